@@ -0,0 +1,30 @@
+"""Add composite index for latest active contract lookup
+
+Revision ID: 020_add_active_contract_lookup_index
+Revises: 019_add_employment_type_index
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '020_add_active_contract_lookup_index'
+down_revision = '019_add_employment_type_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Index contracts by employee, status and start date for the payroll ranking query"""
+    conn = op.get_bind()
+    conn.execute(sa.text("""
+        CREATE INDEX IF NOT EXISTS idx_employment_contracts_employee_status_start
+        ON employment_contracts (employee_id, status, start_date DESC)
+        WHERE is_deleted = false
+    """))
+
+
+def downgrade():
+    """Remove the active contract lookup index"""
+    op.drop_index('idx_employment_contracts_employee_status_start', 'employment_contracts')
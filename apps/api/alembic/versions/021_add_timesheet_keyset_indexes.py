@@ -0,0 +1,42 @@
+"""Add keyset pagination indexes for timesheets
+
+Revision ID: 021_add_timesheet_keyset_indexes
+Revises: 020_add_active_contract_lookup_index
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '021_add_timesheet_keyset_indexes'
+down_revision = '020_add_active_contract_lookup_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Index timesheets by (created_at, id) overall and per employee, and entries by timesheet"""
+    conn = op.get_bind()
+    conn.execute(sa.text("""
+        CREATE INDEX IF NOT EXISTS idx_timesheets_created_keyset
+        ON timesheets (created_at DESC, id DESC)
+        WHERE is_deleted = false
+    """))
+    conn.execute(sa.text("""
+        CREATE INDEX IF NOT EXISTS idx_timesheets_employee_created_keyset
+        ON timesheets (employee_id, created_at DESC, id DESC)
+        WHERE is_deleted = false
+    """))
+    conn.execute(sa.text("""
+        CREATE INDEX IF NOT EXISTS idx_timesheet_entries_timesheet_date
+        ON timesheet_entries (timesheet_id, date)
+        WHERE is_deleted = false
+    """))
+
+
+def downgrade():
+    """Remove timesheet keyset pagination indexes"""
+    op.drop_index('idx_timesheet_entries_timesheet_date', 'timesheet_entries')
+    op.drop_index('idx_timesheets_employee_created_keyset', 'timesheets')
+    op.drop_index('idx_timesheets_created_keyset', 'timesheets')
@@ -0,0 +1,42 @@
+"""Add keyset sort indexes for the employee directory
+
+Revision ID: 022_add_employee_directory_indexes
+Revises: 021_add_timesheet_keyset_indexes
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '022_add_employee_directory_indexes'
+down_revision = '021_add_timesheet_keyset_indexes'
+branch_labels = None
+depends_on = None
+
+# (index name, columns) for each directory sort; id breaks ties
+DIRECTORY_INDEXES = [
+    ('idx_employees_directory_last_name', 'last_name, id'),
+    ('idx_employees_directory_first_name', 'first_name, id'),
+    ('idx_employees_directory_hire_date', 'hire_date, id'),
+    ('idx_employees_directory_created_at', 'created_at, id'),
+    ('idx_employees_directory_country', 'country_code, last_name, id'),
+    ('idx_employees_directory_department', 'department_id, last_name, id'),
+]
+
+
+def upgrade():
+    """Create partial indexes matching the directory's (sort column, id) keyset"""
+    conn = op.get_bind()
+    for index_name, columns in DIRECTORY_INDEXES:
+        conn.execute(sa.text(f"""
+            CREATE INDEX IF NOT EXISTS {index_name}
+            ON employees ({columns})
+            WHERE is_deleted = false
+        """))
+
+
+def downgrade():
+    """Remove employee directory indexes"""
+    for index_name, _ in reversed(DIRECTORY_INDEXES):
+        op.drop_index(index_name, 'employees')
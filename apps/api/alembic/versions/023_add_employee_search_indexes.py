@@ -0,0 +1,55 @@
+"""Add full-text and trigram indexes for employee search
+
+Revision ID: 023_add_employee_search_indexes
+Revises: 022_add_employee_directory_indexes
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '023_add_employee_search_indexes'
+down_revision = '022_add_employee_directory_indexes'
+branch_labels = None
+depends_on = None
+
+# Must match EMPLOYEE_SEARCH_DOCUMENT in modules/employees/search.py exactly,
+# otherwise the planner will not use the expression indexes
+EMPLOYEE_SEARCH_DOCUMENT = (
+    "lower(coalesce(first_name, '') || ' ' || coalesce(preferred_name, '') || ' ' || "
+    "coalesce(last_name, '') || ' ' || coalesce(employee_number, '') || ' ' || "
+    "coalesce(work_email, ''))"
+)
+
+
+def upgrade():
+    """Enable pg_trgm and index the employee, position and department search text"""
+    conn = op.get_bind()
+    conn.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    conn.execute(sa.text(f"""
+        CREATE INDEX IF NOT EXISTS idx_employees_search_fts
+        ON employees USING gin (to_tsvector('simple', {EMPLOYEE_SEARCH_DOCUMENT}))
+        WHERE is_deleted = false
+    """))
+    conn.execute(sa.text(f"""
+        CREATE INDEX IF NOT EXISTS idx_employees_search_trgm
+        ON employees USING gin (({EMPLOYEE_SEARCH_DOCUMENT}) gin_trgm_ops)
+        WHERE is_deleted = false
+    """))
+    conn.execute(sa.text("""
+        CREATE INDEX IF NOT EXISTS idx_positions_title_trgm
+        ON positions USING gin (lower(title) gin_trgm_ops)
+    """))
+    conn.execute(sa.text("""
+        CREATE INDEX IF NOT EXISTS idx_departments_name_trgm
+        ON departments USING gin (lower(name) gin_trgm_ops)
+    """))
+
+
+def downgrade():
+    """Remove employee search indexes (the pg_trgm extension is left installed)"""
+    op.drop_index('idx_departments_name_trgm', 'departments')
+    op.drop_index('idx_positions_title_trgm', 'positions')
+    op.drop_index('idx_employees_search_trgm', 'employees')
+    op.drop_index('idx_employees_search_fts', 'employees')
@@ -0,0 +1,50 @@
+"""Add email outbox table
+
+Revision ID: 024_add_email_outbox
+Revises: 023_add_employee_search_indexes
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '024_add_email_outbox'
+down_revision = '023_add_employee_search_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create email_outbox and the partial index the dispatcher claims from"""
+    op.create_table(
+        'email_outbox',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('to_email', sa.String(length=255), nullable=False),
+        sa.Column('subject', sa.String(length=500), nullable=False),
+        sa.Column('html_body', sa.Text(), nullable=False),
+        sa.Column('text_body', sa.Text(), nullable=True),
+        sa.Column('dedupe_key', sa.String(length=255), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('dedupe_key', name='uq_email_outbox_dedupe_key')
+    )
+    conn = op.get_bind()
+    conn.execute(sa.text("""
+        CREATE INDEX IF NOT EXISTS idx_email_outbox_pending
+        ON email_outbox (next_attempt_at)
+        WHERE status = 'pending'
+    """))
+
+
+def downgrade():
+    """Drop the email outbox (undelivered mail is lost)"""
+    op.drop_index('idx_email_outbox_pending', 'email_outbox')
+    op.drop_table('email_outbox')
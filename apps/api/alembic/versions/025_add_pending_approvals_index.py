@@ -0,0 +1,30 @@
+"""Add covering index for the approver inbox
+
+Revision ID: 025_add_pending_approvals_index
+Revises: 024_add_email_outbox
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '025_add_pending_approvals_index'
+down_revision = '024_add_email_outbox'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Index approvals by (approver_id, status, submitted_at), carrying the chain-gate columns"""
+    conn = op.get_bind()
+    conn.execute(sa.text("""
+        CREATE INDEX IF NOT EXISTS idx_approval_requests_approver_inbox
+        ON approval_requests (approver_id, status, submitted_at DESC, id DESC)
+        INCLUDE (approval_level, previous_approval_id)
+    """))
+
+
+def downgrade():
+    """Remove the approver inbox index"""
+    op.drop_index('idx_approval_requests_approver_inbox', 'approval_requests')
@@ -0,0 +1,36 @@
+"""Add indexes for supervisor team metrics
+
+Revision ID: 026_add_team_metrics_indexes
+Revises: 025_add_pending_approvals_index
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '026_add_team_metrics_indexes'
+down_revision = '025_add_pending_approvals_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Index attendance by (employee, date) and approved leave by date range"""
+    conn = op.get_bind()
+    conn.execute(sa.text("""
+        CREATE INDEX IF NOT EXISTS idx_attendance_records_employee_date
+        ON attendance_records (employee_id, date)
+        WHERE is_deleted = false
+    """))
+    conn.execute(sa.text("""
+        CREATE INDEX IF NOT EXISTS idx_leave_requests_approved_range
+        ON leave_requests (employee_id, start_date, end_date)
+        WHERE status = 'approved' AND is_deleted = false
+    """))
+
+
+def downgrade():
+    """Remove the team metrics indexes"""
+    op.drop_index('idx_leave_requests_approved_range', 'leave_requests')
+    op.drop_index('idx_attendance_records_employee_date', 'attendance_records')
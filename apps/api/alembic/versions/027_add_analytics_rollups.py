@@ -0,0 +1,87 @@
+"""Add analytics rollup tables
+
+Revision ID: 027_add_analytics_rollups
+Revises: 026_add_team_metrics_indexes
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '027_add_analytics_rollups'
+down_revision = '026_add_team_metrics_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create the headcount, workforce and leave usage rollups and their refresh state"""
+    op.create_table(
+        'analytics_headcount_daily',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('snapshot_date', sa.Date(), nullable=False),
+        sa.Column('department_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('country_code', sa.String(length=2), nullable=True),
+        sa.Column('employment_type', sa.String(length=50), nullable=True),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('headcount', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_analytics_headcount_daily_snapshot_date', 'analytics_headcount_daily', ['snapshot_date'])
+
+    op.create_table(
+        'analytics_workforce_monthly',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('period_start', sa.Date(), nullable=False),
+        sa.Column('department_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('country_code', sa.String(length=2), nullable=True),
+        sa.Column('employment_type', sa.String(length=50), nullable=True),
+        sa.Column('opening_headcount', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('hires', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('terminations', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_analytics_workforce_monthly_period_start', 'analytics_workforce_monthly', ['period_start'])
+
+    op.create_table(
+        'analytics_leave_usage',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('year', sa.String(length=10), nullable=False),
+        sa.Column('leave_type', sa.String(length=50), nullable=False),
+        sa.Column('employees', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_days', sa.Numeric(10, 2), nullable=False, server_default='0'),
+        sa.Column('used_days', sa.Numeric(10, 2), nullable=False, server_default='0'),
+        sa.Column('pending_days', sa.Numeric(10, 2), nullable=False, server_default='0'),
+        sa.Column('available_days', sa.Numeric(10, 2), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_analytics_leave_usage_year', 'analytics_leave_usage', ['year'])
+
+    op.create_table(
+        'analytics_refresh_state',
+        sa.Column('rollup', sa.String(length=50), nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+        sa.Column('watermark', sa.DateTime(), nullable=True),
+        sa.Column('payload', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('rollup')
+    )
+
+    # The incremental refresh looks for rows changed since its watermark
+    conn = op.get_bind()
+    conn.execute(sa.text("CREATE INDEX IF NOT EXISTS idx_employees_updated_at ON employees (updated_at)"))
+    conn.execute(sa.text("CREATE INDEX IF NOT EXISTS idx_leave_balances_updated_at ON leave_balances (updated_at)"))
+
+
+def downgrade():
+    """Drop the analytics rollups (they are rebuilt by the next refresh)"""
+    op.drop_index('idx_leave_balances_updated_at', 'leave_balances')
+    op.drop_index('idx_employees_updated_at', 'employees')
+    op.drop_table('analytics_refresh_state')
+    op.drop_index('ix_analytics_leave_usage_year', 'analytics_leave_usage')
+    op.drop_table('analytics_leave_usage')
+    op.drop_index('ix_analytics_workforce_monthly_period_start', 'analytics_workforce_monthly')
+    op.drop_table('analytics_workforce_monthly')
+    op.drop_index('ix_analytics_headcount_daily_snapshot_date', 'analytics_headcount_daily')
+    op.drop_table('analytics_headcount_daily')
@@ -0,0 +1,60 @@
+"""Add leave ledger
+
+Revision ID: 028_add_leave_ledger
+Revises: 027_add_analytics_rollups
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '028_add_leave_ledger'
+down_revision = '027_add_analytics_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create leave_ledger and seed it with an opening entry per existing balance"""
+    op.create_table(
+        'leave_ledger',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('employee_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('leave_type', sa.String(length=50), nullable=False),
+        sa.Column('year', sa.String(length=10), nullable=False),
+        sa.Column('entry_type', sa.String(length=20), nullable=False),
+        sa.Column('total_delta', sa.Numeric(5, 2), nullable=False, server_default='0'),
+        sa.Column('used_delta', sa.Numeric(5, 2), nullable=False, server_default='0'),
+        sa.Column('pending_delta', sa.Numeric(5, 2), nullable=False, server_default='0'),
+        sa.Column('leave_request_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('reference', sa.String(length=100), nullable=True),
+        sa.Column('created_by', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(['employee_id'], ['employees.id']),
+        sa.ForeignKeyConstraint(['leave_request_id'], ['leave_requests.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('employee_id', 'leave_type', 'year', 'reference', name='uq_leave_ledger_reference')
+    )
+    op.create_index('ix_leave_ledger_employee_id', 'leave_ledger', ['employee_id'])
+    op.create_index('ix_leave_ledger_reference', 'leave_ledger', ['reference'])
+
+    conn = op.get_bind()
+    conn.execute(sa.text("""
+        INSERT INTO leave_ledger (
+            id, employee_id, leave_type, year, entry_type,
+            total_delta, used_delta, pending_delta, reference, created_at
+        )
+        SELECT gen_random_uuid(), employee_id, leave_type, year, 'opening',
+               total_days, used_days, pending_days, 'opening', now()
+        FROM leave_balances
+        WHERE is_deleted = false
+    """))
+
+
+def downgrade():
+    """Drop the leave ledger (balances keep their current snapshot values)"""
+    op.drop_index('ix_leave_ledger_reference', 'leave_ledger')
+    op.drop_index('ix_leave_ledger_employee_id', 'leave_ledger')
+    op.drop_table('leave_ledger')
@@ -0,0 +1,44 @@
+"""Add unique index on live leave balances
+
+Revision ID: 029_add_leave_balance_unique_index
+Revises: 028_add_leave_ledger
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '029_add_leave_balance_unique_index'
+down_revision = '028_add_leave_ledger'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """One live balance per (employee, leave type, year), the accrual engine's upsert target"""
+    conn = op.get_bind()
+    duplicates = conn.execute(sa.text("""
+        SELECT COUNT(*) FROM (
+            SELECT 1 FROM leave_balances
+            WHERE is_deleted = false
+            GROUP BY employee_id, leave_type, year
+            HAVING COUNT(*) > 1
+        ) d
+    """)).scalar()
+    if duplicates:
+        raise RuntimeError(
+            f"{duplicates} employee/leave type/year combinations have more than one live leave balance; "
+            "soft-delete the extras before upgrading"
+        )
+
+    conn.execute(sa.text("""
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_leave_balances_employee_type_year
+        ON leave_balances (employee_id, leave_type, year)
+        WHERE is_deleted = false
+    """))
+
+
+def downgrade():
+    """Remove the unique leave balance index"""
+    op.drop_index('uq_leave_balances_employee_type_year', 'leave_balances')
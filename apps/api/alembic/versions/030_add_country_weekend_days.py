@@ -0,0 +1,25 @@
+"""Add weekend days to country configs
+
+Revision ID: 030_add_country_weekend_days
+Revises: 029_add_leave_balance_unique_index
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '030_add_country_weekend_days'
+down_revision = '029_add_leave_balance_unique_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Weekend days per country for the working-day calendar (null = derived from working_days_per_week)"""
+    op.add_column('country_configs', sa.Column('weekend_days', sa.String(20), nullable=True))
+
+
+def downgrade():
+    """Remove weekend days from country configs"""
+    op.drop_column('country_configs', 'weekend_days')
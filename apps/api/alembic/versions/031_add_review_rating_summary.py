@@ -0,0 +1,30 @@
+"""Add rating summary to performance review cycles
+
+Revision ID: 031_add_review_rating_summary
+Revises: 030_add_country_weekend_days
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '031_add_review_rating_summary'
+down_revision = '030_add_country_weekend_days'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Per-cycle rating aggregates, plus the period index the calibration report filters on"""
+    op.add_column('performance_review_cycles', sa.Column('rating_summary', sa.Text(), nullable=True))
+    op.create_index(
+        'ix_review_cycles_period', 'performance_review_cycles',
+        ['review_period_start', 'review_period_end']
+    )
+
+
+def downgrade():
+    """Remove the rating summary and period index"""
+    op.drop_index('ix_review_cycles_period', 'performance_review_cycles')
+    op.drop_column('performance_review_cycles', 'rating_summary')
@@ -0,0 +1,54 @@
+"""Add employee hierarchy closure table
+
+Revision ID: 032_add_employee_hierarchy
+Revises: 031_add_review_rating_summary
+Create Date: 2026-10-17 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '032_add_employee_hierarchy'
+down_revision = '031_add_review_rating_summary'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create employee_hierarchy and fill it from employees.manager_id"""
+    op.create_table(
+        'employee_hierarchy',
+        sa.Column('ancestor_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('descendant_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('depth', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['ancestor_id'], ['employees.id']),
+        sa.ForeignKeyConstraint(['descendant_id'], ['employees.id']),
+        sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    op.create_index('ix_employee_hierarchy_descendant', 'employee_hierarchy', ['descendant_id', 'depth'])
+
+    # Walk up from every employee; the path check cuts any manager_id cycle
+    conn = op.get_bind()
+    conn.execute(sa.text("""
+        WITH RECURSIVE chain (ancestor_id, descendant_id, depth, path) AS (
+            SELECT id, id, 0, ARRAY[id]
+            FROM employees
+            UNION ALL
+            SELECT e.manager_id, c.descendant_id, c.depth + 1, c.path || e.manager_id
+            FROM chain c
+            JOIN employees e ON e.id = c.ancestor_id
+            WHERE e.manager_id IS NOT NULL
+              AND NOT e.manager_id = ANY(c.path)
+        )
+        INSERT INTO employee_hierarchy (ancestor_id, descendant_id, depth)
+        SELECT ancestor_id, descendant_id, depth
+        FROM chain
+    """))
+
+
+def downgrade():
+    """Drop the hierarchy index (manager_id remains the source of truth)"""
+    op.drop_index('ix_employee_hierarchy_descendant', 'employee_hierarchy')
+    op.drop_table('employee_hierarchy')
@@ -1,12 +1,26 @@
 """
 Redis Cache Service
-Provides caching layer for frequently accessed data
+Provides an async caching layer for frequently accessed data
+
+- Redis access goes through redis.asyncio with a shared connection pool,
+  so cache calls never block the event loop
+- A small in-process L1 tier sits in front of Redis for hot keys; it holds
+  the same JSON as Redis, so every caller gets a fresh, identically typed
+  copy whichever tier answers
+- get_or_set() coalesces concurrent recomputation of the same key
+  (single-flight per process, plus a short Redis lock across workers)
+- Entries can declare tags (employee:<id>, department:<id>, ...); writes
+  call invalidate_tags() which drops only the member keys of those tags
 """
 
-import redis
+import redis.asyncio as aioredis
+import asyncio
 import json
+import time
+import uuid
+from collections import OrderedDict
 from functools import wraps
-from typing import Any, Optional, Callable
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
 import logging
 
 from core.config import settings
@@ -14,83 +28,522 @@ from core.config import settings
 logger = logging.getLogger(__name__)
 
 
+class CacheStats:
+    """Hit/miss/latency counters for the cache layer"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.coalesced = 0
+        self.redis_calls = 0
+        self.redis_time_total = 0.0
+        self.redis_time_max = 0.0
+
+    def record_redis_call(self, duration: float):
+        self.redis_calls += 1
+        self.redis_time_total += duration
+        if duration > self.redis_time_max:
+            self.redis_time_max = duration
+
+    def as_dict(self) -> Dict[str, Any]:
+        lookups = self.local_hits + self.redis_hits + self.misses
+        hits = self.local_hits + self.redis_hits
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate_percent": round(hits / lookups * 100, 2) if lookups else 0,
+            "coalesced_loads": self.coalesced,
+            "errors": self.errors,
+            "redis_calls": self.redis_calls,
+            "redis_avg_ms": round(self.redis_time_total / self.redis_calls * 1000, 3) if self.redis_calls else 0,
+            "redis_max_ms": round(self.redis_time_max * 1000, 3)
+        }
+
+
+class LocalCache:
+    """Bounded in-process LRU with per-entry expiry and tags (the L1 tier)"""
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self.delete(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: int, tags: Iterable[str] = ()):
+        if self.max_entries <= 0:
+            return
+        self.delete(key)
+        tags = tuple(tags)
+        self._entries[key] = (time.monotonic() + min(ttl, self.ttl), value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self.delete(next(iter(self._entries)))
+
+    def delete(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            members = self._tags.get(tag)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._tags[tag]
+
+    def delete_tag(self, tag: str):
+        for key in list(self._tags.get(tag, ())):
+            self.delete(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._tags.clear()
+
+
+# Deletes every member of the given tag sets, then the sets themselves,
+# and returns the member keys. Runs atomically so a concurrent set() cannot
+# register a member between reading a tag set and dropping it.
+INVALIDATE_TAGS_SCRIPT = """
+local deleted = {}
+for _, tag in ipairs(KEYS) do
+    local members = redis.call('SMEMBERS', tag)
+    for i = 1, #members, 500 do
+        redis.call('DEL', unpack(members, i, math.min(i + 499, #members)))
+    end
+    for _, member in ipairs(members) do
+        table.insert(deleted, member)
+    end
+    redis.call('DEL', tag)
+end
+return deleted
+"""
+
+
+# Deletes a lock only while it still holds the caller's token, so a loader
+# that outlived its lock cannot release the lock of the worker after it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _tag_key(tag: str) -> str:
+    return f"tag:{tag}"
+
+
 class RedisCache:
-    """Redis caching service"""
-    
+    """Async Redis caching service with an in-process L1 tier"""
+
     def __init__(self):
+        self.client: Optional[aioredis.Redis] = None
+        self.pool: Optional[aioredis.ConnectionPool] = None
+        self.local = LocalCache(settings.CACHE_LOCAL_MAX_ENTRIES, settings.CACHE_LOCAL_TTL_SECONDS)
+        self.stats = CacheStats()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def connect(self):
+        """Create the connection pool and verify Redis is reachable"""
         try:
-            self.client = redis.from_url(settings.REDIS_URL, decode_responses=True)
-            self.client.ping()
+            self.pool = aioredis.ConnectionPool.from_url(
+                settings.REDIS_URL,
+                decode_responses=True,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+                socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS
+            )
+            self.client = aioredis.Redis(connection_pool=self.pool)
+            await self.client.ping()
             logger.info("Redis cache initialized successfully")
         except Exception as e:
-            logger.warning(f"Redis connection failed: {e}. Caching disabled.")
-            self.client = None
-    
-    def get(self, key: str) -> Optional[Any]:
-        """Get value from cache"""
+            logger.warning(f"Redis connection failed: {e}. Caching limited to in-process tier.")
+            await self.close()
+
+    async def close(self):
+        """Release the connection pool"""
+        if self.client:
+            try:
+                await self.client.aclose()
+            except Exception as e:
+                logger.debug(f"Error closing Redis client: {e}")
+        if self.pool:
+            try:
+                await self.pool.disconnect()
+            except Exception as e:
+                logger.debug(f"Error closing Redis pool: {e}")
+        self.client = None
+        self.pool = None
+
+    async def _call(self, operation: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a Redis operation, recording its latency"""
+        start = time.perf_counter()
+        try:
+            return await operation()
+        finally:
+            self.stats.record_redis_call(time.perf_counter() - start)
+
+    @staticmethod
+    def _dumps(value: Any) -> str:
+        return json.dumps(value, default=str)
+
+    @staticmethod
+    def _loads(raw: Optional[str]) -> Optional[Any]:
+        return None if raw is None else json.loads(raw)
+
+    async def get(self, key: str, local: bool = True) -> Optional[Any]:
+        """Get value from cache (L1 first, then Redis)"""
+        return self._loads(await self._get_raw(key, local))
+
+    async def _get_raw(self, key: str, local: bool = True) -> Optional[str]:
+        """Serialized value of key, or None"""
+        if local:
+            raw = self.local.get(key)
+            if raw is not None:
+                self.stats.local_hits += 1
+                return raw
+
         if not self.client:
+            self.stats.misses += 1
             return None
-        
+
         try:
-            value = self.client.get(key)
-            if value:
-                return json.loads(value)
-            return None
+            raw = await self._call(lambda: self.client.get(key))
         except Exception as e:
+            self.stats.errors += 1
             logger.error(f"Cache get error for key {key}: {e}")
             return None
-    
-    def set(self, key: str, value: Any, ttl: int = 300) -> bool:
-        """Set value in cache with TTL (seconds)"""
+
+        if raw is None:
+            self.stats.misses += 1
+            return None
+
+        self.stats.redis_hits += 1
+        if local:
+            self.local.set(key, raw, self.local.ttl)
+        return raw
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: int = 300,
+        local: bool = True,
+        tags: Optional[Iterable[str]] = None
+    ) -> bool:
+        """
+        Set value in cache with TTL (seconds)
+
+        tags: invalidation tags for this entry, see invalidate_tags()
+        """
+        return await self._set_raw(key, self._dumps(value), ttl, local, tags)
+
+    async def _set_raw(
+        self,
+        key: str,
+        serialized: str,
+        ttl: int,
+        local: bool = True,
+        tags: Optional[Iterable[str]] = None
+    ) -> bool:
+        tags = tuple(tags or ())
+        if local:
+            self.local.set(key, serialized, ttl, tags)
+
         if not self.client:
             return False
-        
+
+        async def _write():
+            if not tags:
+                return await self.client.setex(key, ttl, serialized)
+            # Tag sets outlive their members; stale member keys are harmless
+            tag_ttl = max(ttl, settings.CACHE_TAG_TTL_SECONDS)
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.setex(key, ttl, serialized)
+                for tag in tags:
+                    pipe.sadd(_tag_key(tag), key)
+                    pipe.expire(_tag_key(tag), tag_ttl)
+                return await pipe.execute()
+
         try:
-            serialized = json.dumps(value, default=str)
-            self.client.setex(key, ttl, serialized)
+            await self._call(_write)
             return True
         except Exception as e:
+            self.stats.errors += 1
             logger.error(f"Cache set error for key {key}: {e}")
             return False
-    
-    def delete(self, key: str) -> bool:
-        """Delete key from cache"""
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Get several keys in one round trip; missing keys are omitted"""
+        found: Dict[str, Any] = {}
+        remote_keys = []
+        for key in keys:
+            raw = self.local.get(key)
+            if raw is not None:
+                self.stats.local_hits += 1
+                found[key] = json.loads(raw)
+            else:
+                remote_keys.append(key)
+
+        if not remote_keys:
+            return found
         if not self.client:
+            self.stats.misses += len(remote_keys)
+            return found
+
+        try:
+            raw_values = await self._call(lambda: self.client.mget(remote_keys))
+        except Exception as e:
+            self.stats.errors += 1
+            logger.error(f"Cache get_many error for {len(remote_keys)} keys: {e}")
+            return found
+
+        for key, raw in zip(remote_keys, raw_values):
+            if raw is None:
+                self.stats.misses += 1
+                continue
+            self.stats.redis_hits += 1
+            self.local.set(key, raw, self.local.ttl)
+            found[key] = json.loads(raw)
+        return found
+
+    async def set_many(self, items: Dict[str, Any], ttl: int = 300) -> bool:
+        """Set several keys with the same TTL using a single pipeline"""
+        serialized = {key: self._dumps(value) for key, value in items.items()}
+        for key, raw in serialized.items():
+            self.local.set(key, raw, ttl)
+
+        if not self.client or not items:
+            return False
+
+        async def _pipeline():
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key, raw in serialized.items():
+                    pipe.setex(key, ttl, raw)
+                return await pipe.execute()
+
+        try:
+            await self._call(_pipeline)
+            return True
+        except Exception as e:
+            self.stats.errors += 1
+            logger.error(f"Cache set_many error for {len(items)} keys: {e}")
+            return False
+
+    async def delete(self, *keys: str) -> bool:
+        """Delete keys from cache"""
+        for key in keys:
+            self.local.delete(key)
+
+        if not self.client or not keys:
             return False
-        
+
         try:
-            self.client.delete(key)
+            await self._call(lambda: self.client.delete(*keys))
             return True
         except Exception as e:
-            logger.error(f"Cache delete error for key {key}: {e}")
+            self.stats.errors += 1
+            logger.error(f"Cache delete error for keys {keys}: {e}")
             return False
-    
-    def delete_pattern(self, pattern: str) -> int:
-        """Delete all keys matching pattern"""
+
+    async def incr(self, key: str) -> Optional[int]:
+        """Atomically increment an integer counter"""
         if not self.client:
+            return None
+
+        try:
+            return await self._call(lambda: self.client.incr(key))
+        except Exception as e:
+            self.stats.errors += 1
+            logger.error(f"Cache incr error for key {key}: {e}")
+            return None
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        """
+        Drop every entry registered under any of the given tags
+
+        Cost is O(members of those tags), independent of keyspace size.
+        Other workers' L1 tiers expire within CACHE_LOCAL_TTL_SECONDS.
+        """
+        tags = tuple(tag for tag in tags if tag)
+        for tag in tags:
+            self.local.delete_tag(tag)
+
+        if not self.client or not tags:
             return 0
-        
+
         try:
-            keys = self.client.keys(pattern)
-            if keys:
-                return self.client.delete(*keys)
+            deleted_keys = await self._call(lambda: self.client.eval(
+                INVALIDATE_TAGS_SCRIPT,
+                len(tags),
+                *[_tag_key(tag) for tag in tags]
+            ))
+        except Exception as e:
+            self.stats.errors += 1
+            logger.error(f"Cache invalidate tags error for {tags}: {e}")
+            return 0
+
+        # L1 copies filled from Redis hits carry no tags; drop them by key
+        for key in deleted_keys:
+            self.local.delete(key)
+        return len(deleted_keys)
+
+    async def delete_pattern(self, pattern: str) -> int:
+        """
+        Delete all keys matching pattern
+
+        Walks the keyspace incrementally with SCAN, so it never blocks Redis,
+        but it is still O(keyspace). Prefer invalidate_tags() for app data.
+        """
+        self.local.clear()
+        if not self.client:
             return 0
+
+        async def _scan_and_delete():
+            deleted = 0
+            batch = []
+            async for key in self.client.scan_iter(match=pattern, count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    deleted += await self.client.delete(*batch)
+                    batch = []
+            if batch:
+                deleted += await self.client.delete(*batch)
+            return deleted
+
+        try:
+            return await self._call(_scan_and_delete)
         except Exception as e:
+            self.stats.errors += 1
             logger.error(f"Cache delete pattern error for {pattern}: {e}")
             return 0
-    
-    def clear_all(self) -> bool:
+
+    async def clear_all(self) -> bool:
         """Clear all cache (use with caution)"""
+        self.local.clear()
         if not self.client:
             return False
-        
+
         try:
-            self.client.flushdb()
+            await self._call(lambda: self.client.flushdb())
             return True
         except Exception as e:
+            self.stats.errors += 1
             logger.error(f"Cache clear all error: {e}")
             return False
 
+    async def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int = 300,
+        tags: Optional[Iterable[str]] = None
+    ) -> Any:
+        """
+        Return the cached value for key, computing it with loader on a miss
+
+        Concurrent misses for the same key in this process share one loader
+        call; across workers a short Redis lock lets one worker recompute
+        while the others wait briefly for its result.
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value
+
+        # Waiters share the serialized result and each decode their own copy
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats.coalesced += 1
+            return self._loads(await asyncio.shield(inflight))
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            serialized = await self._load_with_lock(key, loader, ttl, tags)
+            future.set_result(serialized)
+            return self._loads(serialized)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unobserved failure is not logged twice
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _load_with_lock(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        tags: Optional[Iterable[str]] = None
+    ) -> Optional[str]:
+        """Load key under a cross-worker lock and return its serialized value"""
+        lock_key = f"lock:{key}"
+        lock_token = uuid.uuid4().hex
+        lock_timeout = settings.CACHE_LOCK_TIMEOUT_SECONDS
+        acquired = True
+
+        if self.client:
+            try:
+                acquired = bool(await self._call(
+                    lambda: self.client.set(lock_key, lock_token, nx=True, ex=lock_timeout)
+                ))
+            except Exception as e:
+                self.stats.errors += 1
+                logger.error(f"Cache lock error for key {key}: {e}")
+
+        if not acquired:
+            # Another worker is recomputing; wait for its result, then fall back
+            deadline = time.monotonic() + lock_timeout
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                raw = await self._get_raw(key)
+                if raw is not None:
+                    self.stats.coalesced += 1
+                    return raw
+
+        try:
+            value = await loader()
+            if value is None:
+                return None
+            serialized = self._dumps(value)
+            await self._set_raw(key, serialized, ttl, tags=tags)
+            return serialized
+        finally:
+            if acquired and self.client:
+                try:
+                    await self._call(lambda: self.client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, lock_token))
+                except Exception as e:
+                    logger.debug(f"Cache unlock error for key {key}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache counters plus connection state"""
+        return {
+            "connected": self.client is not None,
+            "local_entries": len(self.local._entries),
+            **self.stats.as_dict()
+        }
+
 
 # Global cache instance
 cache = RedisCache()
@@ -99,11 +552,11 @@ cache = RedisCache()
 def cache_result(key_prefix: str, ttl: int = 300):
     """
     Decorator to cache function results
-    
+
     Args:
         key_prefix: Prefix for cache key
         ttl: Time to live in seconds (default 5 minutes)
-    
+
     Usage:
         @cache_result("dashboard:employee", ttl=300)
         async def get_employee_dashboard(employee_id: UUID):
@@ -116,33 +569,68 @@ def cache_result(key_prefix: str, ttl: int = 300):
             args_str = ",".join(str(arg) for arg in args if arg)
             kwargs_str = ",".join(f"{k}={v}" for k, v in sorted(kwargs.items()))
             cache_key = f"{key_prefix}:{args_str}:{kwargs_str}"
-            
-            # Try to get from cache
-            cached_value = cache.get(cache_key)
-            if cached_value is not None:
-                logger.debug(f"Cache hit for key: {cache_key}")
-                return cached_value
-            
-            # Call function
-            logger.debug(f"Cache miss for key: {cache_key}")
-            result = await func(*args, **kwargs)
-            
-            # Store in cache
-            cache.set(cache_key, result, ttl)
-            
-            return result
+
+            return await cache.get_or_set(cache_key, lambda: func(*args, **kwargs), ttl)
         return wrapper
     return decorator
 
 
-def invalidate_cache(pattern: str):
+async def invalidate_cache(pattern: str):
     """
-    Delete cache entries matching pattern
-    
+    Delete cache entries matching pattern (SCAN based, O(keyspace))
+
+    Prefer invalidate_tags() for anything on a request path.
+
     Usage:
-        invalidate_cache("dashboard:employee:*")
+        await invalidate_cache("dashboard:employee:*")
+    """
+    return await cache.delete_pattern(pattern)
+
+
+async def invalidate_tags(*tags: str):
     """
-    return cache.delete_pattern(pattern)
+    Delete every cache entry carrying any of the given tags
+
+    Usage:
+        await invalidate_tags(employee_tag(employee.id), EMPLOYEES_LIST_TAG)
+    """
+    return await cache.invalidate_tags(*tags)
+
+
+# Cache tags
+EMPLOYEES_LIST_TAG = "employees:list"
+APPROVALS_ORG_TAG = "approvals:org"
+
+
+def employee_tag(employee_id) -> str:
+    """Tag for anything derived from a single employee's data"""
+    return f"employee:{employee_id}"
+
+
+def department_tag(department_id) -> str:
+    """Tag for anything derived from a department's membership or details"""
+    return f"department:{department_id}"
+
+
+def approvals_tag(approver_id) -> str:
+    """Tag for an approver's pending approvals and approval stats"""
+    return f"approvals:{approver_id}"
+
+
+def tenant_tag(country_code: str) -> str:
+    """Tag for tenant-wide (country office) aggregates"""
+    return f"tenant:{country_code}"
+
+
+def employee_write_tags(employee) -> List[str]:
+    """Tags to invalidate after an employee row is created, changed or removed"""
+    tags = [EMPLOYEES_LIST_TAG, employee_tag(employee.id)]
+    if getattr(employee, "department_id", None):
+        tags.append(department_tag(employee.department_id))
+    if getattr(employee, "manager_id", None):
+        # The manager's team views list this employee
+        tags.append(employee_tag(employee.manager_id))
+    return tags
 
 
 # Cache key builders
@@ -151,6 +639,16 @@ def build_employee_key(employee_id: str) -> str:
     return f"employee:{employee_id}"
 
 
+def build_approval_stats_key(approver_id) -> str:
+    """Build cache key for an approver's pending counts"""
+    return f"approvals:stats:{approver_id}"
+
+
+def build_approval_backlog_key(country_code: Optional[str] = None) -> str:
+    """Build cache key for the org-wide pending approvals breakdown"""
+    return f"approvals:backlog:{country_code or 'all'}"
+
+
 def build_dashboard_key(employee_id: str, dashboard_type: str = "employee") -> str:
     """Build cache key for dashboard data"""
     return f"dashboard:{dashboard_type}:{employee_id}"
@@ -176,12 +674,24 @@ def build_employees_list_key(skip: int = 0, limit: int = 100, filters: dict = No
     return f"employees:list:{skip}:{limit}{filter_str}"
 
 
+def build_employee_directory_key(params: dict) -> str:
+    """Build cache key for an employee directory page"""
+    param_str = ":".join(f"{k}={v}" for k, v in sorted(params.items()) if v is not None)
+    return f"employees:directory:{param_str}"
+
+
+def build_org_chart_key(version: str, params: dict) -> str:
+    """Build cache key for an org chart layout at a hierarchy version"""
+    param_str = ":".join(f"{k}={v}" for k, v in sorted(params.items()) if v is not None)
+    return f"org_chart:{version}:{param_str}"
+
+
 # Async Redis initialization functions for lifespan management
 async def init_redis():
-    """Initialize Redis connection - no-op for sync redis"""
-    pass
+    """Open the Redis connection pool"""
+    await cache.connect()
 
 
 async def close_redis():
-    """Close Redis connection - no-op for sync redis"""
-    pass
+    """Close the Redis connection pool"""
+    await cache.close()
@@ -47,6 +47,19 @@ celery_app.conf.beat_schedule = {
         'task': 'core.tasks.update_leave_balances',
         'schedule': crontab(hour=0, minute=0, day_of_month=1),  # Monthly on 1st
     },
+    'recompute-leave-balances': {
+        'task': 'core.tasks.recompute_leave_balances',
+        'schedule': crontab(hour=2, minute=0, day_of_week='sunday'),  # Weekly on Sunday
+    },
+    'aggregate-analytics': {
+        'task': 'core.tasks.aggregate_analytics',
+        'schedule': crontab(minute=15),  # Hourly
+    },
+    'rebuild-analytics': {
+        'task': 'core.tasks.aggregate_analytics',
+        'schedule': crontab(hour=3, minute=45),  # Nightly full rebuild (hard deletes, backdated hires)
+        'kwargs': {'full': True},
+    },
 }
 
 if __name__ == '__main__':
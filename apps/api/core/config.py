@@ -17,12 +17,28 @@ class Settings(BaseSettings):
     
     # Redis
     REDIS_URL: str
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 2.0
+    
+    # Cache (in-process L1 tier in front of Redis)
+    CACHE_LOCAL_TTL_SECONDS: int = 5
+    CACHE_LOCAL_MAX_ENTRIES: int = 2048
+    CACHE_LOCK_TIMEOUT_SECONDS: int = 5
+    CACHE_TAG_TTL_SECONDS: int = 86400
+    APPROVAL_STATS_CACHE_TTL_SECONDS: int = 300  # Also dropped by tag whenever an approval changes
+    
+    # Principal cache (authenticated user snapshots)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 300
+    PRINCIPAL_CACHE_LOCAL_TTL_SECONDS: int = 15
     
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 480  # 8 hours for development
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    BCRYPT_ROUNDS: int = 12  # Work factor for new hashes; older hashes are upgraded on the next login
+    PASSWORD_HASH_WORKERS: int = 4  # Threads running bcrypt off the event loop
+    PASSWORD_HASH_MAX_QUEUE: int = 64  # Hashes waiting or running before new ones are refused
     
     # Environment
     ENVIRONMENT: str = "development"
@@ -74,6 +90,16 @@ class Settings(BaseSettings):
     FROM_EMAIL: str = "noreply@inara.org"
     FROM_NAME: str = "INARA HR System"
     APP_URL: str = "http://localhost:3002"
+    SMTP_IDLE_TIMEOUT_SECONDS: int = 60  # Pooled SMTP session is reopened after this much idle time
+    
+    # Email Outbox
+    EMAIL_OUTBOX_DISPATCHER_ENABLED: bool = True  # Run the dispatcher inside the API process
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    EMAIL_OUTBOX_POLL_SECONDS: int = 5  # Idle poll interval; commits that queue mail wake it early
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 8  # Messages are marked failed after this many attempts
+    EMAIL_OUTBOX_BACKOFF_SECONDS: int = 30  # First retry delay, doubled on every attempt
+    EMAIL_OUTBOX_MAX_BACKOFF_SECONDS: int = 3600
+    EMAIL_OUTBOX_LEASE_SECONDS: int = 300  # Claimed rows are retried after this if a worker dies
     
     # Legacy SMTP fields (backward compatibility)
     SMTP_USER: str = ""
@@ -82,11 +108,22 @@ class Settings(BaseSettings):
     # Pagination
     DEFAULT_PAGE_SIZE: int = 20
     MAX_PAGE_SIZE: int = 100
+    DIRECTORY_EXACT_COUNT_THRESHOLD: int = 10000  # Estimated counts above this size
     
     # Organization
     ORG_NAME: str = "INARA"
     ORG_TIMEZONE: str = "UTC"
     DEFAULT_COUNTRY: str = "US"
+    ORG_CHART_CACHE_TTL_SECONDS: int = 3600  # Layouts are keyed on the hierarchy version, so this only bounds memory
+    
+    # Leave Accrual
+    LEAVE_ACCRUAL_CHUNK_SIZE: int = 1000  # Employees per multi-row upsert (stays under driver bind-parameter limits)
+    
+    # Working Calendar
+    WORK_CALENDAR_CACHE_TTL_SECONDS: int = 600  # How long a worker keeps a country's weekend/holiday tables
+    
+    # Performance Reviews
+    REVIEW_CAMPAIGN_BATCH_SIZE: int = 500  # Rows per bulk insert when launching a 360-review campaign
     
     # Rate Limiting
     RATE_LIMIT_ENABLED: bool = True
@@ -103,6 +140,20 @@ class Settings(BaseSettings):
     REQUEST_TIMEOUT_SECONDS: int = 30
     UPLOAD_TIMEOUT_SECONDS: int = 300  # 5 minutes for file uploads
     
+    # Dashboards
+    FANOUT_MAX_PARALLEL_QUERIES: int = 16  # Pooled sessions fan-out queries may hold at once (per process)
+    FANOUT_COMPONENT_TIMEOUT_SECONDS: float = 3.0  # Deadline for each dashboard component
+    DASHBOARD_CACHE_TTL_SECONDS: int = 300
+    DASHBOARD_LAST_GOOD_TTL_SECONDS: int = 3600  # Last good component values, served when a component fails
+    
+    # PDF Rendering
+    PDF_RENDER_BACKEND: str = "process"  # process, celery or inline
+    PDF_RENDER_WORKERS: int = 2  # Processes in the render pool
+    PDF_RENDER_MAX_QUEUE: int = 32  # Renders waiting or running before new ones are refused
+    PDF_RENDER_TIMEOUT_SECONDS: int = 60
+    PAYSLIP_CACHE_TTL_SECONDS: int = 7 * 24 * 3600  # Rendered payslips, keyed by updated_at
+    GENERATED_DOCUMENTS_DIR: str = ""  # Pre-rendered static documents; defaults to the temp directory
+    
     # Error Tracking (Sentry)
     SENTRY_DSN: str = ""
     SENTRY_ENVIRONMENT: str = "development"
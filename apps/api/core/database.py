@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sess
 from sqlalchemy.orm import sessionmaker, declarative_base, DeclarativeBase
 from sqlalchemy.pool import NullPool
 from typing import AsyncGenerator
+from contextlib import asynccontextmanager
 import logging
 from urllib.parse import urlparse, urlunparse, parse_qs, urlencode
 import ssl
@@ -111,6 +112,24 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
+@asynccontextmanager
+async def task_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for a Celery task that runs its coroutine with asyncio.run
+    
+    asyncpg connections belong to the event loop that opened them, and every
+    task run has a new loop, so the shared pool cannot be reused across runs.
+    Tasks get an unpooled engine that is disposed before their loop closes.
+    """
+    engine = create_async_engine(async_url, poolclass=NullPool, connect_args=connect_args)
+    try:
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with session_factory() as session:
+            yield session
+    finally:
+        await engine.dispose()
+
+
 # Base class for models
 class Base(DeclarativeBase):
     """Base class for all SQLAlchemy models"""
@@ -12,6 +12,7 @@ import logging
 from core.database import get_db
 from core.security import decode_token
 from core.exceptions import UnauthorizedException, ForbiddenException
+from core.principal_cache import principal_cache, build_principal
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +40,11 @@ async def get_current_user(
         if not user_id:
             raise UnauthorizedException(message="Invalid token payload")
         
+        # Serve from the principal cache when possible
+        principal = await principal_cache.get(user_id)
+        if principal is not None:
+            return principal
+        
         # Fetch user from database
         from modules.auth.repositories import UserRepository
         import uuid
@@ -53,21 +59,9 @@ async def get_current_user(
             raise UnauthorizedException(message="User account is inactive")
         
         # Return user dict with token data
-        return {
-            "id": str(user.id),
-            "email": user.email,
-            "first_name": user.first_name,
-            "last_name": user.last_name,
-            "roles": [role.name for role in user.roles],
-            "permissions": [
-                perm.name
-                for role in user.roles
-                for perm in role.permissions
-            ],
-            "employee_id": str(user.employee.id) if user.employee else None,
-            "country_code": user.country_code,
-            "is_superuser": user.is_superuser
-        }
+        principal = build_principal(user)
+        await principal_cache.set(user_id, principal)
+        return principal
     except UnauthorizedException:
         raise
     except Exception as e:
@@ -105,9 +99,10 @@ class PermissionChecker:
             ForbiddenException: If user lacks required permissions
         """
         user_permissions = current_user.get("permissions", [])
+        granted = set(user_permissions)
         
         for permission in self.required_permissions:
-            if permission not in user_permissions:
+            if permission not in granted:
                 raise ForbiddenException(
                     message=f"Missing required permission: {permission}",
                     details={"required": self.required_permissions, "available": user_permissions}
@@ -120,7 +115,7 @@ class RoleChecker:
     """Dependency class to check user roles"""
     
     def __init__(self, required_roles: List[str]):
-        self.required_roles = required_roles
+        self.required_roles = frozenset(required_roles)
     
     async def __call__(self, current_user: dict = Depends(get_current_active_user)):
         """
@@ -131,12 +126,12 @@ class RoleChecker:
         """
         user_roles = current_user.get("roles", [])
         
-        has_role = any(role in user_roles for role in self.required_roles)
+        has_role = not self.required_roles.isdisjoint(user_roles)
         
         if not has_role:
             raise ForbiddenException(
                 message="Insufficient role privileges",
-                details={"required": self.required_roles, "available": user_roles}
+                details={"required": sorted(self.required_roles), "available": user_roles}
             )
         
         return current_user
@@ -2,6 +2,10 @@
 Email Notification Service
 Handles sending email notifications for approval workflows and other events
 
+Messages are queued in the email_outbox table (see core/email_outbox.py) and
+delivered in batches by a background dispatcher, so request handlers never
+wait on the mail server.
+
 Configuration Options:
 1. SMTP (Gmail, Office365, etc.)
 2. SendGrid API
@@ -34,9 +38,15 @@ from typing import List, Optional
 import logging
 import os
 import smtplib
+import threading
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+
 # Uncomment when using SendGrid:
 # from sendgrid import SendGridAPIClient
 # from sendgrid.helpers.mail import Mail
@@ -76,34 +86,96 @@ class EmailConfig:
     APP_URL = os.getenv("APP_URL", "http://localhost:3000")
 
 
+class SMTPConnection:
+    """
+    Long-lived SMTP session reused across outbox batches
+
+    Opening a session costs a TCP connect, STARTTLS and AUTH round trip, so
+    the dispatcher keeps one open until the server drops it or it has been
+    idle longer than idle_timeout (most servers close idle sessions anyway).
+    """
+    
+    def __init__(self, config: EmailConfig, idle_timeout: int = settings.SMTP_IDLE_TIMEOUT_SECONDS):
+        self.config = config
+        self.idle_timeout = idle_timeout
+        self._server: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.config.SMTP_HOST, self.config.SMTP_PORT, timeout=30)
+        if self.config.SMTP_USE_TLS:
+            server.starttls()
+        if self.config.SMTP_USERNAME:
+            server.login(self.config.SMTP_USERNAME, self.config.SMTP_PASSWORD)
+        return server
+    
+    def _close_locked(self) -> None:
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+            self._server = None
+    
+    def send(self, msg: MIMEMultipart) -> None:
+        """Send a message, reconnecting once if the pooled session was dropped"""
+        with self._lock:
+            if self._server is not None and time.monotonic() - self._last_used > self.idle_timeout:
+                self._close_locked()
+            for attempt in range(2):
+                if self._server is None:
+                    self._server = self._connect()
+                try:
+                    self._server.send_message(msg)
+                    break
+                except smtplib.SMTPServerDisconnected:
+                    self._server = None
+                    if attempt:
+                        raise
+                except (smtplib.SMTPResponseException, OSError):
+                    # Leave the session in a known state for the next message
+                    self._close_locked()
+                    raise
+            self._last_used = time.monotonic()
+    
+    def close(self) -> None:
+        with self._lock:
+            self._close_locked()
+
+
 class EmailService:
-    """Service for sending email notifications"""
+    """
+    Service for sending email notifications
+    
+    The send_* methods do not talk to the mail server. They queue the message
+    in the email outbox, inside the caller's transaction when a session is
+    passed as db, and the outbox dispatcher delivers it in batches.
+    """
     
     def __init__(self):
         self.config = EmailConfig()
+        self.smtp = SMTPConnection(self.config)
         if self.config.SEND_EMAILS:
             logger.info(f"Email service initialized with provider: {self.config.PROVIDER}")
         else:
             logger.info("Email service initialized in DISABLED mode (set SEND_EMAILS=true to enable)")
     
+    def _build_message(self, to_email: str, subject: str, html_body: str, text_body: Optional[str] = None) -> MIMEMultipart:
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'] = f"{self.config.FROM_NAME} <{self.config.FROM_EMAIL}>"
+        msg['To'] = to_email
+        
+        if text_body:
+            msg.attach(MIMEText(text_body, 'plain'))
+        msg.attach(MIMEText(html_body, 'html'))
+        return msg
+    
     def _send_smtp(self, to_email: str, subject: str, html_body: str, text_body: Optional[str] = None) -> bool:
-        """Send email via SMTP"""
+        """Send email via the pooled SMTP session"""
         try:
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = f"{self.config.FROM_NAME} <{self.config.FROM_EMAIL}>"
-            msg['To'] = to_email
-            
-            if text_body:
-                msg.attach(MIMEText(text_body, 'plain'))
-            msg.attach(MIMEText(html_body, 'html'))
-            
-            with smtplib.SMTP(self.config.SMTP_HOST, self.config.SMTP_PORT) as server:
-                if self.config.SMTP_USE_TLS:
-                    server.starttls()
-                server.login(self.config.SMTP_USERNAME, self.config.SMTP_PASSWORD)
-                server.send_message(msg)
-            
+            self.smtp.send(self._build_message(to_email, subject, html_body, text_body))
             logger.info(f"SMTP email sent to {to_email}: {subject}")
             return True
         except Exception as e:
@@ -158,12 +230,8 @@ class EmailService:
             logger.error(f"Failed to send AWS SES email: {str(e)}")
             return False
     
-    def _send_email(self, to_email: str, subject: str, html_body: str, text_body: Optional[str] = None) -> bool:
-        """Internal method to send email via configured provider"""
-        if not self.config.SEND_EMAILS:
-            logger.info(f"[DISABLED] Would send to {to_email}: {subject}")
-            return True
-        
+    def _deliver(self, to_email: str, subject: str, html_body: str, text_body: Optional[str] = None) -> bool:
+        """Deliver one message through the configured provider (blocking)"""
         if self.config.PROVIDER == "smtp":
             return self._send_smtp(to_email, subject, html_body, text_body)
         elif self.config.PROVIDER == "sendgrid":
@@ -174,12 +242,78 @@ class EmailService:
             logger.error(f"Unknown email provider: {self.config.PROVIDER}")
             return False
     
+    def deliver_batch(self, messages: List[dict]) -> List[Optional[str]]:
+        """
+        Deliver a batch of outbox messages (blocking, run off the event loop)
+        
+        Returns one entry per message: None when delivered, otherwise the
+        error to record for the retry.
+        """
+        if not self.config.SEND_EMAILS:
+            for message in messages:
+                logger.info(f"[DISABLED] Would send to {message['to_email']}: {message['subject']}")
+            return [None] * len(messages)
+        
+        results = []
+        for message in messages:
+            delivered = self._deliver(
+                message["to_email"], message["subject"], message["html_body"], message.get("text_body")
+            )
+            results.append(None if delivered else f"{self.config.PROVIDER} delivery failed")
+        return results
+    
+    def close(self) -> None:
+        """Close the pooled provider connection"""
+        self.smtp.close()
+    
+    async def _send_email(
+        self,
+        to_email: str,
+        subject: str,
+        html_body: str,
+        text_body: Optional[str] = None,
+        db: Optional[AsyncSession] = None,
+        dedupe_key: Optional[str] = None
+    ) -> bool:
+        """
+        Queue an email in the outbox
+        
+        With db the outbox row joins the caller's transaction and is only
+        delivered once that transaction commits. Without it the row is
+        committed immediately in its own session.
+        """
+        if not self.config.SEND_EMAILS:
+            logger.info(f"[DISABLED] Would send to {to_email}: {subject}")
+            return True
+        
+        from core.email_outbox import enqueue_email
+        try:
+            await enqueue_email(to_email, subject, html_body, text_body, db=db, dedupe_key=dedupe_key)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to queue email to {to_email}: {str(e)}")
+            return False
+    
+    async def send_email(
+        self,
+        to_email: str,
+        subject: str,
+        html_body: str,
+        body: Optional[str] = None,
+        db: Optional[AsyncSession] = None,
+        dedupe_key: Optional[str] = None
+    ) -> bool:
+        """Queue a free-form email (HTML body with optional plain text fallback)"""
+        return await self._send_email(to_email, subject, html_body, body, db=db, dedupe_key=dedupe_key)
+    
     async def send_approval_request_notification(
         self,
         to_email: str,
         employee_name: str,
         request_type: str,
-        request_details: dict
+        request_details: dict,
+        db: Optional[AsyncSession] = None,
+        dedupe_key: Optional[str] = None
     ) -> bool:
         """
         Send notification when a new approval request is created
@@ -233,14 +367,16 @@ class EmailService:
         {self.config.APP_URL}/dashboard
         """
         
-        return self._send_email(to_email, subject, html_body, text_body)
+        return await self._send_email(to_email, subject, html_body, text_body, db=db, dedupe_key=dedupe_key)
     
     async def send_approval_status_notification(
         self,
         to_email: str,
         request_type: str,
         status: str,
-        comments: Optional[str] = None
+        comments: Optional[str] = None,
+        db: Optional[AsyncSession] = None,
+        dedupe_key: Optional[str] = None
     ) -> bool:
         """
         Send notification when an approval request is approved/rejected
@@ -293,14 +429,16 @@ class EmailService:
         View your dashboard: {self.config.APP_URL}/dashboard
         """
         
-        return self._send_email(to_email, subject, html_body, text_body)
+        return await self._send_email(to_email, subject, html_body, text_body, db=db, dedupe_key=dedupe_key)
     
     async def send_delegation_notification(
         self,
         to_email: str,
         supervisor_name: str,
         start_date: str,
-        end_date: str
+        end_date: str,
+        db: Optional[AsyncSession] = None,
+        dedupe_key: Optional[str] = None
     ) -> bool:
         """
         Send notification when approval authority is delegated
@@ -359,12 +497,13 @@ class EmailService:
         View pending approvals: {self.config.APP_URL}/dashboard
         """
         
-        return self._send_email(to_email, subject, html_body, text_body)
+        return await self._send_email(to_email, subject, html_body, text_body, db=db, dedupe_key=dedupe_key)
     
     async def send_timesheet_reminder(
         self,
         to_emails: List[str],
-        period_end: str
+        period_end: str,
+        db: Optional[AsyncSession] = None
     ) -> bool:
         """
         Send reminder to submit timesheets
@@ -410,10 +549,13 @@ class EmailService:
         # Send to all recipients
         success_count = 0
         for email in to_emails:
-            if self._send_email(email, subject, html_body, text_body):
+            if await self._send_email(
+                email, subject, html_body, text_body,
+                db=db, dedupe_key=f"timesheet-reminder:{period_end}:{email}"
+            ):
                 success_count += 1
         
-        logger.info(f"Sent timesheet reminders to {success_count}/{len(to_emails)} recipients")
+        logger.info(f"Queued timesheet reminders for {success_count}/{len(to_emails)} recipients")
         return success_count > 0
 
     async def send_resignation_notification(
@@ -422,7 +564,9 @@ class EmailService:
         employee_name: str,
         resignation_date: str,
         last_working_day: str,
-        reason: str
+        reason: str,
+        db: Optional[AsyncSession] = None,
+        dedupe_key: Optional[str] = None
     ) -> bool:
         """
         Send notification when an employee submits a resignation
@@ -483,7 +627,7 @@ class EmailService:
         {self.config.APP_URL}/dashboard
         """
         
-        return self._send_email(to_email, subject, html_body, text_body)
+        return await self._send_email(to_email, subject, html_body, text_body, db=db, dedupe_key=dedupe_key)
     
     async def send_contract_extension_notification(
         self,
@@ -491,7 +635,9 @@ class EmailService:
         employee_name: str,
         new_start_date: str,
         new_end_date: str,
-        changes: dict
+        changes: dict,
+        db: Optional[AsyncSession] = None,
+        dedupe_key: Optional[str] = None
     ) -> bool:
         """
         Send notification when a contract extension is created
@@ -565,13 +711,15 @@ class EmailService:
         Review and accept: {self.config.APP_URL}/dashboard
         """
         
-        return self._send_email(to_email, subject, html_body, text_body)
+        return await self._send_email(to_email, subject, html_body, text_body, db=db, dedupe_key=dedupe_key)
     
     async def send_verification_email(
         self,
         to_email: str,
         user_name: str,
-        verification_token: str
+        verification_token: str,
+        db: Optional[AsyncSession] = None,
+        dedupe_key: Optional[str] = None
     ) -> bool:
         """
         Send email verification email
@@ -630,13 +778,15 @@ class EmailService:
         This is an automated notification from INARA HR System.
         """
         
-        return self._send_email(to_email, subject, html_body, text_body)
+        return await self._send_email(to_email, subject, html_body, text_body, db=db, dedupe_key=dedupe_key)
     
     async def send_password_reset_email(
         self,
         to_email: str,
         user_name: str,
-        reset_token: str
+        reset_token: str,
+        db: Optional[AsyncSession] = None,
+        dedupe_key: Optional[str] = None
     ) -> bool:
         """
         Send password reset email
@@ -695,12 +845,14 @@ class EmailService:
         This is an automated notification from INARA HR System.
         """
         
-        return self._send_email(to_email, subject, html_body, text_body)
+        return await self._send_email(to_email, subject, html_body, text_body, db=db, dedupe_key=dedupe_key)
     
     async def send_password_reset_confirmation(
         self,
         to_email: str,
-        user_name: str
+        user_name: str,
+        db: Optional[AsyncSession] = None,
+        dedupe_key: Optional[str] = None
     ) -> bool:
         """
         Send password reset confirmation email
@@ -751,12 +903,14 @@ class EmailService:
         This is an automated notification from INARA HR System.
         """
         
-        return self._send_email(to_email, subject, html_body, text_body)
+        return await self._send_email(to_email, subject, html_body, text_body, db=db, dedupe_key=dedupe_key)
     
     async def send_password_change_notification(
         self,
         to_email: str,
-        user_name: str
+        user_name: str,
+        db: Optional[AsyncSession] = None,
+        dedupe_key: Optional[str] = None
     ) -> bool:
         """
         Send password change notification email
@@ -797,7 +951,7 @@ class EmailService:
         This is an automated notification from INARA HR System.
         """
         
-        return self._send_email(to_email, subject, html_body, text_body)
+        return await self._send_email(to_email, subject, html_body, text_body, db=db, dedupe_key=dedupe_key)
 
 
 # Create singleton instance for easy importing
@@ -0,0 +1,280 @@
+"""
+Email Outbox
+Durable queue for outgoing email
+
+Notifications queued with the caller's session are written to the
+email_outbox table in the same transaction as the business change that
+triggered them, so a rolled-back approval never emails anyone and a
+committed one is never silently dropped. A background
+dispatcher claims due rows in batches, delivers them over the pooled
+provider connection off the event loop, and retries failures with
+exponential backoff.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import asyncio
+import logging
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.database import AsyncSessionLocal
+from modules.notifications.models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+
+def _outbox_insert(dialect_name: str, values):
+    """INSERT (of one row dict or a list of them) that silently skips rows whose dedupe_key is already queued"""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return insert(EmailOutbox).values(values)
+    return dialect_insert(EmailOutbox).values(values).on_conflict_do_nothing(
+        index_elements=["dedupe_key"]
+    )
+
+
+async def enqueue_email(
+    to_email: str,
+    subject: str,
+    html_body: str,
+    text_body: Optional[str] = None,
+    db: Optional[AsyncSession] = None,
+    dedupe_key: Optional[str] = None
+) -> None:
+    """
+    Queue an email for delivery
+
+    With db the row is part of the caller's transaction: it is delivered only
+    if the caller commits, and the dispatcher is woken on that commit.
+    Without db the row is committed straight away in its own session.
+    """
+    values = {
+        "to_email": to_email,
+        "subject": subject,
+        "html_body": html_body,
+        "text_body": text_body,
+        "dedupe_key": dedupe_key
+    }
+
+    if db is not None:
+        await db.execute(_outbox_insert(db.get_bind().dialect.name, values))
+        event.listen(db.sync_session, "after_commit", _wake_dispatcher, once=True)
+        return
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(_outbox_insert(session.get_bind().dialect.name, values))
+        await session.commit()
+    email_dispatcher.notify()
+
+
+async def enqueue_emails(
+    messages: List[Dict[str, Any]],
+    db: AsyncSession,
+    batch_size: int = 500
+) -> int:
+    """
+    Queue many emails as part of the caller's transaction
+
+    Each message has to_email, subject, html_body and optionally text_body
+    and dedupe_key. Rows go in as multi-row INSERTs of batch_size.
+
+    Returns:
+        Number of messages handed to the outbox
+    """
+    if not messages:
+        return 0
+    dialect_name = db.get_bind().dialect.name
+    columns = ("to_email", "subject", "html_body", "text_body", "dedupe_key")
+    for start in range(0, len(messages), batch_size):
+        rows = [{column: message.get(column) for column in columns} for message in messages[start:start + batch_size]]
+        await db.execute(_outbox_insert(dialect_name, rows))
+    event.listen(db.sync_session, "after_commit", _wake_dispatcher, once=True)
+    return len(messages)
+
+
+def _wake_dispatcher(session) -> None:
+    email_dispatcher.notify()
+
+
+class EmailOutboxDispatcher:
+    """
+    Delivers queued email in batches
+
+    Claiming a batch pushes next_attempt_at forward by the lease and bumps
+    attempts in one short transaction (FOR UPDATE SKIP LOCKED on PostgreSQL,
+    so several API workers can dispatch concurrently). Delivery then happens
+    outside any transaction, and the results are recorded in a second one.
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        batch_size: int = settings.EMAIL_OUTBOX_BATCH_SIZE,
+        poll_seconds: float = settings.EMAIL_OUTBOX_POLL_SECONDS,
+        max_attempts: int = settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+        backoff_seconds: int = settings.EMAIL_OUTBOX_BACKOFF_SECONDS,
+        max_backoff_seconds: int = settings.EMAIL_OUTBOX_MAX_BACKOFF_SECONDS,
+        lease_seconds: int = settings.EMAIL_OUTBOX_LEASE_SECONDS
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.lease_seconds = lease_seconds
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.batches = 0
+
+    def notify(self) -> None:
+        """Wake the dispatcher loop early (new mail was committed)"""
+        self._wakeup.set()
+
+    def backoff(self, attempts: int) -> timedelta:
+        """Delay before the next attempt after `attempts` failed deliveries"""
+        delay = self.backoff_seconds * (2 ** max(attempts - 1, 0))
+        return timedelta(seconds=min(delay, self.max_backoff_seconds))
+
+    async def _claim_batch(self) -> List[Dict[str, Any]]:
+        now = datetime.utcnow()
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(EmailOutbox)
+                .where(
+                    EmailOutbox.status == "pending",
+                    EmailOutbox.next_attempt_at <= now
+                )
+                .order_by(EmailOutbox.next_attempt_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            rows = result.scalars().all()
+
+            lease_until = now + timedelta(seconds=self.lease_seconds)
+            for row in rows:
+                row.attempts += 1
+                row.next_attempt_at = lease_until
+
+            batch = [
+                {
+                    "id": row.id,
+                    "to_email": row.to_email,
+                    "subject": row.subject,
+                    "html_body": row.html_body,
+                    "text_body": row.text_body,
+                    "attempts": row.attempts
+                }
+                for row in rows
+            ]
+            await session.commit()
+        return batch
+
+    async def _record_results(self, batch: List[Dict[str, Any]], errors: List[Optional[str]]) -> None:
+        now = datetime.utcnow()
+        sent_ids = [message["id"] for message, error in zip(batch, errors) if error is None]
+
+        async with self.session_factory() as session:
+            if sent_ids:
+                await session.execute(
+                    update(EmailOutbox)
+                    .where(EmailOutbox.id.in_(sent_ids))
+                    .values(status="sent", sent_at=now, last_error=None, updated_at=now)
+                )
+
+            for message, error in zip(batch, errors):
+                if error is None:
+                    continue
+                if message["attempts"] >= self.max_attempts:
+                    values = {"status": "failed", "last_error": error, "updated_at": now}
+                    self.failed += 1
+                    logger.error(f"Giving up on email to {message['to_email']} after {message['attempts']} attempts: {error}")
+                else:
+                    values = {
+                        "next_attempt_at": now + self.backoff(message["attempts"]),
+                        "last_error": error,
+                        "updated_at": now
+                    }
+                    self.retried += 1
+                await session.execute(
+                    update(EmailOutbox).where(EmailOutbox.id == message["id"]).values(**values)
+                )
+
+            await session.commit()
+
+        self.sent += len(sent_ids)
+
+    async def dispatch_pending(self) -> int:
+        """Claim and deliver one batch; returns the number of messages attempted"""
+        from core.email import email_service
+
+        batch = await self._claim_batch()
+        if not batch:
+            return 0
+
+        try:
+            errors = await asyncio.to_thread(email_service.deliver_batch, batch)
+        except Exception as e:
+            logger.error(f"Email batch delivery failed: {str(e)}")
+            errors = [str(e)] * len(batch)
+
+        await self._record_results(batch, errors)
+        self.batches += 1
+        return len(batch)
+
+    async def run(self) -> None:
+        """Dispatch until cancelled, draining backlogs back to back"""
+        while True:
+            self._wakeup.clear()
+            try:
+                attempted = await self.dispatch_pending()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Email outbox dispatch error: {str(e)}")
+                attempted = 0
+
+            if attempted >= self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        from core.email import email_service
+
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(email_service.close)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "batches": self.batches,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed
+        }
+
+
+# Global dispatcher instance
+email_dispatcher = EmailOutboxDispatcher()
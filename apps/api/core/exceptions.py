@@ -134,3 +134,25 @@ class FileUploadException(BaseHTTPException):
             error_code="FILE_UPLOAD_ERROR",
             details=details
         )
+
+
+class PasswordHashingUnavailableException(BaseHTTPException):
+    """Raised when the password hashing queue is full"""
+    def __init__(self, message: str = "Too many sign-in requests, please retry shortly", details: Optional[Any] = None):
+        super().__init__(
+            message=message,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            error_code="PASSWORD_HASHING_UNAVAILABLE",
+            details=details
+        )
+
+
+class RenderUnavailableException(BaseHTTPException):
+    """Raised when a document cannot be rendered in time or the render queue is full"""
+    def __init__(self, message: str = "Document rendering is temporarily unavailable", details: Optional[Any] = None):
+        super().__init__(
+            message=message,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            error_code="RENDER_UNAVAILABLE",
+            details=details
+        )
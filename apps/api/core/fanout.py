@@ -0,0 +1,82 @@
+"""
+Parallel Query Fan-out
+Run independent read-only queries concurrently, each on its own pooled session
+
+An AsyncSession cannot execute two statements at once, so gathering several
+queries on the request session either serializes them or fails. fan_out()
+gives every component its own session from the pool, a deadline, and a
+global cap on how many components run at once so a burst of dashboard
+requests cannot drain the connection pool.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import asyncio
+import logging
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+Component = Callable[[AsyncSession], Awaitable[Any]]
+
+# Shared by every fan-out in the process; bounds pooled connections in use
+_query_slots = asyncio.Semaphore(settings.FANOUT_MAX_PARALLEL_QUERIES)
+
+
+async def _run_component(
+    name: str,
+    load: Component,
+    timeout: float,
+    session_factory
+) -> Any:
+    started = time.perf_counter()
+
+    async def run() -> Any:
+        async with _query_slots:
+            async with session_factory() as session:
+                return await load(session)
+
+    try:
+        # The deadline covers waiting for a slot and a connection, not just the query
+        return await asyncio.wait_for(run(), timeout)
+    finally:
+        logger.debug(f"Fan-out component {name} took {(time.perf_counter() - started) * 1000:.1f}ms")
+
+
+async def fan_out(
+    components: Dict[str, Component],
+    timeout: float = settings.FANOUT_COMPONENT_TIMEOUT_SECONDS,
+    session_factory: Optional[Callable[[], AsyncSession]] = None
+) -> Tuple[Dict[str, Any], Dict[str, BaseException]]:
+    """
+    Run each component concurrently on its own session
+
+    Args:
+        components: name -> coroutine function taking a session
+        timeout: per-component deadline in seconds (including the wait for a slot)
+        session_factory: session factory, AsyncSessionLocal by default
+
+    Returns:
+        (results, errors): results of the components that finished, and the
+        exception (TimeoutError included) of each one that did not
+    """
+    session_factory = session_factory or AsyncSessionLocal
+    names = list(components)
+    outcomes = await asyncio.gather(
+        *(_run_component(name, components[name], timeout, session_factory) for name in names),
+        return_exceptions=True
+    )
+
+    results, errors = {}, {}
+    for name, outcome in zip(names, outcomes):
+        if isinstance(outcome, BaseException):
+            if isinstance(outcome, asyncio.CancelledError):
+                raise outcome
+            errors[name] = outcome
+        else:
+            results[name] = outcome
+    return results, errors
@@ -11,6 +11,10 @@ from collections import defaultdict
 import time
 
 from core.database import async_engine
+from core.cache import cache
+from core.pdf_render import render_service
+from core.email_outbox import email_dispatcher
+from core.password_hashing import password_hasher
 
 logger = logging.getLogger(__name__)
 
@@ -161,5 +165,9 @@ def get_monitoring_stats() -> Dict[str, Any]:
     return {
         "pool": db_monitor.get_pool_stats(),
         "queries": db_monitor.get_query_stats(minutes=5),
+        "cache": cache.get_stats(),
+        "pdf_render": render_service.get_stats(),
+        "email_outbox": email_dispatcher.get_stats(),
+        "password_hashing": password_hasher.get_stats(),
         "timestamp": datetime.utcnow().isoformat()
     }
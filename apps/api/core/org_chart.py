@@ -0,0 +1,180 @@
+"""
+Organization Chart Layout
+Tidy-tree positions for the org chart, split into pages or drawn as SVG
+
+layout_org_chart places every employee on an integer grid in one pass over
+a children index: leaves take consecutive columns left to right and each
+manager sits above the middle of their reports, so a subtree always owns a
+contiguous range of columns and never overlaps its neighbours. x is the
+column, y the level below the chart's top. The layout is plain JSON, so it
+can be cached, returned to the frontend and sent to a render worker.
+
+paginate_layout cuts the grid into page-sized windows for the PDF export;
+render_org_chart_svg draws the whole grid at once.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+# Drawing units (points in the PDF, px in the SVG)
+BOX_WIDTH = 140
+BOX_HEIGHT = 50
+H_SPACING = 20
+V_SPACING = 40
+
+BOX_FILL = "#FFF5F7"
+BOX_STROKE = "#D91C5C"
+
+
+def layout_org_chart(nodes: List[Dict[str, Any]], max_depth: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Lay out employees as a forest
+
+    Each node needs "id" and "manager_id"; other keys (name, position,
+    department) are carried through. Nodes whose manager is not in the list
+    become roots, in input order; siblings keep input order too. Levels below
+    max_depth are left out and counted in the parent's hidden_reports.
+
+    Returns {"nodes": [...], "width": columns, "height": levels}, nodes in
+    pre-order with x, y, manager_id (None at the roots), reports and
+    hidden_reports added.
+    """
+    by_id = {node["id"]: node for node in nodes}
+    children: Dict[Any, List[Any]] = {}
+    roots = []
+    for node in nodes:
+        manager_id = node.get("manager_id")
+        if manager_id is not None and manager_id in by_id and manager_id != node["id"]:
+            children.setdefault(manager_id, []).append(node["id"])
+        else:
+            roots.append(node["id"])
+
+    placed: Dict[Any, Dict[str, Any]] = {}
+    order: List[Any] = []
+    visited = set()
+    next_column = 0
+    height = 0
+
+    def hide(node_ids):
+        """Mark subtrees below the depth limit as seen without placing them"""
+        pending = list(node_ids)
+        while pending:
+            node_id = pending.pop()
+            if node_id not in visited:
+                visited.add(node_id)
+                pending.extend(children.get(node_id, ()))
+
+    def place(root_id):
+        nonlocal next_column, height
+        # (id, level, parent id, expanded); children are positioned before their manager
+        stack: List[Tuple[Any, int, Any, bool]] = [(root_id, 0, None, False)]
+        shown: Dict[Any, List[Any]] = {}
+        while stack:
+            node_id, level, parent_id, expanded = stack.pop()
+            if expanded:
+                kids = shown[node_id]
+                if kids:
+                    column = (placed[kids[0]]["x"] + placed[kids[-1]]["x"]) // 2
+                else:
+                    column = next_column
+                    next_column += 1
+                reports = len(children.get(node_id, ()))
+                placed[node_id] = {
+                    **by_id[node_id],
+                    "manager_id": parent_id,
+                    "x": column,
+                    "y": level,
+                    "reports": reports,
+                    "hidden_reports": reports - len(kids),
+                }
+                continue
+            if node_id in visited:
+                continue
+            visited.add(node_id)
+            order.append(node_id)
+            height = max(height, level + 1)
+            stack.append((node_id, level, parent_id, True))
+            kids = [child for child in children.get(node_id, ()) if child not in visited]
+            if max_depth is not None and level >= max_depth:
+                hide(kids)
+                kids = []
+            shown[node_id] = kids
+            for child in reversed(kids):
+                stack.append((child, level + 1, node_id, False))
+
+    for root_id in roots:
+        place(root_id)
+    # Members of a manager_id cycle have no root; start from the first one met
+    for node in nodes:
+        if node["id"] not in visited:
+            place(node["id"])
+
+    return {
+        "nodes": [placed[node_id] for node_id in order],
+        "width": next_column,
+        "height": height,
+    }
+
+
+def paginate_layout(layout: Dict[str, Any], columns: int, rows: int) -> List[Dict[str, Any]]:
+    """
+    Split a layout into pages of at most columns x rows grid cells
+
+    Pages run top to bottom, then left to right within a band of levels;
+    empty windows are skipped. Each page lists its nodes and the grid origin
+    (x0, y0) to subtract when drawing.
+    """
+    windows: Dict[Tuple[int, int], List[Dict[str, Any]]] = {}
+    for node in layout["nodes"]:
+        windows.setdefault((node["y"] // rows, node["x"] // columns), []).append(node)
+    return [
+        {"x0": column * columns, "y0": row * rows, "nodes": windows[(row, column)]}
+        for row, column in sorted(windows)
+    ]
+
+
+def node_center(x: int, y: int) -> Tuple[float, float]:
+    """Top-centre of a node's box, in drawing units from the top-left of the grid"""
+    return x * (BOX_WIDTH + H_SPACING) + BOX_WIDTH / 2, y * (BOX_HEIGHT + V_SPACING)
+
+
+def render_org_chart_svg(layout: Dict[str, Any]) -> str:
+    """The whole layout as one SVG document"""
+    width = max(layout["width"] * (BOX_WIDTH + H_SPACING) - H_SPACING, 0)
+    height = max(layout["height"] * (BOX_HEIGHT + V_SPACING) - V_SPACING, 0)
+    positions = {node["id"]: (node["x"], node["y"]) for node in layout["nodes"]}
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" font-family="Helvetica, Arial, sans-serif">',
+        f'<g fill="none" stroke="{BOX_STROKE}" stroke-width="1">'
+    ]
+    for node in layout["nodes"]:
+        if node["manager_id"] in positions:
+            mx, my = node_center(*positions[node["manager_id"]])
+            cx, cy = node_center(node["x"], node["y"])
+            elbow = my + BOX_HEIGHT + V_SPACING / 2
+            parts.append(f'<path d="M{mx:g},{my + BOX_HEIGHT:g}V{elbow:g}H{cx:g}V{cy:g}"/>')
+    parts.append("</g>")
+
+    for node in layout["nodes"]:
+        cx, top = node_center(node["x"], node["y"])
+        left = cx - BOX_WIDTH / 2
+        parts.append(f'<g data-id="{escape(str(node["id"]))}">')
+        parts.append(
+            f'<rect x="{left:g}" y="{top:g}" width="{BOX_WIDTH}" height="{BOX_HEIGHT}" '
+            f'fill="{BOX_FILL}" stroke="{BOX_STROKE}" stroke-width="1.5"/>'
+        )
+        lines = [(node.get("name") or "", 9, "bold", 15), (node.get("position") or "N/A", 7, "normal", 27)]
+        if node.get("department"):
+            lines.append((node["department"], 7, "normal", 38))
+        if node.get("hidden_reports"):
+            lines.append((f'+{node["hidden_reports"]} more', 7, "normal", BOX_HEIGHT + 10))
+        for text, size, weight, offset in lines:
+            parts.append(
+                f'<text x="{cx:g}" y="{top + offset:g}" font-size="{size}" font-weight="{weight}" '
+                f'text-anchor="middle">{escape(text)}</text>'
+            )
+        parts.append("</g>")
+    parts.append("</svg>")
+    return "\n".join(parts)
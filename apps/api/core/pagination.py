@@ -0,0 +1,30 @@
+"""
+Keyset Pagination Helpers
+Opaque cursors for "seek" pagination over (sort value, id) pairs
+"""
+
+from typing import List, Optional
+import base64
+import json
+
+from core.exceptions import BadRequestException
+
+
+def encode_cursor(*values) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor"""
+    payload = json.dumps([str(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[List[str]]:
+    """Decode a cursor produced by encode_cursor; None when no cursor was given"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise BadRequestException("Invalid pagination cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise BadRequestException("Invalid pagination cursor")
+    return values
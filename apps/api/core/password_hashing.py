@@ -0,0 +1,122 @@
+"""
+Password Hashing Service
+Runs bcrypt outside the event loop
+
+A bcrypt hash or check takes 100-300 ms of CPU at the default work factor.
+Called from a handler it stalls every other request on the worker, so
+hashing and verification run on a small thread pool (bcrypt releases the
+GIL while it works) and the handler awaits the result. Calls beyond
+PASSWORD_HASH_MAX_QUEUE are refused instead of queueing without bound, so
+a burst of logins degrades into fast 503s rather than a stalled worker.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import time
+
+from core.config import settings
+from core.exceptions import PasswordHashingUnavailableException
+from core.security import hash_password, verify_password, password_needs_rehash
+
+
+class PasswordHasher:
+    """
+    Shared bcrypt executor
+
+    hash and verify admit at most max_queue calls at a time (waiting or
+    running); workers bounds how many run at once.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.PASSWORD_HASH_WORKERS,
+        max_queue: int = settings.PASSWORD_HASH_MAX_QUEUE,
+        rounds: int = settings.BCRYPT_ROUNDS
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.rounds = rounds
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.counts = {"hash": 0, "verify": 0}
+        self.seconds = {"hash": 0.0, "verify": 0.0}
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Thread pool, created on first use"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, operation: str, function: Callable, *args: Any) -> Any:
+        if self.in_flight >= self.max_queue:
+            self.rejected += 1
+            raise PasswordHashingUnavailableException()
+
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, function, *args)
+        finally:
+            self.in_flight -= 1
+            self.counts[operation] += 1
+            self.seconds[operation] += time.perf_counter() - started
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", hash_password, password, self.rounds)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run("verify", verify_password, password, hashed_password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Check a password and, when it matches a hash made with another work
+        factor, return a replacement hash at the current one: (valid, new hash or None)
+        """
+        if not await self.verify(password, hashed_password):
+            return False, None
+        if not password_needs_rehash(hashed_password, self.rounds):
+            return True, None
+        self.rehashed += 1
+        return True, await self.hash(password)
+
+    async def hash_many(self, passwords: Sequence[str]) -> List[str]:
+        """Hash several passwords in parallel, keeping at most `workers` in the queue at a time"""
+        slots = asyncio.Semaphore(self.workers)
+
+        async def hash_one(password: str) -> str:
+            async with slots:
+                return await self.hash(password)
+
+        return list(await asyncio.gather(*(hash_one(password) for password in passwords)))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hashing metrics for the monitoring endpoint"""
+        return {
+            "workers": self.workers,
+            "rounds": self.rounds,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "max_queue": self.max_queue,
+            "hashed": self.counts["hash"],
+            "verified": self.counts["verify"],
+            "rehashed": self.rehashed,
+            "rejected": self.rejected,
+            "avg_hash_ms": round(self.seconds["hash"] / (self.counts["hash"] or 1) * 1000, 2),
+            "avg_verify_ms": round(self.seconds["verify"] / (self.counts["verify"] or 1) * 1000, 2)
+        }
+
+
+# Global password hasher instance
+password_hasher = PasswordHasher()
@@ -11,120 +11,142 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.platypus.flowables import Flowable
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from reportlab.pdfgen import canvas
+from reportlab.pdfbase import pdfmetrics
 from io import BytesIO
+from xml.sax.saxutils import escape
 from datetime import datetime
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+import os
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+LOGO_FILES = ("inara-logo.png", "inara-logo-pdf.png")
+STANDARD_FONTS = ("Helvetica", "Helvetica-Bold", "Helvetica-Oblique", "Helvetica-BoldOblique")
+
+
+@lru_cache(maxsize=16)
+def _image_size(image_path: str) -> Tuple[int, int]:
+    from PIL import Image as PILImage
+    with PILImage.open(image_path) as img:
+        return img.size
+
+
+def logo_size(logo_path: str) -> Tuple[int, int]:
+    """Pixel size of a logo image, read from disk once per process"""
+    return _image_size(os.path.abspath(logo_path))
+
+
+def preload_assets() -> None:
+    """
+    Warm per-process rendering state: font metrics and logo sizes. Called
+    once by each render worker on startup. Stylesheets are not shared, since
+    every renderer adds its own styles to a fresh one.
+    """
+    for font_name in STANDARD_FONTS:
+        pdfmetrics.getFont(font_name)
+    for filename in LOGO_FILES:
+        logo_path = os.path.join(STATIC_DIR, filename)
+        if os.path.exists(logo_path):
+            logo_size(logo_path)
 
 
 class OrgChartBox(Flowable):
-    """Custom flowable for drawing organization chart boxes"""
+    """Custom flowable drawing one page of an organization chart layout"""
     
-    def __init__(self, employees_data, width, height):
+    def __init__(self, page, page_of, names, continued, width, height):
         Flowable.__init__(self)
-        self.employees = employees_data
+        self.page = page
+        self.page_of = page_of  # employee id -> page number
+        self.names = names  # employee id -> name, for references to other pages
+        self.continued = continued  # manager id -> other pages holding their reports
         self.width = width
         self.height = height
         
     def draw(self):
-        """Draw the organization chart with boxes and lines"""
-        # Build hierarchy
-        employee_dict = {emp['id']: emp for emp in self.employees}
-        roots = [emp for emp in self.employees if not emp.get('manager_id')]
-        
-        # Chart dimensions
-        box_width = 140
-        box_height = 50
-        h_spacing = 20
-        v_spacing = 40
-        start_y = self.height - 50
-        
-        # Calculate positions for each level
-        levels = []
+        """Draw the page's boxes, the lines between them and references to other pages"""
+        from core.org_chart import BOX_WIDTH, BOX_HEIGHT, H_SPACING, V_SPACING, BOX_FILL, BOX_STROKE
         
-        def get_level(emp, level=0):
-            if level >= len(levels):
-                levels.append([])
-            levels[level].append(emp)
-            
-            # Get direct reports
-            reports = [e for e in self.employees if e.get('manager_id') == emp['id']]
-            for report in reports:
-                get_level(report, level + 1)
-        
-        # Build levels starting from roots
-        for root in roots:
-            get_level(root)
+        nodes = self.page["nodes"]
+        here = {node["id"]: node for node in nodes}
+        columns_used = max(node["x"] for node in nodes) - self.page["x0"] + 1
+        left = (self.width - (columns_used * (BOX_WIDTH + H_SPACING) - H_SPACING)) / 2
+        top = self.height - V_SPACING / 2  # room for "Reports to" labels on the first row
         
-        # Draw each level
-        positions = {}  # Store box positions for drawing lines
-        
-        for level_idx, level_employees in enumerate(levels):
-            y = start_y - (level_idx * (box_height + v_spacing))
-            num_boxes = len(level_employees)
-            total_width = (num_boxes * box_width) + ((num_boxes - 1) * h_spacing)
-            start_x = (self.width - total_width) / 2
-            
-            for emp_idx, emp in enumerate(level_employees):
-                x = start_x + (emp_idx * (box_width + h_spacing))
-                positions[emp['id']] = (x + box_width/2, y)
-                
-                # Draw box
-                self.canv.setFillColor(colors.HexColor('#FFF5F7'))
-                self.canv.setStrokeColor(colors.HexColor('#D91C5C'))
-                self.canv.setLineWidth(1.5)
-                self.canv.rect(x, y - box_height, box_width, box_height, fill=1)
-                
-                # Draw text
-                self.canv.setFillColor(colors.black)
-                self.canv.setFont("Helvetica-Bold", 9)
-                name = f"{emp.get('first_name', '')} {emp.get('last_name', '')}"
-                # Center text
-                text_width = self.canv.stringWidth(name, "Helvetica-Bold", 9)
-                self.canv.drawString(x + (box_width - text_width)/2, y - 15, name)
-                
-                self.canv.setFont("Helvetica", 7)
-                position = emp.get('position', {}).get('title', 'N/A') if isinstance(emp.get('position'), dict) else 'N/A'
-                text_width = self.canv.stringWidth(position, "Helvetica", 7)
-                self.canv.drawString(x + (box_width - text_width)/2, y - 27, position)
-                
-                dept = emp.get('department', {}).get('name', '') if isinstance(emp.get('department'), dict) else ''
-                if dept:
-                    text_width = self.canv.stringWidth(dept, "Helvetica", 7)
-                    self.canv.drawString(x + (box_width - text_width)/2, y - 38, dept)
+        def box(node):
+            """Bottom-left corner and centre x of a node's box on this page"""
+            x = left + (node["x"] - self.page["x0"]) * (BOX_WIDTH + H_SPACING)
+            y = top - (node["y"] - self.page["y0"]) * (BOX_HEIGHT + V_SPACING) - BOX_HEIGHT
+            return x, y, x + BOX_WIDTH / 2
         
         # Draw connecting lines
-        self.canv.setStrokeColor(colors.HexColor('#D91C5C'))
+        self.canv.setStrokeColor(colors.HexColor(BOX_STROKE))
         self.canv.setLineWidth(1)
+        for node in nodes:
+            manager_id = node["manager_id"]
+            if manager_id is None:
+                continue
+            x, y, cx = box(node)
+            if manager_id in here:
+                _, manager_y, manager_cx = box(here[manager_id])
+                elbow = manager_y - V_SPACING / 2
+                self.canv.line(manager_cx, manager_y, manager_cx, elbow)
+                self.canv.line(manager_cx, elbow, cx, elbow)
+                self.canv.line(cx, elbow, cx, y + BOX_HEIGHT)
+            else:
+                # Manager drawn on another page
+                stub = y + BOX_HEIGHT + V_SPACING / 4
+                self.canv.line(cx, y + BOX_HEIGHT, cx, stub)
+                self.canv.setFillColor(colors.grey)
+                self.canv.setFont("Helvetica-Oblique", 6)
+                self.canv.drawCentredString(
+                    cx, stub + 2,
+                    f"Reports to {self.names.get(manager_id, '')} (p. {self.page_of.get(manager_id, '?')})"
+                )
         
-        for emp in self.employees:
-            if emp['id'] in positions and emp.get('manager_id') and emp['manager_id'] in positions:
-                # Draw line from manager to employee
-                manager_pos = positions[emp['manager_id']]
-                emp_pos = positions[emp['id']]
-                
-                # Vertical line from manager
-                self.canv.line(manager_pos[0], manager_pos[1] - box_height, 
-                             manager_pos[0], manager_pos[1] - box_height - v_spacing/2)
-                
-                # Horizontal line
-                self.canv.line(manager_pos[0], manager_pos[1] - box_height - v_spacing/2,
-                             emp_pos[0], manager_pos[1] - box_height - v_spacing/2)
-                
-                # Vertical line to employee
-                self.canv.line(emp_pos[0], manager_pos[1] - box_height - v_spacing/2,
-                             emp_pos[0], emp_pos[1])
+        for node in nodes:
+            x, y, cx = box(node)
+            
+            # Draw box
+            self.canv.setFillColor(colors.HexColor(BOX_FILL))
+            self.canv.setStrokeColor(colors.HexColor(BOX_STROKE))
+            self.canv.setLineWidth(1.5)
+            self.canv.rect(x, y, BOX_WIDTH, BOX_HEIGHT, fill=1)
+            
+            # Draw text
+            self.canv.setFillColor(colors.black)
+            self.canv.setFont("Helvetica-Bold", 9)
+            self.canv.drawCentredString(cx, y + BOX_HEIGHT - 15, node.get("name") or "")
+            self.canv.setFont("Helvetica", 7)
+            self.canv.drawCentredString(cx, y + BOX_HEIGHT - 27, node.get("position") or "N/A")
+            if node.get("department"):
+                self.canv.drawCentredString(cx, y + BOX_HEIGHT - 38, node["department"])
+            
+            # Reports continued on other pages or left out below the depth limit
+            notes = []
+            if node["id"] in self.continued:
+                pages = ", ".join(str(page) for page in self.continued[node["id"]])
+                notes.append(f"Reports continue on p. {pages}")
+            if node.get("hidden_reports"):
+                notes.append(f"+{node['hidden_reports']} not shown")
+            if notes:
+                self.canv.setFillColor(colors.grey)
+                self.canv.setFont("Helvetica-Oblique", 6)
+                self.canv.drawCentredString(cx, y - 8, "; ".join(notes))
 
 
-def create_organization_chart_pdf(employees: List[Dict[str, Any]]) -> BytesIO:
+def create_organization_chart_pdf(layout: Dict[str, Any], title: Optional[str] = None) -> BytesIO:
     """
     Generate PDF for organization chart with visual org chart style
     
     Args:
-        employees: List of employee dictionaries with hierarchy
+        layout: Chart layout from core.org_chart.layout_org_chart
+        title: Optional scope shown under the heading, e.g. a department name
         
     Returns:
-        BytesIO buffer containing PDF
+        BytesIO buffer containing PDF, one page per window of the layout grid
     """
+    from core.org_chart import BOX_WIDTH, BOX_HEIGHT, H_SPACING, V_SPACING, paginate_layout
+    
     buffer = BytesIO()
     doc = SimpleDocTemplate(
         buffer,
@@ -147,29 +169,13 @@ def create_organization_chart_pdf(employees: List[Dict[str, Any]]) -> BytesIO:
         alignment=TA_CENTER,
         spaceAfter=10
     )
-    
-    elements.append(Paragraph("International Network for Aid, Relief and Assistance", title_style))
-    elements.append(Paragraph("Organizational Structure", ParagraphStyle(
+    subtitle_style = ParagraphStyle(
         'Subtitle',
         parent=styles['Normal'],
         fontSize=14,
         alignment=TA_CENTER,
         spaceAfter=20
-    )))
-    
-    elements.append(Spacer(1, 0.2*inch))
-    
-    # Add the org chart
-    page_width = landscape(A4)[0] - 60  # minus margins
-    page_height = landscape(A4)[1] - 150  # minus margins and title
-    
-    org_chart = OrgChartBox(employees, page_width, page_height)
-    elements.append(org_chart)
-    
-    elements.append(Spacer(1, 0.3*inch))
-    
-    # Footer
-    elements.append(Spacer(1, 0.3*inch))
+    )
     footer_style = ParagraphStyle(
         'Footer',
         parent=styles['Normal'],
@@ -177,194 +183,38 @@ def create_organization_chart_pdf(employees: List[Dict[str, Any]]) -> BytesIO:
         textColor=colors.grey,
         alignment=TA_CENTER
     )
-    elements.append(Paragraph(f"Generated on {datetime.now().strftime('%B %d, %Y at %H:%M')}", footer_style))
-    
-    doc.build(elements)
-    buffer.seek(0)
-    return buffer
-
-
-def create_user_manual_pdf() -> BytesIO:
-    """Generate PDF version of the User Manual"""
-    buffer = BytesIO()
-    
-    # Read the markdown manual
-    import os
-    # Calculate path to USER_MANUAL.md at project root
-    # __file__ is at: apps/api/core/pdf_generator.py
-    # Need to go up 3 levels to get to project root
-    current_dir = os.path.dirname(__file__)  # apps/api/core
-    api_dir = os.path.dirname(current_dir)  # apps/api
-    apps_dir = os.path.dirname(api_dir)  # apps
-    project_root = os.path.dirname(apps_dir)  # project root
-    manual_path = os.path.join(project_root, "USER_MANUAL.md")
-    
-    try:
-        with open(manual_path, 'r', encoding='utf-8') as f:
-            manual_content = f.read()
-    except FileNotFoundError:
-        # If manual file not found, create a basic version
-        manual_content = "# INARA HR Management System - User Manual\n\nVersion 1.0\n\nThis is the user manual for the INARA HR Management System."
-    
-    # Create PDF
-    doc = SimpleDocTemplate(buffer, pagesize=letter,
-                           rightMargin=72, leftMargin=72,
-                           topMargin=72, bottomMargin=18)
-    
-    # Container for the 'Flowable' objects
-    elements = []
-    
-    # Styles
-    styles = getSampleStyleSheet()
-    
-    # Title style
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1a1a1a'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
-    
-    # Heading styles
-    h1_style = ParagraphStyle(
-        'CustomH1',
-        parent=styles['Heading1'],
-        fontSize=18,
-        textColor=colors.HexColor('#2c3e50'),
-        spaceAfter=12,
-        spaceBefore=20
-    )
-    
-    h2_style = ParagraphStyle(
-        'CustomH2',
-        parent=styles['Heading2'],
-        fontSize=14,
-        textColor=colors.HexColor('#34495e'),
-        spaceAfter=10,
-        spaceBefore=15
-    )
-    
-    h3_style = ParagraphStyle(
-        'CustomH3',
-        parent=styles['Heading3'],
-        fontSize=12,
-        textColor=colors.HexColor('#34495e'),
-        spaceAfter=8,
-        spaceBefore=12
-    )
-    
-    # Body style
-    body_style = ParagraphStyle(
-        'CustomBody',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=14,
-        spaceAfter=8
-    )
-    
-    # List style
-    list_style = ParagraphStyle(
-        'CustomList',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=14,
-        leftIndent=20,
-        spaceAfter=6
-    )
-    
-    # Add logo if available
-    logo_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static", "inara-logo.png")
-    if os.path.exists(logo_path):
-        try:
-            from PIL import Image as PILImage
-            img = PILImage.open(logo_path)
-            img_width, img_height = img.size
-            aspect_ratio = img_width / img_height
-            
-            logo_width = 2 * inch
-            logo_height = logo_width / aspect_ratio
-            
-            logo = Image(logo_path, width=logo_width, height=logo_height)
-            elements.append(logo)
-            elements.append(Spacer(1, 0.3*inch))
-        except:
-            pass
-    
-    # Title
-    elements.append(Paragraph("INARA HR Management System", title_style))
-    elements.append(Paragraph("User Manual", title_style))
-    elements.append(Spacer(1, 0.2*inch))
-    elements.append(Paragraph(f"Version 1.0 | Last Updated: January 2026", body_style))
-    elements.append(Spacer(1, 0.4*inch))
-    
-    # Parse markdown content and convert to PDF elements
-    lines = manual_content.split('\n')
-    i = 0
-    in_list = False
     
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        # Skip empty lines (but add small spacing)
-        if not line:
-            if not in_list:
-                elements.append(Spacer(1, 0.1*inch))
-            i += 1
-            continue
-        
-        # Handle headers
-        if line.startswith('# '):
-            if i > 0:  # Don't add page break for first heading
-                elements.append(PageBreak())
-            elements.append(Paragraph(line[2:], h1_style))
-            in_list = False
-        elif line.startswith('## '):
-            elements.append(Spacer(1, 0.15*inch))
-            elements.append(Paragraph(line[3:], h2_style))
-            in_list = False
-        elif line.startswith('### '):
-            elements.append(Spacer(1, 0.1*inch))
-            elements.append(Paragraph(line[4:], h3_style))
-            in_list = False
-        # Handle lists
-        elif line.startswith('- ') or line.startswith('* '):
-            if not in_list:
-                elements.append(Spacer(1, 0.05*inch))
-            in_list = True
-            elements.append(Paragraph(f"• {line[2:]}", list_style))
-        # Handle numbered lists
-        elif line and line[0].isdigit() and '. ' in line[:5]:
-            if not in_list:
-                elements.append(Spacer(1, 0.05*inch))
-            in_list = True
-            elements.append(Paragraph(line, list_style))
-        # Handle bold text (simple)
-        elif line.startswith('**') and line.endswith('**'):
-            bold_text = line[2:-2]
-            bold_style = ParagraphStyle('Bold', parent=body_style, fontName='Helvetica-Bold')
-            elements.append(Paragraph(bold_text, bold_style))
-            in_list = False
-        # Handle code blocks (skip for PDF)
-        elif line.startswith('```'):
-            # Skip code blocks
-            i += 1
-            while i < len(lines) and not lines[i].strip().startswith('```'):
-                i += 1
-            i += 1
-            continue
-        # Regular paragraph
-        else:
-            # Clean up markdown formatting
-            clean_line = line.replace('**', '').replace('*', '')
-            if clean_line:
-                elements.append(Paragraph(clean_line, body_style))
-                in_list = False
-        
-        i += 1
+    page_width = landscape(A4)[0] - 60  # minus margins
+    page_height = landscape(A4)[1] - 190  # minus margins, title and footer
+    # Grid cells per page; the last row keeps room for the notes under its boxes
+    columns = max(int((page_width + H_SPACING) // (BOX_WIDTH + H_SPACING)), 1)
+    rows = max(int((page_height - V_SPACING / 2 - BOX_HEIGHT - 10) // (BOX_HEIGHT + V_SPACING)) + 1, 1)
+    
+    pages = paginate_layout(layout, columns, rows)
+    page_of = {node["id"]: number for number, page in enumerate(pages, 1) for node in page["nodes"]}
+    names = {node["id"]: node.get("name") or "" for node in layout["nodes"]}
+    continued = {}
+    for node in layout["nodes"]:
+        manager_id = node["manager_id"]
+        if manager_id is not None and page_of[manager_id] != page_of[node["id"]]:
+            manager_pages = continued.setdefault(manager_id, [])
+            if page_of[node["id"]] not in manager_pages:
+                manager_pages.append(page_of[node["id"]])
+    
+    generated = datetime.now().strftime('%B %d, %Y at %H:%M')
+    subtitle = f"Organizational Structure - {escape(title)}" if title else "Organizational Structure"
+    for number, page in enumerate(pages, 1):
+        if number > 1:
+            elements.append(PageBreak())
+        elements.append(Paragraph("International Network for Aid, Relief and Assistance", title_style))
+        elements.append(Paragraph(subtitle, subtitle_style))
+        elements.append(OrgChartBox(page, page_of, names, continued, page_width, page_height))
+        elements.append(Paragraph(f"Page {number} of {len(pages)} - Generated on {generated}", footer_style))
+    if not pages:
+        elements.append(Paragraph("International Network for Aid, Relief and Assistance", title_style))
+        elements.append(Paragraph(subtitle, subtitle_style))
+        elements.append(Paragraph("No employees to show", styles['Normal']))
     
-    # Build PDF
     doc.build(elements)
     buffer.seek(0)
     return buffer
@@ -388,7 +238,6 @@ def create_leave_request_pdf(leave_request: Dict[str, Any]) -> BytesIO:
     
     # Logo and Header - preserve aspect ratio
     import os
-    from PIL import Image as PILImage
     
     logo_path = os.path.join(os.path.dirname(__file__), '..', 'static', 'inara-logo.png')
     if not os.path.exists(logo_path):
@@ -396,8 +245,7 @@ def create_leave_request_pdf(leave_request: Dict[str, Any]) -> BytesIO:
     
     if os.path.exists(logo_path):
         # Load image to get original dimensions and preserve aspect ratio
-        pil_img = PILImage.open(logo_path)
-        original_width, original_height = pil_img.size
+        original_width, original_height = logo_size(logo_path)
         aspect_ratio = original_width / original_height
         
         # Set width and calculate height to preserve aspect ratio
@@ -493,215 +341,28 @@ def create_leave_request_pdf(leave_request: Dict[str, Any]) -> BytesIO:
     return buffer
 
 
-def create_user_manual_pdf() -> BytesIO:
-    """Generate PDF version of the User Manual"""
-    buffer = BytesIO()
+def create_timesheet_pdf(timesheet: Dict[str, Any]) -> BytesIO:
+    """
+    Generate PDF for timesheet with compact grid layout matching the review dialog
     
-    # Read the markdown manual
-    import os
-    # Calculate path to USER_MANUAL.md at project root
-    # __file__ is at: apps/api/core/pdf_generator.py
-    # Need to go up 3 levels to get to project root
-    current_dir = os.path.dirname(__file__)  # apps/api/core
-    api_dir = os.path.dirname(current_dir)  # apps/api
-    apps_dir = os.path.dirname(api_dir)  # apps
-    project_root = os.path.dirname(apps_dir)  # project root
-    manual_path = os.path.join(project_root, "USER_MANUAL.md")
-    
-    try:
-        with open(manual_path, 'r', encoding='utf-8') as f:
-            manual_content = f.read()
-    except FileNotFoundError:
-        # If manual file not found, create a basic version
-        manual_content = "# INARA HR Management System - User Manual\n\nVersion 1.0\n\nThis is the user manual for the INARA HR Management System."
+    Args:
+        timesheet: Timesheet dictionary with entries
+        
+    Returns:
+        BytesIO buffer containing PDF
+    """
+    from datetime import datetime as dt
+    from calendar import monthrange
     
-    # Create PDF
-    doc = SimpleDocTemplate(buffer, pagesize=letter,
-                           rightMargin=72, leftMargin=72,
-                           topMargin=72, bottomMargin=18)
+    buffer = BytesIO()
+    # Use landscape orientation to fit the grid, reduced margins
+    doc = SimpleDocTemplate(buffer, pagesize=landscape(letter), topMargin=0.2*inch, bottomMargin=0.2*inch, leftMargin=0.2*inch, rightMargin=0.2*inch)
     
-    # Container for the 'Flowable' objects
     elements = []
-    
-    # Styles
     styles = getSampleStyleSheet()
     
-    # Title style
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1a1a1a'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
-    
-    # Heading styles
-    h1_style = ParagraphStyle(
-        'CustomH1',
-        parent=styles['Heading1'],
-        fontSize=18,
-        textColor=colors.HexColor('#2c3e50'),
-        spaceAfter=12,
-        spaceBefore=20
-    )
-    
-    h2_style = ParagraphStyle(
-        'CustomH2',
-        parent=styles['Heading2'],
-        fontSize=14,
-        textColor=colors.HexColor('#34495e'),
-        spaceAfter=10,
-        spaceBefore=15
-    )
-    
-    h3_style = ParagraphStyle(
-        'CustomH3',
-        parent=styles['Heading3'],
-        fontSize=12,
-        textColor=colors.HexColor('#34495e'),
-        spaceAfter=8,
-        spaceBefore=12
-    )
-    
-    # Body style
-    body_style = ParagraphStyle(
-        'CustomBody',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=14,
-        spaceAfter=8
-    )
-    
-    # List style
-    list_style = ParagraphStyle(
-        'CustomList',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=14,
-        leftIndent=20,
-        spaceAfter=6
-    )
-    
-    # Add logo if available
-    logo_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static", "inara-logo.png")
-    if os.path.exists(logo_path):
-        try:
-            from PIL import Image as PILImage
-            img = PILImage.open(logo_path)
-            img_width, img_height = img.size
-            aspect_ratio = img_width / img_height
-            
-            logo_width = 2 * inch
-            logo_height = logo_width / aspect_ratio
-            
-            logo = Image(logo_path, width=logo_width, height=logo_height)
-            elements.append(logo)
-            elements.append(Spacer(1, 0.3*inch))
-        except:
-            pass
-    
-    # Title
-    elements.append(Paragraph("INARA HR Management System", title_style))
-    elements.append(Paragraph("User Manual", title_style))
-    elements.append(Spacer(1, 0.2*inch))
-    elements.append(Paragraph(f"Version 1.0 | Last Updated: January 2026", body_style))
-    elements.append(Spacer(1, 0.4*inch))
-    
-    # Parse markdown content and convert to PDF elements
-    lines = manual_content.split('\n')
-    i = 0
-    in_list = False
-    
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        # Skip empty lines (but add small spacing)
-        if not line:
-            if not in_list:
-                elements.append(Spacer(1, 0.1*inch))
-            i += 1
-            continue
-        
-        # Handle headers
-        if line.startswith('# '):
-            if i > 0:  # Don't add page break for first heading
-                elements.append(PageBreak())
-            elements.append(Paragraph(line[2:], h1_style))
-            in_list = False
-        elif line.startswith('## '):
-            elements.append(Spacer(1, 0.15*inch))
-            elements.append(Paragraph(line[3:], h2_style))
-            in_list = False
-        elif line.startswith('### '):
-            elements.append(Spacer(1, 0.1*inch))
-            elements.append(Paragraph(line[4:], h3_style))
-            in_list = False
-        # Handle lists
-        elif line.startswith('- ') or line.startswith('* '):
-            if not in_list:
-                elements.append(Spacer(1, 0.05*inch))
-            in_list = True
-            elements.append(Paragraph(f"• {line[2:]}", list_style))
-        # Handle numbered lists
-        elif line and line[0].isdigit() and '. ' in line[:5]:
-            if not in_list:
-                elements.append(Spacer(1, 0.05*inch))
-            in_list = True
-            elements.append(Paragraph(line, list_style))
-        # Handle bold text (simple)
-        elif line.startswith('**') and line.endswith('**'):
-            bold_text = line[2:-2]
-            bold_style = ParagraphStyle('Bold', parent=body_style, fontName='Helvetica-Bold')
-            elements.append(Paragraph(bold_text, bold_style))
-            in_list = False
-        # Handle code blocks (skip for PDF)
-        elif line.startswith('```'):
-            # Skip code blocks
-            i += 1
-            while i < len(lines) and not lines[i].strip().startswith('```'):
-                i += 1
-            i += 1
-            continue
-        # Regular paragraph
-        else:
-            # Clean up markdown formatting
-            clean_line = line.replace('**', '').replace('*', '')
-            if clean_line:
-                elements.append(Paragraph(clean_line, body_style))
-                in_list = False
-        
-        i += 1
-    
-    # Build PDF
-    doc.build(elements)
-    buffer.seek(0)
-    return buffer
-
-
-def create_timesheet_pdf(timesheet: Dict[str, Any]) -> BytesIO:
-    """
-    Generate PDF for timesheet with compact grid layout matching the review dialog
-    
-    Args:
-        timesheet: Timesheet dictionary with entries
-        
-    Returns:
-        BytesIO buffer containing PDF
-    """
-    from datetime import datetime as dt
-    from calendar import monthrange
-    
-    buffer = BytesIO()
-    # Use landscape orientation to fit the grid, reduced margins
-    doc = SimpleDocTemplate(buffer, pagesize=landscape(letter), topMargin=0.2*inch, bottomMargin=0.2*inch, leftMargin=0.2*inch, rightMargin=0.2*inch)
-    
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    # Logo and Header - preserve aspect ratio
-    import os
-    from PIL import Image as PILImage
+    # Logo and Header - preserve aspect ratio
+    import os
     
     logo_path = os.path.join(os.path.dirname(__file__), '..', 'static', 'inara-logo.png')
     if not os.path.exists(logo_path):
@@ -709,8 +370,7 @@ def create_timesheet_pdf(timesheet: Dict[str, Any]) -> BytesIO:
     
     if os.path.exists(logo_path):
         # Load image to get original dimensions and preserve aspect ratio
-        pil_img = PILImage.open(logo_path)
-        original_width, original_height = pil_img.size
+        original_width, original_height = logo_size(logo_path)
         aspect_ratio = original_width / original_height
         
         # Set width and calculate height to preserve aspect ratio
@@ -922,9 +582,15 @@ def create_timesheet_pdf(timesheet: Dict[str, Any]) -> BytesIO:
             # Header row
             header_row = ['Project \\ Grant Name']
             
-            # Helper to check if weekend
+            # Weekends and public holidays from the employee's working calendar;
+            # Saturday/Sunday when the caller did not supply them
+            non_working_days = timesheet.get('non_working_days')
+            closed_days = {str(d) for d in non_working_days} if non_working_days is not None else None
+            
             def is_weekend(day):
                 date = dt(year, month, day)
+                if closed_days is not None:
+                    return date.strftime('%Y-%m-%d') in closed_days
                 return date.weekday() >= 5  # Saturday = 5, Sunday = 6
             
             # Helper to get day name
@@ -1063,254 +729,66 @@ def create_timesheet_pdf(timesheet: Dict[str, Any]) -> BytesIO:
     return buffer
 
 
-def create_user_manual_pdf() -> BytesIO:
-    """Generate PDF version of the User Manual"""
+def create_travel_request_pdf(travel_request: Dict[str, Any]) -> BytesIO:
+    """
+    Generate PDF for travel request with INARA logo and detailed form
+    
+    Args:
+        travel_request: Travel request dictionary
+        
+    Returns:
+        BytesIO buffer containing PDF
+    """
     buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch)
     
-    # Read the markdown manual
-    import os
-    # Calculate path to USER_MANUAL.md at project root
-    # __file__ is at: apps/api/core/pdf_generator.py
-    # Need to go up 3 levels to get to project root
-    current_dir = os.path.dirname(__file__)  # apps/api/core
-    api_dir = os.path.dirname(current_dir)  # apps/api
-    apps_dir = os.path.dirname(api_dir)  # apps
-    project_root = os.path.dirname(apps_dir)  # project root
-    manual_path = os.path.join(project_root, "USER_MANUAL.md")
-    
-    try:
-        with open(manual_path, 'r', encoding='utf-8') as f:
-            manual_content = f.read()
-    except FileNotFoundError:
-        # If manual file not found, create a basic version
-        manual_content = "# INARA HR Management System - User Manual\n\nVersion 1.0\n\nThis is the user manual for the INARA HR Management System."
+    elements = []
+    styles = getSampleStyleSheet()
     
-    # Create PDF
-    doc = SimpleDocTemplate(buffer, pagesize=letter,
-                           rightMargin=72, leftMargin=72,
-                           topMargin=72, bottomMargin=18)
+    # Logo and Header - preserve aspect ratio
+    import os
     
-    # Container for the 'Flowable' objects
-    elements = []
+    logo_path = os.path.join(os.path.dirname(__file__), '..', 'static', 'inara-logo.png')
+    if not os.path.exists(logo_path):
+        logo_path = os.path.join(os.path.dirname(__file__), '..', 'static', 'inara-logo-pdf.png')
     
-    # Styles
-    styles = getSampleStyleSheet()
+    if os.path.exists(logo_path):
+        # Load image to get original dimensions and preserve aspect ratio
+        original_width, original_height = logo_size(logo_path)
+        aspect_ratio = original_width / original_height
+        
+        # Set width and calculate height to preserve aspect ratio
+        logo_width = 1*inch
+        logo_height = logo_width / aspect_ratio
+        
+        img = Image(logo_path, width=logo_width, height=logo_height)
+        
+        # Create header table with logo and organization name
+        header_data = [[img, Paragraph("<b>INARA</b><br/>International Network for Aid, Relief and Assistance", 
+                                       ParagraphStyle('OrgName', parent=styles['Normal'], fontSize=10, alignment=TA_RIGHT))]]
+        header_table = Table(header_data, colWidths=[1.5*inch, 5*inch])
+        header_table.setStyle(TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('ALIGN', (0, 0), (0, 0), 'LEFT'),
+            ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
+        ]))
+        elements.append(header_table)
+        elements.append(Spacer(1, 0.2*inch))
     
-    # Title style
     title_style = ParagraphStyle(
         'CustomTitle',
         parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1a1a1a'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
-    
-    # Heading styles
-    h1_style = ParagraphStyle(
-        'CustomH1',
-        parent=styles['Heading1'],
-        fontSize=18,
-        textColor=colors.HexColor('#2c3e50'),
-        spaceAfter=12,
-        spaceBefore=20
-    )
-    
-    h2_style = ParagraphStyle(
-        'CustomH2',
-        parent=styles['Heading2'],
-        fontSize=14,
-        textColor=colors.HexColor('#34495e'),
+        fontSize=20,
+        textColor=colors.HexColor('#D91C5C'),
+        alignment=TA_CENTER,
         spaceAfter=10,
-        spaceBefore=15
+        fontName='Helvetica-Bold'
     )
     
-    h3_style = ParagraphStyle(
-        'CustomH3',
-        parent=styles['Heading3'],
-        fontSize=12,
-        textColor=colors.HexColor('#34495e'),
-        spaceAfter=8,
-        spaceBefore=12
-    )
-    
-    # Body style
-    body_style = ParagraphStyle(
-        'CustomBody',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=14,
-        spaceAfter=8
-    )
-    
-    # List style
-    list_style = ParagraphStyle(
-        'CustomList',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=14,
-        leftIndent=20,
-        spaceAfter=6
-    )
-    
-    # Add logo if available
-    logo_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static", "inara-logo.png")
-    if os.path.exists(logo_path):
-        try:
-            from PIL import Image as PILImage
-            img = PILImage.open(logo_path)
-            img_width, img_height = img.size
-            aspect_ratio = img_width / img_height
-            
-            logo_width = 2 * inch
-            logo_height = logo_width / aspect_ratio
-            
-            logo = Image(logo_path, width=logo_width, height=logo_height)
-            elements.append(logo)
-            elements.append(Spacer(1, 0.3*inch))
-        except:
-            pass
-    
-    # Title
-    elements.append(Paragraph("INARA HR Management System", title_style))
-    elements.append(Paragraph("User Manual", title_style))
-    elements.append(Spacer(1, 0.2*inch))
-    elements.append(Paragraph(f"Version 1.0 | Last Updated: January 2026", body_style))
-    elements.append(Spacer(1, 0.4*inch))
-    
-    # Parse markdown content and convert to PDF elements
-    lines = manual_content.split('\n')
-    i = 0
-    in_list = False
-    
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        # Skip empty lines (but add small spacing)
-        if not line:
-            if not in_list:
-                elements.append(Spacer(1, 0.1*inch))
-            i += 1
-            continue
-        
-        # Handle headers
-        if line.startswith('# '):
-            if i > 0:  # Don't add page break for first heading
-                elements.append(PageBreak())
-            elements.append(Paragraph(line[2:], h1_style))
-            in_list = False
-        elif line.startswith('## '):
-            elements.append(Spacer(1, 0.15*inch))
-            elements.append(Paragraph(line[3:], h2_style))
-            in_list = False
-        elif line.startswith('### '):
-            elements.append(Spacer(1, 0.1*inch))
-            elements.append(Paragraph(line[4:], h3_style))
-            in_list = False
-        # Handle lists
-        elif line.startswith('- ') or line.startswith('* '):
-            if not in_list:
-                elements.append(Spacer(1, 0.05*inch))
-            in_list = True
-            elements.append(Paragraph(f"• {line[2:]}", list_style))
-        # Handle numbered lists
-        elif line and line[0].isdigit() and '. ' in line[:5]:
-            if not in_list:
-                elements.append(Spacer(1, 0.05*inch))
-            in_list = True
-            elements.append(Paragraph(line, list_style))
-        # Handle bold text (simple)
-        elif line.startswith('**') and line.endswith('**'):
-            bold_text = line[2:-2]
-            bold_style = ParagraphStyle('Bold', parent=body_style, fontName='Helvetica-Bold')
-            elements.append(Paragraph(bold_text, bold_style))
-            in_list = False
-        # Handle code blocks (skip for PDF)
-        elif line.startswith('```'):
-            # Skip code blocks
-            i += 1
-            while i < len(lines) and not lines[i].strip().startswith('```'):
-                i += 1
-            i += 1
-            continue
-        # Regular paragraph
-        else:
-            # Clean up markdown formatting
-            clean_line = line.replace('**', '').replace('*', '')
-            if clean_line:
-                elements.append(Paragraph(clean_line, body_style))
-                in_list = False
-        
-        i += 1
-    
-    # Build PDF
-    doc.build(elements)
-    buffer.seek(0)
-    return buffer
-
-
-def create_travel_request_pdf(travel_request: Dict[str, Any]) -> BytesIO:
-    """
-    Generate PDF for travel request with INARA logo and detailed form
-    
-    Args:
-        travel_request: Travel request dictionary
-        
-    Returns:
-        BytesIO buffer containing PDF
-    """
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch)
-    
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    # Logo and Header - preserve aspect ratio
-    import os
-    from PIL import Image as PILImage
-    
-    logo_path = os.path.join(os.path.dirname(__file__), '..', 'static', 'inara-logo.png')
-    if not os.path.exists(logo_path):
-        logo_path = os.path.join(os.path.dirname(__file__), '..', 'static', 'inara-logo-pdf.png')
-    
-    if os.path.exists(logo_path):
-        # Load image to get original dimensions and preserve aspect ratio
-        pil_img = PILImage.open(logo_path)
-        original_width, original_height = pil_img.size
-        aspect_ratio = original_width / original_height
-        
-        # Set width and calculate height to preserve aspect ratio
-        logo_width = 1*inch
-        logo_height = logo_width / aspect_ratio
-        
-        img = Image(logo_path, width=logo_width, height=logo_height)
-        
-        # Create header table with logo and organization name
-        header_data = [[img, Paragraph("<b>INARA</b><br/>International Network for Aid, Relief and Assistance", 
-                                       ParagraphStyle('OrgName', parent=styles['Normal'], fontSize=10, alignment=TA_RIGHT))]]
-        header_table = Table(header_data, colWidths=[1.5*inch, 5*inch])
-        header_table.setStyle(TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('ALIGN', (0, 0), (0, 0), 'LEFT'),
-            ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
-        ]))
-        elements.append(header_table)
-        elements.append(Spacer(1, 0.2*inch))
-    
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=20,
-        textColor=colors.HexColor('#D91C5C'),
-        alignment=TA_CENTER,
-        spaceAfter=10,
-        fontName='Helvetica-Bold'
-    )
-    
-    elements.append(Paragraph("TRAVEL REQUEST FORM", title_style))
-    subtitle_style = ParagraphStyle('Subtitle', parent=styles['Normal'], fontSize=10, textColor=colors.grey, alignment=TA_CENTER)
-    elements.append(Paragraph("Official Travel Authorization Document", subtitle_style))
-    elements.append(Spacer(1, 0.3*inch))
+    elements.append(Paragraph("TRAVEL REQUEST FORM", title_style))
+    subtitle_style = ParagraphStyle('Subtitle', parent=styles['Normal'], fontSize=10, textColor=colors.grey, alignment=TA_CENTER)
+    elements.append(Paragraph("Official Travel Authorization Document", subtitle_style))
+    elements.append(Spacer(1, 0.3*inch))
     
     # Section 1: Employee Information
     section_style = ParagraphStyle('SectionHeader', parent=styles['Heading2'], fontSize=12, 
@@ -1434,249 +912,61 @@ def create_travel_request_pdf(travel_request: Dict[str, Any]) -> BytesIO:
     return buffer
 
 
-def create_user_manual_pdf() -> BytesIO:
-    """Generate PDF version of the User Manual"""
+def create_performance_appraisal_pdf(appraisal: Dict[str, Any]) -> BytesIO:
+    """
+    Generate PDF for performance appraisal
+    
+    Args:
+        appraisal: Performance appraisal dictionary
+        
+    Returns:
+        BytesIO buffer containing PDF
+    """
     buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch)
     
-    # Read the markdown manual
-    import os
-    # Calculate path to USER_MANUAL.md at project root
-    # __file__ is at: apps/api/core/pdf_generator.py
-    # Need to go up 3 levels to get to project root
-    current_dir = os.path.dirname(__file__)  # apps/api/core
-    api_dir = os.path.dirname(current_dir)  # apps/api
-    apps_dir = os.path.dirname(api_dir)  # apps
-    project_root = os.path.dirname(apps_dir)  # project root
-    manual_path = os.path.join(project_root, "USER_MANUAL.md")
-    
-    try:
-        with open(manual_path, 'r', encoding='utf-8') as f:
-            manual_content = f.read()
-    except FileNotFoundError:
-        # If manual file not found, create a basic version
-        manual_content = "# INARA HR Management System - User Manual\n\nVersion 1.0\n\nThis is the user manual for the INARA HR Management System."
+    elements = []
+    styles = getSampleStyleSheet()
     
-    # Create PDF
-    doc = SimpleDocTemplate(buffer, pagesize=letter,
-                           rightMargin=72, leftMargin=72,
-                           topMargin=72, bottomMargin=18)
+    # Logo and Header - preserve aspect ratio
+    import os
     
-    # Container for the 'Flowable' objects
-    elements = []
+    logo_path = os.path.join(os.path.dirname(__file__), '..', 'static', 'inara-logo.png')
+    if not os.path.exists(logo_path):
+        logo_path = os.path.join(os.path.dirname(__file__), '..', 'static', 'inara-logo-pdf.png')
     
-    # Styles
-    styles = getSampleStyleSheet()
+    if os.path.exists(logo_path):
+        # Load image to get original dimensions and preserve aspect ratio
+        original_width, original_height = logo_size(logo_path)
+        aspect_ratio = original_width / original_height
+        
+        # Set width and calculate height to preserve aspect ratio
+        logo_width = 0.8*inch
+        logo_height = logo_width / aspect_ratio
+        
+        img = Image(logo_path, width=logo_width, height=logo_height)
+        header_data = [[img, Paragraph("<b>INARA</b><br/>International Network for Aid, Relief and Assistance", 
+                                       ParagraphStyle('OrgName', parent=styles['Normal'], fontSize=10, alignment=TA_RIGHT))]]
+        header_table = Table(header_data, colWidths=[1.5*inch, 5*inch])
+        header_table.setStyle(TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('ALIGN', (0, 0), (0, 0), 'LEFT'),
+            ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
+        ]))
+        elements.append(header_table)
+        elements.append(Spacer(1, 0.2*inch))
     
-    # Title style
     title_style = ParagraphStyle(
         'CustomTitle',
         parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1a1a1a'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
-    
-    # Heading styles
-    h1_style = ParagraphStyle(
-        'CustomH1',
-        parent=styles['Heading1'],
         fontSize=18,
-        textColor=colors.HexColor('#2c3e50'),
-        spaceAfter=12,
-        spaceBefore=20
-    )
-    
-    h2_style = ParagraphStyle(
-        'CustomH2',
-        parent=styles['Heading2'],
-        fontSize=14,
-        textColor=colors.HexColor('#34495e'),
-        spaceAfter=10,
-        spaceBefore=15
+        textColor=colors.HexColor('#D91C5C'),
+        alignment=TA_CENTER,
+        spaceAfter=20
     )
     
-    h3_style = ParagraphStyle(
-        'CustomH3',
-        parent=styles['Heading3'],
-        fontSize=12,
-        textColor=colors.HexColor('#34495e'),
-        spaceAfter=8,
-        spaceBefore=12
-    )
-    
-    # Body style
-    body_style = ParagraphStyle(
-        'CustomBody',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=14,
-        spaceAfter=8
-    )
-    
-    # List style
-    list_style = ParagraphStyle(
-        'CustomList',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=14,
-        leftIndent=20,
-        spaceAfter=6
-    )
-    
-    # Add logo if available
-    logo_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static", "inara-logo.png")
-    if os.path.exists(logo_path):
-        try:
-            from PIL import Image as PILImage
-            img = PILImage.open(logo_path)
-            img_width, img_height = img.size
-            aspect_ratio = img_width / img_height
-            
-            logo_width = 2 * inch
-            logo_height = logo_width / aspect_ratio
-            
-            logo = Image(logo_path, width=logo_width, height=logo_height)
-            elements.append(logo)
-            elements.append(Spacer(1, 0.3*inch))
-        except:
-            pass
-    
-    # Title
-    elements.append(Paragraph("INARA HR Management System", title_style))
-    elements.append(Paragraph("User Manual", title_style))
-    elements.append(Spacer(1, 0.2*inch))
-    elements.append(Paragraph(f"Version 1.0 | Last Updated: January 2026", body_style))
-    elements.append(Spacer(1, 0.4*inch))
-    
-    # Parse markdown content and convert to PDF elements
-    lines = manual_content.split('\n')
-    i = 0
-    in_list = False
-    
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        # Skip empty lines (but add small spacing)
-        if not line:
-            if not in_list:
-                elements.append(Spacer(1, 0.1*inch))
-            i += 1
-            continue
-        
-        # Handle headers
-        if line.startswith('# '):
-            if i > 0:  # Don't add page break for first heading
-                elements.append(PageBreak())
-            elements.append(Paragraph(line[2:], h1_style))
-            in_list = False
-        elif line.startswith('## '):
-            elements.append(Spacer(1, 0.15*inch))
-            elements.append(Paragraph(line[3:], h2_style))
-            in_list = False
-        elif line.startswith('### '):
-            elements.append(Spacer(1, 0.1*inch))
-            elements.append(Paragraph(line[4:], h3_style))
-            in_list = False
-        # Handle lists
-        elif line.startswith('- ') or line.startswith('* '):
-            if not in_list:
-                elements.append(Spacer(1, 0.05*inch))
-            in_list = True
-            elements.append(Paragraph(f"• {line[2:]}", list_style))
-        # Handle numbered lists
-        elif line and line[0].isdigit() and '. ' in line[:5]:
-            if not in_list:
-                elements.append(Spacer(1, 0.05*inch))
-            in_list = True
-            elements.append(Paragraph(line, list_style))
-        # Handle bold text (simple)
-        elif line.startswith('**') and line.endswith('**'):
-            bold_text = line[2:-2]
-            bold_style = ParagraphStyle('Bold', parent=body_style, fontName='Helvetica-Bold')
-            elements.append(Paragraph(bold_text, bold_style))
-            in_list = False
-        # Handle code blocks (skip for PDF)
-        elif line.startswith('```'):
-            # Skip code blocks
-            i += 1
-            while i < len(lines) and not lines[i].strip().startswith('```'):
-                i += 1
-            i += 1
-            continue
-        # Regular paragraph
-        else:
-            # Clean up markdown formatting
-            clean_line = line.replace('**', '').replace('*', '')
-            if clean_line:
-                elements.append(Paragraph(clean_line, body_style))
-                in_list = False
-        
-        i += 1
-    
-    # Build PDF
-    doc.build(elements)
-    buffer.seek(0)
-    return buffer
-
-
-def create_performance_appraisal_pdf(appraisal: Dict[str, Any]) -> BytesIO:
-    """
-    Generate PDF for performance appraisal
-    
-    Args:
-        appraisal: Performance appraisal dictionary
-        
-    Returns:
-        BytesIO buffer containing PDF
-    """
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch)
-    
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    # Logo and Header - preserve aspect ratio
-    import os
-    from PIL import Image as PILImage
-    
-    logo_path = os.path.join(os.path.dirname(__file__), '..', 'static', 'inara-logo.png')
-    if not os.path.exists(logo_path):
-        logo_path = os.path.join(os.path.dirname(__file__), '..', 'static', 'inara-logo-pdf.png')
-    
-    if os.path.exists(logo_path):
-        # Load image to get original dimensions and preserve aspect ratio
-        pil_img = PILImage.open(logo_path)
-        original_width, original_height = pil_img.size
-        aspect_ratio = original_width / original_height
-        
-        # Set width and calculate height to preserve aspect ratio
-        logo_width = 0.8*inch
-        logo_height = logo_width / aspect_ratio
-        
-        img = Image(logo_path, width=logo_width, height=logo_height)
-        header_data = [[img, Paragraph("<b>INARA</b><br/>International Network for Aid, Relief and Assistance", 
-                                       ParagraphStyle('OrgName', parent=styles['Normal'], fontSize=10, alignment=TA_RIGHT))]]
-        header_table = Table(header_data, colWidths=[1.5*inch, 5*inch])
-        header_table.setStyle(TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('ALIGN', (0, 0), (0, 0), 'LEFT'),
-            ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
-        ]))
-        elements.append(header_table)
-        elements.append(Spacer(1, 0.2*inch))
-    
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        textColor=colors.HexColor('#D91C5C'),
-        alignment=TA_CENTER,
-        spaceAfter=20
-    )
-    
-    elements.append(Paragraph("Performance Appraisal", title_style))
-    elements.append(Spacer(1, 0.2*inch))
+    elements.append(Paragraph("Performance Appraisal", title_style))
+    elements.append(Spacer(1, 0.2*inch))
     
     # Basic info
     data = [
@@ -1754,192 +1044,6 @@ def create_performance_appraisal_pdf(appraisal: Dict[str, Any]) -> BytesIO:
     return buffer
 
 
-def create_user_manual_pdf() -> BytesIO:
-    """Generate PDF version of the User Manual"""
-    buffer = BytesIO()
-    
-    # Read the markdown manual
-    import os
-    # Calculate path to USER_MANUAL.md at project root
-    # __file__ is at: apps/api/core/pdf_generator.py
-    # Need to go up 3 levels to get to project root
-    current_dir = os.path.dirname(__file__)  # apps/api/core
-    api_dir = os.path.dirname(current_dir)  # apps/api
-    apps_dir = os.path.dirname(api_dir)  # apps
-    project_root = os.path.dirname(apps_dir)  # project root
-    manual_path = os.path.join(project_root, "USER_MANUAL.md")
-    
-    try:
-        with open(manual_path, 'r', encoding='utf-8') as f:
-            manual_content = f.read()
-    except FileNotFoundError:
-        # If manual file not found, create a basic version
-        manual_content = "# INARA HR Management System - User Manual\n\nVersion 1.0\n\nThis is the user manual for the INARA HR Management System."
-    
-    # Create PDF
-    doc = SimpleDocTemplate(buffer, pagesize=letter,
-                           rightMargin=72, leftMargin=72,
-                           topMargin=72, bottomMargin=18)
-    
-    # Container for the 'Flowable' objects
-    elements = []
-    
-    # Styles
-    styles = getSampleStyleSheet()
-    
-    # Title style
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1a1a1a'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
-    
-    # Heading styles
-    h1_style = ParagraphStyle(
-        'CustomH1',
-        parent=styles['Heading1'],
-        fontSize=18,
-        textColor=colors.HexColor('#2c3e50'),
-        spaceAfter=12,
-        spaceBefore=20
-    )
-    
-    h2_style = ParagraphStyle(
-        'CustomH2',
-        parent=styles['Heading2'],
-        fontSize=14,
-        textColor=colors.HexColor('#34495e'),
-        spaceAfter=10,
-        spaceBefore=15
-    )
-    
-    h3_style = ParagraphStyle(
-        'CustomH3',
-        parent=styles['Heading3'],
-        fontSize=12,
-        textColor=colors.HexColor('#34495e'),
-        spaceAfter=8,
-        spaceBefore=12
-    )
-    
-    # Body style
-    body_style = ParagraphStyle(
-        'CustomBody',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=14,
-        spaceAfter=8
-    )
-    
-    # List style
-    list_style = ParagraphStyle(
-        'CustomList',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=14,
-        leftIndent=20,
-        spaceAfter=6
-    )
-    
-    # Add logo if available
-    logo_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static", "inara-logo.png")
-    if os.path.exists(logo_path):
-        try:
-            from PIL import Image as PILImage
-            img = PILImage.open(logo_path)
-            img_width, img_height = img.size
-            aspect_ratio = img_width / img_height
-            
-            logo_width = 2 * inch
-            logo_height = logo_width / aspect_ratio
-            
-            logo = Image(logo_path, width=logo_width, height=logo_height)
-            elements.append(logo)
-            elements.append(Spacer(1, 0.3*inch))
-        except:
-            pass
-    
-    # Title
-    elements.append(Paragraph("INARA HR Management System", title_style))
-    elements.append(Paragraph("User Manual", title_style))
-    elements.append(Spacer(1, 0.2*inch))
-    elements.append(Paragraph(f"Version 1.0 | Last Updated: January 2026", body_style))
-    elements.append(Spacer(1, 0.4*inch))
-    
-    # Parse markdown content and convert to PDF elements
-    lines = manual_content.split('\n')
-    i = 0
-    in_list = False
-    
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        # Skip empty lines (but add small spacing)
-        if not line:
-            if not in_list:
-                elements.append(Spacer(1, 0.1*inch))
-            i += 1
-            continue
-        
-        # Handle headers
-        if line.startswith('# '):
-            if i > 0:  # Don't add page break for first heading
-                elements.append(PageBreak())
-            elements.append(Paragraph(line[2:], h1_style))
-            in_list = False
-        elif line.startswith('## '):
-            elements.append(Spacer(1, 0.15*inch))
-            elements.append(Paragraph(line[3:], h2_style))
-            in_list = False
-        elif line.startswith('### '):
-            elements.append(Spacer(1, 0.1*inch))
-            elements.append(Paragraph(line[4:], h3_style))
-            in_list = False
-        # Handle lists
-        elif line.startswith('- ') or line.startswith('* '):
-            if not in_list:
-                elements.append(Spacer(1, 0.05*inch))
-            in_list = True
-            elements.append(Paragraph(f"• {line[2:]}", list_style))
-        # Handle numbered lists
-        elif line and line[0].isdigit() and '. ' in line[:5]:
-            if not in_list:
-                elements.append(Spacer(1, 0.05*inch))
-            in_list = True
-            elements.append(Paragraph(line, list_style))
-        # Handle bold text (simple)
-        elif line.startswith('**') and line.endswith('**'):
-            bold_text = line[2:-2]
-            bold_style = ParagraphStyle('Bold', parent=body_style, fontName='Helvetica-Bold')
-            elements.append(Paragraph(bold_text, bold_style))
-            in_list = False
-        # Handle code blocks (skip for PDF)
-        elif line.startswith('```'):
-            # Skip code blocks
-            i += 1
-            while i < len(lines) and not lines[i].strip().startswith('```'):
-                i += 1
-            i += 1
-            continue
-        # Regular paragraph
-        else:
-            # Clean up markdown formatting
-            clean_line = line.replace('**', '').replace('*', '')
-            if clean_line:
-                elements.append(Paragraph(clean_line, body_style))
-                in_list = False
-        
-        i += 1
-    
-    # Build PDF
-    doc.build(elements)
-    buffer.seek(0)
-    return buffer
-
-
 def create_grievance_report_pdf(grievance: Dict[str, Any]) -> BytesIO:
     """
     Generate PDF for grievance/safeguarding report
@@ -1958,7 +1062,6 @@ def create_grievance_report_pdf(grievance: Dict[str, Any]) -> BytesIO:
     
     # Logo and Header - preserve aspect ratio
     import os
-    from PIL import Image as PILImage
     
     logo_path = os.path.join(os.path.dirname(__file__), '..', 'static', 'inara-logo.png')
     if not os.path.exists(logo_path):
@@ -1966,8 +1069,7 @@ def create_grievance_report_pdf(grievance: Dict[str, Any]) -> BytesIO:
     
     if os.path.exists(logo_path):
         # Load image to get original dimensions and preserve aspect ratio
-        pil_img = PILImage.open(logo_path)
-        original_width, original_height = pil_img.size
+        original_width, original_height = logo_size(logo_path)
         aspect_ratio = original_width / original_height
         
         # Set width and calculate height to preserve aspect ratio
@@ -2035,209 +1137,23 @@ def create_grievance_report_pdf(grievance: Dict[str, Any]) -> BytesIO:
     
     elements.append(table)
     
-    if grievance.get('description'):
-        elements.append(Spacer(1, 0.3*inch))
-        elements.append(Paragraph("<b>Description:</b>", styles['Heading3']))
-        elements.append(Spacer(1, 0.1*inch))
-        elements.append(Paragraph(grievance.get('description', ''), styles['Normal']))
-    
-    if grievance.get('resolution'):
-        elements.append(Spacer(1, 0.2*inch))
-        elements.append(Paragraph("<b>Resolution:</b>", styles['Heading3']))
-        elements.append(Spacer(1, 0.1*inch))
-        elements.append(Paragraph(grievance.get('resolution', ''), styles['Normal']))
-    
-    # Footer
-    elements.append(Spacer(1, 0.5*inch))
-    footer_style = ParagraphStyle('Footer', parent=styles['Normal'], fontSize=8, textColor=colors.grey, alignment=TA_CENTER)
-    elements.append(Paragraph(f"Generated on {datetime.now().strftime('%B %d, %Y at %H:%M')}", footer_style))
-    
-    doc.build(elements)
-    buffer.seek(0)
-    return buffer
-
-
-def create_user_manual_pdf() -> BytesIO:
-    """Generate PDF version of the User Manual"""
-    buffer = BytesIO()
-    
-    # Read the markdown manual
-    import os
-    # Calculate path to USER_MANUAL.md at project root
-    # __file__ is at: apps/api/core/pdf_generator.py
-    # Need to go up 3 levels to get to project root
-    current_dir = os.path.dirname(__file__)  # apps/api/core
-    api_dir = os.path.dirname(current_dir)  # apps/api
-    apps_dir = os.path.dirname(api_dir)  # apps
-    project_root = os.path.dirname(apps_dir)  # project root
-    manual_path = os.path.join(project_root, "USER_MANUAL.md")
-    
-    try:
-        with open(manual_path, 'r', encoding='utf-8') as f:
-            manual_content = f.read()
-    except FileNotFoundError:
-        # If manual file not found, create a basic version
-        manual_content = "# INARA HR Management System - User Manual\n\nVersion 1.0\n\nThis is the user manual for the INARA HR Management System."
-    
-    # Create PDF
-    doc = SimpleDocTemplate(buffer, pagesize=letter,
-                           rightMargin=72, leftMargin=72,
-                           topMargin=72, bottomMargin=18)
-    
-    # Container for the 'Flowable' objects
-    elements = []
-    
-    # Styles
-    styles = getSampleStyleSheet()
-    
-    # Title style
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1a1a1a'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
-    
-    # Heading styles
-    h1_style = ParagraphStyle(
-        'CustomH1',
-        parent=styles['Heading1'],
-        fontSize=18,
-        textColor=colors.HexColor('#2c3e50'),
-        spaceAfter=12,
-        spaceBefore=20
-    )
-    
-    h2_style = ParagraphStyle(
-        'CustomH2',
-        parent=styles['Heading2'],
-        fontSize=14,
-        textColor=colors.HexColor('#34495e'),
-        spaceAfter=10,
-        spaceBefore=15
-    )
-    
-    h3_style = ParagraphStyle(
-        'CustomH3',
-        parent=styles['Heading3'],
-        fontSize=12,
-        textColor=colors.HexColor('#34495e'),
-        spaceAfter=8,
-        spaceBefore=12
-    )
-    
-    # Body style
-    body_style = ParagraphStyle(
-        'CustomBody',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=14,
-        spaceAfter=8
-    )
-    
-    # List style
-    list_style = ParagraphStyle(
-        'CustomList',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=14,
-        leftIndent=20,
-        spaceAfter=6
-    )
-    
-    # Add logo if available
-    logo_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static", "inara-logo.png")
-    if os.path.exists(logo_path):
-        try:
-            from PIL import Image as PILImage
-            img = PILImage.open(logo_path)
-            img_width, img_height = img.size
-            aspect_ratio = img_width / img_height
-            
-            logo_width = 2 * inch
-            logo_height = logo_width / aspect_ratio
-            
-            logo = Image(logo_path, width=logo_width, height=logo_height)
-            elements.append(logo)
-            elements.append(Spacer(1, 0.3*inch))
-        except:
-            pass
-    
-    # Title
-    elements.append(Paragraph("INARA HR Management System", title_style))
-    elements.append(Paragraph("User Manual", title_style))
-    elements.append(Spacer(1, 0.2*inch))
-    elements.append(Paragraph(f"Version 1.0 | Last Updated: January 2026", body_style))
-    elements.append(Spacer(1, 0.4*inch))
-    
-    # Parse markdown content and convert to PDF elements
-    lines = manual_content.split('\n')
-    i = 0
-    in_list = False
+    if grievance.get('description'):
+        elements.append(Spacer(1, 0.3*inch))
+        elements.append(Paragraph("<b>Description:</b>", styles['Heading3']))
+        elements.append(Spacer(1, 0.1*inch))
+        elements.append(Paragraph(grievance.get('description', ''), styles['Normal']))
     
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        # Skip empty lines (but add small spacing)
-        if not line:
-            if not in_list:
-                elements.append(Spacer(1, 0.1*inch))
-            i += 1
-            continue
-        
-        # Handle headers
-        if line.startswith('# '):
-            if i > 0:  # Don't add page break for first heading
-                elements.append(PageBreak())
-            elements.append(Paragraph(line[2:], h1_style))
-            in_list = False
-        elif line.startswith('## '):
-            elements.append(Spacer(1, 0.15*inch))
-            elements.append(Paragraph(line[3:], h2_style))
-            in_list = False
-        elif line.startswith('### '):
-            elements.append(Spacer(1, 0.1*inch))
-            elements.append(Paragraph(line[4:], h3_style))
-            in_list = False
-        # Handle lists
-        elif line.startswith('- ') or line.startswith('* '):
-            if not in_list:
-                elements.append(Spacer(1, 0.05*inch))
-            in_list = True
-            elements.append(Paragraph(f"• {line[2:]}", list_style))
-        # Handle numbered lists
-        elif line and line[0].isdigit() and '. ' in line[:5]:
-            if not in_list:
-                elements.append(Spacer(1, 0.05*inch))
-            in_list = True
-            elements.append(Paragraph(line, list_style))
-        # Handle bold text (simple)
-        elif line.startswith('**') and line.endswith('**'):
-            bold_text = line[2:-2]
-            bold_style = ParagraphStyle('Bold', parent=body_style, fontName='Helvetica-Bold')
-            elements.append(Paragraph(bold_text, bold_style))
-            in_list = False
-        # Handle code blocks (skip for PDF)
-        elif line.startswith('```'):
-            # Skip code blocks
-            i += 1
-            while i < len(lines) and not lines[i].strip().startswith('```'):
-                i += 1
-            i += 1
-            continue
-        # Regular paragraph
-        else:
-            # Clean up markdown formatting
-            clean_line = line.replace('**', '').replace('*', '')
-            if clean_line:
-                elements.append(Paragraph(clean_line, body_style))
-                in_list = False
-        
-        i += 1
+    if grievance.get('resolution'):
+        elements.append(Spacer(1, 0.2*inch))
+        elements.append(Paragraph("<b>Resolution:</b>", styles['Heading3']))
+        elements.append(Spacer(1, 0.1*inch))
+        elements.append(Paragraph(grievance.get('resolution', ''), styles['Normal']))
+    
+    # Footer
+    elements.append(Spacer(1, 0.5*inch))
+    footer_style = ParagraphStyle('Footer', parent=styles['Normal'], fontSize=8, textColor=colors.grey, alignment=TA_CENTER)
+    elements.append(Paragraph(f"Generated on {datetime.now().strftime('%B %d, %Y at %H:%M')}", footer_style))
     
-    # Build PDF
     doc.build(elements)
     buffer.seek(0)
     return buffer
@@ -2252,7 +1168,6 @@ def generate_employment_contract_pdf(contract: dict, employee: dict) -> BytesIO:
     
     # Logo and Header - preserve aspect ratio
     import os
-    from PIL import Image as PILImage
     
     logo_path = os.path.join(os.path.dirname(__file__), '..', 'static', 'inara-logo.png')
     if not os.path.exists(logo_path):
@@ -2261,8 +1176,7 @@ def generate_employment_contract_pdf(contract: dict, employee: dict) -> BytesIO:
     elements = []
     if os.path.exists(logo_path):
         # Load image to get original dimensions and preserve aspect ratio
-        pil_img = PILImage.open(logo_path)
-        original_width, original_height = pil_img.size
+        original_width, original_height = logo_size(logo_path)
         aspect_ratio = original_width / original_height
         
         # Set width and calculate height to preserve aspect ratio
@@ -2334,192 +1248,6 @@ def generate_employment_contract_pdf(contract: dict, employee: dict) -> BytesIO:
     return buffer
 
 
-def create_user_manual_pdf() -> BytesIO:
-    """Generate PDF version of the User Manual"""
-    buffer = BytesIO()
-    
-    # Read the markdown manual
-    import os
-    # Calculate path to USER_MANUAL.md at project root
-    # __file__ is at: apps/api/core/pdf_generator.py
-    # Need to go up 3 levels to get to project root
-    current_dir = os.path.dirname(__file__)  # apps/api/core
-    api_dir = os.path.dirname(current_dir)  # apps/api
-    apps_dir = os.path.dirname(api_dir)  # apps
-    project_root = os.path.dirname(apps_dir)  # project root
-    manual_path = os.path.join(project_root, "USER_MANUAL.md")
-    
-    try:
-        with open(manual_path, 'r', encoding='utf-8') as f:
-            manual_content = f.read()
-    except FileNotFoundError:
-        # If manual file not found, create a basic version
-        manual_content = "# INARA HR Management System - User Manual\n\nVersion 1.0\n\nThis is the user manual for the INARA HR Management System."
-    
-    # Create PDF
-    doc = SimpleDocTemplate(buffer, pagesize=letter,
-                           rightMargin=72, leftMargin=72,
-                           topMargin=72, bottomMargin=18)
-    
-    # Container for the 'Flowable' objects
-    elements = []
-    
-    # Styles
-    styles = getSampleStyleSheet()
-    
-    # Title style
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1a1a1a'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
-    
-    # Heading styles
-    h1_style = ParagraphStyle(
-        'CustomH1',
-        parent=styles['Heading1'],
-        fontSize=18,
-        textColor=colors.HexColor('#2c3e50'),
-        spaceAfter=12,
-        spaceBefore=20
-    )
-    
-    h2_style = ParagraphStyle(
-        'CustomH2',
-        parent=styles['Heading2'],
-        fontSize=14,
-        textColor=colors.HexColor('#34495e'),
-        spaceAfter=10,
-        spaceBefore=15
-    )
-    
-    h3_style = ParagraphStyle(
-        'CustomH3',
-        parent=styles['Heading3'],
-        fontSize=12,
-        textColor=colors.HexColor('#34495e'),
-        spaceAfter=8,
-        spaceBefore=12
-    )
-    
-    # Body style
-    body_style = ParagraphStyle(
-        'CustomBody',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=14,
-        spaceAfter=8
-    )
-    
-    # List style
-    list_style = ParagraphStyle(
-        'CustomList',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=14,
-        leftIndent=20,
-        spaceAfter=6
-    )
-    
-    # Add logo if available
-    logo_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static", "inara-logo.png")
-    if os.path.exists(logo_path):
-        try:
-            from PIL import Image as PILImage
-            img = PILImage.open(logo_path)
-            img_width, img_height = img.size
-            aspect_ratio = img_width / img_height
-            
-            logo_width = 2 * inch
-            logo_height = logo_width / aspect_ratio
-            
-            logo = Image(logo_path, width=logo_width, height=logo_height)
-            elements.append(logo)
-            elements.append(Spacer(1, 0.3*inch))
-        except:
-            pass
-    
-    # Title
-    elements.append(Paragraph("INARA HR Management System", title_style))
-    elements.append(Paragraph("User Manual", title_style))
-    elements.append(Spacer(1, 0.2*inch))
-    elements.append(Paragraph(f"Version 1.0 | Last Updated: January 2026", body_style))
-    elements.append(Spacer(1, 0.4*inch))
-    
-    # Parse markdown content and convert to PDF elements
-    lines = manual_content.split('\n')
-    i = 0
-    in_list = False
-    
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        # Skip empty lines (but add small spacing)
-        if not line:
-            if not in_list:
-                elements.append(Spacer(1, 0.1*inch))
-            i += 1
-            continue
-        
-        # Handle headers
-        if line.startswith('# '):
-            if i > 0:  # Don't add page break for first heading
-                elements.append(PageBreak())
-            elements.append(Paragraph(line[2:], h1_style))
-            in_list = False
-        elif line.startswith('## '):
-            elements.append(Spacer(1, 0.15*inch))
-            elements.append(Paragraph(line[3:], h2_style))
-            in_list = False
-        elif line.startswith('### '):
-            elements.append(Spacer(1, 0.1*inch))
-            elements.append(Paragraph(line[4:], h3_style))
-            in_list = False
-        # Handle lists
-        elif line.startswith('- ') or line.startswith('* '):
-            if not in_list:
-                elements.append(Spacer(1, 0.05*inch))
-            in_list = True
-            elements.append(Paragraph(f"• {line[2:]}", list_style))
-        # Handle numbered lists
-        elif line and line[0].isdigit() and '. ' in line[:5]:
-            if not in_list:
-                elements.append(Spacer(1, 0.05*inch))
-            in_list = True
-            elements.append(Paragraph(line, list_style))
-        # Handle bold text (simple)
-        elif line.startswith('**') and line.endswith('**'):
-            bold_text = line[2:-2]
-            bold_style = ParagraphStyle('Bold', parent=body_style, fontName='Helvetica-Bold')
-            elements.append(Paragraph(bold_text, bold_style))
-            in_list = False
-        # Handle code blocks (skip for PDF)
-        elif line.startswith('```'):
-            # Skip code blocks
-            i += 1
-            while i < len(lines) and not lines[i].strip().startswith('```'):
-                i += 1
-            i += 1
-            continue
-        # Regular paragraph
-        else:
-            # Clean up markdown formatting
-            clean_line = line.replace('**', '').replace('*', '')
-            if clean_line:
-                elements.append(Paragraph(clean_line, body_style))
-                in_list = False
-        
-        i += 1
-    
-    # Build PDF
-    doc.build(elements)
-    buffer.seek(0)
-    return buffer
-
-
 def generate_resignation_letter_pdf(resignation: dict, employee: dict) -> BytesIO:
     """Generate a resignation letter PDF"""
     buffer = BytesIO()
@@ -2570,25 +1298,34 @@ def generate_resignation_letter_pdf(resignation: dict, employee: dict) -> BytesI
     return buffer
 
 
+def user_manual_source_path() -> Optional[str]:
+    """
+    Locate USER_MANUAL.md: the project root in a checkout
+    (apps/api/core -> up 3 levels), or the API directory in Docker
+    """
+    api_dir = os.path.dirname(STATIC_DIR)
+    project_root = os.path.dirname(os.path.dirname(api_dir))
+    for candidate in (project_root, api_dir):
+        manual_path = os.path.join(candidate, "USER_MANUAL.md")
+        if os.path.exists(manual_path):
+            return manual_path
+    return None
+
+
 def create_user_manual_pdf() -> BytesIO:
     """Generate PDF version of the User Manual"""
     buffer = BytesIO()
     
     # Read the markdown manual
-    import os
-    # Calculate path to USER_MANUAL.md at project root
-    # __file__ is at: apps/api/core/pdf_generator.py
-    # Need to go up 3 levels to get to project root
-    current_dir = os.path.dirname(__file__)  # apps/api/core
-    api_dir = os.path.dirname(current_dir)  # apps/api
-    apps_dir = os.path.dirname(api_dir)  # apps
-    project_root = os.path.dirname(apps_dir)  # project root
-    manual_path = os.path.join(project_root, "USER_MANUAL.md")
-    
-    try:
-        with open(manual_path, 'r', encoding='utf-8') as f:
-            manual_content = f.read()
-    except FileNotFoundError:
+    manual_path = user_manual_source_path()
+    manual_content = None
+    if manual_path is not None:
+        try:
+            with open(manual_path, 'r', encoding='utf-8') as f:
+                manual_content = f.read()
+        except OSError:
+            pass  # unreadable: fall back like a missing file
+    if manual_content is None:
         # If manual file not found, create a basic version
         manual_content = "# INARA HR Management System - User Manual\n\nVersion 1.0\n\nThis is the user manual for the INARA HR Management System."
     
@@ -2664,9 +1401,7 @@ def create_user_manual_pdf() -> BytesIO:
     logo_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static", "inara-logo.png")
     if os.path.exists(logo_path):
         try:
-            from PIL import Image as PILImage
-            img = PILImage.open(logo_path)
-            img_width, img_height = img.size
+            img_width, img_height = logo_size(logo_path)
             aspect_ratio = img_width / img_height
             
             logo_width = 2 * inch
@@ -0,0 +1,230 @@
+"""
+PDF Render Service
+Runs ReportLab rendering outside the event loop
+
+ReportLab is CPU bound and holds the GIL, so documents are rendered in a
+bounded process pool (or on the Celery workers) and the handler awaits
+the result. Renderers must be module-level functions so they can be sent
+to another process by reference; their arguments must be picklable, and
+for the Celery backend made of JSON types plus UUID, Decimal, date and
+datetime, which encode_render_args tags so they arrive with their types.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import base64
+import importlib
+import logging
+import time
+import uuid
+
+from core.config import settings
+from core.exceptions import RenderUnavailableException
+
+logger = logging.getLogger(__name__)
+
+# Modules whose functions may be named in a Celery render task
+RENDER_MODULES = ("core.pdf_generator", "modules.payroll.pdf_generator")
+
+
+def renderer_path(renderer: Callable) -> str:
+    """Dotted reference for a renderer, e.g. core.pdf_generator:create_timesheet_pdf"""
+    return f"{renderer.__module__}:{renderer.__qualname__}"
+
+
+def resolve_renderer(path: str) -> Callable:
+    """Resolve a renderer reference, refusing anything outside RENDER_MODULES"""
+    module_name, _, function_name = path.partition(":")
+    if module_name not in RENDER_MODULES or not function_name or "." in function_name:
+        raise ValueError(f"Unknown renderer: {path}")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+# Tagged forms of the non-JSON values renderer arguments may contain
+_TAGGED_TYPES = (
+    ("uuid", uuid.UUID, str, uuid.UUID),
+    ("decimal", Decimal, str, Decimal),
+    ("datetime", datetime, datetime.isoformat, datetime.fromisoformat),  # before date: a datetime is a date
+    ("date", date, date.isoformat, date.fromisoformat),
+)
+TYPE_TAG = "__render_type__"
+
+
+def encode_render_args(value: Any) -> Any:
+    """Make renderer arguments JSON-safe for the Celery backend, tagging UUID, Decimal and dates"""
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, dict):
+        return {key: encode_render_args(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode_render_args(item) for item in value]
+    for tag, kind, encode, _ in _TAGGED_TYPES:
+        if isinstance(value, kind):
+            return {TYPE_TAG: tag, "value": encode(value)}
+    raise TypeError(f"{type(value).__name__} cannot be sent to the Celery render backend")
+
+
+def decode_render_args(value: Any) -> Any:
+    """Inverse of encode_render_args"""
+    if isinstance(value, list):
+        return [decode_render_args(item) for item in value]
+    if isinstance(value, dict):
+        if TYPE_TAG in value:
+            decode = {tag: decoder for tag, _, _, decoder in _TAGGED_TYPES}[value[TYPE_TAG]]
+            return decode(value["value"])
+        return {key: decode_render_args(item) for key, item in value.items()}
+    return value
+
+
+def render_to_bytes(renderer: Callable, args: tuple, kwargs: Dict[str, Any]) -> bytes:
+    """Run a renderer and normalise its BytesIO or bytes result"""
+    result = renderer(*args, **kwargs)
+    if isinstance(result, BytesIO):
+        return result.getvalue()
+    return bytes(result)
+
+
+def _init_worker() -> None:
+    """Load font metrics and logo sizes once per worker process"""
+    from core.pdf_generator import preload_assets
+    preload_assets()
+
+
+class PDFRenderService:
+    """
+    Shared render executor
+
+    - process: bounded ProcessPoolExecutor, workers preloaded on start
+    - celery: offloaded to core.tasks.render_pdf_task on the Celery app
+    - inline: rendered in the calling thread (tests and scripts)
+    """
+
+    def __init__(
+        self,
+        backend: str = settings.PDF_RENDER_BACKEND,
+        workers: int = settings.PDF_RENDER_WORKERS,
+        max_queue: int = settings.PDF_RENDER_MAX_QUEUE,
+        timeout: int = settings.PDF_RENDER_TIMEOUT_SECONDS
+    ):
+        self.backend = backend
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.queue_depth = 0
+        self.rendered = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.failures = 0
+        self.total_seconds = 0.0
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        """Process pool, created on first use"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        return self._pool
+
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def render_bytes(
+        self,
+        renderer: Callable,
+        *args: Any,
+        timeout: Optional[float] = None,
+        **kwargs: Any
+    ) -> bytes:
+        """Render a document and return the PDF bytes"""
+        if self.queue_depth >= self.max_queue:
+            self.rejected += 1
+            raise RenderUnavailableException("Too many documents are being rendered, please retry shortly")
+
+        timeout = timeout or self.timeout
+        self.queue_depth += 1
+        started = time.perf_counter()
+        submitted = None
+        try:
+            if self.backend == "process":
+                # The slot is held until the worker finishes: a timed-out
+                # render keeps running, and still counts against max_queue
+                submitted = self.pool.submit(render_to_bytes, renderer, args, kwargs)
+                submitted.add_done_callback(self._release_from_worker(asyncio.get_running_loop()))
+                work = asyncio.wrap_future(submitted)
+            else:
+                work = self._dispatch(renderer, args, kwargs, timeout)
+            pdf_bytes = await asyncio.wait_for(work, timeout)
+            self.rendered += 1
+            self.total_seconds += time.perf_counter() - started
+            return pdf_bytes
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.error(f"PDF render timed out after {timeout}s: {renderer_path(renderer)}")
+            raise RenderUnavailableException(f"Document rendering timed out after {timeout} seconds")
+        except BrokenProcessPool:
+            # A crashed worker poisons the pool; start a fresh one next time
+            self.failures += 1
+            self._pool = None
+            raise
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            if submitted is None:
+                self.queue_depth -= 1
+
+    def _release_from_worker(self, loop: asyncio.AbstractEventLoop) -> Callable:
+        """Done-callback freeing a render slot once its pool future finishes"""
+        def release(_future) -> None:
+            try:
+                loop.call_soon_threadsafe(self._release_slot)
+            except RuntimeError:  # the loop has closed
+                self._release_slot()
+        return release
+
+    def _release_slot(self) -> None:
+        self.queue_depth -= 1
+
+    async def render(self, renderer: Callable, *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> BytesIO:
+        """Render a document and return it as a BytesIO, like the renderers themselves"""
+        return BytesIO(await self.render_bytes(renderer, *args, timeout=timeout, **kwargs))
+
+    async def _dispatch(self, renderer: Callable, args: tuple, kwargs: Dict[str, Any], timeout: float) -> bytes:
+        """Render on the inline or Celery backend (the process pool is driven by render_bytes)"""
+        if self.backend == "inline":
+            return render_to_bytes(renderer, args, kwargs)
+
+        if self.backend == "celery":
+            from core.tasks import render_pdf_task
+            result = render_pdf_task.delay(
+                renderer_path(renderer), encode_render_args(list(args)), encode_render_args(kwargs)
+            )
+            encoded = await asyncio.to_thread(result.get, timeout=timeout)
+            return base64.b64decode(encoded)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Render metrics for the monitoring endpoint"""
+        completed = self.rendered or 1
+        return {
+            "backend": self.backend,
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "rendered": self.rendered,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "failures": self.failures,
+            "avg_render_ms": round(self.total_seconds / completed * 1000, 2)
+        }
+
+
+# Global render service instance
+render_service = PDFRenderService()
@@ -0,0 +1,133 @@
+"""
+Principal Cache
+Caches the authenticated user snapshot (roles, permissions, employee link)
+so get_current_user does not hit the database on every request
+"""
+
+from typing import Any, Dict, Optional
+import logging
+import time
+
+from core.cache import cache, LocalCache
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bump when the snapshot shape changes so stale entries from a previous
+# deploy are ignored instead of being handed to route handlers
+PRINCIPAL_SNAPSHOT_VERSION = 1
+
+GENERATION_KEY = "auth:principal:generation"
+
+
+def build_principal(user) -> Dict[str, Any]:
+    """
+    Build the compact principal snapshot for a loaded User
+
+    The user must have roles -> permissions and employee loaded.
+    """
+    permissions = sorted({
+        perm.name
+        for role in user.roles
+        for perm in role.permissions
+    })
+    return {
+        "id": str(user.id),
+        "email": user.email,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "roles": [role.name for role in user.roles],
+        "permissions": permissions,
+        "employee_id": str(user.employee.id) if user.employee else None,
+        "country_code": user.country_code,
+        "is_superuser": user.is_superuser
+    }
+
+
+class PrincipalCache:
+    """
+    Two-tier cache of principal snapshots
+
+    - Local tier: per-process LRU with a short TTL, no network round trip
+    - Redis tier: shared between workers with a longer TTL
+
+    Redis keys embed a generation number. Changing a single user deletes
+    that user's entry; changing roles or permissions bumps the generation,
+    which orphans every cached principal at once.
+    """
+
+    def __init__(
+        self,
+        ttl: int = settings.PRINCIPAL_CACHE_TTL_SECONDS,
+        local_ttl: int = settings.PRINCIPAL_CACHE_LOCAL_TTL_SECONDS,
+        max_local_entries: int = 10000
+    ):
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self._local = LocalCache(max_local_entries, local_ttl)
+        self._generation = 0
+        self._generation_checked_at = 0.0
+
+    def _key(self, user_id: str, generation: int) -> str:
+        return f"auth:principal:{generation}:{user_id}"
+
+    async def _current_generation(self) -> int:
+        """Read the shared generation, re-checking Redis at most every local_ttl seconds"""
+        now = time.monotonic()
+        if now - self._generation_checked_at >= self.local_ttl:
+            shared = await cache.get(GENERATION_KEY, local=False)
+            if shared is not None and int(shared) != self._generation:
+                self._generation = int(shared)
+                self._local.clear()
+            self._generation_checked_at = now
+        return self._generation
+
+    async def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Return the cached principal for a user, or None on miss"""
+        user_id = str(user_id)
+        generation = await self._current_generation()
+
+        entry = self._local.get(user_id)
+        if entry:
+            entry_generation, principal = entry
+            if entry_generation == generation:
+                return principal
+            self._local.delete(user_id)
+
+        snapshot = await cache.get(self._key(user_id, generation), local=False)
+        if not snapshot or snapshot.get("v") != PRINCIPAL_SNAPSHOT_VERSION:
+            return None
+
+        principal = snapshot["principal"]
+        self._local.set(user_id, (generation, principal), self.local_ttl)
+        return principal
+
+    async def set(self, user_id: str, principal: Dict[str, Any]) -> None:
+        """Store a principal snapshot in both tiers"""
+        user_id = str(user_id)
+        generation = await self._current_generation()
+        self._local.set(user_id, (generation, principal), self.local_ttl)
+        await cache.set(
+            self._key(user_id, generation),
+            {"v": PRINCIPAL_SNAPSHOT_VERSION, "principal": principal},
+            self.ttl,
+            local=False
+        )
+
+    async def invalidate_user(self, user_id: str) -> None:
+        """Drop a single user's principal (profile, roles or status changed)"""
+        user_id = str(user_id)
+        self._local.delete(user_id)
+        await cache.delete(self._key(user_id, await self._current_generation()))
+
+    async def invalidate_all(self) -> None:
+        """Invalidate every principal (role or permission definitions changed)"""
+        generation = await cache.incr(GENERATION_KEY)
+        self._generation = generation if generation is not None else self._generation + 1
+        self._generation_checked_at = time.monotonic()
+        self._local.clear()
+        logger.info(f"Principal cache invalidated (generation {self._generation})")
+
+
+# Global principal cache instance
+principal_cache = PrincipalCache()
@@ -13,21 +13,33 @@ from core.config import settings
 from core.exceptions import UnauthorizedException
 
 
-def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
+    """
+    Hash a password using bcrypt (blocking; async code should use
+    core.password_hashing.password_hasher instead)
+    """
     password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds or settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
+    """Verify a password against its hash (blocking, see hash_password)"""
     password_bytes = plain_password.encode('utf-8')
     hashed_bytes = hashed_password.encode('utf-8')
     return bcrypt.checkpw(password_bytes, hashed_bytes)
 
 
+def password_needs_rehash(hashed_password: str, rounds: Optional[int] = None) -> bool:
+    """Whether a bcrypt hash ($2b$<cost>$...) was made with a different work factor"""
+    try:
+        cost = int(hashed_password.split('$')[2])
+    except (IndexError, ValueError):
+        return True
+    return cost != (rounds or settings.BCRYPT_ROUNDS)
+
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token
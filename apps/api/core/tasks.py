@@ -9,7 +9,6 @@ import logging
 
 from core.celery_app import celery_app
 from core.email import email_service
-from core.database import SessionLocal
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +16,7 @@ logger = logging.getLogger(__name__)
 @celery_app.task(name='core.tasks.send_email_task')
 def send_email_task(to_email: str, subject: str, body: str, html_body: str = None):
     """
-    Send email asynchronously
+    Queue an email in the outbox (delivered by the outbox dispatcher)
     
     Args:
         to_email: Recipient email address
@@ -25,25 +24,31 @@ def send_email_task(to_email: str, subject: str, body: str, html_body: str = Non
         body: Plain text body
         html_body: HTML body (optional)
     """
-    try:
-        logger.info(f"Sending email to {to_email}: {subject}")
-        email_service.send_email(
-            to_email=to_email,
-            subject=subject,
-            body=body,
-            html_body=html_body
-        )
-        logger.info(f"Email sent successfully to {to_email}")
-        return {"status": "success", "to": to_email}
-    except Exception as e:
-        logger.error(f"Failed to send email to {to_email}: {str(e)}")
-        raise
+    import asyncio
+    from core.database import task_session
+    
+    async def queue():
+        async with task_session() as session:
+            queued = await email_service.send_email(
+                to_email=to_email,
+                subject=subject,
+                html_body=html_body or body,
+                body=body,
+                db=session
+            )
+            await session.commit()
+            return queued
+    
+    logger.info(f"Queueing email to {to_email}: {subject}")
+    if not asyncio.run(queue()):
+        raise RuntimeError(f"Failed to queue email to {to_email}")
+    return {"status": "success", "to": to_email}
 
 
 @celery_app.task(name='core.tasks.send_bulk_email_task')
 def send_bulk_email_task(recipients: List[str], subject: str, body: str, html_body: str = None):
     """
-    Send bulk emails asynchronously
+    Queue the same email for many recipients in one transaction
     
     Args:
         recipients: List of recipient email addresses
@@ -51,21 +56,31 @@ def send_bulk_email_task(recipients: List[str], subject: str, body: str, html_bo
         body: Plain text body
         html_body: HTML body (optional)
     """
-    results = []
-    for email in recipients:
-        try:
-            email_service.send_email(
-                to_email=email,
-                subject=subject,
-                body=body,
-                html_body=html_body
-            )
-            results.append({"email": email, "status": "success"})
-        except Exception as e:
-            logger.error(f"Failed to send email to {email}: {str(e)}")
-            results.append({"email": email, "status": "failed", "error": str(e)})
+    import asyncio
+    from core.database import task_session
+    from core.email_outbox import enqueue_emails
+    
+    if not email_service.config.SEND_EMAILS:
+        logger.info(f"[DISABLED] Would send to {len(recipients)} recipients: {subject}")
+        return [{"email": email, "status": "success"} for email in recipients]
+    
+    messages = [
+        {"to_email": email, "subject": subject, "html_body": html_body or body, "text_body": body}
+        for email in recipients
+    ]
+    
+    async def queue():
+        async with task_session() as session:
+            await enqueue_emails(messages, session)
+            await session.commit()
+    
+    try:
+        asyncio.run(queue())
+    except Exception as e:
+        logger.error(f"Failed to queue bulk email: {str(e)}")
+        return [{"email": email, "status": "failed", "error": str(e)} for email in recipients]
     
-    return results
+    return [{"email": email, "status": "success"} for email in recipients]
 
 
 @celery_app.task(name='core.tasks.generate_pdf_report')
@@ -87,6 +102,27 @@ def generate_pdf_report(report_type: str, employee_id: str, **kwargs):
         raise
 
 
+@celery_app.task(name='core.tasks.render_pdf_task')
+def render_pdf_task(renderer: str, args: list, kwargs: dict = None):
+    """
+    Render a PDF for the web tier's render service
+    
+    Args:
+        renderer: Renderer reference, e.g. core.pdf_generator:create_timesheet_pdf
+        args: Positional arguments for the renderer, as encode_render_args made them
+        kwargs: Keyword arguments for the renderer, likewise
+    
+    Returns the PDF as base64 so it survives the JSON result backend.
+    """
+    import base64
+    from core.pdf_render import resolve_renderer, render_to_bytes, decode_render_args
+    
+    pdf_bytes = render_to_bytes(
+        resolve_renderer(renderer), tuple(decode_render_args(args)), decode_render_args(kwargs or {})
+    )
+    return base64.b64encode(pdf_bytes).decode("ascii")
+
+
 @celery_app.task(name='core.tasks.send_timesheet_reminders')
 def send_timesheet_reminders():
     """
@@ -109,48 +145,128 @@ def check_contract_expirations():
     """
     try:
         logger.info("Checking contract expirations")
-        
-        db = SessionLocal()
-        try:
-            # TODO: Query contracts expiring in 30, 60, 90 days
-            # TODO: Send notifications to HR
-            return {"status": "success", "contracts_checked": 0}
-        finally:
-            db.close()
+        # TODO: Query contracts expiring in 30, 60, 90 days (see core.database.task_session)
+        # TODO: Send notifications to HR
+        return {"status": "success", "contracts_checked": 0}
     except Exception as e:
         logger.error(f"Failed to check contract expirations: {str(e)}")
         raise
 
 
-@celery_app.task(name='core.tasks.update_leave_balances')
-def update_leave_balances():
+@celery_app.task(bind=True, name='core.tasks.update_leave_balances')
+def update_leave_balances(self, on: str = None, catch_up: bool = False):
     """
-    Update leave balances for all employees (runs monthly)
+    Accrue leave for the current period, and carry over last year's
+    unused days in January (runs monthly)
+    
+    Args:
+        on: Date (YYYY-MM-DD) whose accrual period to run; today by default
+        catch_up: Also accrue the earlier periods of the year
+    
+    Progress is published as task state PROGRESS.
     """
+    import asyncio
+    from datetime import date
+    from core.database import task_session
+    from modules.leave.services import LeaveAccrualService
+    
+    def report(progress):
+        self.update_state(state='PROGRESS', meta=progress)
+    
+    async def accrue():
+        async with task_session() as session:
+            service = LeaveAccrualService(session, progress=report)
+            return await service.run(on=date.fromisoformat(on) if on else None, catch_up=catch_up)
+    
     try:
         logger.info("Updating leave balances")
-        
-        db = SessionLocal()
-        try:
-            # TODO: Calculate and update leave accruals
-            # TODO: Reset annual leave if configured
-            return {"status": "success", "balances_updated": 0}
-        finally:
-            db.close()
+        stats = asyncio.run(accrue())
+        return {"status": "success", **stats}
     except Exception as e:
         logger.error(f"Failed to update leave balances: {str(e)}")
         raise
 
 
+@celery_app.task(bind=True, name='core.tasks.launch_review_campaign')
+def launch_review_campaign(self, campaign: dict, initiator_id: str = None):
+    """
+    Launch a 360-degree review campaign in the background
+    
+    Args:
+        campaign: ReviewCampaignCreate payload
+        initiator_id: Employee ID recorded as creator of the cycles
+    
+    Progress is published as task state PROGRESS.
+    """
+    import asyncio
+    import uuid
+    from core.database import task_session
+    from modules.performance.schemas import ReviewCampaignCreate
+    from modules.performance.services import ReviewCampaignService
+    
+    def report(progress):
+        self.update_state(state='PROGRESS', meta=progress)
+    
+    async def launch():
+        async with task_session() as session:
+            service = ReviewCampaignService(session, progress=report)
+            return await service.launch(
+                ReviewCampaignCreate(**campaign),
+                initiator_id=uuid.UUID(initiator_id) if initiator_id else None
+            )
+    
+    try:
+        result = asyncio.run(launch())
+        return {"status": "success", **result.model_dump(mode="json")}
+    except Exception as e:
+        logger.error(f"Failed to launch review campaign: {str(e)}")
+        raise
+
+
+@celery_app.task(name='core.tasks.recompute_leave_balances')
+def recompute_leave_balances():
+    """
+    Rebuild leave balance snapshots from the leave ledger (runs weekly)
+    """
+    import asyncio
+    from core.database import task_session
+    from modules.leave.services import LeaveService
+    
+    async def recompute():
+        async with task_session() as session:
+            return await LeaveService(session).recompute_balances()
+    
+    try:
+        logger.info("Recomputing leave balances from the ledger")
+        stats = asyncio.run(recompute())
+        if stats["corrected"]:
+            logger.warning(f"Corrected {stats['corrected']} drifted leave balances")
+        return {"status": "success", **stats}
+    except Exception as e:
+        logger.error(f"Failed to recompute leave balances: {str(e)}")
+        raise
+
+
 @celery_app.task(name='core.tasks.aggregate_analytics')
-def aggregate_analytics():
+def aggregate_analytics(full: bool = False):
     """
-    Aggregate analytics data for dashboards (runs hourly)
+    Refresh the analytics rollup tables (hourly, with a full rebuild nightly)
+    
+    Args:
+        full: Rebuild every month and year instead of only the changed ones
     """
+    import asyncio
+    from core.database import task_session
+    from modules.analytics.services import AnalyticsRollupService
+    
+    async def refresh():
+        async with task_session() as session:
+            return await AnalyticsRollupService(session).refresh(full=full)
+    
     try:
         logger.info("Aggregating analytics data")
-        # TODO: Calculate headcount, turnover, etc.
-        return {"status": "success"}
+        stats = asyncio.run(refresh())
+        return {"status": "success", **stats}
     except Exception as e:
         logger.error(f"Failed to aggregate analytics: {str(e)}")
         raise
@@ -0,0 +1,119 @@
+"""
+User Manual Document Cache
+Pre-renders the user manual PDF once per content version and keeps it on disk
+"""
+
+from typing import Optional, Tuple
+import asyncio
+import glob
+import hashlib
+import logging
+import os
+import tempfile
+
+from core.config import settings
+from core import pdf_generator
+from core.pdf_render import render_service
+
+logger = logging.getLogger(__name__)
+
+FILE_PREFIX = "user-manual-"
+
+
+def _source_files() -> list:
+    """Everything the rendered manual depends on"""
+    files = [pdf_generator.__file__]
+    manual_path = pdf_generator.user_manual_source_path()
+    if manual_path:
+        files.append(manual_path)
+    for filename in pdf_generator.LOGO_FILES:
+        logo_path = os.path.join(pdf_generator.STATIC_DIR, filename)
+        if os.path.exists(logo_path):
+            files.append(logo_path)
+    return files
+
+
+class UserManualCache:
+    """
+    Content-addressed store for the rendered user manual
+
+    The file name embeds a SHA-256 of the markdown source, the logos and
+    the renderer module, so a deploy that changes any of them renders a
+    new file and the old one is removed. The hash itself is recomputed
+    only when a source file's size or mtime changes.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or settings.GENERATED_DOCUMENTS_DIR or os.path.join(
+            tempfile.gettempdir(), "inara-hris-documents"
+        )
+        self._signature = None
+        self._content_hash: Optional[str] = None
+        self._lock = asyncio.Lock()
+
+    def content_hash(self) -> str:
+        """SHA-256 over the manual's inputs, memoised on their stat signature"""
+        files = _source_files()
+        signature = tuple(
+            (path, stat.st_size, stat.st_mtime_ns)
+            for path, stat in ((path, os.stat(path)) for path in files)
+        )
+        if signature != self._signature:
+            digest = hashlib.sha256()
+            for path in files:
+                digest.update(os.path.basename(path).encode())
+                with open(path, "rb") as f:
+                    for block in iter(lambda: f.read(1024 * 1024), b""):
+                        digest.update(block)
+            self._content_hash = digest.hexdigest()
+            self._signature = signature
+        return self._content_hash
+
+    def path_for(self, content_hash: str) -> str:
+        return os.path.join(self.directory, f"{FILE_PREFIX}{content_hash[:32]}.pdf")
+
+    async def get(self) -> Tuple[str, str]:
+        """
+        Return (file path, ETag) for the current manual, rendering it if needed
+
+        Concurrent first requests share one render.
+        """
+        content_hash = self.content_hash()
+        path = self.path_for(content_hash)
+        etag = f'"{content_hash[:32]}"'
+        if os.path.exists(path):
+            return path, etag
+
+        async with self._lock:
+            if not os.path.exists(path):
+                pdf_bytes = await render_service.render_bytes(pdf_generator.create_user_manual_pdf)
+                await asyncio.to_thread(self._write, path, pdf_bytes)
+                logger.info(f"Rendered user manual {os.path.basename(path)} ({len(pdf_bytes)} bytes)")
+        return path, etag
+
+    def _write(self, path: str, pdf_bytes: bytes) -> None:
+        """Write atomically and drop manuals rendered from older sources"""
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(pdf_bytes)
+        os.replace(tmp_path, path)
+
+        for stale in glob.glob(os.path.join(self.directory, f"{FILE_PREFIX}*.pdf")):
+            if stale != path:
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+
+
+# Global user manual cache instance
+user_manual_cache = UserManualCache()
+
+
+async def warm_user_manual() -> None:
+    """Render the manual ahead of the first download (non-critical)"""
+    try:
+        await user_manual_cache.get()
+    except Exception as e:
+        logger.warning(f"User manual pre-render failed, will render on first request: {e}")
@@ -0,0 +1,269 @@
+"""
+Working-day Calendar
+Weekends and public holidays per country, precomputed into per-year bitsets
+
+Each country's CountryConfig defines its weekend days and public holidays.
+A WorkCalendar turns them into one integer bitset per year (bit i set when
+day i of the year is a working day) plus a running count of working days,
+so "is this a working day" is a shift and "how many working days between
+two dates" is two array lookups per calendar year spanned. Leave requests,
+timesheets and payroll pro-rating all count days through this module.
+"""
+
+from array import array
+from datetime import date, timedelta
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+import calendar
+import json
+import logging
+import re
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import LocalCache
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Python weekday numbers: Monday = 0 ... Sunday = 6
+DEFAULT_WEEKEND_DAYS: FrozenSet[int] = frozenset({5, 6})
+
+_FIXED_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_RECURRING_DATE = re.compile(r"^\d{2}-\d{2}$")
+
+
+def parse_weekend_days(value: Optional[str], working_days_per_week: Optional[int] = None) -> FrozenSet[int]:
+    """
+    Parse CountryConfig.weekend_days ("4" or "4,5", Monday = 0)
+
+    Without an explicit value the weekend is the last 7 - working_days_per_week
+    days of the week (Saturday and Sunday for a five-day week).
+    """
+    if value is not None and value.strip():
+        days = set()
+        for part in value.split(","):
+            day = int(part.strip())
+            if not 0 <= day <= 6:
+                raise ValueError(f"Weekend day {day} is not a weekday number (Monday = 0 ... Sunday = 6)")
+            days.add(day)
+        if len(days) == 7:
+            raise ValueError("A week needs at least one working day")
+        return frozenset(days)
+    if working_days_per_week is None:
+        return DEFAULT_WEEKEND_DAYS
+    working = min(max(int(working_days_per_week), 1), 7)
+    return frozenset(range(working, 7))
+
+
+def parse_public_holidays(value: Optional[str], strict: bool = False) -> Tuple[FrozenSet[date], FrozenSet[Tuple[int, int]]]:
+    """
+    Parse CountryConfig.public_holidays into (fixed dates, recurring (month, day))
+
+    Accepts a JSON list of "YYYY-MM-DD" / "MM-DD" strings or of objects with
+    a "date" key, or the same strings separated by commas, semicolons or
+    newlines. "MM-DD" entries recur every year. Unparseable entries raise
+    ValueError when strict, otherwise they are logged and skipped.
+    """
+    if value is None or not value.strip():
+        return frozenset(), frozenset()
+
+    try:
+        parsed = json.loads(value)
+    except ValueError:
+        parsed = None
+    if isinstance(parsed, list):
+        entries = [item.get("date") if isinstance(item, dict) else item for item in parsed]
+    else:
+        entries = re.split(r"[,;\n]", value)
+
+    fixed, recurring = set(), set()
+    for entry in entries:
+        text = str(entry or "").strip()
+        if not text:
+            continue
+        try:
+            if _FIXED_DATE.match(text):
+                fixed.add(date.fromisoformat(text))
+                continue
+            if _RECURRING_DATE.match(text):
+                month, day = int(text[:2]), int(text[3:])
+                date(2000, month, day)  # leap year, so 02-29 is accepted
+                recurring.add((month, day))
+                continue
+            raise ValueError(f"Unrecognised public holiday '{text}' (expected YYYY-MM-DD or MM-DD)")
+        except ValueError as e:
+            if strict:
+                raise ValueError(str(e)) from None
+            logger.warning(f"Skipping public holiday entry: {e}")
+    return frozenset(fixed), frozenset(recurring)
+
+
+class WorkCalendar:
+    """
+    Working days of one country
+
+    Year tables are built lazily on first use and kept for the life of the
+    calendar; a calendar is immutable, so reloading the country config means
+    building a new one.
+    """
+
+    def __init__(
+        self,
+        country_code: Optional[str] = None,
+        weekend_days: Iterable[int] = DEFAULT_WEEKEND_DAYS,
+        holidays: Iterable[date] = (),
+        recurring_holidays: Iterable[Tuple[int, int]] = ()
+    ):
+        self.country_code = country_code
+        self.weekend_days = frozenset(weekend_days)
+        self.holidays = frozenset(holidays)
+        self.recurring_holidays = frozenset(recurring_holidays)
+        self._years: Dict[int, Tuple[int, array]] = {}
+
+    @classmethod
+    def from_config(cls, config) -> "WorkCalendar":
+        """Build the calendar of a CountryConfig row"""
+        holidays, recurring = parse_public_holidays(config.public_holidays)
+        return cls(
+            country_code=config.country_code,
+            weekend_days=parse_weekend_days(config.weekend_days, config.working_days_per_week),
+            holidays=holidays,
+            recurring_holidays=recurring
+        )
+
+    def _year(self, year: int) -> Tuple[int, array]:
+        """(working-day bitset, running count) of a year; counts[i] = working days before day i"""
+        table = self._years.get(year)
+        if table is not None:
+            return table
+
+        first_weekday = date(year, 1, 1).weekday()
+        length = 366 if calendar.isleap(year) else 365
+        # One week's pattern starting on Jan 1, repeated across the year
+        week = sum(1 << i for i in range(7) if (first_weekday + i) % 7 not in self.weekend_days)
+        mask = 0
+        for offset in range(0, length, 7):
+            mask |= week << offset
+        mask &= (1 << length) - 1
+
+        jan_first = date(year, 1, 1).toordinal()
+        closed = [day for day in self.holidays if day.year == year]
+        for month, day in self.recurring_holidays:
+            if month == 2 and day == 29 and length == 365:
+                continue
+            closed.append(date(year, month, day))
+        for day in closed:
+            mask &= ~(1 << (day.toordinal() - jan_first))
+
+        counts = array("H", [0]) * (length + 1)
+        running = 0
+        for i in range(length):
+            running += (mask >> i) & 1
+            counts[i + 1] = running
+
+        table = (mask, counts)
+        self._years[year] = table
+        return table
+
+    def year_mask(self, year: int) -> int:
+        """Working-day bitset of a year (bit i = day i, Jan 1 = bit 0)"""
+        return self._year(year)[0]
+
+    def is_working_day(self, day: date) -> bool:
+        mask, _ = self._year(day.year)
+        return bool((mask >> (day.timetuple().tm_yday - 1)) & 1)
+
+    def working_days(self, start: date, end: date) -> int:
+        """Working days from start to end, both inclusive (0 when end < start)"""
+        if end < start:
+            return 0
+        total = 0
+        for year in range(start.year, end.year + 1):
+            _, counts = self._year(year)
+            first = start.timetuple().tm_yday - 1 if year == start.year else 0
+            last = end.timetuple().tm_yday if year == end.year else len(counts) - 1
+            total += counts[last] - counts[first]
+        return total
+
+    def overlap_working_days(self, start: date, end: date, other_start: date, other_end: date) -> int:
+        """Working days shared by two inclusive date ranges"""
+        return self.working_days(max(start, other_start), min(end, other_end))
+
+    def working_days_in_month(self, year: int, month: int) -> int:
+        return self.working_days(date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1]))
+
+    def non_working_days(self, start: date, end: date) -> List[date]:
+        """Weekend days and holidays from start to end, both inclusive"""
+        days = []
+        day = start
+        while day <= end:
+            mask, _ = self._year(day.year)
+            jan_first = date(day.year, 1, 1)
+            year_end = min(end, date(day.year, 12, 31))
+            for offset in range((day - jan_first).days, (year_end - jan_first).days + 1):
+                if not (mask >> offset) & 1:
+                    days.append(jan_first + timedelta(days=offset))
+            day = year_end + timedelta(days=1)
+        return days
+
+
+# Built calendars per country, shared by every request in the worker. Admin
+# writes invalidate the local entry; other workers pick changes up after the TTL.
+_calendars = LocalCache(max_entries=500, ttl=settings.WORK_CALENDAR_CACHE_TTL_SECONDS)
+
+
+def _cache_key(country_code: Optional[str]) -> str:
+    return f"work_calendar:{country_code or ''}"
+
+
+async def get_work_calendars(db: AsyncSession, country_codes: Iterable[Optional[str]]) -> Dict[Optional[str], WorkCalendar]:
+    """
+    Calendars for several countries, loading the missing ones in one query
+
+    Countries without a config (or None) get the default Saturday/Sunday
+    calendar with no holidays.
+    """
+    from modules.admin.models import CountryConfig
+
+    calendars: Dict[Optional[str], WorkCalendar] = {}
+    missing = set()
+    for code in set(country_codes):
+        cached = _calendars.get(_cache_key(code))
+        if cached is not None:
+            calendars[code] = cached
+        else:
+            missing.add(code)
+    if not missing:
+        return calendars
+
+    configs = {}
+    codes = [code for code in missing if code]
+    if codes:
+        result = await db.execute(
+            select(CountryConfig).where(
+                CountryConfig.country_code.in_(codes),
+                CountryConfig.is_deleted == False
+            )
+        )
+        configs = {config.country_code: config for config in result.scalars().all()}
+
+    for code in missing:
+        config = configs.get(code)
+        work_calendar = WorkCalendar.from_config(config) if config else WorkCalendar(code)
+        _calendars.set(_cache_key(code), work_calendar, settings.WORK_CALENDAR_CACHE_TTL_SECONDS)
+        calendars[code] = work_calendar
+    return calendars
+
+
+async def get_work_calendar(db: AsyncSession, country_code: Optional[str]) -> WorkCalendar:
+    """Calendar of one country (see get_work_calendars)"""
+    return (await get_work_calendars(db, [country_code]))[country_code]
+
+
+def invalidate_work_calendar(country_code: Optional[str] = None):
+    """Drop a country's cached calendar in this worker, or every calendar when no code is given"""
+    if country_code is None:
+        _calendars.clear()
+    else:
+        _calendars.delete(_cache_key(country_code))
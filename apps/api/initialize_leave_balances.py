@@ -9,13 +9,13 @@ from datetime import datetime
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import select, and_
-from decimal import Decimal
 
 # Ensure we're in the correct directory
 sys.path.insert(0, os.path.dirname(__file__))
 
 from modules.employees.models import Employee
-from modules.leave.models import LeavePolicy, LeaveBalance
+from modules.leave.models import LeavePolicy
+from modules.leave.services import LeaveAccrualService
 
 
 async def initialize_balances():
@@ -45,9 +45,6 @@ async def initialize_balances():
     
     async with async_session() as session:
         try:
-            # Get current year
-            current_year = str(datetime.now().year)
-            
             # Get all active employees
             employees_result = await session.execute(
                 select(Employee).where(
@@ -79,65 +76,17 @@ async def initialize_balances():
             for policy in policies:
                 print(f"   - {policy.name}: {policy.leave_type} ({policy.days_per_year} days/year)")
             
-            created_count = 0
-            updated_count = 0
-            skipped_count = 0
-            
-            # For each employee
-            for emp in employees:
-                emp_name = f"{emp.first_name} {emp.last_name}"
-                print(f"\n👤 Processing {emp_name} ({emp.employee_number})...")
-                
-                # For each policy, create or update balance
-                for policy in policies:
-                    # Check if balance already exists
-                    existing_balance_result = await session.execute(
-                        select(LeaveBalance).where(
-                            and_(
-                                LeaveBalance.employee_id == emp.id,
-                                LeaveBalance.leave_type == policy.leave_type,
-                                LeaveBalance.year == current_year,
-                                LeaveBalance.is_deleted == False
-                            )
-                        )
-                    )
-                    existing_balance = existing_balance_result.scalar_one_or_none()
-                    
-                    if existing_balance:
-                        # Update if days changed
-                        if existing_balance.total_days != policy.days_per_year:
-                            old_total = existing_balance.total_days
-                            existing_balance.total_days = policy.days_per_year
-                            existing_balance.available_days = policy.days_per_year - existing_balance.used_days - existing_balance.pending_days
-                            print(f"   ✏️  Updated {policy.leave_type}: {old_total} → {policy.days_per_year} days")
-                            updated_count += 1
-                        else:
-                            print(f"   ⏭️  Skipped {policy.leave_type} (already exists)")
-                            skipped_count += 1
-                    else:
-                        # Create new balance
-                        balance = LeaveBalance(
-                            employee_id=emp.id,
-                            leave_type=policy.leave_type,
-                            year=current_year,
-                            total_days=policy.days_per_year,
-                            used_days=Decimal("0"),
-                            pending_days=Decimal("0"),
-                            available_days=policy.days_per_year,
-                            country_code=emp.country_code
-                        )
-                        session.add(balance)
-                        print(f"   ✅ Created {policy.leave_type}: {policy.days_per_year} days")
-                        created_count += 1
+            # Accrue every period of the year so far (already accrued periods are skipped)
+            def report(progress):
+                print(f"   {progress['stage']} {progress['leave_type']} {progress['period']}: "
+                      f"{progress['processed']} employees, {progress['posted']} credited")
             
-            # Commit all changes
-            await session.commit()
+            stats = await LeaveAccrualService(session, progress=report).run(catch_up=True)
             
             print(f"\n{'='*60}")
             print(f"✅ Initialization complete!")
-            print(f"   Created: {created_count} balances")
-            print(f"   Updated: {updated_count} balances")
-            print(f"   Skipped: {skipped_count} balances")
+            print(f"   Accrued: {stats['accrued']} balances over {stats['periods']} policy periods")
+            print(f"   Carried over: {stats['carried_over']} balances")
             print(f"{'='*60}")
             
         except Exception as e:
@@ -437,6 +437,17 @@ async def lifespan(app: FastAPI):
         logger.warning(f"⚠️  Redis initialization failed (non-critical): {redis_error}")
         logger.warning("⚠️  Application will continue without Redis caching")
     
+    # Pre-render the user manual in the background (non-blocking)
+    import asyncio
+    from core.user_manual import warm_user_manual
+    manual_warmup = asyncio.create_task(warm_user_manual())
+    
+    # Deliver queued email in the background
+    from core.email_outbox import email_dispatcher
+    if settings.EMAIL_OUTBOX_DISPATCHER_ENABLED:
+        email_dispatcher.start()
+        logger.info("📧 Email outbox dispatcher started")
+    
     # Start database monitoring (non-blocking)
     try:
         db_monitor.start_monitoring()
@@ -455,9 +466,21 @@ async def lifespan(app: FastAPI):
     # Stop monitoring
     db_monitor.stop_monitoring()
     
+    # Stop email delivery (queued mail stays in the outbox)
+    await email_dispatcher.stop()
+    
     # Close cache connection
     await close_redis()
     
+    # Stop PDF render workers
+    from core.pdf_render import render_service
+    manual_warmup.cancel()
+    render_service.shutdown()
+    
+    # Stop password hashing threads
+    from core.password_hashing import password_hasher
+    password_hasher.shutdown()
+    
     # Close database connections
     await close_db()
     logger.info("✅ Cleanup completed")
@@ -17,7 +17,8 @@ class CountryConfig(BaseModel, TenantMixin, Base):
     timezone = Column(String(50), nullable=False)
     working_hours_per_week = Column(Numeric(5, 2), nullable=False, default=40)
     working_days_per_week = Column(Integer, nullable=False, default=5)
-    public_holidays = Column(Text, nullable=True)
+    weekend_days = Column(String(20), nullable=True)  # Comma-separated weekday numbers, Monday = 0 (e.g. "4" for Friday)
+    public_holidays = Column(Text, nullable=True)  # JSON list or comma-separated YYYY-MM-DD / recurring MM-DD dates
     is_active = Column(Boolean, default=True)
 
 class SalaryBand(BaseModel, TenantMixin, Base):
@@ -3,10 +3,10 @@ Admin Routes
 Administrative functions and system management
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, HTMLResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, text
+from sqlalchemy import insert, select, text
 from io import BytesIO
 import os
 import re
@@ -15,7 +15,8 @@ from datetime import datetime, date
 
 from core.database import get_db
 from core.dependencies import get_current_user, require_admin
-from core.pdf_generator import create_user_manual_pdf
+from core.principal_cache import principal_cache
+from core.user_manual import user_manual_cache
 from modules.auth.models import User, Role
 from modules.admin.models import CountryConfig
 from modules.admin.schemas import (
@@ -24,17 +25,38 @@ from modules.admin.schemas import (
     CountryConfigResponse
 )
 from modules.admin.repositories import CountryConfigRepository
+from modules.employees.hierarchy import OrgHierarchy
+from modules.employees.models import Employee, EmploymentStatus, EmploymentType
+from modules.employees.search import employee_search_index
+from core.work_calendar import invalidate_work_calendar, parse_public_holidays
 
 router = APIRouter(tags=["admin"])
 
 
 @router.get("/user-manual")
 async def get_user_manual(
+    request: Request,
+    format: str = Query("html", pattern="^(html|pdf)$"),
     current_user: dict = Depends(get_current_user)
 ):
     """
-    Get the user manual in HTML format
+    Get the user manual in HTML format, or as a PDF with format=pdf
+    
+    The PDF is pre-rendered per content version and revalidated with ETag.
     """
+    if format == "pdf":
+        path, etag = await user_manual_cache.get()
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+        return FileResponse(
+            path,
+            media_type="application/pdf",
+            filename="INARA_HR_User_Manual.pdf",
+            headers=headers
+        )
+    
     # Calculate path to USER_MANUAL.md
     # The file is in the API directory (apps/api/USER_MANUAL.md)
     # In Docker: /app/USER_MANUAL.md
@@ -263,6 +285,7 @@ async def fix_my_roles(
         
         if roles_added:
             await db.commit()
+            await principal_cache.invalidate_user(user.id)
             await db.refresh(user, ["roles"])
             
             return {
@@ -314,18 +337,16 @@ async def sync_users_to_employees(
 
         # Find all users without an employee record
         result = await db.execute(
-            text("""
-                SELECT u.id, u.email, u.first_name, u.last_name, u.country_code, u.created_at
-                FROM users u
-                LEFT JOIN employees e ON u.id = e.user_id
-                WHERE e.id IS NULL
-                  AND u.is_deleted = false
-                  AND u.email NOT IN :skip_emails
-                ORDER BY u.created_at
-            """),
-            {"skip_emails": tuple(SKIP_EMAILS)}
+            select(User.id, User.email, User.first_name, User.last_name, User.country_code, User.created_at)
+            .outerjoin(Employee, Employee.user_id == User.id)
+            .where(
+                Employee.id.is_(None),
+                User.is_deleted == False,
+                User.email.not_in(SKIP_EMAILS)
+            )
+            .order_by(User.created_at)
         )
-        users = result.fetchall()
+        users = result.all()
 
         created = []
         failed = []
@@ -333,43 +354,41 @@ async def sync_users_to_employees(
         for user_id, email, first_name, last_name, country_code, created_at in users:
             max_num += 1
             emp_number = f"EMP-{max_num:03d}"
-            emp_id = str(uuid.uuid4())
+            emp_id = uuid.uuid4()
             now = datetime.utcnow()
             hire_date = created_at.date() if created_at else date.today()
 
             try:
                 await db.execute(
-                    text("""
-                        INSERT INTO employees (
-                            id, user_id, employee_number, first_name, last_name,
-                            work_email, status, employment_type, hire_date,
-                            country_code, created_at, updated_at, is_deleted
-                        ) VALUES (
-                            :id, :user_id, :employee_number, :first_name, :last_name,
-                            :work_email, 'ACTIVE', 'FULL_TIME', :hire_date,
-                            :country_code, :created_at, :updated_at, false
-                        )
-                    """),
-                    {
-                        "id": emp_id,
-                        "user_id": str(user_id),
-                        "employee_number": emp_number,
-                        "first_name": first_name,
-                        "last_name": last_name,
-                        "work_email": email,
-                        "hire_date": hire_date,
-                        "country_code": country_code if country_code else "LB",
-                        "created_at": now,
-                        "updated_at": now,
-                    }
+                    insert(Employee).values(
+                        id=emp_id,
+                        user_id=user_id,
+                        employee_number=emp_number,
+                        first_name=first_name,
+                        last_name=last_name,
+                        work_email=email,
+                        status=EmploymentStatus.ACTIVE,
+                        employment_type=EmploymentType.FULL_TIME,
+                        hire_date=hire_date,
+                        country_code=country_code if country_code else "LB",
+                        created_at=now,
+                        updated_at=now,
+                        is_deleted=False,
+                    )
                 )
+                # Index the new employee in the reporting hierarchy in the same transaction
+                await OrgHierarchy(db).add_employee(emp_id)
                 await db.commit()
+                await principal_cache.invalidate_user(user_id)
                 created.append({"employee_number": emp_number, "email": email, "name": f"{first_name} {last_name}"})
             except Exception as e:
                 await db.rollback()
                 max_num -= 1
                 failed.append({"email": email, "error": str(e)[:200]})
 
+        if created:
+            employee_search_index.invalidate()
+
         return {
             "success": True,
             "created": len(created),
@@ -452,6 +471,7 @@ async def create_country(
         config = await repo.create(data.model_dump())
         await db.commit()
         await db.refresh(config)
+        invalidate_work_calendar(config.country_code)
         
         return config
     except HTTPException:
@@ -479,10 +499,22 @@ async def update_country(
         if not config:
             raise HTTPException(status_code=404, detail="Country configuration not found")
         
+        update_data = data.model_dump(exclude_unset=True)
+        
+        # The edit dialog resends the stored holidays, which may be legacy free
+        # text; only a changed value has to be in the date format
+        public_holidays = update_data.get("public_holidays")
+        if public_holidays is not None and public_holidays != config.public_holidays:
+            try:
+                parse_public_holidays(public_holidays, strict=True)
+            except ValueError as e:
+                raise HTTPException(status_code=422, detail=str(e))
+        
         # Update the config
-        updated_config = await repo.update(config, data.model_dump(exclude_unset=True))
+        updated_config = await repo.update(config, update_data)
         await db.commit()
         await db.refresh(updated_config)
+        invalidate_work_calendar(updated_config.country_code)
         
         return updated_config
     except HTTPException:
@@ -511,6 +543,7 @@ async def delete_country(
         
         await repo.delete(config)
         await db.commit()
+        invalidate_work_calendar(config.country_code)
         
         return None
     except HTTPException:
@@ -3,11 +3,25 @@ Admin Module - Pydantic Schemas
 Request/response validation schemas for admin operations
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional
 from datetime import datetime
 import uuid
 
+from core.work_calendar import parse_public_holidays, parse_weekend_days
+
+
+def _check_weekend_days(v):
+    if v is not None:
+        parse_weekend_days(v)
+    return v
+
+
+def _check_public_holidays(v):
+    if v is not None:
+        parse_public_holidays(v, strict=True)
+    return v
+
 
 class CountryConfigBase(BaseModel):
     """Base country config schema"""
@@ -17,12 +31,16 @@ class CountryConfigBase(BaseModel):
     timezone: str = Field(..., min_length=1, max_length=50)
     working_hours_per_week: float = Field(..., ge=0, le=168)
     working_days_per_week: int = Field(..., ge=1, le=7)
-    public_holidays: Optional[str] = None
+    weekend_days: Optional[str] = Field(None, max_length=20, description="Comma-separated weekday numbers, Monday = 0")
+    public_holidays: Optional[str] = Field(None, description="JSON list or comma-separated YYYY-MM-DD / recurring MM-DD dates")
 
 
 class CountryConfigCreate(CountryConfigBase):
     """Country config creation schema"""
     is_active: bool = True
+    
+    _validate_weekend_days = field_validator('weekend_days')(_check_weekend_days)
+    _validate_public_holidays = field_validator('public_holidays')(_check_public_holidays)
 
 
 class CountryConfigUpdate(BaseModel):
@@ -31,8 +49,11 @@ class CountryConfigUpdate(BaseModel):
     timezone: Optional[str] = Field(None, min_length=1, max_length=50)
     working_hours_per_week: Optional[float] = Field(None, ge=0, le=168)
     working_days_per_week: Optional[int] = Field(None, ge=1, le=7)
-    public_holidays: Optional[str] = None
+    weekend_days: Optional[str] = Field(None, max_length=20)
+    public_holidays: Optional[str] = None  # checked by the route, only when it changes
     is_active: Optional[bool] = None
+    
+    _validate_weekend_days = field_validator('weekend_days')(_check_weekend_days)
 
 
 class CountryConfigResponse(CountryConfigBase):
@@ -0,0 +1,80 @@
+"""
+Analytics - Models
+Rollup tables behind the HR analytics endpoints
+"""
+
+from sqlalchemy import Column, String, Text, Date, DateTime, Integer, Numeric
+from sqlalchemy.dialects.postgresql import UUID
+
+from core.database import Base
+from core.models import UUIDMixin
+
+
+class HeadcountDailyRollup(UUIDMixin, Base):
+    """
+    Employees per (department, country, employment type, status) on a day
+
+    One snapshot is written per day; earlier days are never rewritten, so the
+    table doubles as headcount history.
+    """
+    __tablename__ = "analytics_headcount_daily"
+
+    snapshot_date = Column(Date, nullable=False, index=True)
+    department_id = Column(UUID(as_uuid=True), nullable=True)
+    country_code = Column(String(2), nullable=True)
+    employment_type = Column(String(50), nullable=True)
+    status = Column(String(50), nullable=False)
+    headcount = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<HeadcountDailyRollup {self.snapshot_date} - {self.headcount}>"
+
+
+class WorkforceMonthlyRollup(UUIDMixin, Base):
+    """Opening headcount, hires and terminations per month and group"""
+    __tablename__ = "analytics_workforce_monthly"
+
+    period_start = Column(Date, nullable=False, index=True)  # first day of the month
+    department_id = Column(UUID(as_uuid=True), nullable=True)
+    country_code = Column(String(2), nullable=True)
+    employment_type = Column(String(50), nullable=True)
+    opening_headcount = Column(Integer, default=0, nullable=False)
+    hires = Column(Integer, default=0, nullable=False)
+    terminations = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<WorkforceMonthlyRollup {self.period_start} +{self.hires} -{self.terminations}>"
+
+
+class LeaveUsageRollup(UUIDMixin, Base):
+    """Leave days allocated and used per leave type and year"""
+    __tablename__ = "analytics_leave_usage"
+
+    year = Column(String(10), nullable=False, index=True)
+    leave_type = Column(String(50), nullable=False)
+    employees = Column(Integer, default=0, nullable=False)
+    total_days = Column(Numeric(10, 2), default=0, nullable=False)
+    used_days = Column(Numeric(10, 2), default=0, nullable=False)
+    pending_days = Column(Numeric(10, 2), default=0, nullable=False)
+    available_days = Column(Numeric(10, 2), default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<LeaveUsageRollup {self.year} {self.leave_type}>"
+
+
+class AnalyticsRefreshState(Base):
+    """
+    Freshness and incremental watermark of each rollup
+
+    watermark is the newest source updated_at already folded into the rollup;
+    the next refresh only revisits periods touched by rows changed after it.
+    """
+    __tablename__ = "analytics_refresh_state"
+
+    rollup = Column(String(50), primary_key=True)  # headcount_daily, workforce_monthly, leave_usage, dashboard
+    refreshed_at = Column(DateTime, nullable=False)
+    watermark = Column(DateTime, nullable=True)
+    payload = Column(Text, nullable=True)  # JSON string
+
+    def __repr__(self):
+        return f"<AnalyticsRefreshState {self.rollup} @ {self.refreshed_at}>"
@@ -0,0 +1,376 @@
+"""
+Analytics - Repository Layer
+Rollup maintenance and reads
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, delete, and_, or_, func, case, literal, union_all, cast, Date, String
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from datetime import date, datetime
+
+from modules.analytics.models import (
+    HeadcountDailyRollup, WorkforceMonthlyRollup, LeaveUsageRollup, AnalyticsRefreshState
+)
+from modules.employees.models import Employee, Department
+from modules.leave.models import LeaveBalance
+
+
+# Period that events before the requested range are folded into, so the
+# running headcount starts from the right opening value
+OPENING_PERIOD = date(1900, 1, 1)
+
+# pg_advisory_xact_lock key serializing rollup refreshes
+REFRESH_LOCK_KEY = 727001
+
+
+def _enum_value(value) -> Optional[str]:
+    return value.value if hasattr(value, "value") else value
+
+
+def bucket_expression(dialect_name: str, bucket: str, column):
+    """SQL expression truncating a date column to its week (Monday), month or quarter"""
+    if dialect_name == "postgresql":
+        return cast(func.date_trunc(bucket, column), Date)
+
+    # SQLite date() modifiers
+    if bucket == "week":
+        return func.date(column, "-" + cast((func.strftime("%w", column) + 6) % 7, String) + " days")
+    if bucket == "quarter":
+        return func.date(
+            column, "start of month",
+            "-" + cast((func.strftime("%m", column) - 1) % 3, String) + " months"
+        )
+    return func.date(column, "start of month")
+
+
+class AnalyticsRollupRepository:
+    """Repository for analytics rollup tables"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    # Refresh state
+
+    async def lock_refresh(self) -> None:
+        """
+        Wait for any other refresh to finish and hold the lock until this
+        transaction ends, so two refreshes never rewrite the same periods at
+        once (the rewrites are delete-then-insert)
+        """
+        if self.db.get_bind().dialect.name == "postgresql":
+            await self.db.execute(select(func.pg_advisory_xact_lock(REFRESH_LOCK_KEY)))
+
+    async def get_state(self, rollup: str) -> Optional[AnalyticsRefreshState]:
+        result = await self.db.execute(
+            select(AnalyticsRefreshState).where(AnalyticsRefreshState.rollup == rollup)
+        )
+        return result.scalar_one_or_none()
+
+    async def save_state(
+        self,
+        rollup: str,
+        refreshed_at: datetime,
+        watermark: Optional[datetime] = None,
+        payload: Optional[str] = None
+    ) -> None:
+        state = await self.get_state(rollup)
+        if state is None:
+            state = AnalyticsRefreshState(rollup=rollup)
+            self.db.add(state)
+        state.refreshed_at = refreshed_at
+        state.watermark = watermark
+        state.payload = payload
+
+    # Headcount (daily)
+
+    async def replace_headcount_snapshot(self, snapshot_date: date) -> int:
+        """Rewrite the snapshot for one day from the live employee table"""
+        result = await self.db.execute(
+            select(
+                Employee.department_id,
+                Employee.country_code,
+                Employee.employment_type,
+                Employee.status,
+                func.count(Employee.id).label("headcount")
+            )
+            .where(Employee.is_deleted == False)
+            .group_by(Employee.department_id, Employee.country_code, Employee.employment_type, Employee.status)
+        )
+        rows = [
+            {
+                "snapshot_date": snapshot_date,
+                "department_id": row.department_id,
+                "country_code": row.country_code,
+                "employment_type": _enum_value(row.employment_type),
+                "status": _enum_value(row.status),
+                "headcount": row.headcount
+            }
+            for row in result.all()
+        ]
+
+        await self.db.execute(
+            delete(HeadcountDailyRollup).where(HeadcountDailyRollup.snapshot_date == snapshot_date)
+        )
+        if rows:
+            await self.db.execute(insert(HeadcountDailyRollup), rows)
+        return len(rows)
+
+    async def get_headcount(self, group_by: str = "department") -> Tuple[Optional[date], List[Dict]]:
+        """Active headcount per department or country from the latest snapshot"""
+        latest = (await self.db.execute(select(func.max(HeadcountDailyRollup.snapshot_date)))).scalar()
+        if latest is None:
+            return None, []
+
+        if group_by == "department":
+            group_column = HeadcountDailyRollup.department_id
+            label = func.coalesce(Department.name, "Unassigned")
+        else:
+            group_column = HeadcountDailyRollup.country_code
+            label = func.coalesce(HeadcountDailyRollup.country_code, "Unknown")
+
+        query = (
+            select(label.label("group"), func.sum(HeadcountDailyRollup.headcount).label("count"))
+            .where(
+                and_(
+                    HeadcountDailyRollup.snapshot_date == latest,
+                    HeadcountDailyRollup.status == "active"
+                )
+            )
+            .group_by(group_column, label)
+            .order_by(label)
+        )
+        if group_by == "department":
+            query = query.outerjoin(Department, Department.id == HeadcountDailyRollup.department_id)
+
+        result = await self.db.execute(query)
+        return latest, [{"group": row.group, "count": int(row.count)} for row in result.all()]
+
+    async def get_headcount_totals(self) -> Dict[str, int]:
+        """Total and active employees in the latest snapshot"""
+        latest = select(func.max(HeadcountDailyRollup.snapshot_date)).scalar_subquery()
+        result = await self.db.execute(
+            select(
+                func.coalesce(func.sum(HeadcountDailyRollup.headcount), 0).label("total"),
+                func.coalesce(
+                    func.sum(case((HeadcountDailyRollup.status == "active", HeadcountDailyRollup.headcount), else_=0)),
+                    0
+                ).label("active")
+            )
+            .where(HeadcountDailyRollup.snapshot_date == latest)
+        )
+        row = result.one()
+        return {"total": int(row.total), "active": int(row.active)}
+
+    # Workforce movements (monthly)
+
+    async def get_employee_changes(self, after: Optional[datetime]) -> Tuple[Optional[date], Optional[datetime]]:
+        """
+        Earliest hire/termination date among employees changed after the
+        watermark (deleted rows included), and the newest updated_at seen
+        """
+        query = select(
+            func.min(Employee.hire_date),
+            func.min(Employee.termination_date),
+            func.max(Employee.updated_at)
+        )
+        if after is not None:
+            query = query.where(Employee.updated_at > after)
+
+        min_hire, min_termination, max_updated = (await self.db.execute(query)).one()
+        earliest = min(d for d in (min_hire, min_termination, date.max) if d is not None)
+        return (earliest if earliest != date.max else None), max_updated
+
+    async def replace_workforce_month(self, period_start: date, period_end: date) -> int:
+        """Rewrite one month's opening headcount, hires and terminations"""
+        employed_at_start = and_(
+            Employee.hire_date < period_start,
+            or_(Employee.termination_date.is_(None), Employee.termination_date >= period_start)
+        )
+        hired = Employee.hire_date.between(period_start, period_end)
+        terminated = Employee.termination_date.between(period_start, period_end)
+
+        result = await self.db.execute(
+            select(
+                Employee.department_id,
+                Employee.country_code,
+                Employee.employment_type,
+                func.sum(case((employed_at_start, 1), else_=0)).label("opening_headcount"),
+                func.sum(case((hired, 1), else_=0)).label("hires"),
+                func.sum(case((terminated, 1), else_=0)).label("terminations")
+            )
+            .where(
+                and_(
+                    Employee.is_deleted == False,
+                    Employee.hire_date <= period_end,
+                    or_(Employee.termination_date.is_(None), Employee.termination_date >= period_start)
+                )
+            )
+            .group_by(Employee.department_id, Employee.country_code, Employee.employment_type)
+        )
+        rows = [
+            {
+                "period_start": period_start,
+                "department_id": row.department_id,
+                "country_code": row.country_code,
+                "employment_type": _enum_value(row.employment_type),
+                "opening_headcount": int(row.opening_headcount or 0),
+                "hires": int(row.hires or 0),
+                "terminations": int(row.terminations or 0)
+            }
+            for row in result.all()
+        ]
+
+        await self.db.execute(
+            delete(WorkforceMonthlyRollup).where(WorkforceMonthlyRollup.period_start == period_start)
+        )
+        if rows:
+            await self.db.execute(insert(WorkforceMonthlyRollup), rows)
+        return len(rows)
+
+    async def get_year_turnover(self, year: int) -> Dict[str, int]:
+        """Headcount at the start of the year and terminations during it"""
+        start_of_year = date(year, 1, 1)
+        result = await self.db.execute(
+            select(
+                func.coalesce(
+                    func.sum(case(
+                        (WorkforceMonthlyRollup.period_start == start_of_year, WorkforceMonthlyRollup.opening_headcount),
+                        else_=0
+                    )),
+                    0
+                ).label("employees_at_start"),
+                func.coalesce(func.sum(WorkforceMonthlyRollup.terminations), 0).label("terminations")
+            )
+            .where(WorkforceMonthlyRollup.period_start.between(start_of_year, date(year, 12, 1)))
+        )
+        row = result.one()
+        return {"employees_at_start": int(row.employees_at_start), "terminations": int(row.terminations)}
+
+    # Leave usage (yearly)
+
+    async def get_leave_balance_changes(self, after: Optional[datetime]) -> Tuple[List[str], Optional[datetime]]:
+        """Years with leave balances changed after the watermark, and the newest updated_at seen"""
+        query = select(LeaveBalance.year, func.max(LeaveBalance.updated_at)).group_by(LeaveBalance.year)
+        if after is not None:
+            query = query.where(LeaveBalance.updated_at > after)
+
+        rows = (await self.db.execute(query)).all()
+        max_updated = max((row[1] for row in rows), default=None)
+        return [row[0] for row in rows], max_updated
+
+    async def replace_leave_usage(self, year: str) -> int:
+        """Rewrite one year's leave usage per leave type"""
+        result = await self.db.execute(
+            select(
+                LeaveBalance.leave_type,
+                func.count(func.distinct(LeaveBalance.employee_id)).label("employees"),
+                func.coalesce(func.sum(LeaveBalance.total_days), 0).label("total_days"),
+                func.coalesce(func.sum(LeaveBalance.used_days), 0).label("used_days"),
+                func.coalesce(func.sum(LeaveBalance.pending_days), 0).label("pending_days"),
+                func.coalesce(func.sum(LeaveBalance.available_days), 0).label("available_days")
+            )
+            .where(and_(LeaveBalance.year == year, LeaveBalance.is_deleted == False))
+            .group_by(LeaveBalance.leave_type)
+        )
+        rows = [{"year": year, **row._mapping} for row in result.all()]
+
+        await self.db.execute(delete(LeaveUsageRollup).where(LeaveUsageRollup.year == year))
+        if rows:
+            await self.db.execute(insert(LeaveUsageRollup), rows)
+        return len(rows)
+
+    async def get_leave_usage(self, year: str) -> List[LeaveUsageRollup]:
+        result = await self.db.execute(
+            select(LeaveUsageRollup)
+            .where(LeaveUsageRollup.year == year)
+            .order_by(LeaveUsageRollup.leave_type)
+        )
+        return result.scalars().all()
+
+
+class WorkforceSeriesRepository:
+    """Repository for workforce time series"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _split_column(self, split_by: Optional[str]):
+        if split_by == "department":
+            return func.coalesce(Department.name, "Unassigned")
+        if split_by == "country":
+            return func.coalesce(Employee.country_code, "Unknown")
+        if split_by == "employment_type":
+            return Employee.employment_type
+        if split_by == "gender":
+            return func.coalesce(Employee.gender, "Unknown")
+        return literal("all")
+
+    async def stream_movements(
+        self,
+        bucket: str,
+        start: date,
+        end: date,
+        split_by: Optional[str] = None
+    ) -> AsyncIterator:
+        """
+        Hires, exits and closing headcount per (group, period), ordered by
+        group then period
+
+        Hire and termination dates are unioned into one event list, bucketed
+        and summed, and a running SUM window over the buckets gives the
+        headcount at the end of each one - a single pass over employees.
+        Events before start land in OPENING_PERIOD. Periods without events
+        are not returned.
+        """
+        group = self._split_column(split_by)
+
+        def events(event_date, hires: int, exits: int):
+            query = (
+                select(
+                    event_date.label("event_date"),
+                    literal(hires).label("hires"),
+                    literal(exits).label("exits"),
+                    group.label("grp")
+                )
+                .where(and_(Employee.is_deleted == False, event_date <= end))
+            )
+            if split_by == "department":
+                query = query.outerjoin(Department, Department.id == Employee.department_id)
+            return query
+
+        event_rows = union_all(
+            events(Employee.hire_date, 1, 0),
+            events(Employee.termination_date, 0, 1).where(Employee.termination_date.isnot(None))
+        ).subquery()
+
+        dialect_name = self.db.get_bind().dialect.name
+        period = case(
+            (event_rows.c.event_date < start, literal(OPENING_PERIOD, Date)),
+            else_=bucket_expression(dialect_name, bucket, event_rows.c.event_date)
+        )
+        movements = (
+            select(
+                event_rows.c.grp,
+                period.label("period"),
+                func.sum(event_rows.c.hires).label("hires"),
+                func.sum(event_rows.c.exits).label("exits")
+            )
+            .group_by(event_rows.c.grp, period)
+            .subquery()
+        )
+
+        result = await self.db.stream(
+            select(
+                movements.c.grp,
+                movements.c.period,
+                movements.c.hires,
+                movements.c.exits,
+                func.sum(movements.c.hires - movements.c.exits).over(
+                    partition_by=movements.c.grp,
+                    order_by=movements.c.period
+                ).label("headcount")
+            )
+            .order_by(movements.c.grp, movements.c.period)
+        )
+        async for row in result:
+            yield row
@@ -1,14 +1,44 @@
 """Analytics Module - Routes"""
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from typing import Any, AsyncIterator, Dict, Optional
+from datetime import date
+import csv
+import io
+import json
 
 from core.database import get_db
-from core.dependencies import get_current_active_user, require_hr_read
-from modules.analytics.services import AnalyticsService
+from core.dependencies import get_current_active_user, require_hr_read, require_hr_admin
+from modules.analytics.services import AnalyticsService, AnalyticsRollupService
 
 router = APIRouter()
 
+SERIES_COLUMNS = [
+    "period_start", "period_end", "group", "opening_headcount",
+    "hires", "exits", "closing_headcount", "turnover_rate"
+]
+
+
+async def _series_as_json(rows: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    separator = "["
+    async for row in rows:
+        yield separator + json.dumps(row)
+        separator = ","
+    yield "[]" if separator == "[" else "]"
+
+
+async def _series_as_csv(rows: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=SERIES_COLUMNS)
+    writer.writeheader()
+    async for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
 
 @router.get("/dashboard")
 async def get_hr_dashboard(
@@ -55,3 +85,41 @@ async def get_leave_utilization(
     analytics_service = AnalyticsService(db)
     utilization = await analytics_service.get_leave_utilization(year=year)
     return utilization
+
+
+@router.get("/workforce/time-series")
+async def get_workforce_time_series(
+    bucket: str = Query("month", pattern="^(week|month|quarter)$"),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    split_by: Optional[str] = Query(None, pattern="^(department|country|employment_type|gender)$"),
+    format: str = Query("json", pattern="^(json|csv)$"),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(require_hr_read)
+):
+    """
+    Stream headcount, hires, exits and turnover per week, month or quarter
+    
+    Defaults to the last 12 months. split_by gives one series per
+    department, country, employment type or gender.
+    """
+    analytics_service = AnalyticsService(db)
+    rows = analytics_service.workforce_series(bucket=bucket, start=start, end=end, split_by=split_by)
+    
+    if format == "csv":
+        return StreamingResponse(
+            _series_as_csv(rows),
+            media_type="text/csv",
+            headers={"Content-Disposition": f"attachment; filename=workforce_{bucket}.csv"}
+        )
+    return StreamingResponse(_series_as_json(rows), media_type="application/json")
+
+
+@router.post("/refresh")
+async def refresh_analytics(
+    full: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(require_hr_admin)
+):
+    """Refresh the analytics rollups now (full=true rebuilds all history)"""
+    return await AnalyticsRollupService(db).refresh(full=full)
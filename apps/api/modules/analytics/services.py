@@ -1,171 +1,230 @@
 """Analytics - Services"""
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, extract
-from typing import Dict
+from sqlalchemy import select, func, and_
+from typing import Any, AsyncIterator, Dict, List, Optional
 from datetime import date, datetime, timedelta
 from decimal import Decimal
+import json
+import logging
+import threading
 
-from modules.employees.models import Employee
+from core.database import AsyncSessionLocal
+from core.exceptions import BadRequestException
+from modules.analytics.models import AnalyticsRefreshState
+from modules.analytics.repositories import AnalyticsRollupRepository, WorkforceSeriesRepository
 from modules.leave.models import LeaveRequest
 from modules.timesheets.models import Timesheet
 from modules.performance.models import PerformanceReviewCycle
 from modules.recruitment.models import JobPosting
-from modules.leave.models import LeaveBalance
 
+logger = logging.getLogger(__name__)
 
-class AnalyticsService:
-    """Service for HR analytics and metrics"""
+TIME_SERIES_BUCKETS = ("week", "month", "quarter")
+TIME_SERIES_SPLITS = ("department", "country", "employment_type", "gender")
+
+# Longest series one request may ask for (about ten years of weeks)
+MAX_TIME_SERIES_PERIODS = 520
+
+
+def bucket_start(value: date, bucket: str) -> date:
+    """First day of the week (Monday), month or quarter containing value"""
+    if bucket == "week":
+        return value - timedelta(days=value.weekday())
+    if bucket == "quarter":
+        return date(value.year, value.month - (value.month - 1) % 3, 1)
+    return value.replace(day=1)
+
+
+def next_bucket_start(value: date, bucket: str) -> date:
+    """First day of the bucket after the one starting at value"""
+    if bucket == "week":
+        return value + timedelta(days=7)
+    months = 3 if bucket == "quarter" else 1
+    month = value.month - 1 + months
+    return date(value.year + month // 12, month % 12 + 1, 1)
+
+
+def _month_starts(first: date, last: date) -> List[date]:
+    """First day of every month from first's month through last's month"""
+    months = []
+    current = first.replace(day=1)
+    while current <= last:
+        months.append(current)
+        current = (current + timedelta(days=32)).replace(day=1)
+    return months
+
+
+# How often a worker may queue a refresh for rollups that were never built
+REFRESH_REQUEST_INTERVAL = timedelta(minutes=5)
+_refresh_requested_at: Optional[datetime] = None
+
+
+def request_refresh() -> None:
+    """
+    Queue an aggregate_analytics run, at most once per REFRESH_REQUEST_INTERVAL
+    
+    Publishing blocks while the broker is unreachable, so it happens on a
+    daemon thread instead of in the request.
+    """
+    global _refresh_requested_at
+    now = datetime.utcnow()
+    if _refresh_requested_at is not None and now - _refresh_requested_at < REFRESH_REQUEST_INTERVAL:
+        return
+    _refresh_requested_at = now
+    
+    def enqueue():
+        try:
+            from core.tasks import aggregate_analytics
+            aggregate_analytics.delay()
+        except Exception as e:
+            logger.warning(f"Could not queue an analytics refresh: {str(e)}")
+    
+    threading.Thread(target=enqueue, name="analytics-refresh-request", daemon=True).start()
+
+
+class AnalyticsRollupService:
+    """
+    Maintains the analytics rollup tables
+    
+    Run hourly by the aggregate_analytics task. Each refresh only rewrites
+    what can have changed: today's headcount snapshot, the months from the
+    earliest hire/termination date among employees changed since the last
+    run to the current month, and the leave years with changed balances.
+    full=True rebuilds every month and year from scratch, which also picks
+    up hard deletes and dates moved later (the incremental pass only sees
+    the new value of a changed row).
+    """
     
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.repo = AnalyticsRollupRepository(db)
     
-    async def get_dashboard_metrics(self) -> Dict:
-        """Get HR dashboard metrics"""
-        # Total employees
-        total_result = await self.db.execute(
-            select(func.count(Employee.id)).where(Employee.is_deleted == False)
-        )
-        total_employees = total_result.scalar() or 0
-        
-        # Active employees
-        active_result = await self.db.execute(
-            select(func.count(Employee.id)).where(
-                and_(
-                    Employee.is_deleted == False,
-                    Employee.status == "active"
-                )
-            )
-        )
-        active_employees = active_result.scalar() or 0
-        
-        # Pending leave requests
-        pending_leave_result = await self.db.execute(
-            select(func.count(LeaveRequest.id)).where(
-                and_(
-                    LeaveRequest.is_deleted == False,
-                    LeaveRequest.status == "pending"
-                )
-            )
-        )
-        pending_leave_requests = pending_leave_result.scalar() or 0
-        
-        # Pending timesheets
-        pending_timesheet_result = await self.db.execute(
-            select(func.count(Timesheet.id)).where(
-                and_(
-                    Timesheet.is_deleted == False,
-                    Timesheet.status == "submitted"
-                )
-            )
-        )
-        pending_timesheets = pending_timesheet_result.scalar() or 0
-        
-        # Upcoming reviews (next 30 days)
-        upcoming_reviews_result = await self.db.execute(
-            select(func.count(PerformanceReviewCycle.id)).where(
-                and_(
-                    PerformanceReviewCycle.is_deleted == False,
-                    PerformanceReviewCycle.review_period_end >= date.today(),
-                    PerformanceReviewCycle.review_period_end <= date.today() + timedelta(days=30)
-                )
+    async def refresh(self, today: Optional[date] = None, full: bool = False) -> Dict:
+        """Refresh all rollups in one transaction; returns what was rewritten"""
+        today = today or date.today()
+        await self.repo.lock_refresh()
+        now = datetime.utcnow()
+        
+        headcount_groups = await self.repo.replace_headcount_snapshot(today)
+        await self.repo.save_state("headcount_daily", now)
+        
+        workforce_state = await self.repo.get_state("workforce_monthly")
+        watermark = None if full or workforce_state is None else workforce_state.watermark
+        earliest_change, employees_updated = await self.repo.get_employee_changes(watermark)
+        first_month = min(earliest_change, today) if earliest_change else today
+        months = _month_starts(first_month, today)
+        for period_start in months:
+            period_end = (period_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+            await self.repo.replace_workforce_month(period_start, period_end)
+        await self.repo.save_state("workforce_monthly", now, employees_updated or watermark)
+        
+        leave_state = await self.repo.get_state("leave_usage")
+        watermark = None if full or leave_state is None else leave_state.watermark
+        years, balances_updated = await self.repo.get_leave_balance_changes(watermark)
+        for year in years:
+            await self.repo.replace_leave_usage(year)
+        await self.repo.save_state("leave_usage", now, balances_updated or watermark)
+        
+        await self.repo.save_state("dashboard", now, payload=json.dumps(await self._pending_work_counts(today)))
+        
+        await self.db.commit()
+        
+        stats = {
+            "headcount_groups": headcount_groups,
+            "months_refreshed": len(months),
+            "leave_years_refreshed": len(years)
+        }
+        logger.info(f"Analytics rollups refreshed: {stats}")
+        return stats
+    
+    async def _pending_work_counts(self, today: date) -> Dict[str, int]:
+        """Open work queues shown on the HR dashboard, counted in one statement"""
+        def count(model, *conditions):
+            return (
+                select(func.count(model.id))
+                .where(and_(model.is_deleted == False, *conditions))
+                .scalar_subquery()
             )
-        )
-        upcoming_reviews = upcoming_reviews_result.scalar() or 0
-        
-        # Open positions
-        open_positions_result = await self.db.execute(
-            select(func.count(JobPosting.id)).where(
-                and_(
-                    JobPosting.is_deleted == False,
-                    JobPosting.status == "open"
-                )
+        
+        result = await self.db.execute(
+            select(
+                count(LeaveRequest, LeaveRequest.status == "pending").label("pending_leave_requests"),
+                count(Timesheet, Timesheet.status == "submitted").label("pending_timesheets"),
+                count(
+                    PerformanceReviewCycle,
+                    PerformanceReviewCycle.review_period_end >= today,
+                    PerformanceReviewCycle.review_period_end <= today + timedelta(days=30)
+                ).label("upcoming_reviews"),
+                count(JobPosting, JobPosting.status == "open").label("open_positions")
             )
         )
-        open_positions = open_positions_result.scalar() or 0
+        return {key: int(value or 0) for key, value in result.one()._mapping.items()}
+
+
+class AnalyticsService:
+    """
+    Service for HR analytics and metrics
+    
+    Reads the rollup tables maintained by AnalyticsRollupService, so every
+    report costs the same however much history there is. Responses carry
+    refreshed_at, the time the rollup they come from was last refreshed
+    (None before the first refresh).
+    """
+    
+    def __init__(self, db: AsyncSession, session_factory=None):
+        self.db = db
+        self.repo = AnalyticsRollupRepository(db)
+        self.session_factory = session_factory or AsyncSessionLocal
+    
+    async def _get_fresh_state(self, rollup: str) -> Optional[AnalyticsRefreshState]:
+        """
+        Refresh state of a rollup, or None when it has never been built
+        
+        A missing rollup is queued for the aggregate_analytics task rather
+        than built inside the request; reports are empty until it has run.
+        """
+        state = await self.repo.get_state(rollup)
+        if state is None:
+            request_refresh()
+        return state
+    
+    async def get_dashboard_metrics(self) -> Dict:
+        """Get HR dashboard metrics"""
+        state = await self._get_fresh_state("dashboard")
+        headcount_state = await self._get_fresh_state("headcount_daily")
+        totals = await self.repo.get_headcount_totals()
+        pending = json.loads(state.payload or "{}") if state else {}
         
         return {
-            "total_employees": total_employees,
-            "active_employees": active_employees,
-            "pending_leave_requests": pending_leave_requests,
-            "pending_timesheets": pending_timesheets,
-            "upcoming_reviews": upcoming_reviews,
-            "open_positions": open_positions
+            "total_employees": totals["total"],
+            "active_employees": totals["active"],
+            "pending_leave_requests": pending.get("pending_leave_requests", 0),
+            "pending_timesheets": pending.get("pending_timesheets", 0),
+            "upcoming_reviews": pending.get("upcoming_reviews", 0),
+            "open_positions": pending.get("open_positions", 0),
+            "refreshed_at": min(state.refreshed_at, headcount_state.refreshed_at) if state and headcount_state else None
         }
     
     async def get_headcount_report(self, group_by: str = "department") -> Dict:
         """Get headcount by department or location"""
-        if group_by == "department":
-            result = await self.db.execute(
-                select(
-                    func.count(Employee.id).label('count'),
-                    Employee.department_id
-                )
-                .where(and_(Employee.is_deleted == False, Employee.status == "active"))
-                .group_by(Employee.department_id)
-            )
-            
-            from modules.employees.models import Department
-            departments_result = await self.db.execute(
-                select(Department)
-            )
-            departments = {d.id: d.name for d in departments_result.scalars().all()}
-            
-            headcount = []
-            for row in result:
-                headcount.append({
-                    "group": departments.get(row.department_id, "Unassigned"),
-                    "count": row.count
-                })
-        else:  # location/country
-            result = await self.db.execute(
-                select(
-                    func.count(Employee.id).label('count'),
-                    Employee.country_code
-                )
-                .where(and_(Employee.is_deleted == False, Employee.status == "active"))
-                .group_by(Employee.country_code)
-            )
-            
-            headcount = []
-            for row in result:
-                headcount.append({
-                    "group": row.country_code or "Unknown",
-                    "count": row.count
-                })
+        state = await self._get_fresh_state("headcount_daily")
+        snapshot_date, headcount = await self.repo.get_headcount(group_by)
         
-        return {"headcount": headcount}
+        return {
+            "headcount": headcount,
+            "snapshot_date": snapshot_date,
+            "refreshed_at": state.refreshed_at if state else None
+        }
     
     async def get_turnover_rate(self, year: int = None) -> Dict:
         """Get employee turnover rate"""
         if not year:
             year = datetime.now().year
         
-        # Total employees at start of year
-        start_of_year = date(year, 1, 1)
-        
-        # Employees who were active at start of year
-        active_at_start_result = await self.db.execute(
-            select(func.count(Employee.id)).where(
-                and_(
-                    Employee.is_deleted == False,
-                    Employee.hire_date <= start_of_year,
-                    (Employee.termination_date >= start_of_year) | (Employee.termination_date.is_(None))
-                )
-            )
-        )
-        employees_at_start = active_at_start_result.scalar() or 0
-        
-        # Terminations during the year
-        terminations_result = await self.db.execute(
-            select(func.count(Employee.id)).where(
-                and_(
-                    Employee.is_deleted == False,
-                    extract('year', Employee.termination_date) == year,
-                    Employee.termination_date.isnot(None)
-                )
-            )
-        )
-        terminations = terminations_result.scalar() or 0
+        state = await self._get_fresh_state("workforce_monthly")
+        turnover = await self.repo.get_year_turnover(year)
+        employees_at_start = turnover["employees_at_start"]
+        terminations = turnover["terminations"]
         
         # Calculate turnover rate
         if employees_at_start > 0:
@@ -177,7 +236,8 @@ class AnalyticsService:
             "year": year,
             "employees_at_start": employees_at_start,
             "terminations": terminations,
-            "turnover_rate": round(turnover_rate, 2)
+            "turnover_rate": round(turnover_rate, 2),
+            "refreshed_at": state.refreshed_at if state else None
         }
     
     async def get_leave_utilization(self, year: int = None) -> Dict:
@@ -185,31 +245,14 @@ class AnalyticsService:
         if not year:
             year = datetime.now().year
         
-        year_str = str(year)
-        
-        # Get all leave balances for the year
-        result = await self.db.execute(
-            select(
-                LeaveBalance.leave_type,
-                func.sum(LeaveBalance.total_days).label('total_days'),
-                func.sum(LeaveBalance.used_days).label('used_days'),
-                func.sum(LeaveBalance.pending_days).label('pending_days'),
-                func.sum(LeaveBalance.available_days).label('available_days')
-            )
-            .where(
-                and_(
-                    LeaveBalance.year == year_str,
-                    LeaveBalance.is_deleted == False
-                )
-            )
-            .group_by(LeaveBalance.leave_type)
-        )
+        state = await self._get_fresh_state("leave_usage")
+        rows = await self.repo.get_leave_usage(str(year))
         
         utilization_by_type = []
         total_allocated = Decimal('0')
         total_used = Decimal('0')
         
-        for row in result:
+        for row in rows:
             utilization_pct = 0.0
             if row.total_days and row.total_days > 0:
                 utilization_pct = float((row.used_days / row.total_days) * 100)
@@ -235,5 +278,89 @@ class AnalyticsService:
             "overall_utilization_percentage": round(overall_utilization, 2),
             "total_allocated_days": float(total_allocated),
             "total_used_days": float(total_used),
-            "by_leave_type": utilization_by_type
+            "by_leave_type": utilization_by_type,
+            "refreshed_at": state.refreshed_at if state else None
         }
+    
+    def workforce_series(
+        self,
+        bucket: str = "month",
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        split_by: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Headcount, hires, exits and turnover per period, streamed row by row
+        
+        The range is widened to whole buckets. Rows come ordered by group
+        then period, with every period present for each group (quiet
+        periods carry the headcount forward). Arguments are validated here,
+        before anything is streamed; the rows are read on their own session
+        so the stream can outlive the request handler.
+        """
+        if bucket not in TIME_SERIES_BUCKETS:
+            raise BadRequestException(f"bucket must be one of: {', '.join(TIME_SERIES_BUCKETS)}")
+        if split_by is not None and split_by not in TIME_SERIES_SPLITS:
+            raise BadRequestException(f"split_by must be one of: {', '.join(TIME_SERIES_SPLITS)}")
+        
+        end = end or date.today()
+        start = bucket_start(start or end - timedelta(days=365), bucket)
+        if start > end:
+            raise BadRequestException("start must not be after end")
+        
+        periods = [start]
+        while next_bucket_start(periods[-1], bucket) <= end:
+            periods.append(next_bucket_start(periods[-1], bucket))
+            if len(periods) > MAX_TIME_SERIES_PERIODS:
+                raise BadRequestException(f"Range covers more than {MAX_TIME_SERIES_PERIODS} {bucket}s")
+        
+        return self._iter_workforce_series(bucket, periods, split_by)
+    
+    async def _iter_workforce_series(
+        self,
+        bucket: str,
+        periods: List[date],
+        split_by: Optional[str]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        start = periods[0]
+        end = next_bucket_start(periods[-1], bucket) - timedelta(days=1)
+        
+        def series_row(group, index: int, closing: int, hires: int = 0, exits: int = 0) -> Dict[str, Any]:
+            opening = closing - hires + exits
+            average = (opening + closing) / 2
+            return {
+                "period_start": periods[index].isoformat(),
+                "period_end": (next_bucket_start(periods[index], bucket) - timedelta(days=1)).isoformat(),
+                "group": group,
+                "opening_headcount": opening,
+                "hires": hires,
+                "exits": exits,
+                "closing_headcount": closing,
+                "turnover_rate": round(exits / average * 100, 2) if average > 0 else 0.0
+            }
+        
+        async with self.session_factory() as session:
+            group, headcount, index = None, 0, 0
+            first = True
+            async for row in WorkforceSeriesRepository(session).stream_movements(bucket, start, end, split_by):
+                row_group = row.grp.value if hasattr(row.grp, "value") else row.grp
+                if first or row_group != group:
+                    if not first:
+                        for remaining in range(index, len(periods)):
+                            yield series_row(group, remaining, headcount)
+                    group, headcount, index, first = row_group, 0, 0, False
+                
+                period = row.period if isinstance(row.period, date) else date.fromisoformat(row.period)
+                headcount = int(row.headcount)
+                if period < start:
+                    continue
+                
+                while periods[index] < period:
+                    yield series_row(group, index, headcount - int(row.hires) + int(row.exits))
+                    index += 1
+                yield series_row(group, index, headcount, int(row.hires), int(row.exits))
+                index += 1
+            
+            if not first:
+                for remaining in range(index, len(periods)):
+                    yield series_row(group, remaining, headcount)
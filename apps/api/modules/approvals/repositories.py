@@ -3,18 +3,44 @@ Approval Workflow Module - Repository Layer
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
-from sqlalchemy.orm import selectinload
-from typing import List, Optional
-from datetime import datetime
+from sqlalchemy import select, and_, or_, func, case
+from sqlalchemy.orm import selectinload, aliased
+from typing import List, Optional, Tuple
+from datetime import datetime, timedelta
 import uuid
 
 from modules.approvals.models import ApprovalRequest, ApprovalDelegation, ApprovalStatus, ApprovalType
+from modules.employees.models import Employee
 from modules.approvals.schemas import (
     ApprovalRequestCreate, ApprovalRequestUpdate,
     ApprovalDelegationCreate, ApprovalDelegationUpdate
 )
 
+# Columns returned for the approver inbox (mirrors ApprovalRequestResponse)
+PENDING_APPROVAL_COLUMNS = (
+    ApprovalRequest.id,
+    ApprovalRequest.request_type,
+    ApprovalRequest.request_id,
+    ApprovalRequest.employee_id,
+    ApprovalRequest.approver_id,
+    ApprovalRequest.approval_level,
+    ApprovalRequest.status,
+    ApprovalRequest.comments,
+    ApprovalRequest.submitted_at,
+    ApprovalRequest.reviewed_at,
+    ApprovalRequest.created_at,
+    ApprovalRequest.updated_at
+)
+
+# Age buckets for pending approvals: (label, upper bound in days); the last
+# bucket is open-ended
+APPROVAL_AGE_BUCKETS = (
+    ("0-1d", 1),
+    ("1-3d", 3),
+    ("3-7d", 7),
+    ("7d+", None)
+)
+
 
 class ApprovalRequestRepository:
     """Repository for approval request operations"""
@@ -30,9 +56,10 @@ class ApprovalRequestRepository:
         approval_level: int = 1,
         previous_approval_id: uuid.UUID = None,
         is_final_approval: bool = False,
-        next_approver_id: uuid.UUID = None
+        next_approver_id: uuid.UUID = None,
+        commit: bool = True
     ) -> ApprovalRequest:
-        """Create a new approval request"""
+        """Create a new approval request (commit=False only flushes, to join the caller's transaction)"""
         approval_dict = approval_data.model_dump()
         approval = ApprovalRequest(
             **approval_dict,
@@ -44,6 +71,9 @@ class ApprovalRequestRepository:
             next_approver_id=next_approver_id
         )
         self.db.add(approval)
+        if not commit:
+            await self.db.flush()
+            return approval
         await self.db.commit()
         await self.db.refresh(approval)
         return approval
@@ -77,43 +107,76 @@ class ApprovalRequestRepository:
         )
         return result.scalar_one_or_none()
     
-    async def get_pending_for_approver(self, approver_id: uuid.UUID) -> List[ApprovalRequest]:
+    def _pending_for_approver(self, approver_id: uuid.UUID, *columns):
         """
-        Get all pending approval requests for an approver
-        Only returns approvals where:
-        - Previous approval (if exists) is approved
-        - Or this is the first approval in the chain (level 1)
+        Pending approvals an approver can act on now
+        
+        Only includes approvals where the previous approval in the chain is
+        approved, or that are the first approval in the chain (level 1).
+        The gate is a self-join on previous_approval_id, so it is applied by
+        the database before pagination instead of row by row in Python.
         """
-        # Get all pending approvals for this approver
-        result = await self.db.execute(
-            select(ApprovalRequest)
-            .options(
-                selectinload(ApprovalRequest.employee),
-                selectinload(ApprovalRequest.approver),
-                selectinload(ApprovalRequest.previous_approval)
-            )
+        previous = aliased(ApprovalRequest)
+        return (
+            select(*columns)
+            .select_from(ApprovalRequest)
+            .outerjoin(previous, previous.id == ApprovalRequest.previous_approval_id)
             .where(
                 and_(
                     ApprovalRequest.approver_id == approver_id,
-                    ApprovalRequest.status == ApprovalStatus.PENDING
+                    ApprovalRequest.status == ApprovalStatus.PENDING,
+                    or_(
+                        ApprovalRequest.approval_level == 1,
+                        previous.status == ApprovalStatus.APPROVED
+                    )
                 )
             )
-            .order_by(ApprovalRequest.submitted_at.desc())
         )
-        all_approvals = list(result.scalars().all())
+    
+    async def get_pending_for_approver(
+        self,
+        approver_id: uuid.UUID,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[datetime, uuid.UUID]] = None
+    ) -> List[dict]:
+        """
+        Get pending approval requests for an approver, newest first
+        
+        Returns plain rows (no ORM objects) with the submitting employee's
+        name joined in. Keyset-paginated on (submitted_at, id) when after is
+        given; limit=None returns everything.
+        """
+        query = self._pending_for_approver(
+            approver_id,
+            *PENDING_APPROVAL_COLUMNS,
+            (Employee.first_name + " " + Employee.last_name).label("employee_name")
+        ).outerjoin(Employee, Employee.id == ApprovalRequest.employee_id)
+        
+        if after:
+            after_submitted_at, after_id = after
+            query = query.where(
+                or_(
+                    ApprovalRequest.submitted_at < after_submitted_at,
+                    and_(
+                        ApprovalRequest.submitted_at == after_submitted_at,
+                        ApprovalRequest.id < after_id
+                    )
+                )
+            )
         
-        # Filter: only include if it's level 1 OR previous approval is approved
-        valid_approvals = []
-        for approval in all_approvals:
-            if approval.approval_level == 1:
-                # First level - always show
-                valid_approvals.append(approval)
-            elif approval.previous_approval:
-                # Check if previous approval is approved
-                if approval.previous_approval.status == ApprovalStatus.APPROVED:
-                    valid_approvals.append(approval)
+        query = query.order_by(ApprovalRequest.submitted_at.desc(), ApprovalRequest.id.desc())
+        if limit is not None:
+            query = query.limit(limit)
         
-        return valid_approvals
+        result = await self.db.execute(query)
+        return [dict(row) for row in result.mappings().all()]
+    
+    async def count_pending_for_approver(self, approver_id: uuid.UUID) -> int:
+        """Count the pending approvals get_pending_for_approver would return"""
+        result = await self.db.execute(
+            self._pending_for_approver(approver_id, func.count(ApprovalRequest.id))
+        )
+        return result.scalar() or 0
     
     async def get_by_employee(self, employee_id: uuid.UUID) -> List[ApprovalRequest]:
         """Get all approval requests submitted by an employee"""
@@ -164,8 +227,13 @@ class ApprovalRequestRepository:
         )
         return list(result.scalars().all())
     
-    async def update(self, approval_id: uuid.UUID, update_data: ApprovalRequestUpdate) -> Optional[ApprovalRequest]:
-        """Update approval request (approve/reject)"""
+    async def update(
+        self,
+        approval_id: uuid.UUID,
+        update_data: ApprovalRequestUpdate,
+        commit: bool = True
+    ) -> Optional[ApprovalRequest]:
+        """Update approval request, approve/reject (commit=False only flushes, to join the caller's transaction)"""
         approval = await self.get_by_id(approval_id)
         if not approval:
             return None
@@ -176,42 +244,86 @@ class ApprovalRequestRepository:
         if update_data.status in [ApprovalStatus.APPROVED, ApprovalStatus.REJECTED]:
             approval.reviewed_at = datetime.utcnow()
         
+        if not commit:
+            await self.db.flush()
+            return approval
         await self.db.commit()
         await self.db.refresh(approval)
         return approval
     
     async def get_stats_for_approver(self, approver_id: uuid.UUID) -> dict:
-        """Get approval statistics for an approver"""
-        # Total pending
-        total_result = await self.db.execute(
-            select(func.count(ApprovalRequest.id))
+        """Get pending counts per request type for an approver in one grouped query"""
+        result = await self.db.execute(
+            select(ApprovalRequest.request_type, func.count(ApprovalRequest.id))
             .where(
                 and_(
                     ApprovalRequest.approver_id == approver_id,
                     ApprovalRequest.status == ApprovalStatus.PENDING
                 )
             )
+            .group_by(ApprovalRequest.request_type)
         )
-        total_pending = total_result.scalar() or 0
-        
-        # Pending by type
-        stats = {"total_pending": total_pending}
+        counts = dict(result.all())
         
+        stats = {"total_pending": sum(counts.values())}
         for approval_type in ApprovalType:
-            type_result = await self.db.execute(
-                select(func.count(ApprovalRequest.id))
-                .where(
-                    and_(
-                        ApprovalRequest.approver_id == approver_id,
-                        ApprovalRequest.status == ApprovalStatus.PENDING,
-                        ApprovalRequest.request_type == approval_type
-                    )
-                )
+            stats[f"{approval_type.value}_pending"] = counts.get(approval_type, 0)
+        return stats
+    
+    async def get_pending_breakdown(
+        self,
+        country_code: Optional[str] = None,
+        now: Optional[datetime] = None
+    ) -> List[dict]:
+        """
+        Org-wide pending approvals grouped by approver, request type and age bucket
+        
+        Age is measured from submitted_at; buckets are APPROVAL_AGE_BUCKETS.
+        """
+        now = now or datetime.utcnow()
+        age_bucket = case(
+            *[
+                (ApprovalRequest.submitted_at > now - timedelta(days=days), label)
+                for label, days in APPROVAL_AGE_BUCKETS if days is not None
+            ],
+            else_=APPROVAL_AGE_BUCKETS[-1][0]
+        )
+        
+        pending = (
+            select(
+                ApprovalRequest.approver_id,
+                ApprovalRequest.request_type,
+                ApprovalRequest.submitted_at,
+                age_bucket.label("age_bucket")
             )
-            count = type_result.scalar() or 0
-            stats[f"{approval_type.value}_pending"] = count
+            .where(ApprovalRequest.status == ApprovalStatus.PENDING)
+        )
+        if country_code:
+            pending = pending.where(ApprovalRequest.country_code == country_code)
+        pending = pending.subquery()
         
-        return stats
+        # Group on the subquery so the bucket expression is not repeated with
+        # fresh bind parameters in GROUP BY
+        result = await self.db.execute(
+            select(
+                pending.c.approver_id,
+                (Employee.first_name + " " + Employee.last_name).label("approver_name"),
+                pending.c.request_type,
+                pending.c.age_bucket,
+                func.count().label("pending"),
+                func.min(pending.c.submitted_at).label("oldest_submitted_at")
+            )
+            .outerjoin(Employee, Employee.id == pending.c.approver_id)
+            .group_by(
+                pending.c.approver_id,
+                Employee.first_name,
+                Employee.last_name,
+                pending.c.request_type,
+                pending.c.age_bucket
+            )
+            .order_by(func.min(pending.c.submitted_at))
+        )
+        return [dict(row) for row in result.mappings().all()]
 
 
 class ApprovalDelegationRepository:
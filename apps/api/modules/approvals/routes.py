@@ -2,23 +2,26 @@
 Approval Workflow Module - API Routes
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from typing import List, Optional
+from datetime import datetime
 import uuid
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.dependencies import get_db, get_current_user, get_current_active_user, require_hr_admin
+from core.config import settings
 from core.exceptions import NotFoundException, BadRequestException
+from core.pagination import encode_cursor, decode_cursor
 from modules.auth.models import User
 from modules.employees.models import Employee
 from sqlalchemy import select
 import uuid as uuid_lib
 from modules.approvals.services import ApprovalService
 from modules.approvals.schemas import (
-    ApprovalRequestCreate, ApprovalRequestUpdate, ApprovalRequestResponse,
+    ApprovalRequestCreate, ApprovalRequestUpdate, ApprovalRequestResponse, PendingApprovalResponse,
     ApprovalDelegationCreate, ApprovalDelegationUpdate, ApprovalDelegationResponse,
-    ApprovalStats
+    ApprovalStats, ApprovalBacklog
 )
 from modules.approvals.models import ApprovalType
 
@@ -70,17 +73,55 @@ async def get_approval_by_request(
     return result
 
 
-@router.get("/pending", response_model=List[ApprovalRequestResponse])
+@router.get("/pending", response_model=List[PendingApprovalResponse])
 async def get_pending_approvals(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=settings.MAX_PAGE_SIZE, description="Page size; omit for every pending item"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_active_user)
 ):
-    """Get all pending approvals for current user (as approver)"""
+    """
+    Get pending approvals for current user (as approver), newest first
+    
+    With limit the list is keyset-paginated on (submitted_at, id): the
+    X-Next-Cursor response header carries the cursor for the next page.
+    """
     service = ApprovalService(db)
     employee_id = current_user.get("employee_id")
     if not employee_id:
         return []
-    return await service.get_pending_approvals(uuid_lib.UUID(employee_id))
+    
+    after = decode_cursor(cursor, 2)
+    if after:
+        try:
+            after = (datetime.fromisoformat(after[0]), uuid_lib.UUID(after[1]))
+        except ValueError:
+            raise BadRequestException("Invalid pagination cursor")
+    
+    approvals = await service.get_pending_approvals(
+        uuid_lib.UUID(employee_id),
+        limit=limit + 1 if limit else None,
+        after=after
+    )
+    if limit and len(approvals) > limit:
+        approvals = approvals[:limit]
+        last = approvals[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last["submitted_at"].isoformat(), last["id"])
+    return approvals
+
+
+@router.get("/pending/count")
+async def count_pending_approvals(
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Count pending approvals for current user without loading them (for badges and polling)"""
+    employee_id = current_user.get("employee_id")
+    if not employee_id:
+        return {"count": 0}
+    service = ApprovalService(db)
+    return {"count": await service.count_pending_approvals(uuid_lib.UUID(employee_id))}
 
 
 @router.get("/my-requests", response_model=List[ApprovalRequestResponse])
@@ -168,6 +209,24 @@ async def get_approval_stats(
     return await service.get_approval_stats(uuid_lib.UUID(employee_id))
 
 
+@router.get("/stats/backlog", response_model=ApprovalBacklog)
+async def get_approval_backlog(
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(require_hr_admin)
+):
+    """
+    Pending approvals per approver, request type and age bucket (SLA monitoring)
+    
+    Scoped to the caller's country unless they are a superuser or have admin:all.
+    Requires hr:admin permission
+    """
+    country_code = current_user.get("country_code")
+    if current_user.get("is_superuser") or "admin:all" in current_user.get("permissions", []):
+        country_code = None
+    service = ApprovalService(db)
+    return await service.get_approval_backlog(country_code)
+
+
 # Delegation endpoints
 @router.post("/delegations", response_model=ApprovalDelegationResponse, status_code=status.HTTP_201_CREATED)
 async def create_delegation(
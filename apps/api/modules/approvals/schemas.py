@@ -3,7 +3,7 @@ Approval Workflow Module - Pydantic Schemas
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 import uuid
 
@@ -36,6 +36,7 @@ class ApprovalRequestResponse(ApprovalRequestBase):
     status: ApprovalStatus
     submitted_at: datetime
     reviewed_at: Optional[datetime] = None
+    is_final_approval: bool = False
     created_at: datetime
     updated_at: Optional[datetime] = None
     
@@ -43,6 +44,11 @@ class ApprovalRequestResponse(ApprovalRequestBase):
         from_attributes = True
 
 
+class PendingApprovalResponse(ApprovalRequestResponse):
+    approval_level: int
+    employee_name: Optional[str] = None
+
+
 # Approval Delegation Schemas
 class ApprovalDelegationBase(BaseModel):
     supervisor_id: uuid.UUID
@@ -79,3 +85,20 @@ class ApprovalStats(BaseModel):
     travel_pending: int
     timesheet_pending: int
     performance_pending: int
+
+
+class ApprovalBacklogRow(BaseModel):
+    approver_id: uuid.UUID
+    approver_name: Optional[str] = None
+    request_type: ApprovalType
+    age_bucket: str
+    pending: int
+    oldest_submitted_at: datetime
+
+
+class ApprovalBacklog(BaseModel):
+    """Org-wide pending approvals per approver, type and age bucket"""
+    generated_at: datetime
+    age_buckets: List[str]
+    total_pending: int
+    rows: List[ApprovalBacklogRow]
@@ -2,13 +2,15 @@
 Approval Workflow Module - Service Layer
 """
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
 import uuid
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from modules.approvals.repositories import ApprovalRequestRepository, ApprovalDelegationRepository
+from modules.approvals.repositories import (
+    ApprovalRequestRepository, ApprovalDelegationRepository, APPROVAL_AGE_BUCKETS
+)
 from modules.approvals.schemas import (
     ApprovalRequestCreate, ApprovalRequestUpdate, ApprovalRequestResponse,
     ApprovalDelegationCreate, ApprovalDelegationUpdate, ApprovalDelegationResponse,
@@ -16,6 +18,11 @@ from modules.approvals.schemas import (
 )
 from modules.approvals.models import ApprovalStatus, ApprovalType
 from core.exceptions import NotFoundException, BadRequestException
+from core.cache import (
+    cache, invalidate_tags, approvals_tag, employee_tag, APPROVALS_ORG_TAG,
+    build_approval_stats_key, build_approval_backlog_key
+)
+from core.config import settings
 
 
 class ApprovalService:
@@ -34,9 +41,15 @@ class ApprovalService:
         approval_level: int = 1,
         previous_approval_id: uuid.UUID = None,
         is_final_approval: bool = False,
-        next_approver_id: uuid.UUID = None
+        next_approver_id: uuid.UUID = None,
+        commit: bool = True
     ) -> ApprovalRequestResponse:
-        """Create a new approval request"""
+        """
+        Create a new approval request
+        
+        With commit=False the approval only joins the caller's transaction;
+        the caller commits and then invalidates the approver's cached views.
+        """
         from modules.employees.models import Employee
         from sqlalchemy import select
         
@@ -59,8 +72,11 @@ class ApprovalService:
             approval_level=approval_level,
             previous_approval_id=previous_approval_id,
             is_final_approval=is_final_approval,
-            next_approver_id=next_approver_id
+            next_approver_id=next_approver_id,
+            commit=commit
         )
+        if commit:
+            await self._invalidate_approval_caches(approval)
         return ApprovalRequestResponse.model_validate(approval)
     
     async def get_approval_request(self, approval_id: uuid.UUID) -> ApprovalRequestResponse:
@@ -81,17 +97,18 @@ class ApprovalService:
             return ApprovalRequestResponse.model_validate(approval)
         return None
     
-    async def get_pending_approvals(self, approver_id: uuid.UUID) -> List[dict]:
-        """Get all pending approvals for an approver"""
-        approvals = await self.approval_repo.get_pending_for_approver(approver_id)
-        result = []
-        for approval in approvals:
-            approval_dict = ApprovalRequestResponse.model_validate(approval).model_dump()
-            # Add employee name for frontend display
-            if approval.employee:
-                approval_dict["employee_name"] = f"{approval.employee.first_name} {approval.employee.last_name}"
-            result.append(approval_dict)
-        return result
+    async def get_pending_approvals(
+        self,
+        approver_id: uuid.UUID,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[datetime, uuid.UUID]] = None
+    ) -> List[dict]:
+        """Get pending approvals an approver can act on now, newest first"""
+        return await self.approval_repo.get_pending_for_approver(approver_id, limit, after)
+    
+    async def count_pending_approvals(self, approver_id: uuid.UUID) -> int:
+        """Count pending approvals an approver can act on now"""
+        return await self.approval_repo.count_pending_for_approver(approver_id)
     
     async def get_employee_requests(self, employee_id: uuid.UUID) -> List[ApprovalRequestResponse]:
         """Get all approval requests submitted by an employee"""
@@ -141,6 +158,7 @@ class ApprovalService:
                 is_final_approval=is_final
             )
             
+            await self._invalidate_approval_caches(approval)
             approvals.append(ApprovalRequestResponse.model_validate(approval))
             previous_approval_id = approval.id
             
@@ -175,9 +193,15 @@ class ApprovalService:
         if approval.status != ApprovalStatus.PENDING:
             raise BadRequestException("This request has already been reviewed")
         
-        # Update approval status
+        # Update approval status; the decision, the next approval in the chain
+        # and the queued notifications are committed together
         update_data = ApprovalRequestUpdate(status=ApprovalStatus.APPROVED, comments=comments)
-        updated = await self.approval_repo.update(approval_id, update_data)
+        updated = await self.approval_repo.update(approval_id, update_data, commit=False)
+        changed = [updated]
+        
+        from core.email import email_service
+        from modules.employees.models import Employee
+        from sqlalchemy import select
         
         # If not final approval and has next_approver_id, create next approval in chain
         if not updated.is_final_approval and updated.next_approver_id:
@@ -193,20 +217,18 @@ class ApprovalService:
                 country_code=updated.country_code,
                 approval_level=updated.approval_level + 1,
                 previous_approval_id=approval_id,
-                is_final_approval=True  # Assume this is final (can be adjusted per workflow)
+                is_final_approval=True,  # Assume this is final (can be adjusted per workflow)
+                commit=False
             )
+            changed.append(next_approval)
             
             # Send notification to next approver
-            from core.email import email_service
-            from modules.employees.models import Employee
-            from sqlalchemy import select
-            
             next_approver_result = await self.db.execute(
                 select(Employee).where(Employee.id == updated.next_approver_id)
             )
             next_approver = next_approver_result.scalar_one_or_none()
             
-            if next_approver and next_approver.email:
+            if next_approver and next_approver.work_email:
                 employee_result = await self.db.execute(
                     select(Employee).where(Employee.id == updated.employee_id)
                 )
@@ -214,10 +236,12 @@ class ApprovalService:
                 employee_name = f"{employee.first_name} {employee.last_name}" if employee else "Employee"
                 
                 await email_service.send_approval_request_notification(
-                    to_email=next_approver.email,
+                    to_email=next_approver.work_email,
                     employee_name=employee_name,
                     request_type=updated.request_type.value,
-                    request_details={"Previous Approver": f"{updated.approver.first_name} {updated.approver.last_name}"}
+                    request_details={"Previous Approver": f"{updated.approver.first_name} {updated.approver.last_name}"},
+                    db=self.db,
+                    dedupe_key=f"approval:{next_approval.id}:requested"
                 )
         elif updated.is_final_approval:
             # This is the final approval - notify employee
@@ -225,12 +249,14 @@ class ApprovalService:
                 select(Employee).where(Employee.id == updated.employee_id)
             )
             employee = employee_result.scalar_one_or_none()
-            if employee and employee.email:
+            if employee and employee.work_email:
                 await email_service.send_approval_status_notification(
-                    to_email=employee.email,
+                    to_email=employee.work_email,
                     request_type=updated.request_type.value,
                     status="approved",
-                    comments=comments
+                    comments=comments,
+                    db=self.db,
+                    dedupe_key=f"approval:{updated.id}:approved"
                 )
         else:
             # Notify next approver (if exists)
@@ -240,7 +266,7 @@ class ApprovalService:
                 updated.approval_level
             )
             if next_approval and next_approval.approver:
-                if next_approval.approver.email:
+                if next_approval.approver.work_email:
                     employee_result = await self.db.execute(
                         select(Employee).where(Employee.id == updated.employee_id)
                     )
@@ -248,12 +274,20 @@ class ApprovalService:
                     employee_name = f"{employee.first_name} {employee.last_name}" if employee else "Employee"
                     
                     await email_service.send_approval_request_notification(
-                        to_email=next_approval.approver.email,
+                        to_email=next_approval.approver.work_email,
                         employee_name=employee_name,
                         request_type=updated.request_type.value,
-                        request_details={"Previous Approver": f"{updated.approver.first_name} {updated.approver.last_name}"}
+                        request_details={"Previous Approver": f"{updated.approver.first_name} {updated.approver.last_name}"},
+                        db=self.db,
+                        dedupe_key=f"approval:{next_approval.id}:requested"
                     )
         
+        # Commit the decision with its queued notifications (delivered by the outbox dispatcher)
+        await self.db.commit()
+        await self.db.refresh(updated)
+        for changed_approval in changed:
+            await self._invalidate_approval_caches(changed_approval)
+        
         return ApprovalRequestResponse.model_validate(updated)
     
     async def reject_request(
@@ -277,6 +311,7 @@ class ApprovalService:
         
         update_data = ApprovalRequestUpdate(status=ApprovalStatus.REJECTED, comments=comments)
         updated = await self.approval_repo.update(approval_id, update_data)
+        await self._invalidate_approval_caches(updated)
         return ApprovalRequestResponse.model_validate(updated)
     
     async def cancel_request(self, approval_id: uuid.UUID, employee_id: uuid.UUID) -> ApprovalRequestResponse:
@@ -293,13 +328,49 @@ class ApprovalService:
         
         update_data = ApprovalRequestUpdate(status=ApprovalStatus.CANCELLED)
         updated = await self.approval_repo.update(approval_id, update_data)
+        await self._invalidate_approval_caches(updated)
         return ApprovalRequestResponse.model_validate(updated)
     
     async def get_approval_stats(self, approver_id: uuid.UUID) -> ApprovalStats:
-        """Get approval statistics for dashboard"""
-        stats = await self.approval_repo.get_stats_for_approver(approver_id)
+        """Get approval statistics for dashboard (cached until the approver's approvals change)"""
+        stats = await cache.get_or_set(
+            build_approval_stats_key(approver_id),
+            lambda: self.approval_repo.get_stats_for_approver(approver_id),
+            ttl=settings.APPROVAL_STATS_CACHE_TTL_SECONDS,
+            tags=[approvals_tag(approver_id)]
+        )
         return ApprovalStats(**stats)
     
+    async def get_approval_backlog(self, country_code: Optional[str] = None) -> dict:
+        """
+        Org-wide pending approvals per approver, request type and age bucket
+        
+        Cached until any approval changes (APPROVALS_ORG_TAG).
+        """
+        async def load_backlog():
+            rows = await self.approval_repo.get_pending_breakdown(country_code)
+            return {
+                "generated_at": datetime.utcnow().isoformat(),
+                "age_buckets": [label for label, _ in APPROVAL_AGE_BUCKETS],
+                "total_pending": sum(row["pending"] for row in rows),
+                "rows": [
+                    {
+                        **row,
+                        "approver_id": str(row["approver_id"]),
+                        "request_type": row["request_type"].value,
+                        "oldest_submitted_at": row["oldest_submitted_at"].isoformat()
+                    }
+                    for row in rows
+                ]
+            }
+        
+        return await cache.get_or_set(
+            build_approval_backlog_key(country_code),
+            load_backlog,
+            ttl=settings.APPROVAL_STATS_CACHE_TTL_SECONDS,
+            tags=[APPROVALS_ORG_TAG]
+        )
+    
     # Delegation methods
     async def create_delegation(self, delegation_data: ApprovalDelegationCreate) -> ApprovalDelegationResponse:
         """Create a new delegation"""
@@ -339,6 +410,13 @@ class ApprovalService:
             raise NotFoundException("Delegation not found")
         return ApprovalDelegationResponse.model_validate(delegation)
     
+    async def _invalidate_approval_caches(self, approval):
+        """Drop cached inbox/stats for the approver and views of the requester"""
+        tags = [approvals_tag(approval.approver_id), employee_tag(approval.employee_id), APPROVALS_ORG_TAG]
+        if approval.next_approver_id:
+            tags.append(approvals_tag(approval.next_approver_id))
+        await invalidate_tags(*tags)
+    
     async def _update_related_entity_status(self, approval):
         """
         Update the status of the related entity (leave request, grievance, etc.) when final approval is given
@@ -422,9 +500,9 @@ class ApprovalService:
                         select(Employee).where(Employee.id == resignation.employee_id)
                     )
                     employee = employee_result.scalar_one_or_none()
-                    if employee and employee.email:
+                    if employee and employee.work_email:
                         await email_service.send_email(
-                            to_email=employee.email,
+                            to_email=employee.work_email,
                             subject="Resignation Approved - Ready for Exit Interview",
                             html_body=f"""
                             <p>Dear {employee.first_name},</p>
@@ -432,8 +510,11 @@ class ApprovalService:
                             <p><strong>Intended Last Working Day:</strong> {resignation.intended_last_working_day.strftime('%B %d, %Y')}</p>
                             <p>Your resignation is now ready for the exit interview process. Please coordinate with HR to schedule your exit interview.</p>
                             <p>You can view the status of your resignation in your Personnel File.</p>
-                            """
+                            """,
+                            db=self.db,
+                            dedupe_key=f"resignation:{resignation.id}:accepted"
                         )
+                        await self.db.commit()
     
     async def _generate_workforce_approval_pdf(self, approval):
         """Generate PDF approval document for workforce requisition"""
@@ -12,7 +12,7 @@ import uuid
 import logging
 
 from modules.auth.models import User, Role, Permission, LoginAttempt, RefreshToken
-from core.security import hash_password
+from core.password_hashing import password_hasher
 from core.retry import retry_on_db_error
 
 logger = logging.getLogger(__name__)
@@ -76,7 +76,7 @@ class UserRepository:
         """Create new user"""
         # Hash password
         if 'password' in user_data:
-            user_data['hashed_password'] = hash_password(user_data.pop('password'))
+            user_data['hashed_password'] = await password_hasher.hash(user_data.pop('password'))
         
         # Normalize email
         if 'email' in user_data:
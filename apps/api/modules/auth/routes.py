@@ -13,6 +13,7 @@ import io
 
 from core.database import get_db
 from core.dependencies import get_current_user, get_current_active_user, require_admin
+from core.principal_cache import principal_cache
 from modules.auth.services import AuthService
 from modules.auth.repositories import UserRepository, RoleRepository, PermissionRepository
 from modules.auth.schemas import (
@@ -267,13 +268,30 @@ async def export_users_with_credentials(
     Export all users with their credentials (passwords will be reset/generated)
     Returns CSV file with email, password, name, role, etc.
     """
+    from datetime import datetime
+    from core.password_hashing import password_hasher
     from core.security import generate_secure_password
     from modules.auth.repositories import UserRepository
-    from modules.auth.models import User
+    from modules.employees.models import Employee
     
     user_repo = UserRepository(db)
     users = await user_repo.get_all(skip=0, limit=10000)  # Get all users
     
+    # Generate new passwords for export and hash them in parallel on the hashing pool
+    new_passwords = [generate_secure_password(12) for _ in users]
+    hashed_passwords = await password_hasher.hash_many(new_passwords)
+    
+    # Linked employees for every exported user, in one query
+    linked = {}
+    if users:
+        emp_result = await db.execute(
+            select(Employee.user_id, Employee.id, Employee.employee_number).where(
+                Employee.user_id.in_([user.id for user in users]),
+                Employee.is_deleted == False
+            )
+        )
+        linked = {row.user_id: row for row in emp_result.all()}
+    
     # Create CSV in memory
     output = io.StringIO()
     writer = csv.writer(output)
@@ -294,28 +312,16 @@ async def export_users_with_credentials(
     ])
     
     # Reset passwords and write user data
-    for user in users:
-        # Generate new password for export
-        new_password = generate_secure_password(12)
-        
-        # Update user password
-        await user_repo.update(user.id, {"password": new_password})
-        await db.commit()
+    changed_at = datetime.utcnow()
+    for user, new_password, hashed_password in zip(users, new_passwords, hashed_passwords):
+        user.hashed_password = hashed_password
+        user.password_changed_at = changed_at
         
         # Get role names
         role_names = [role.display_name for role in user.roles] if user.roles else []
         role_str = ", ".join(role_names) if role_names else "No Role"
         
-        # Get employee info if linked
-        employee_number = None
-        if user.employee_id:
-            from modules.employees.models import Employee
-            emp_result = await db.execute(
-                select(Employee).where(Employee.id == user.employee_id)
-            )
-            employee = emp_result.scalar_one_or_none()
-            if employee:
-                employee_number = employee.employee_number
+        employee = linked.get(user.id)
         
         writer.writerow([
             user.email,
@@ -327,10 +333,13 @@ async def export_users_with_credentials(
             role_str,
             "Yes" if user.is_active else "No",
             "Yes" if user.is_verified else "No",
-            str(user.employee_id) if user.employee_id else "",
-            employee_number or "",
+            str(employee.id) if employee else "",
+            employee.employee_number if employee else "",
         ])
     
+    # One commit for every reset, so a failed export leaves all passwords unchanged
+    await db.commit()
+    
     output.seek(0)
     
     # Return CSV file
@@ -390,6 +399,7 @@ async def update_user(
                 user.roles.append(role)
     
     await db.commit()  # Explicit commit for update operation
+    await principal_cache.invalidate_user(user_id)
     await db.refresh(user)
     return user
 
@@ -447,6 +457,7 @@ async def delete_user(
         from core.exceptions import NotFoundException
         raise NotFoundException(resource="User")
     await db.commit()  # Explicit commit for delete operation
+    await principal_cache.invalidate_user(user_id)
 
 
 @router.patch("/users/{user_id}/password")
@@ -461,7 +472,7 @@ async def reset_user_password(
     
     - **new_password**: New password (min 8 chars)
     """
-    from core.security import hash_password
+    from core.password_hashing import password_hasher
     
     # Validate new password
     new_password = password_data.get("new_password")
@@ -482,7 +493,7 @@ async def reset_user_password(
         raise NotFoundException(resource="User")
     
     # Update password
-    hashed_password = hash_password(new_password)
+    hashed_password = await password_hasher.hash(new_password)
     update_data = {
         "hashed_password": hashed_password,
         "password_changed_at": None  # Will be set by DB trigger/default
@@ -527,6 +538,7 @@ async def create_role(
     
     role = await role_repo.create(role_data.model_dump(exclude={'permission_ids'}))
     await db.commit()  # Explicit commit for create operation
+    await principal_cache.invalidate_all()
     await db.refresh(role)
     return role
 
@@ -563,5 +575,6 @@ async def create_permission(
     
     permission = await perm_repo.create(permission_data.model_dump())
     await db.commit()  # Explicit commit for create operation
+    await principal_cache.invalidate_all()
     await db.refresh(permission)
     return permission
@@ -13,7 +13,8 @@ import logging
 from modules.auth.repositories import UserRepository, RoleRepository, LoginAttemptRepository
 from modules.auth.schemas import UserCreate, LoginRequest
 from modules.auth.models import User
-from core.security import verify_password, create_access_token, create_refresh_token, hash_password, decode_token
+from core.security import create_access_token, create_refresh_token, decode_token
+from core.password_hashing import password_hasher
 from core.exceptions import InvalidCredentialsException, AlreadyExistsException, NotFoundException, UnauthorizedException, BadRequestException
 from core.config import settings
 
@@ -52,8 +53,14 @@ class AuthService:
         # Get user by email (include employee relationship for login)
         user = await self.user_repo.get_by_email(credentials.email, include_employee=True)
         
-        # Verify user exists and password is correct
-        if not user or not verify_password(credentials.password, user.hashed_password):
+        # Verify user exists and password is correct; a hash made with an old
+        # work factor comes back upgraded and is saved with the login below
+        password_ok, upgraded_hash = False, None
+        if user:
+            password_ok, upgraded_hash = await password_hasher.verify_and_update(
+                credentials.password, user.hashed_password
+            )
+        if not password_ok:
             # Log failed attempt
             await self.login_attempt_repo.create({
                 "email": credentials.email,
@@ -138,6 +145,8 @@ class AuthService:
         if int(user.failed_login_attempts or "0") > 0:
             update_data["failed_login_attempts"] = "0"
             update_data["locked_until"] = None
+        if upgraded_hash:
+            update_data["hashed_password"] = upgraded_hash
         
         # Update user in background (don't block login)
         try:
@@ -387,12 +396,12 @@ class AuthService:
             raise NotFoundException(resource="User")
         
         # Verify current password
-        if not verify_password(current_password, user.hashed_password):
+        if not await password_hasher.verify(current_password, user.hashed_password):
             raise InvalidCredentialsException(message="Current password is incorrect")
         
         # Update password
         await self.user_repo.update(user_id, {
-            "hashed_password": hash_password(new_password),
+            "hashed_password": await password_hasher.hash(new_password),
             "password_changed_at": datetime.utcnow()
         })
         
@@ -492,7 +501,7 @@ class AuthService:
         
         # Update password
         await self.user_repo.update(user.id, {
-            "hashed_password": hash_password(new_password),
+            "hashed_password": await password_hasher.hash(new_password),
             "password_changed_at": datetime.utcnow(),
             "reset_token": None,
             "reset_token_expires": None,
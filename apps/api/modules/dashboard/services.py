@@ -4,27 +4,60 @@ Business logic for dashboard data aggregation
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func, or_
-from sqlalchemy.orm import selectinload
-from typing import Dict, Any, List
-from datetime import datetime, timedelta
+from sqlalchemy import select, and_, func, or_, case
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from datetime import date, datetime, timedelta
 import uuid
-import asyncio
 import logging
 
-from modules.employees.models import Employee
+from modules.employees.models import Employee, EmployeeHierarchy, Department, Position, EmploymentStatus
 from modules.auth.models import User
 from modules.approvals.services import ApprovalService
-from core.cache import cache, build_dashboard_key, invalidate_cache
+from core.cache import (
+    cache, build_dashboard_key, employee_tag, department_tag, approvals_tag, tenant_tag
+)
+from core.config import settings
+from core.fanout import fan_out
 
 logger = logging.getLogger(__name__)
 
 
+# Values shown for a component that failed and has no last good value
+DASHBOARD_COMPONENT_DEFAULTS = {
+    "approvals": {
+        "total_pending": 0,
+        "leave_pending": 0,
+        "travel_pending": 0,
+        "timesheet_pending": 0,
+        "performance_pending": 0
+    },
+    "recentPayslips": [],
+    "recentLeaveRequests": [],
+    "recentTravelRequests": [],
+    "grievances": {"total": 0, "resolved": 0, "pending": 0},
+    "leaveBalance": {"annual": 0, "sick": 0, "total": 0},
+    "teamMembers": [],
+    "approvalStats": {
+        "total_pending": 0,
+        "leave_pending": 0,
+        "travel_pending": 0,
+        "timesheet_pending": 0,
+        "performance_pending": 0
+    },
+    "pendingApprovals": []
+}
+
+# Attendance rate window for team metrics
+TEAM_ATTENDANCE_WINDOW_DAYS = 30
+
+
 class DashboardService:
     """Service for dashboard operations"""
     
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, session_factory=None):
         self.db = db
+        # Factory for the per-component sessions of the parallel fan-out
+        self.session_factory = session_factory
         self.approval_service = ApprovalService(db)
     
     async def check_if_supervisor(self, user_id: uuid.UUID) -> bool:
@@ -51,410 +84,521 @@ class DashboardService:
     async def get_employee_dashboard(self, user_id: uuid.UUID) -> Dict[str, Any]:
         """
         Get employee personal dashboard data with caching and parallel queries
+        
+        Each component runs on its own pooled session with its own deadline
+        (see core/fanout.py). A component that fails or times out is served
+        from its last good value and listed in staleComponents; a dashboard
+        with stale parts is not cached so the next request retries them.
         """
-        # Check cache first (5 minute TTL)
         cache_key = build_dashboard_key(str(user_id), "employee")
-        cached_data = cache.get(cache_key)
+        cached_data = await cache.get(cache_key)
         if cached_data is not None:
             logger.debug(f"Cache hit for dashboard: {cache_key}")
             return cached_data
         
         try:
-            # Get employee record
             result = await self.db.execute(
-                select(Employee)
-                .options(
-                    selectinload(Employee.position),
-                    selectinload(Employee.department)
+                select(
+                    Employee.id,
+                    Employee.first_name,
+                    Employee.last_name,
+                    Employee.employee_number,
+                    Employee.department_id,
+                    Employee.country_code,
+                    Position.title.label("position"),
+                    Department.name.label("department")
                 )
+                .outerjoin(Position, Position.id == Employee.position_id)
+                .outerjoin(Department, Department.id == Employee.department_id)
                 .where(Employee.user_id == user_id)
             )
-            employee = result.scalar_one_or_none()
-            
-            if not employee:
-                return self._get_empty_employee_dashboard()
-            
-            # Extract employee data before any potential transaction issues
-            employee_id = employee.id
-            employee_first_name = employee.first_name
-            employee_last_name = employee.last_name
-            employee_number = employee.employee_number
-            employee_position = employee.position.title if employee.position else "N/A"
-            employee_department = employee.department.name if employee.department else "N/A"
-            
-            # Parallelize all independent queries for better performance
-            # Run all data fetching queries concurrently
-            try:
-                approval_stats_task = self.approval_service.get_approval_stats(employee_id)
-                payslips_task = self._get_employee_payslips(employee_id)
-                leave_requests_task = self._get_employee_leave_requests(employee_id)
-                travel_requests_task = self._get_employee_travel_requests(employee_id)
-                grievance_stats_task = self._get_employee_grievances(employee_id)
-                leave_balance_task = self._get_employee_leave_balance(employee_id)
-                
-                # Wait for all queries to complete in parallel
-                results = await asyncio.gather(
-                    approval_stats_task,
-                    payslips_task,
-                    leave_requests_task,
-                    travel_requests_task,
-                    grievance_stats_task,
-                    leave_balance_task,
-                    return_exceptions=True
-                )
-                
-                # Handle approval stats (first result)
-                if isinstance(results[0], Exception):
-                    logger.warning(f"Error fetching approval stats: {results[0]}")
-                    approvals_data = {
-                        "total_pending": 0,
-                        "leave_pending": 0,
-                        "travel_pending": 0,
-                        "timesheet_pending": 0,
-                        "performance_pending": 0
-                    }
-                else:
-                    approval_stats = results[0]
-                    approvals_data = {
-                        "total_pending": approval_stats.total_pending,
-                        "leave_pending": approval_stats.leave_pending,
-                        "travel_pending": approval_stats.travel_pending,
-                        "timesheet_pending": approval_stats.timesheet_pending,
-                        "performance_pending": approval_stats.performance_pending
-                    }
-                
-                # Extract other results (handle exceptions gracefully)
-                recent_payslips = results[1] if not isinstance(results[1], Exception) else []
-                recent_leave_requests = results[2] if not isinstance(results[2], Exception) else []
-                recent_travel_requests = results[3] if not isinstance(results[3], Exception) else []
-                grievance_stats = results[4] if not isinstance(results[4], Exception) else {"total": 0, "resolved": 0, "pending": 0}
-                leave_balance = results[5] if not isinstance(results[5], Exception) else {"annual": 0, "sick": 0, "total": 0}
-                
-            except Exception as e:
-                logger.error(f"Error in parallel queries: {e}")
-                # Fallback to empty data if parallel queries fail
-                approvals_data = {
-                    "total_pending": 0,
-                    "leave_pending": 0,
-                    "travel_pending": 0,
-                    "timesheet_pending": 0,
-                    "performance_pending": 0
-                }
-                recent_payslips = []
-                recent_leave_requests = []
-                recent_travel_requests = []
-                grievance_stats = {"total": 0, "resolved": 0, "pending": 0}
-                leave_balance = {"annual": 0, "sick": 0, "total": 0}
-            
-            dashboard_data = {
-                "employee": {
-                    "id": str(employee_id),
-                    "name": f"{employee_first_name} {employee_last_name}",
-                    "position": employee_position,
-                    "department": employee_department,
-                    "employee_number": employee_number
-                },
-                "leaveBalance": leave_balance,
-                "recentLeaveRequests": recent_leave_requests,
-                "recentTravelRequests": recent_travel_requests,
-                "recentPayslips": recent_payslips,
-                "attendance": {
-                    "present": 20,
-                    "absent": 1,
-                    "late": 2,
-                    "total": 23
-                },
-                "grievances": grievance_stats,
-                "performance": {
-                    "lastReviewDate": None,
-                    "rating": "N/A",
-                    "nextReviewDate": None
-                },
-                "approvals": approvals_data
-            }
-            
-            # Cache the result for 5 minutes (300 seconds)
-            cache.set(cache_key, dashboard_data, ttl=300)
-            
-            return dashboard_data
+            employee = result.mappings().first()
         except Exception as e:
             logger.error(f"Error in get_employee_dashboard: {e}")
-            # Rollback on error
             await self.db.rollback()
             return self._get_empty_employee_dashboard()
+        
+        if not employee:
+            return self._get_empty_employee_dashboard()
+        
+        employee_id = employee["id"]
+        cache_tags = [employee_tag(employee_id), approvals_tag(employee_id)]
+        if employee["department_id"]:
+            cache_tags.append(department_tag(employee["department_id"]))
+        if employee["country_code"]:
+            cache_tags.append(tenant_tag(employee["country_code"]))
+        
+        components, stale = await self._load_components(
+            build_dashboard_key(str(employee_id), "employee:last-good"),
+            {
+                "approvals": lambda db: self._get_employee_approval_stats(db, employee_id),
+                "recentPayslips": lambda db: self._get_employee_payslips(db, employee_id),
+                "recentLeaveRequests": lambda db: self._get_employee_leave_requests(db, employee_id),
+                "recentTravelRequests": lambda db: self._get_employee_travel_requests(db, employee_id),
+                "grievances": lambda db: self._get_employee_grievances(db, employee_id),
+                "leaveBalance": lambda db: self._get_employee_leave_balance(db, employee_id)
+            }
+        )
+        
+        dashboard_data = {
+            "employee": {
+                "id": str(employee_id),
+                "name": f"{employee['first_name']} {employee['last_name']}",
+                "position": employee["position"] or "N/A",
+                "department": employee["department"] or "N/A",
+                "employee_number": employee["employee_number"]
+            },
+            "leaveBalance": components["leaveBalance"],
+            "recentLeaveRequests": components["recentLeaveRequests"],
+            "recentTravelRequests": components["recentTravelRequests"],
+            "recentPayslips": components["recentPayslips"],
+            "attendance": {
+                "present": 20,
+                "absent": 1,
+                "late": 2,
+                "total": 23
+            },
+            "grievances": components["grievances"],
+            "performance": {
+                "lastReviewDate": None,
+                "rating": "N/A",
+                "nextReviewDate": None
+            },
+            "approvals": components["approvals"],
+            "staleComponents": stale
+        }
+        
+        if not stale:
+            await cache.set(cache_key, dashboard_data, ttl=settings.DASHBOARD_CACHE_TTL_SECONDS, tags=cache_tags)
+        
+        return dashboard_data
+    
+    async def _load_components(
+        self,
+        last_good_key: str,
+        components: Dict[str, Callable[[AsyncSession], Awaitable[Any]]]
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Fan components out over pooled sessions, falling back per component
+        
+        Successful values are remembered under last_good_key; a component
+        that fails or times out gets its last good value (or the empty
+        default) and its name is returned in the stale list.
+        """
+        results, errors = await fan_out(components, session_factory=self.session_factory)
+        
+        last_good = {}
+        if errors:
+            last_good = await cache.get(last_good_key) or {}
+        
+        stale = []
+        for name, error in errors.items():
+            logger.warning(f"Dashboard component {name} failed ({type(error).__name__}: {error})")
+            results[name] = last_good.get(name, DASHBOARD_COMPONENT_DEFAULTS.get(name))
+            stale.append(name)
+        
+        await cache.set(
+            last_good_key,
+            {**last_good, **{name: value for name, value in results.items() if name not in errors}},
+            ttl=settings.DASHBOARD_LAST_GOOD_TTL_SECONDS
+        )
+        return results, sorted(stale)
     
-    async def _get_employee_payslips(self, employee_id: uuid.UUID) -> List[Dict[str, Any]]:
+    @staticmethod
+    async def _get_employee_approval_stats(db: AsyncSession, employee_id: uuid.UUID) -> Dict[str, int]:
+        """Get pending approval counts for an employee acting as approver"""
+        approval_stats = await ApprovalService(db).get_approval_stats(employee_id)
+        return {
+            "total_pending": approval_stats.total_pending,
+            "leave_pending": approval_stats.leave_pending,
+            "travel_pending": approval_stats.travel_pending,
+            "timesheet_pending": approval_stats.timesheet_pending,
+            "performance_pending": approval_stats.performance_pending
+        }
+    
+    @staticmethod
+    async def _get_employee_payslips(db: AsyncSession, employee_id: uuid.UUID) -> List[Dict[str, Any]]:
         """Get recent approved/processed payslips for an employee"""
-        try:
-            from modules.payroll.models import Payroll, PayrollEntry, PayrollStatus
-            
-            # Get payroll entries for this employee from approved/processed payrolls
-            result = await self.db.execute(
-                select(PayrollEntry, Payroll)
-                .join(Payroll, PayrollEntry.payroll_id == Payroll.id)
-                .where(
-                    and_(
-                        PayrollEntry.employee_id == employee_id,
-                        Payroll.status.in_([PayrollStatus.APPROVED, PayrollStatus.PROCESSED]),
-                        Payroll.is_deleted == False
-                    )
+        from modules.payroll.models import Payroll, PayrollEntry, PayrollStatus
+        
+        # Get payroll entries for this employee from approved/processed payrolls
+        result = await db.execute(
+            select(
+                PayrollEntry.id,
+                PayrollEntry.net_salary,
+                PayrollEntry.currency,
+                Payroll.id.label("payroll_id"),
+                Payroll.year,
+                Payroll.month,
+                Payroll.status
+            )
+            .join(Payroll, PayrollEntry.payroll_id == Payroll.id)
+            .where(
+                and_(
+                    PayrollEntry.employee_id == employee_id,
+                    Payroll.status.in_([PayrollStatus.APPROVED, PayrollStatus.PROCESSED]),
+                    Payroll.is_deleted == False
                 )
-                .order_by(Payroll.year.desc(), Payroll.month.desc())
-                .limit(5)
             )
-            entries_with_payroll = result.all()
-            
-            payslips = []
-            for entry, payroll in entries_with_payroll:
-                payslips.append({
-                    "id": str(entry.id),
-                    "payroll_id": str(payroll.id),
-                    "period": f"{payroll.year}-{payroll.month:02d}",
-                    "amount": float(entry.net_salary),
-                    "currency": entry.currency,
-                    "status": payroll.status.value if hasattr(payroll.status, 'value') else payroll.status
-                })
-            
-            return payslips
-        except Exception as e:
-            # If there's an error, rollback and return empty list
-            await self.db.rollback()
-            print(f"Error fetching payslips: {e}")
-            return []
+            .order_by(Payroll.year.desc(), Payroll.month.desc())
+            .limit(5)
+        )
+        
+        return [
+            {
+                "id": str(row.id),
+                "payroll_id": str(row.payroll_id),
+                "period": f"{row.year}-{row.month:02d}",
+                "amount": float(row.net_salary),
+                "currency": row.currency,
+                "status": row.status.value if hasattr(row.status, 'value') else row.status
+            }
+            for row in result.all()
+        ]
     
-    async def _get_employee_leave_requests(self, employee_id: uuid.UUID) -> List[Dict[str, Any]]:
+    @staticmethod
+    async def _get_employee_leave_requests(db: AsyncSession, employee_id: uuid.UUID) -> List[Dict[str, Any]]:
         """Get recent leave requests for an employee"""
-        try:
-            from modules.leave.models import LeaveRequest
-            
-            result = await self.db.execute(
-                select(LeaveRequest)
-                .where(
-                    and_(
-                        LeaveRequest.employee_id == employee_id,
-                        LeaveRequest.is_deleted == False
-                    )
+        from modules.leave.models import LeaveRequest
+        
+        result = await db.execute(
+            select(
+                LeaveRequest.id,
+                LeaveRequest.leave_type,
+                LeaveRequest.start_date,
+                LeaveRequest.end_date,
+                LeaveRequest.total_days,
+                LeaveRequest.status
+            )
+            .where(
+                and_(
+                    LeaveRequest.employee_id == employee_id,
+                    LeaveRequest.is_deleted == False
                 )
-                .order_by(LeaveRequest.created_at.desc())
-                .limit(5)
             )
-            leave_requests = result.scalars().all()
-            
-            requests = []
-            for req in leave_requests:
-                # Calculate days
-                days = (req.end_date - req.start_date).days + 1 if req.start_date and req.end_date else 0
-                requests.append({
-                    "id": str(req.id),
-                    "leave_type": req.leave_type,
-                    "start_date": req.start_date.isoformat() if req.start_date else None,
-                    "end_date": req.end_date.isoformat() if req.end_date else None,
-                    "status": req.status,
-                    "days": days
-                })
-            
-            return requests
-        except Exception as e:
-            await self.db.rollback()
-            print(f"Error fetching leave requests: {e}")
-            return []
+            .order_by(LeaveRequest.created_at.desc())
+            .limit(5)
+        )
+        
+        requests = []
+        for req in result.all():
+            # Working days counted when the request was submitted
+            days = float(req.total_days) if req.total_days is not None else 0
+            requests.append({
+                "id": str(req.id),
+                "leave_type": req.leave_type,
+                "start_date": req.start_date.isoformat() if req.start_date else None,
+                "end_date": req.end_date.isoformat() if req.end_date else None,
+                "status": req.status,
+                "days": days
+            })
+        return requests
     
-    async def _get_employee_travel_requests(self, employee_id: uuid.UUID) -> List[Dict[str, Any]]:
+    @staticmethod
+    async def _get_employee_travel_requests(db: AsyncSession, employee_id: uuid.UUID) -> List[Dict[str, Any]]:
         """Get recent travel requests for an employee"""
-        try:
-            from modules.travel.models import TravelRequest
-            
-            result = await self.db.execute(
-                select(TravelRequest)
-                .where(
-                    and_(
-                        TravelRequest.employee_id == employee_id,
-                        TravelRequest.is_deleted == False
-                    )
+        from modules.travel.models import TravelRequest
+        
+        result = await db.execute(
+            select(
+                TravelRequest.id,
+                TravelRequest.destination,
+                TravelRequest.departure_date,
+                TravelRequest.return_date,
+                TravelRequest.status
+            )
+            .where(
+                and_(
+                    TravelRequest.employee_id == employee_id,
+                    TravelRequest.is_deleted == False
                 )
-                .order_by(TravelRequest.created_at.desc())
-                .limit(5)
             )
-            travel_requests = result.scalars().all()
-            
-            requests = []
-            for req in travel_requests:
-                requests.append({
-                    "id": str(req.id),
-                    "destination": req.destination,
-                    "start_date": req.departure_date.isoformat() if req.departure_date else None,
-                    "end_date": req.return_date.isoformat() if req.return_date else None,
-                    "status": req.status
-                })
-            
-            return requests
-        except Exception as e:
-            await self.db.rollback()
-            print(f"Error fetching travel requests: {e}")
-            return []
+            .order_by(TravelRequest.created_at.desc())
+            .limit(5)
+        )
+        
+        return [
+            {
+                "id": str(req.id),
+                "destination": req.destination,
+                "start_date": req.departure_date.isoformat() if req.departure_date else None,
+                "end_date": req.return_date.isoformat() if req.return_date else None,
+                "status": req.status
+            }
+            for req in result.all()
+        ]
     
-    async def _get_employee_grievances(self, employee_id: uuid.UUID) -> Dict[str, int]:
-        """Get grievance statistics for an employee"""
-        try:
-            from modules.grievance.models import Grievance
-            
-            # Get all grievances
-            result = await self.db.execute(
-                select(Grievance)
-                .where(
-                    and_(
-                        Grievance.employee_id == employee_id,
-                        Grievance.is_deleted == False
-                    )
+    @staticmethod
+    async def _get_employee_grievances(db: AsyncSession, employee_id: uuid.UUID) -> Dict[str, int]:
+        """Get grievance statistics for an employee (counted in the database)"""
+        from modules.grievance.models import Grievance
+        
+        result = await db.execute(
+            select(Grievance.status, func.count(Grievance.id))
+            .where(
+                and_(
+                    Grievance.employee_id == employee_id,
+                    Grievance.is_deleted == False
                 )
             )
-            grievances = result.scalars().all()
-            
-            total = len(grievances)
-            resolved = sum(1 for g in grievances if g.status in ['resolved', 'closed'])
-            pending = sum(1 for g in grievances if g.status in ['open', 'pending', 'investigating'])
-            
-            return {
-                "total": total,
-                "resolved": resolved,
-                "pending": pending
-            }
-        except Exception as e:
-            await self.db.rollback()
-            print(f"Error fetching grievances: {e}")
-            return {
-                "total": 0,
-                "resolved": 0,
-                "pending": 0
-            }
+            .group_by(Grievance.status)
+        )
+        counts = {getattr(status, 'value', status): count for status, count in result.all()}
+        
+        return {
+            "total": sum(counts.values()),
+            "resolved": sum(counts.get(status, 0) for status in ['resolved', 'closed']),
+            "pending": sum(counts.get(status, 0) for status in ['open', 'pending', 'investigating'])
+        }
     
-    async def _get_employee_leave_balance(self, employee_id: uuid.UUID) -> Dict[str, Any]:
+    @staticmethod
+    async def _get_employee_leave_balance(db: AsyncSession, employee_id: uuid.UUID) -> Dict[str, Any]:
         """Get leave balance for an employee"""
-        try:
-            from modules.leave.models import LeaveBalance
-            from decimal import Decimal
-            
-            # Get current year
-            current_year = str(datetime.now().year)
-            
-            # Get all leave balances for current year
-            result = await self.db.execute(
-                select(LeaveBalance)
-                .where(
-                    and_(
-                        LeaveBalance.employee_id == employee_id,
-                        LeaveBalance.year == current_year,
-                        LeaveBalance.is_deleted == False
-                    )
+        from modules.leave.models import LeaveBalance
+        from decimal import Decimal
+        
+        # Get current year
+        current_year = str(datetime.now().year)
+        
+        result = await db.execute(
+            select(LeaveBalance.leave_type, LeaveBalance.available_days)
+            .where(
+                and_(
+                    LeaveBalance.employee_id == employee_id,
+                    LeaveBalance.year == current_year,
+                    LeaveBalance.is_deleted == False
                 )
             )
-            balances = result.scalars().all()
-            
-            # Calculate totals by leave type
-            annual_balance = Decimal("0")
-            sick_balance = Decimal("0")
-            
-            for balance in balances:
-                if balance.leave_type.lower() in ['annual', 'annual_leave']:
-                    annual_balance += balance.available_days
-                elif balance.leave_type.lower() in ['sick', 'sick_leave']:
-                    sick_balance += balance.available_days
-            
-            total_balance = annual_balance + sick_balance
-            
-            return {
-                "annual": float(annual_balance),
-                "sick": float(sick_balance),
-                "total": float(total_balance)
-            }
-        except Exception as e:
-            await self.db.rollback()
-            print(f"Error fetching leave balance: {e}")
-            return {
-                "annual": 0,
-                "sick": 0,
-                "total": 0
-            }
+        )
+        
+        # Calculate totals by leave type
+        annual_balance = Decimal("0")
+        sick_balance = Decimal("0")
+        
+        for leave_type, available_days in result.all():
+            if leave_type.lower() in ['annual', 'annual_leave']:
+                annual_balance += available_days
+            elif leave_type.lower() in ['sick', 'sick_leave']:
+                sick_balance += available_days
+        
+        total_balance = annual_balance + sick_balance
+        
+        return {
+            "annual": float(annual_balance),
+            "sick": float(sick_balance),
+            "total": float(total_balance)
+        }
     
     async def get_supervisor_dashboard(self, user_id: uuid.UUID) -> Dict[str, Any]:
         """
         Get supervisor dashboard with team data and pending approvals
+        
+        The team is every direct and indirect report. Their leave balances,
+        attendance and on-leave status are aggregated in one query. The
+        payload is cached per supervisor and tagged with each member's
+        employee tag, so leave, attendance, approval and reporting-line
+        changes drop it.
         """
-        # Get supervisor's employee record
         result = await self.db.execute(
-            select(Employee)
-            .options(selectinload(Employee.position))
+            select(
+                Employee.id,
+                Employee.first_name,
+                Employee.last_name,
+                Position.title.label("position")
+            )
+            .outerjoin(Position, Position.id == Employee.position_id)
             .where(Employee.user_id == user_id)
         )
-        supervisor = result.scalar_one_or_none()
+        supervisor = result.mappings().first()
         
         if not supervisor:
             return self._get_empty_supervisor_dashboard()
         
-        # Get team members (direct reports)
-        result = await self.db.execute(
-            select(Employee)
-            .options(selectinload(Employee.position))
-            .where(Employee.manager_id == supervisor.id)
-        )
-        team_members = result.scalars().all()
-        
-        team_data = []
-        for member in team_members:
-            team_data.append({
-                "id": str(member.id),
-                "name": f"{member.first_name} {member.last_name}",
-                "position": member.position.title if member.position else "N/A",
-                "attendance_rate": 95,
-                "leave_balance": 20,
-                "status": member.status.value
-            })
-        
-        active_members = sum(1 for m in team_members if m.status.value == "active")
-        on_leave = sum(1 for m in team_members if m.status.value == "on_leave")
+        supervisor_id = supervisor["id"]
+        cache_key = build_dashboard_key(str(supervisor_id), "supervisor")
+        cached_data = await cache.get(cache_key)
+        if cached_data is not None:
+            return cached_data
         
-        # Get approval statistics
-        approval_stats = await self.approval_service.get_approval_stats(supervisor.id)
+        components, stale = await self._load_components(
+            build_dashboard_key(str(supervisor_id), "supervisor:last-good"),
+            {
+                "teamMembers": lambda db: self._get_team_metrics(db, supervisor_id),
+                "approvalStats": lambda db: self._get_employee_approval_stats(db, supervisor_id),
+                "pendingApprovals": lambda db: self._get_pending_approvals(db, supervisor_id)
+            }
+        )
+        team_members = components["teamMembers"]
         
-        # Get pending approval requests
-        pending_approvals = await self.approval_service.get_pending_approvals(supervisor.id)
+        attendance_rates = [m["attendance_rate"] for m in team_members if m["attendance_rate"] is not None]
+        avg_attendance = round(sum(attendance_rates) / len(attendance_rates), 1) if attendance_rates else 0
         
-        return {
+        dashboard_data = {
             "supervisor": {
-                "id": str(supervisor.id),
-                "name": f"{supervisor.first_name} {supervisor.last_name}",
-                "position": supervisor.position.title if supervisor.position else "Supervisor",
+                "id": str(supervisor_id),
+                "name": f"{supervisor['first_name']} {supervisor['last_name']}",
+                "position": supervisor["position"] or "Supervisor",
                 "team_size": len(team_members)
             },
-            "approvalStats": {
-                "total_pending": approval_stats.total_pending,
-                "leave_pending": approval_stats.leave_pending,
-                "travel_pending": approval_stats.travel_pending,
-                "timesheet_pending": approval_stats.timesheet_pending,
-                "performance_pending": approval_stats.performance_pending
-            },
-            "pendingApprovals": [
-                {
-                    "id": str(approval.id),
-                    "type": approval.request_type.value,
-                    "employee_id": str(approval.employee_id),
-                    "submitted_at": approval.submitted_at.isoformat(),
-                    "comments": approval.comments
-                }
-                for approval in pending_approvals[:10]  # Show latest 10
-            ],
-            "teamMembers": team_data,
+            "approvalStats": components["approvalStats"],
+            "pendingApprovals": components["pendingApprovals"],
+            "teamMembers": team_members,
             "teamStats": {
                 "totalMembers": len(team_members),
-                "activeMembers": active_members,
-                "onLeave": on_leave,
-                "avgAttendance": 92
+                "directReports": sum(1 for m in team_members if m["depth"] == 1),
+                "activeMembers": sum(1 for m in team_members if m["status"] == "active"),
+                "onLeave": sum(1 for m in team_members if m["status"] == "on_leave"),
+                "avgAttendance": avg_attendance
             },
             "complianceItems": {
                 "pending": 0,
                 "overdue": 0
-            }
+            },
+            "staleComponents": stale
         }
+        
+        if not stale:
+            cache_tags = [employee_tag(supervisor_id), approvals_tag(supervisor_id)]
+            cache_tags.extend(employee_tag(m["id"]) for m in team_members)
+            await cache.set(cache_key, dashboard_data, ttl=settings.DASHBOARD_CACHE_TTL_SECONDS, tags=cache_tags)
+        
+        return dashboard_data
+    
+    @staticmethod
+    async def _get_team_metrics(
+        db: AsyncSession,
+        supervisor_id: uuid.UUID,
+        today: Optional[date] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Direct and indirect reports with leave, attendance and on-leave status
+        
+        Reports come from the employee_hierarchy closure table, so the whole
+        team is one indexed lookup at any depth. Each metric is a grouped
+        subquery joined per member, all in one statement:
+        - leave_balance: available annual leave for the current year
+        - attendance_rate: attended share of recorded days in the last
+          TEAM_ATTENDANCE_WINDOW_DAYS (half days count half), None without records
+        - status: on_leave when an approved leave request covers today
+        """
+        from modules.leave.models import LeaveBalance, LeaveRequest, AttendanceRecord
+        
+        today = today or date.today()
+        
+        members = (
+            select(EmployeeHierarchy.descendant_id.label("employee_id"), EmployeeHierarchy.depth)
+            .where(and_(EmployeeHierarchy.ancestor_id == supervisor_id, EmployeeHierarchy.depth > 0))
+            .subquery()
+        )
+        
+        balances = (
+            select(
+                LeaveBalance.employee_id,
+                func.sum(LeaveBalance.available_days).label("leave_balance")
+            )
+            .where(
+                and_(
+                    LeaveBalance.year == str(today.year),
+                    func.lower(LeaveBalance.leave_type).in_(['annual', 'annual_leave']),
+                    LeaveBalance.is_deleted == False
+                )
+            )
+            .group_by(LeaveBalance.employee_id)
+            .subquery()
+        )
+        attendance = (
+            select(
+                AttendanceRecord.employee_id,
+                func.count(AttendanceRecord.id).label("days_recorded"),
+                func.sum(
+                    case(
+                        (AttendanceRecord.status.in_(['present', 'late']), 1.0),
+                        (AttendanceRecord.status == 'half-day', 0.5),
+                        else_=0.0
+                    )
+                ).label("days_attended")
+            )
+            .where(
+                and_(
+                    AttendanceRecord.date > today - timedelta(days=TEAM_ATTENDANCE_WINDOW_DAYS),
+                    AttendanceRecord.date <= today,
+                    AttendanceRecord.is_deleted == False
+                )
+            )
+            .group_by(AttendanceRecord.employee_id)
+            .subquery()
+        )
+        on_leave = (
+            select(LeaveRequest.employee_id, func.count(LeaveRequest.id).label("active_leaves"))
+            .where(
+                and_(
+                    LeaveRequest.status == 'approved',
+                    LeaveRequest.start_date <= today,
+                    LeaveRequest.end_date >= today,
+                    LeaveRequest.is_deleted == False
+                )
+            )
+            .group_by(LeaveRequest.employee_id)
+            .subquery()
+        )
+        
+        result = await db.execute(
+            select(
+                members.c.employee_id,
+                members.c.depth,
+                Employee.first_name,
+                Employee.last_name,
+                Employee.manager_id,
+                Employee.status,
+                Position.title.label("position"),
+                balances.c.leave_balance,
+                attendance.c.days_recorded,
+                attendance.c.days_attended,
+                on_leave.c.active_leaves
+            )
+            .join(Employee, Employee.id == members.c.employee_id)
+            .outerjoin(Position, Position.id == Employee.position_id)
+            .outerjoin(balances, balances.c.employee_id == members.c.employee_id)
+            .outerjoin(attendance, attendance.c.employee_id == members.c.employee_id)
+            .outerjoin(on_leave, on_leave.c.employee_id == members.c.employee_id)
+            .where(
+                Employee.is_deleted == False,
+                Employee.status.in_([EmploymentStatus.ACTIVE, EmploymentStatus.ON_LEAVE])
+            )
+            .order_by(members.c.depth, Employee.first_name, Employee.last_name)
+        )
+        
+        team_members = []
+        for row in result.all():
+            attendance_rate = None
+            if row.days_recorded:
+                attendance_rate = round(float(row.days_attended) / row.days_recorded * 100, 1)
+            team_members.append({
+                "id": str(row.employee_id),
+                "name": f"{row.first_name} {row.last_name}",
+                "position": row.position or "N/A",
+                "manager_id": str(row.manager_id) if row.manager_id else None,
+                "depth": row.depth,
+                "attendance_rate": attendance_rate,
+                "leave_balance": float(row.leave_balance or 0),
+                "status": "on_leave" if row.active_leaves else row.status.value
+            })
+        return team_members
+    
+    @staticmethod
+    async def _get_pending_approvals(db: AsyncSession, approver_id: uuid.UUID) -> List[Dict[str, Any]]:
+        """Latest 10 approvals the supervisor can act on"""
+        pending_approvals = await ApprovalService(db).get_pending_approvals(approver_id, limit=10)
+        return [
+            {
+                "id": str(approval["id"]),
+                "type": approval["request_type"].value,
+                "employee_id": str(approval["employee_id"]),
+                "submitted_at": approval["submitted_at"].isoformat(),
+                "comments": approval["comments"]
+            }
+            for approval in pending_approvals
+        ]
     
     def _get_empty_employee_dashboard(self) -> Dict[str, Any]:
         """Return empty employee dashboard structure"""
@@ -473,7 +617,8 @@ class DashboardService:
             "attendance": {"present": 0, "absent": 0, "late": 0, "total": 0},
             "grievances": {"total": 0, "resolved": 0, "pending": 0},
             "performance": {"lastReviewDate": None, "rating": "N/A", "nextReviewDate": None},
-            "approvals": None
+            "approvals": None,
+            "staleComponents": []
         }
     
     def _get_empty_supervisor_dashboard(self) -> Dict[str, Any]:
@@ -489,16 +634,17 @@ class DashboardService:
             },
             "pendingApprovals": [],
             "teamMembers": [],
-            "teamStats": {"totalMembers": 0, "activeMembers": 0, "onLeave": 0, "avgAttendance": 0},
-            "complianceItems": {"pending": 0, "overdue": 0}
+            "teamStats": {"totalMembers": 0, "directReports": 0, "activeMembers": 0, "onLeave": 0, "avgAttendance": 0},
+            "complianceItems": {"pending": 0, "overdue": 0},
+            "staleComponents": []
         }
     
     @staticmethod
-    def invalidate_dashboard_cache(user_id: str):
+    async def invalidate_dashboard_cache(user_id: str):
         """
         Invalidate dashboard cache for a specific user
         Useful when dashboard data changes (e.g., approvals, leave requests, etc.)
         """
         cache_key = build_dashboard_key(user_id, "employee")
-        cache.delete(cache_key)
+        await cache.delete(cache_key)
         logger.debug(f"Invalidated dashboard cache for user: {user_id}")
\ No newline at end of file
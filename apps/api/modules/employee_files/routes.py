@@ -578,6 +578,7 @@ async def download_contract_pdf(
     """Download employment contract as PDF"""
     from fastapi.responses import StreamingResponse
     from core.pdf_generator import generate_employment_contract_pdf
+    from core.pdf_render import render_service
     from sqlalchemy import select
     from .models import EmploymentContract
     from modules.employees.models import Employee
@@ -617,7 +618,7 @@ async def download_contract_pdf(
     }
     
     # Generate PDF
-    pdf_buffer = generate_employment_contract_pdf(contract_dict, employee_dict)
+    pdf_buffer = await render_service.render(generate_employment_contract_pdf, contract_dict, employee_dict)
     
     return StreamingResponse(
         pdf_buffer,
@@ -635,6 +636,7 @@ async def download_resignation_pdf(
     """Download resignation letter as PDF"""
     from fastapi.responses import StreamingResponse
     from core.pdf_generator import generate_resignation_letter_pdf
+    from core.pdf_render import render_service
     from sqlalchemy import select
     from .models import Resignation
     from modules.employees.models import Employee
@@ -668,7 +670,7 @@ async def download_resignation_pdf(
     }
     
     # Generate PDF
-    pdf_buffer = generate_resignation_letter_pdf(resignation_dict, employee_dict)
+    pdf_buffer = await render_service.render(generate_resignation_letter_pdf, resignation_dict, employee_dict)
     
     return StreamingResponse(
         pdf_buffer,
@@ -0,0 +1,264 @@
+"""
+Organization Hierarchy
+Closure-table index over the reporting lines in Employee.manager_id
+
+employee_hierarchy holds one row per (ancestor, descendant) pair at any
+distance plus a depth-0 row per employee. "Everyone under X" is the rows
+with ancestor X, "X's chain of command" is the rows with descendant X, and
+span of control is a grouped count over the former, each one indexed query
+regardless of how deep the org is.
+
+Every write to manager_id goes through OrgHierarchy (add_employee for new
+employees, set_manager for moves) so the index changes in the same
+transaction. A move rewrites only the links between the moved subtree and
+its old and new ancestors. Soft-deleted employees keep their rows, since
+their reports still point at them; the queries below skip them.
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, delete, func, case, true
+from sqlalchemy.orm import aliased
+from typing import Any, Dict, List, Optional
+import hashlib
+import uuid
+
+from core.exceptions import BadRequestException, NotFoundException
+from modules.employees.models import Employee, EmployeeHierarchy, EmploymentStatus, Department, Position
+
+# Employees still in post; the others stay in the index but are not counted
+CURRENT_STATUSES = (EmploymentStatus.ACTIVE, EmploymentStatus.ON_LEAVE)
+
+REBUILD_BATCH_SIZE = 5000
+
+MEMBER_COLUMNS = (
+    Employee.id,
+    Employee.employee_number,
+    Employee.first_name,
+    Employee.last_name,
+    Employee.manager_id,
+    Employee.department_id,
+    Employee.position_id,
+)
+
+
+class OrgHierarchy:
+    """Maintains and queries the employee_hierarchy closure table"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    async def add_employee(self, employee_id: uuid.UUID, manager_id: Optional[uuid.UUID] = None):
+        """Index a new employee: a self row plus one row per ancestor of the manager"""
+        await self.db.execute(
+            insert(EmployeeHierarchy).values(ancestor_id=employee_id, descendant_id=employee_id, depth=0)
+        )
+        if manager_id is not None:
+            await self._attach(employee_id, manager_id)
+
+    async def set_manager(self, employee: Employee, manager_id: Optional[uuid.UUID]):
+        """
+        Move an employee, with everyone under them, to a new manager
+
+        Raises BadRequestException for self-management or a move that would
+        put the employee under one of their own reports, and
+        NotFoundException when the manager does not exist.
+        """
+        if manager_id == employee.manager_id:
+            return
+
+        if manager_id is not None:
+            if manager_id == employee.id:
+                raise BadRequestException(message="Employee cannot be their own manager")
+            manager_exists = await self.db.scalar(
+                select(Employee.id).where(Employee.id == manager_id, Employee.is_deleted == False)
+            )
+            if manager_exists is None:
+                raise NotFoundException(resource="Manager")
+            if await self.is_under(manager_id, employee.id):
+                raise BadRequestException(message="Cannot create circular reporting structure")
+
+        employee.manager_id = manager_id
+        await self._detach(employee.id)
+        if manager_id is not None:
+            await self._attach(employee.id, manager_id)
+
+    async def _detach(self, employee_id: uuid.UUID):
+        """Drop the links between the subtree of employee_id and everyone above it"""
+        subtree = aliased(EmployeeHierarchy)
+        above = aliased(EmployeeHierarchy)
+        await self.db.execute(
+            delete(EmployeeHierarchy).where(
+                EmployeeHierarchy.descendant_id.in_(
+                    select(subtree.descendant_id).where(subtree.ancestor_id == employee_id)
+                ),
+                EmployeeHierarchy.ancestor_id.in_(
+                    select(above.ancestor_id).where(above.descendant_id == employee_id, above.depth > 0)
+                )
+            )
+        )
+
+    async def _attach(self, employee_id: uuid.UUID, manager_id: uuid.UUID):
+        """Link every ancestor of manager_id (itself included) to the subtree of employee_id"""
+        above = aliased(EmployeeHierarchy)
+        subtree = aliased(EmployeeHierarchy)
+        await self.db.execute(
+            insert(EmployeeHierarchy).from_select(
+                ["ancestor_id", "descendant_id", "depth"],
+                select(above.ancestor_id, subtree.descendant_id, above.depth + subtree.depth + 1)
+                .select_from(above)
+                .join(subtree, true())
+                .where(above.descendant_id == manager_id, subtree.ancestor_id == employee_id)
+            )
+        )
+
+    async def rebuild(self) -> int:
+        """
+        Recompute the whole index from manager_id and return the rows written
+
+        For repairs and bulk loads that bypass set_manager. A manager_id cycle
+        left behind by such a load is cut where it closes instead of looping.
+        """
+        result = await self.db.execute(select(Employee.id, Employee.manager_id))
+        managers = dict(result.all())
+
+        await self.db.execute(delete(EmployeeHierarchy))
+        written = 0
+        batch: List[Dict[str, Any]] = []
+        for employee_id in managers:
+            node, depth, seen = employee_id, 0, set()
+            while node is not None and node not in seen:
+                batch.append({"ancestor_id": node, "descendant_id": employee_id, "depth": depth})
+                seen.add(node)
+                node = managers.get(node)
+                depth += 1
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                await self.db.execute(insert(EmployeeHierarchy), batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            await self.db.execute(insert(EmployeeHierarchy), batch)
+            written += len(batch)
+        return written
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    async def get_version(self) -> str:
+        """
+        Stamp that changes whenever the org chart could look different
+
+        Derived from the employee count and the newest updated_at of
+        employees, departments and positions, which every manager move,
+        rename, hire and (soft) delete bumps. One indexed query; used to key
+        cached chart layouts so no write path has to invalidate them.
+        """
+        row = (await self.db.execute(
+            select(
+                select(func.count(Employee.id)).scalar_subquery(),
+                select(func.max(Employee.updated_at)).scalar_subquery(),
+                select(func.max(Department.updated_at)).scalar_subquery(),
+                select(func.max(Position.updated_at)).scalar_subquery()
+            )
+        )).one()
+        return hashlib.sha1(repr(tuple(row)).encode()).hexdigest()[:16]
+
+    async def is_under(self, employee_id: uuid.UUID, ancestor_id: uuid.UUID) -> bool:
+        """Whether employee_id is ancestor_id or reports to them at any depth"""
+        found = await self.db.scalar(
+            select(EmployeeHierarchy.depth).where(
+                EmployeeHierarchy.ancestor_id == ancestor_id,
+                EmployeeHierarchy.descendant_id == employee_id
+            )
+        )
+        return found is not None
+
+    @staticmethod
+    def _current(include_inactive: bool) -> list:
+        conditions = [Employee.is_deleted == False]
+        if not include_inactive:
+            conditions.append(Employee.status.in_(CURRENT_STATUSES))
+        return conditions
+
+    async def get_reports(
+        self,
+        employee_id: uuid.UUID,
+        max_depth: Optional[int] = None,
+        include_inactive: bool = False
+    ) -> List[Any]:
+        """Everyone under employee_id, nearest levels first, down to max_depth levels"""
+        query = (
+            select(*MEMBER_COLUMNS, EmployeeHierarchy.depth)
+            .join(EmployeeHierarchy, EmployeeHierarchy.descendant_id == Employee.id)
+            .where(
+                EmployeeHierarchy.ancestor_id == employee_id,
+                EmployeeHierarchy.depth > 0,
+                *self._current(include_inactive)
+            )
+            .order_by(EmployeeHierarchy.depth, Employee.last_name, Employee.first_name, Employee.id)
+        )
+        if max_depth is not None:
+            query = query.where(EmployeeHierarchy.depth <= max_depth)
+        result = await self.db.execute(query)
+        return result.all()
+
+    async def get_report_ids(self, employee_id: uuid.UUID, include_inactive: bool = False) -> List[uuid.UUID]:
+        """Ids of everyone under employee_id (see get_reports)"""
+        result = await self.db.execute(
+            select(EmployeeHierarchy.descendant_id)
+            .join(Employee, Employee.id == EmployeeHierarchy.descendant_id)
+            .where(
+                EmployeeHierarchy.ancestor_id == employee_id,
+                EmployeeHierarchy.depth > 0,
+                *self._current(include_inactive)
+            )
+        )
+        return list(result.scalars().all())
+
+    async def get_chain_of_command(self, employee_id: uuid.UUID) -> List[Any]:
+        """The managers above employee_id, direct manager first"""
+        result = await self.db.execute(
+            select(*MEMBER_COLUMNS, EmployeeHierarchy.depth)
+            .join(EmployeeHierarchy, EmployeeHierarchy.ancestor_id == Employee.id)
+            .where(
+                EmployeeHierarchy.descendant_id == employee_id,
+                EmployeeHierarchy.depth > 0,
+                Employee.is_deleted == False
+            )
+            .order_by(EmployeeHierarchy.depth)
+        )
+        return result.all()
+
+    async def get_span_of_control(self, employee_id: uuid.UUID) -> Dict[str, Any]:
+        """Level in the org, direct and total reports and levels below, in one query"""
+        level = (
+            select(func.coalesce(func.max(EmployeeHierarchy.depth), 0))
+            .where(EmployeeHierarchy.descendant_id == employee_id)
+            .scalar_subquery()
+        )
+        row = (await self.db.execute(
+            select(
+                level.label("level"),
+                func.count(case((EmployeeHierarchy.depth == 1, 1))).label("direct_reports"),
+                func.count(case((EmployeeHierarchy.depth > 0, 1))).label("total_reports"),
+                func.coalesce(func.max(EmployeeHierarchy.depth), 0).label("levels_below")
+            )
+            .select_from(EmployeeHierarchy)
+            .join(Employee, Employee.id == EmployeeHierarchy.descendant_id)
+            .where(
+                EmployeeHierarchy.ancestor_id == employee_id,
+                EmployeeHierarchy.depth > 0,
+                *self._current(False)
+            )
+        )).one()
+        return {
+            "employee_id": employee_id,
+            "level": row.level,
+            "direct_reports": row.direct_reports,
+            "total_reports": row.total_reports,
+            "levels_below": row.levels_below,
+        }
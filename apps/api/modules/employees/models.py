@@ -3,7 +3,7 @@ Employee Management Module - Database Models
 Employee profiles, contracts, positions, and documents
 """
 
-from sqlalchemy import Column, String, Date, Enum as SQLEnum, ForeignKey, Numeric, Text
+from sqlalchemy import Column, String, Date, Enum as SQLEnum, ForeignKey, Numeric, Text, Integer, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 import enum
@@ -214,3 +214,25 @@ class EmployeeDocument(BaseModel, TenantMixin, AuditMixin, Base):
     
     def __repr__(self):
         return f"<EmployeeDocument {self.document_type} for {self.employee_id}>"
+
+
+class EmployeeHierarchy(Base):
+    """
+    Closure table of the reporting lines in Employee.manager_id
+
+    One row per (manager, report) pair at any distance, plus a depth-0 row
+    per employee, so subtree, chain-of-command and span-of-control questions
+    are single indexed queries. Maintained by modules.employees.hierarchy.
+    """
+    __tablename__ = "employee_hierarchy"
+    
+    ancestor_id = Column(UUID(as_uuid=True), ForeignKey('employees.id'), primary_key=True)
+    descendant_id = Column(UUID(as_uuid=True), ForeignKey('employees.id'), primary_key=True)
+    depth = Column(Integer, nullable=False)  # 0 = self, 1 = direct report, ...
+    
+    __table_args__ = (
+        Index('ix_employee_hierarchy_descendant', 'descendant_id', 'depth'),
+    )
+    
+    def __repr__(self):
+        return f"<EmployeeHierarchy {self.ancestor_id} -> {self.descendant_id} ({self.depth})>"
@@ -0,0 +1,148 @@
+"""
+Organization Chart
+Loads the employees of a chart scope and serves cached layouts
+
+A chart covers the whole organization, the subtree under one employee
+(read from the employee_hierarchy closure table) or a department with its
+sub-departments. Layouts are computed by core.org_chart and cached under the
+hierarchy version stamp, so every worker reuses them until an employee,
+department or position changes.
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import Any, Dict, List, Optional, Set
+import uuid
+
+from core.cache import cache, build_org_chart_key
+from core.config import settings
+from core.exceptions import BadRequestException, NotFoundException
+from core.org_chart import layout_org_chart
+from modules.employees.hierarchy import OrgHierarchy, CURRENT_STATUSES
+from modules.employees.models import Employee, EmployeeHierarchy, Department, Position
+
+
+class OrgChartService:
+    """Org chart layouts for a scope, cached per hierarchy version"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_layout(
+        self,
+        root_employee_id: Optional[uuid.UUID] = None,
+        department_id: Optional[uuid.UUID] = None,
+        max_depth: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Layout of the chart rooted at an employee, of a department, or of everyone
+
+        The result is core.org_chart.layout_org_chart output plus the version
+        and scope it was computed for, and a title naming the scope.
+        """
+        if root_employee_id is not None and department_id is not None:
+            raise BadRequestException(message="Choose either root_employee_id or department_id, not both")
+
+        version = await OrgHierarchy(self.db).get_version()
+        cache_key = build_org_chart_key(version, {
+            "root": root_employee_id,
+            "department": department_id,
+            "depth": max_depth,
+        })
+
+        async def load_layout() -> Dict[str, Any]:
+            if root_employee_id is not None:
+                nodes = await self._subtree_nodes(root_employee_id, max_depth)
+                title = nodes[0]["name"] if nodes else None
+            elif department_id is not None:
+                department_ids, title = await self._department_scope(department_id)
+                nodes = await self._load_nodes(Employee.department_id.in_(department_ids))
+            else:
+                nodes = await self._load_nodes()
+                title = None
+            layout = layout_org_chart(nodes, max_depth=max_depth)
+            layout.update({
+                "version": version,
+                "root_employee_id": str(root_employee_id) if root_employee_id else None,
+                "department_id": str(department_id) if department_id else None,
+                "title": title,
+            })
+            return layout
+
+        return await cache.get_or_set(cache_key, load_layout, ttl=settings.ORG_CHART_CACHE_TTL_SECONDS)
+
+    async def _load_nodes(
+        self,
+        *conditions,
+        hierarchy_root: Optional[uuid.UUID] = None,
+        max_depth: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Chart nodes of current employees, sorted by name so siblings are too"""
+        query = (
+            select(
+                Employee.id,
+                Employee.manager_id,
+                Employee.first_name,
+                Employee.last_name,
+                Position.title.label("position"),
+                Department.name.label("department")
+            )
+            .outerjoin(Position, Position.id == Employee.position_id)
+            .outerjoin(Department, Department.id == Employee.department_id)
+            .where(
+                Employee.is_deleted == False,
+                Employee.status.in_(CURRENT_STATUSES),
+                *conditions
+            )
+        )
+        if hierarchy_root is not None:
+            query = query.join(EmployeeHierarchy, EmployeeHierarchy.descendant_id == Employee.id).where(
+                EmployeeHierarchy.ancestor_id == hierarchy_root
+            )
+            if max_depth is not None:
+                # One level more than shown, so the layout can count hidden reports
+                query = query.where(EmployeeHierarchy.depth <= max_depth + 1)
+            query = query.order_by(EmployeeHierarchy.depth != 0)  # the root first
+        query = query.order_by(Employee.last_name, Employee.first_name, Employee.id)
+
+        result = await self.db.execute(query)
+        return [
+            {
+                "id": str(row.id),
+                "manager_id": str(row.manager_id) if row.manager_id else None,
+                "name": f"{row.first_name} {row.last_name}",
+                "position": row.position,
+                "department": row.department,
+            }
+            for row in result.all()
+        ]
+
+    async def _subtree_nodes(self, root_employee_id: uuid.UUID, max_depth: Optional[int]) -> List[Dict[str, Any]]:
+        nodes = await self._load_nodes(hierarchy_root=root_employee_id, max_depth=max_depth)
+        if not nodes or nodes[0]["id"] != str(root_employee_id):
+            raise NotFoundException(resource="Employee")
+        return nodes
+
+    async def _department_scope(self, department_id: uuid.UUID):
+        """(ids of the department and every department below it, department name)"""
+        result = await self.db.execute(
+            select(Department.id, Department.parent_id, Department.name).where(Department.is_deleted == False)
+        )
+        rows = result.all()
+        names = {row.id: row.name for row in rows}
+        if department_id not in names:
+            raise NotFoundException(resource="Department")
+
+        sub_departments: Dict[uuid.UUID, List[uuid.UUID]] = {}
+        for row in rows:
+            if row.parent_id is not None:
+                sub_departments.setdefault(row.parent_id, []).append(row.id)
+        scope: Set[uuid.UUID] = set()
+        pending = [department_id]
+        while pending:
+            current = pending.pop()
+            if current in scope:
+                continue
+            scope.add(current)
+            pending.extend(sub_departments.get(current, ()))
+        return list(scope), names[department_id]
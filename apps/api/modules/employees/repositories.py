@@ -3,12 +3,48 @@ Employee Management Module - Repository Layer
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
-from typing import Optional, List
+from sqlalchemy import select, and_, or_, func, text
+from typing import Any, Dict, Optional, List, Sequence, Tuple
+import json
 import uuid
 
 from modules.employees.models import Employee, Department, Position, Contract
 
+# Columns the directory can project, by public field name
+DIRECTORY_COLUMNS = {
+    "id": Employee.id,
+    "employee_number": Employee.employee_number,
+    "first_name": Employee.first_name,
+    "middle_name": Employee.middle_name,
+    "last_name": Employee.last_name,
+    "preferred_name": Employee.preferred_name,
+    "work_email": Employee.work_email,
+    "phone": Employee.phone,
+    "mobile": Employee.mobile,
+    "country_code": Employee.country_code,
+    "status": Employee.status,
+    "employment_type": Employee.employment_type,
+    "hire_date": Employee.hire_date,
+    "work_location": Employee.work_location,
+    "work_type": Employee.work_type,
+    "profile_photo_url": Employee.profile_photo_url,
+    "department_id": Employee.department_id,
+    "department_name": Department.name,
+    "position_id": Employee.position_id,
+    "position_title": Position.title,
+    "manager_id": Employee.manager_id,
+    "created_at": Employee.created_at,
+}
+
+# Sortable, non-nullable columns; each is paired with id for a stable keyset
+DIRECTORY_SORTS = {
+    "last_name": Employee.last_name,
+    "first_name": Employee.first_name,
+    "employee_number": Employee.employee_number,
+    "hire_date": Employee.hire_date,
+    "created_at": Employee.created_at,
+}
+
 
 class EmployeeRepository:
     """Repository for Employee operations"""
@@ -54,6 +90,88 @@ class EmployeeRepository:
         await self.db.flush()
         return employee
     
+    @staticmethod
+    def _directory_filters(filters: Dict[str, Any]) -> list:
+        conditions = [Employee.is_deleted == False]
+        if filters.get("department_id"):
+            conditions.append(Employee.department_id == filters["department_id"])
+        if filters.get("status"):
+            conditions.append(Employee.status == filters["status"])
+        if filters.get("country_code"):
+            conditions.append(Employee.country_code == filters["country_code"])
+        if filters.get("employment_type"):
+            conditions.append(Employee.employment_type == filters["employment_type"])
+        return conditions
+    
+    async def get_directory_page(
+        self,
+        fields: Sequence[str],
+        filters: Dict[str, Any],
+        sort: str = "last_name",
+        descending: bool = False,
+        after: Optional[Tuple[Any, uuid.UUID]] = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """
+        One keyset page of the directory, selecting only the requested columns
+        
+        Rows are ordered by (sort column, id); `after` is the (sort value, id)
+        of the last row of the previous page. Departments and positions are
+        joined only when one of their columns is requested.
+        """
+        sort_column = DIRECTORY_SORTS[sort]
+        columns = [DIRECTORY_COLUMNS[field].label(field) for field in fields]
+        # The keyset needs the sort value and id even if they were not requested
+        columns += [sort_column.label("_sort_value"), Employee.id.label("_id")]
+        
+        query = select(*columns).where(*self._directory_filters(filters))
+        if "department_name" in fields:
+            query = query.outerjoin(Department, Department.id == Employee.department_id)
+        if "position_title" in fields:
+            query = query.outerjoin(Position, Position.id == Employee.position_id)
+        
+        if after:
+            after_value, after_id = after
+            if descending:
+                query = query.where(or_(
+                    sort_column < after_value,
+                    and_(sort_column == after_value, Employee.id < after_id)
+                ))
+            else:
+                query = query.where(or_(
+                    sort_column > after_value,
+                    and_(sort_column == after_value, Employee.id > after_id)
+                ))
+        
+        if descending:
+            query = query.order_by(sort_column.desc(), Employee.id.desc())
+        else:
+            query = query.order_by(sort_column.asc(), Employee.id.asc())
+        
+        result = await self.db.execute(query.limit(limit))
+        return [dict(row) for row in result.mappings().all()]
+    
+    async def count_directory(self, filters: Dict[str, Any], estimated: bool = False, exact_below: int = 10000) -> Tuple[int, bool]:
+        """
+        Count matching employees, returning (count, is_estimate)
+        
+        With estimated=True on PostgreSQL the planner's row estimate is used
+        when it is at least exact_below; smaller results are counted exactly.
+        """
+        query = select(Employee.id).where(*self._directory_filters(filters))
+        
+        if estimated and self.db.bind.dialect.name == "postgresql":
+            compiled = query.compile(dialect=self.db.bind.dialect, compile_kwargs={"literal_binds": True})
+            plan = (await self.db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = int(plan[0]["Plan"]["Plan Rows"])
+            if estimate >= exact_below:
+                return estimate, True
+        
+        result = await self.db.execute(select(func.count()).select_from(query.subquery()))
+        return result.scalar() or 0, False
+    
     async def get_by_user_id(self, user_id: uuid.UUID) -> Optional[Employee]:
         """Get employee by user ID"""
         result = await self.db.execute(
@@ -3,7 +3,7 @@ Employee Management Module - API Routes
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
@@ -12,13 +12,21 @@ import uuid
 
 from core.database import get_db
 from core.dependencies import get_current_active_user, require_hr_read, require_hr_write
+from core.org_chart import render_org_chart_svg
 from core.pdf_generator import create_organization_chart_pdf
+from core.pdf_render import render_service
 from modules.employees.services import EmployeeService
+from modules.employees.hierarchy import OrgHierarchy
+from modules.employees.org_chart import OrgChartService
 from modules.employees.schemas import (
     EmployeeCreate, 
     EmployeeUpdate, 
     EmployeeResponse,
     EmployeeHierarchyUpdate,
+    EmployeeDirectoryPage,
+    EmployeeSearchResponse,
+    OrgHierarchyMember,
+    SpanOfControl,
     DepartmentCreate,
     DepartmentUpdate,
     DepartmentResponse,
@@ -242,33 +250,43 @@ async def get_organization_chart(
     return [EmployeeResponse.model_validate(emp) for emp in employees]
 
 
+@router.get("/organization-chart/layout")
+async def get_organization_chart_layout(
+    root_employee_id: Optional[uuid.UUID] = Query(None, description="Chart only this employee and everyone under them"),
+    department_id: Optional[uuid.UUID] = Query(None, description="Chart only this department and its sub-departments"),
+    max_depth: Optional[int] = Query(None, ge=0, le=50, description="Levels to show below the top of the chart"),
+    format: str = Query("json", pattern="^(json|svg)$"),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Organization chart layout as JSON grid positions or an SVG drawing
+    
+    Requires: Authentication
+    """
+    layout = await OrgChartService(db).get_layout(root_employee_id, department_id, max_depth)
+    if format == "svg":
+        return Response(content=render_org_chart_svg(layout), media_type="image/svg+xml")
+    return layout
+
+
 @router.get("/organization-chart/export")
 async def export_organization_chart_pdf(
+    root_employee_id: Optional[uuid.UUID] = Query(None, description="Chart only this employee and everyone under them"),
+    department_id: Optional[uuid.UUID] = Query(None, description="Chart only this department and its sub-departments"),
+    max_depth: Optional[int] = Query(None, ge=0, le=50, description="Levels to show below the top of the chart"),
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """
-    Export organization chart as PDF
+    Export organization chart as PDF, split across pages where it is wider or deeper than one
     
     Requires: Authentication
     """
-    query = select(Employee).options(
-        selectinload(Employee.department),
-        selectinload(Employee.position),
-        selectinload(Employee.manager)
-    ).where(
-        Employee.is_deleted == False,
-        Employee.status == 'ACTIVE'
-    )
-    
-    result = await db.execute(query)
-    employees = result.scalars().all()
-    
-    # Convert to dict for PDF generation
-    employees_data = [EmployeeResponse.model_validate(emp).model_dump() for emp in employees]
+    layout = await OrgChartService(db).get_layout(root_employee_id, department_id, max_depth)
     
     # Generate PDF
-    pdf_buffer = create_organization_chart_pdf(employees_data)
+    pdf_buffer = await render_service.render(create_organization_chart_pdf, layout, layout["title"])
     
     return StreamingResponse(
         pdf_buffer,
@@ -296,16 +314,16 @@ async def list_employees(
     
     Requires permission: hr:read
     """
-    from core.cache import cache, build_employees_list_key
+    from core.cache import cache, build_employees_list_key, EMPLOYEES_LIST_TAG
     import logging
     logger = logging.getLogger(__name__)
     
     # Check cache first (5 minute TTL)
     cache_key = build_employees_list_key(skip, limit)
     if refresh:
-        cache.delete(cache_key)
+        await cache.delete(cache_key)
     else:
-        cached_data = cache.get(cache_key)
+        cached_data = await cache.get(cache_key)
         if cached_data is not None:
             logger.debug(f"Cache hit for employees list: {cache_key}")
             # Convert cached dicts back to EmployeeResponse objects
@@ -330,11 +348,69 @@ async def list_employees(
     
     # Cache the result for 5 minutes (300 seconds)
     # Convert to dict for JSON serialization
-    cache.set(cache_key, [emp.model_dump() for emp in employees_list], ttl=300)
+    await cache.set(
+        cache_key,
+        [emp.model_dump() for emp in employees_list],
+        ttl=300,
+        tags=[EMPLOYEES_LIST_TAG]
+    )
     
     return employees_list
 
 
+@router.get("/directory", response_model=EmployeeDirectoryPage)
+async def get_employee_directory(
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    sort: str = Query("last_name", description="last_name, first_name, employee_number, hire_date or created_at; prefix - for descending"),
+    department_id: Optional[uuid.UUID] = Query(None),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    country_code: Optional[str] = Query(None, min_length=2, max_length=2),
+    employment_type: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    count: str = Query("none", description="none, exact or estimated"),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(require_hr_read)
+):
+    """
+    Employee directory with keyset pagination and column projection
+    
+    Requires permission: hr:read
+    """
+    service = EmployeeService(db)
+    return await service.get_directory(
+        fields=fields,
+        sort=sort,
+        department_id=department_id,
+        status=status_filter,
+        country_code=country_code,
+        employment_type=employment_type,
+        cursor=cursor,
+        limit=limit,
+        count=count
+    )
+
+
+@router.get("/search", response_model=EmployeeSearchResponse)
+async def search_employees(
+    q: str = Query(..., min_length=1, max_length=200, description="Name, employee number, email, position or department"),
+    autocomplete: bool = Query(False, description="Prefix matching only, for type-ahead"),
+    limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Ranked, typo-tolerant employee search
+    
+    Results are limited to the caller's country (unless admin:all) and to
+    active employees for users without HR read access.
+    """
+    from modules.employees.search import EmployeeSearchService
+    
+    results = await EmployeeSearchService(db).search(q, current_user, limit=limit, autocomplete=autocomplete)
+    return {"query": q, "results": results}
+
+
 @router.post("/", response_model=EmployeeResponse, status_code=status.HTTP_201_CREATED)
 async def create_employee(
     employee_data: EmployeeCreate,
@@ -346,15 +422,17 @@ async def create_employee(
     
     Requires permission: hr:write
     """
-    from core.cache import invalidate_cache
+    from core.cache import invalidate_tags, employee_write_tags
+    from modules.employees.search import employee_search_index
     
     service = EmployeeService(db)
     employee = await service.create_employee(employee_data)
     
     await db.commit()
     
-    # Invalidate employees list cache
-    invalidate_cache("employees:list:*")
+    # Invalidate cached views that include this employee
+    await invalidate_tags(*employee_write_tags(employee))
+    employee_search_index.invalidate()
     
     # Reload with relationships to avoid detached instance errors
     result = await db.execute(
@@ -451,11 +529,20 @@ async def update_employee(
         from core.exceptions import NotFoundException
         raise NotFoundException(resource="Employee")
     
-    from core.cache import invalidate_cache
+    from core.cache import invalidate_tags, employee_write_tags
+    from modules.employees.search import employee_search_index
+    from core.principal_cache import principal_cache
+    
+    # Tags for the pre-update department/manager, so moved employees leave old views
+    previous_tags = employee_write_tags(employee)
     
     # Update fields
     update_data = employee_data.model_dump(exclude_unset=True)
     
+    # Manager changes move the employee's subtree in the hierarchy index too
+    if 'manager_id' in update_data:
+        await OrgHierarchy(db).set_manager(employee, update_data.pop('manager_id'))
+    
     # Check if work_email is being updated and sync with user record
     work_email_updated = 'work_email' in update_data
     new_work_email = update_data.get('work_email')
@@ -475,10 +562,13 @@ async def update_employee(
             user.email = new_work_email
     
     await db.commit()
+    if work_email_updated and employee.user_id:
+        await principal_cache.invalidate_user(employee.user_id)
     await db.refresh(employee)
     
-    # Invalidate employees list cache
-    invalidate_cache("employees:list:*")
+    # Invalidate cached views that include this employee
+    await invalidate_tags(*previous_tags, *employee_write_tags(employee))
+    employee_search_index.invalidate()
     
     # Reload with relationships
     result = await db.execute(
@@ -506,14 +596,9 @@ async def delete_employee(
     
     Requires permission: hr:write
     """
-    from core.cache import invalidate_cache
-    
     service = EmployeeService(db)
     await service.delete_employee(employee_id)
     
-    # Invalidate employees list cache
-    invalidate_cache("employees:list:*")
-    
     return None
 
 
@@ -528,14 +613,9 @@ async def activate_employee(
     
     Requires permission: hr:write
     """
-    from core.cache import invalidate_cache
-    
     service = EmployeeService(db)
     employee = await service.activate_employee(employee_id)
     
-    # Invalidate employees list cache
-    invalidate_cache("employees:list:*")
-    
     return employee
 
 
@@ -550,14 +630,9 @@ async def deactivate_employee(
     
     Requires permission: hr:write
     """
-    from core.cache import invalidate_cache
-    
     service = EmployeeService(db)
     employee = await service.deactivate_employee(employee_id)
     
-    # Invalidate employees list cache
-    invalidate_cache("employees:list:*")
-    
     return employee
 
 
@@ -587,35 +662,6 @@ async def update_employee_hierarchy(
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     
-    # Validate manager doesn't create circular reference
-    if hierarchy_data.manager_id:
-        # Check if new manager is not the same employee
-        if hierarchy_data.manager_id == emp_uuid:
-            raise HTTPException(status_code=400, detail="Employee cannot be their own manager")
-        
-        # Check if new manager exists
-        manager_result = await db.execute(
-            select(Employee).where(Employee.id == hierarchy_data.manager_id)
-        )
-        manager = manager_result.scalar_one_or_none()
-        if not manager:
-            raise HTTPException(status_code=404, detail="Manager not found")
-        
-        # Check for circular reference (if new manager reports to this employee)
-        current_manager = manager
-        while current_manager.manager_id:
-            if current_manager.manager_id == emp_uuid:
-                raise HTTPException(
-                    status_code=400, 
-                    detail="Cannot create circular reporting structure"
-                )
-            manager_result = await db.execute(
-                select(Employee).where(Employee.id == current_manager.manager_id)
-            )
-            current_manager = manager_result.scalar_one_or_none()
-            if not current_manager:
-                break
-    
     # Validate department exists
     if hierarchy_data.department_id:
         dept_result = await db.execute(
@@ -624,12 +670,18 @@ async def update_employee_hierarchy(
         if not dept_result.scalar_one_or_none():
             raise HTTPException(status_code=404, detail="Department not found")
     
-    # Update employee
-    employee.manager_id = hierarchy_data.manager_id
+    from core.cache import invalidate_tags, employee_write_tags
+    from modules.employees.search import employee_search_index
+    previous_tags = employee_write_tags(employee)
+    
+    # Validates the manager (exists, no circular reporting) and moves the subtree
+    await OrgHierarchy(db).set_manager(employee, hierarchy_data.manager_id)
     if hierarchy_data.department_id:
         employee.department_id = hierarchy_data.department_id
     
     await db.commit()
+    await invalidate_tags(*previous_tags, *employee_write_tags(employee))
+    employee_search_index.invalidate()
     
     # Reload with relationships
     result = await db.execute(
@@ -644,6 +696,64 @@ async def update_employee_hierarchy(
     return EmployeeResponse.model_validate(employee)
 
 
+@router.get("/{employee_id}/reports", response_model=List[OrgHierarchyMember])
+async def get_employee_reports(
+    employee_id: uuid.UUID,
+    max_depth: Optional[int] = Query(None, ge=1, description="Levels below the employee to include; all when omitted"),
+    include_inactive: bool = Query(False, description="Include terminated, resigned and retired employees"),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(require_hr_read)
+):
+    """
+    Everyone reporting to an employee, directly or indirectly, nearest levels first
+    
+    Requires permission: hr:read
+    """
+    await _require_employee(db, employee_id)
+    rows = await OrgHierarchy(db).get_reports(employee_id, max_depth=max_depth, include_inactive=include_inactive)
+    return [OrgHierarchyMember.model_validate(row._mapping) for row in rows]
+
+
+@router.get("/{employee_id}/chain-of-command", response_model=List[OrgHierarchyMember])
+async def get_employee_chain_of_command(
+    employee_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(require_hr_read)
+):
+    """
+    The managers above an employee, direct manager first
+    
+    Requires permission: hr:read
+    """
+    await _require_employee(db, employee_id)
+    rows = await OrgHierarchy(db).get_chain_of_command(employee_id)
+    return [OrgHierarchyMember.model_validate(row._mapping) for row in rows]
+
+
+@router.get("/{employee_id}/span-of-control", response_model=SpanOfControl)
+async def get_employee_span_of_control(
+    employee_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(require_hr_read)
+):
+    """
+    Org level, direct and total reports and depth of an employee's team
+    
+    Requires permission: hr:read
+    """
+    await _require_employee(db, employee_id)
+    return await OrgHierarchy(db).get_span_of_control(employee_id)
+
+
+async def _require_employee(db: AsyncSession, employee_id: uuid.UUID):
+    found = await db.scalar(
+        select(Employee.id).where(Employee.id == employee_id, Employee.is_deleted == False)
+    )
+    if found is None:
+        from core.exceptions import NotFoundException
+        raise NotFoundException(resource="Employee")
+
+
 # TODO: Add endpoints for:
 # - Upload employee document
 # - List employee documents
@@ -3,7 +3,7 @@ Employee Management Module - Pydantic Schemas
 """
 
 from pydantic import BaseModel, EmailStr, Field, validator
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import date, datetime
 from decimal import Decimal
 import uuid
@@ -205,6 +205,54 @@ class EmployeeResponse(EmployeeBase):
         from_attributes = True
 
 
+class EmployeeDirectoryPage(BaseModel):
+    """One keyset page of the employee directory"""
+    items: List[Dict[str, Any]]
+    fields: List[str]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+
+
+class EmployeeSearchResult(BaseModel):
+    """A ranked employee search hit"""
+    id: uuid.UUID
+    employee_number: str
+    first_name: str
+    last_name: str
+    work_email: Optional[str] = None
+    position_title: Optional[str] = None
+    department_name: Optional[str] = None
+    score: float
+
+
+class EmployeeSearchResponse(BaseModel):
+    """Employee search results, best match first"""
+    query: str
+    results: List[EmployeeSearchResult]
+
+
+class OrgHierarchyMember(BaseModel):
+    """An employee above or below another in the reporting lines"""
+    id: uuid.UUID
+    employee_number: str
+    first_name: str
+    last_name: str
+    manager_id: Optional[uuid.UUID] = None
+    department_id: Optional[uuid.UUID] = None
+    position_id: Optional[uuid.UUID] = None
+    depth: int  # reporting levels between the two employees
+
+
+class SpanOfControl(BaseModel):
+    """Position of an employee in the org and the size of their team"""
+    employee_id: uuid.UUID
+    level: int  # 0 for employees without a manager
+    direct_reports: int
+    total_reports: int
+    levels_below: int
+
+
 class ContractCreate(BaseModel):
     """Contract creation schema"""
     employee_id: uuid.UUID
@@ -0,0 +1,288 @@
+"""
+Employee Search
+Ranked full-text, fuzzy and prefix search over the employee directory
+
+PostgreSQL uses the tsvector and pg_trgm expression indexes from
+migration 023. Other databases (SQLite in tests) fall back to an
+in-process trigram index rebuilt from the employees table.
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, text
+from typing import Any, Dict, List, Optional
+import asyncio
+import logging
+import re
+import time
+
+from modules.employees.models import Employee, Department, Position, EmploymentStatus
+
+logger = logging.getLogger(__name__)
+
+# Must match the expression indexed by migration 023 character for character
+EMPLOYEE_SEARCH_DOCUMENT = (
+    "lower(coalesce(first_name, '') || ' ' || coalesce(preferred_name, '') || ' ' || "
+    "coalesce(last_name, '') || ' ' || coalesce(employee_number, '') || ' ' || "
+    "coalesce(work_email, ''))"
+)
+
+# Users holding any of these see every employee in their tenant, not only active ones
+HR_SEARCH_PERMISSIONS = {"hr:read", "hr:admin", "admin:all"}
+
+MAX_QUERY_TOKENS = 8
+MIN_FUZZY_SCORE = 0.3
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(query: str) -> List[str]:
+    """Lowercase word tokens of a query, capped so a pasted paragraph stays cheap"""
+    return [token[:64] for token in _WORD_RE.findall(query.lower())][:MAX_QUERY_TOKENS]
+
+
+def prefix_tsquery(tokens: List[str]) -> str:
+    """to_tsquery text matching every token as a prefix, e.g. 'jo:* & sm:*'"""
+    return " & ".join(f"{token}:*" for token in tokens)
+
+
+def search_scope(current_user: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Rows a user may search: their own country unless superuser or
+    admin:all, and only active employees unless they can read HR data
+    """
+    permissions = set(current_user.get("permissions", []))
+    is_superuser = current_user.get("is_superuser", False)
+    scope = {"country_code": None, "active_only": False}
+    if not is_superuser and "admin:all" not in permissions:
+        scope["country_code"] = current_user.get("country_code")
+    if not is_superuser and not permissions & HR_SEARCH_PERMISSIONS:
+        scope["active_only"] = True
+    return scope
+
+
+def trigrams(value: str) -> set:
+    """pg_trgm-style trigrams: each word padded with two leading and one trailing space"""
+    grams = set()
+    for word in _WORD_RE.findall(value.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def trigram_similarity(left: set, right: set) -> float:
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+def word_similarity(tokens: List[str], word_trigrams: List[set]) -> float:
+    """Mean over query tokens of the best trigram similarity to any indexed word"""
+    if not tokens or not word_trigrams:
+        return 0.0
+    total = 0.0
+    for token in tokens:
+        token_trigrams = trigrams(token)
+        total += max(trigram_similarity(token_trigrams, grams) for grams in word_trigrams)
+    return total / len(tokens)
+
+
+class InMemoryEmployeeIndex:
+    """
+    Process-local search index for databases without pg_trgm
+
+    Rebuilt from one joined query when older than ttl seconds or after
+    invalidate(); scoring mirrors the PostgreSQL path (prefix matches,
+    trigram similarity, exact employee number boost).
+    """
+
+    def __init__(self, ttl: int = 60):
+        self.ttl = ttl
+        self._docs: List[Dict[str, Any]] = []
+        self._built_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self._built_at = 0.0
+
+    async def ensure_fresh(self, db: AsyncSession) -> None:
+        if time.monotonic() - self._built_at < self.ttl:
+            return
+        async with self._lock:
+            if time.monotonic() - self._built_at < self.ttl:
+                return
+            result = await db.execute(
+                select(
+                    Employee.id, Employee.employee_number, Employee.first_name,
+                    Employee.preferred_name, Employee.last_name, Employee.work_email,
+                    Employee.country_code, Employee.status,
+                    Position.title.label("position_title"), Department.name.label("department_name")
+                )
+                .outerjoin(Position, Position.id == Employee.position_id)
+                .outerjoin(Department, Department.id == Employee.department_id)
+                .where(Employee.is_deleted == False)
+            )
+            docs = []
+            for row in result.mappings().all():
+                document = " ".join(filter(None, [
+                    row["first_name"], row["preferred_name"], row["last_name"],
+                    row["employee_number"], row["work_email"]
+                ]))
+                words = set(_WORD_RE.findall(document.lower()))
+                related = " ".join(filter(None, [row["position_title"], row["department_name"]]))
+                docs.append({
+                    "row": dict(row),
+                    "words": words,
+                    "word_trigrams": [trigrams(word) for word in words],
+                    "related_trigrams": [trigrams(word) for word in set(_WORD_RE.findall(related.lower()))],
+                })
+            self._docs = docs
+            self._built_at = time.monotonic()
+
+    def search(self, query: str, scope: Dict[str, Any], limit: int, autocomplete: bool) -> List[Dict[str, Any]]:
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        query_lower = query.strip().lower()
+
+        scored = []
+        for doc in self._docs:
+            row = doc["row"]
+            if scope["country_code"] and row["country_code"] != scope["country_code"]:
+                continue
+            if scope["active_only"] and row["status"] != EmploymentStatus.ACTIVE:
+                continue
+
+            prefix_hits = sum(1 for token in tokens if any(word.startswith(token) for word in doc["words"]))
+            if autocomplete:
+                if prefix_hits < len(tokens):
+                    continue
+                score = 1.0
+            else:
+                score = max(
+                    prefix_hits / len(tokens),
+                    word_similarity(tokens, doc["word_trigrams"]),
+                    0.5 * word_similarity(tokens, doc["related_trigrams"])
+                )
+                if (row["employee_number"] or "").lower() == query_lower:
+                    score += 1.0
+                if score < MIN_FUZZY_SCORE:
+                    continue
+            scored.append((score, row))
+
+        scored.sort(key=lambda item: (-item[0], item[1]["last_name"] or "", str(item[1]["id"])))
+        return [dict(row, score=round(score, 4)) for score, row in scored[:limit]]
+
+
+# Fallback index shared by requests in this process
+employee_search_index = InMemoryEmployeeIndex()
+
+
+class EmployeeSearchService:
+    """Search employees with the best backend the database supports"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def search(
+        self,
+        query: str,
+        current_user: Dict[str, Any],
+        limit: int = 20,
+        autocomplete: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Ranked matches for query, restricted to what current_user may see"""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        scope = search_scope(current_user)
+
+        if self.db.bind.dialect.name == "postgresql":
+            rows = await self._search_postgres(query, tokens, scope, limit, autocomplete)
+        else:
+            await employee_search_index.ensure_fresh(self.db)
+            rows = employee_search_index.search(query, scope, limit, autocomplete)
+
+        return [
+            {
+                "id": str(row["id"]),
+                "employee_number": row["employee_number"],
+                "first_name": row["first_name"],
+                "last_name": row["last_name"],
+                "work_email": row["work_email"],
+                "position_title": row["position_title"],
+                "department_name": row["department_name"],
+                "score": float(row["score"]),
+            }
+            for row in rows
+        ]
+
+    async def _search_postgres(
+        self,
+        query: str,
+        tokens: List[str],
+        scope: Dict[str, Any],
+        limit: int,
+        autocomplete: bool
+    ) -> List[Dict[str, Any]]:
+        doc = EMPLOYEE_SEARCH_DOCUMENT
+        params: Dict[str, Any] = {
+            "tsquery": prefix_tsquery(tokens),
+            "query": query.strip().lower(),
+            "limit": limit,
+        }
+
+        scope_sql = ""
+        if scope["country_code"]:
+            scope_sql += " AND e.country_code = :country_code"
+            params["country_code"] = scope["country_code"]
+        if scope["active_only"]:
+            scope_sql += " AND e.status = :active_status"
+            params["active_status"] = EmploymentStatus.ACTIVE.name
+
+        if autocomplete:
+            # Prefix-only: served entirely by the GIN tsvector index
+            candidates_sql = f"""
+                SELECT id FROM employees
+                WHERE is_deleted = false
+                  AND to_tsvector('simple', {doc}) @@ to_tsquery('simple', :tsquery)
+            """
+            score_sql = f"ts_rank(to_tsvector('simple', {doc}), to_tsquery('simple', :tsquery))"
+        else:
+            # Each branch can use its own index; UNION de-duplicates
+            candidates_sql = f"""
+                SELECT id FROM employees
+                WHERE is_deleted = false
+                  AND (to_tsvector('simple', {doc}) @@ to_tsquery('simple', :tsquery)
+                       OR :query <% {doc})
+                UNION
+                SELECT employees.id FROM employees
+                JOIN positions ON positions.id = employees.position_id
+                WHERE employees.is_deleted = false AND lower(positions.title) % :query
+                UNION
+                SELECT employees.id FROM employees
+                JOIN departments ON departments.id = employees.department_id
+                WHERE employees.is_deleted = false AND lower(departments.name) % :query
+            """
+            score_sql = f"""(
+                ts_rank(to_tsvector('simple', {doc}), to_tsquery('simple', :tsquery))
+                + word_similarity(:query, {doc})
+                + 0.5 * coalesce(similarity(lower(p.title), :query), 0)
+                + 0.5 * coalesce(similarity(lower(d.name), :query), 0)
+                + CASE WHEN lower(e.employee_number) = :query THEN 1 ELSE 0 END
+            )"""
+
+        statement = text(f"""
+            WITH candidates AS ({candidates_sql})
+            SELECT e.id, e.employee_number, e.first_name, e.last_name, e.work_email,
+                   p.title AS position_title, d.name AS department_name,
+                   {score_sql} AS score
+            FROM candidates c
+            JOIN employees e ON e.id = c.id
+            LEFT JOIN positions p ON p.id = e.position_id
+            LEFT JOIN departments d ON d.id = e.department_id
+            WHERE true{scope_sql}
+            ORDER BY score DESC, e.last_name, e.id
+            LIMIT :limit
+        """)
+        result = await self.db.execute(statement, params)
+        return [dict(row) for row in result.mappings().all()]
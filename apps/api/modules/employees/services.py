@@ -3,11 +3,49 @@ Employee Management Module - Service Layer
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+import enum
 import uuid
 
-from modules.employees.repositories import EmployeeRepository
+from modules.employees.repositories import EmployeeRepository, DIRECTORY_COLUMNS, DIRECTORY_SORTS
+from modules.employees.hierarchy import OrgHierarchy
+from modules.employees.search import employee_search_index
 from modules.employees.schemas import EmployeeCreate, EmployeeUpdate
+from core.cache import (
+    cache, invalidate_tags, employee_write_tags,
+    build_employee_directory_key, EMPLOYEES_LIST_TAG
+)
+from core.config import settings
+from core.exceptions import BadRequestException
+from core.pagination import encode_cursor, decode_cursor
+
+DEFAULT_DIRECTORY_FIELDS = (
+    "id", "employee_number", "first_name", "last_name", "work_email",
+    "status", "department_name", "position_title",
+)
+
+
+def _directory_value(value: Any) -> Any:
+    """JSON-friendly form of a projected column value"""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _parse_enum(value: Optional[str], enum_cls, field: str):
+    if not value:
+        return None
+    token = value.strip().lower()
+    for member in enum_cls:
+        if token in (member.value.lower(), member.name.lower()):
+            return member
+    allowed = ", ".join(member.value for member in enum_cls)
+    raise BadRequestException(f"Invalid {field} '{value}'. Allowed: {allowed}")
 
 
 class EmployeeService:
@@ -29,6 +67,99 @@ class EmployeeService:
         """List all employees"""
         return await self.employee_repo.get_all(skip=skip, limit=limit)
     
+    async def get_directory(
+        self,
+        fields: Optional[str] = None,
+        sort: str = "last_name",
+        department_id: Optional[uuid.UUID] = None,
+        status: Optional[str] = None,
+        country_code: Optional[str] = None,
+        employment_type: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        count: str = "none"
+    ) -> Dict[str, Any]:
+        """
+        Keyset-paginated, projected employee directory
+        
+        fields is a comma-separated subset of DIRECTORY_COLUMNS; sort is one
+        of DIRECTORY_SORTS, prefixed with "-" for descending; count is
+        none, exact or estimated. Pages are cached under the employee list tag.
+        """
+        from modules.employees.models import EmploymentStatus, EmploymentType
+        
+        selected = [f.strip() for f in fields.split(",") if f.strip()] if fields else list(DEFAULT_DIRECTORY_FIELDS)
+        unknown = [f for f in selected if f not in DIRECTORY_COLUMNS]
+        if unknown:
+            raise BadRequestException(
+                f"Unknown fields: {', '.join(unknown)}",
+                details={"allowed": sorted(DIRECTORY_COLUMNS)}
+            )
+        selected = list(dict.fromkeys(selected))
+        
+        descending = sort.startswith("-")
+        sort_field = sort.lstrip("-")
+        if sort_field not in DIRECTORY_SORTS:
+            raise BadRequestException(f"Cannot sort by '{sort_field}'", details={"allowed": sorted(DIRECTORY_SORTS)})
+        
+        filters = {
+            "department_id": department_id,
+            "status": _parse_enum(status, EmploymentStatus, "status"),
+            "country_code": country_code.upper() if country_code else None,
+            "employment_type": _parse_enum(employment_type, EmploymentType, "employment_type"),
+        }
+        
+        after = None
+        cursor_values = decode_cursor(cursor, 3)
+        if cursor_values:
+            cursor_sort, cursor_value, cursor_id = cursor_values
+            if cursor_sort != sort:
+                raise BadRequestException("Cursor was issued for a different sort order")
+            try:
+                python_type = DIRECTORY_SORTS[sort_field].type.python_type
+                if python_type is date:
+                    cursor_value = date.fromisoformat(cursor_value)
+                elif python_type is datetime:
+                    cursor_value = datetime.fromisoformat(cursor_value)
+                after = (cursor_value, uuid.UUID(cursor_id))
+            except ValueError:
+                raise BadRequestException("Invalid pagination cursor")
+        
+        if count not in ("none", "exact", "estimated"):
+            raise BadRequestException("count must be one of: none, exact, estimated")
+        
+        async def load_page() -> Dict[str, Any]:
+            rows = await self.employee_repo.get_directory_page(
+                selected, filters, sort=sort_field, descending=descending, after=after, limit=limit + 1
+            )
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            
+            page = {
+                "items": [{field: _directory_value(row[field]) for field in selected} for row in rows],
+                "fields": selected,
+                "next_cursor": encode_cursor(sort, _directory_value(rows[-1]["_sort_value"]), rows[-1]["_id"]) if has_more else None,
+                "total": None,
+                "total_is_estimate": False
+            }
+            if count != "none":
+                page["total"], page["total_is_estimate"] = await self.employee_repo.count_directory(
+                    filters,
+                    estimated=count == "estimated",
+                    exact_below=settings.DIRECTORY_EXACT_COUNT_THRESHOLD
+                )
+            return page
+        
+        cache_key = build_employee_directory_key({
+            "fields": ",".join(selected),
+            "sort": sort,
+            "cursor": cursor,
+            "limit": limit,
+            "count": count,
+            **{k: _directory_value(v) for k, v in filters.items()}
+        })
+        return await cache.get_or_set(cache_key, load_page, ttl=300, tags=[EMPLOYEES_LIST_TAG])
+    
     async def create_employee(self, employee_data: EmployeeCreate):
         """Create new employee"""
         from sqlalchemy import select
@@ -193,18 +324,24 @@ class EmployeeService:
                 details="Too many conflicts on employee_number",
             )
         
+        await OrgHierarchy(self.db).add_employee(employee.id, employee.manager_id)
+        
         return employee
     
     async def update_employee(self, employee_id: uuid.UUID, employee_data: EmployeeUpdate):
         """Update employee"""
-        employee = await self.employee_repo.update(
-            employee_id,
-            employee_data.model_dump(exclude_unset=True)
-        )
+        update_data = employee_data.model_dump(exclude_unset=True)
+        manager_changed = "manager_id" in update_data
+        manager_id = update_data.pop("manager_id", None)
+        employee = await self.employee_repo.update(employee_id, update_data)
         if not employee:
             from core.exceptions import NotFoundException
             raise NotFoundException(resource="Employee")
+        if manager_changed:
+            await OrgHierarchy(self.db).set_manager(employee, manager_id)
         await self.db.commit()
+        await invalidate_tags(*employee_write_tags(employee))
+        employee_search_index.invalidate()
         return employee
     
     async def delete_employee(self, employee_id: uuid.UUID):
@@ -216,6 +353,8 @@ class EmployeeService:
         
         employee.is_deleted = True
         await self.db.commit()
+        await invalidate_tags(*employee_write_tags(employee))
+        employee_search_index.invalidate()
         return None
     
     async def activate_employee(self, employee_id: uuid.UUID):
@@ -242,6 +381,8 @@ class EmployeeService:
         
         employee.status = 'ACTIVE'
         await self.db.commit()
+        await invalidate_tags(*employee_write_tags(employee))
+        employee_search_index.invalidate()
         await self.db.refresh(employee)
         return employee
     
@@ -269,5 +410,7 @@ class EmployeeService:
         
         employee.status = 'TERMINATED'
         await self.db.commit()
+        await invalidate_tags(*employee_write_tags(employee))
+        employee_search_index.invalidate()
         await self.db.refresh(employee)
         return employee
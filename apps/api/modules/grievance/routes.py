@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from core.database import get_db
 from core.dependencies import get_current_active_user, require_hr_admin
 from core.pdf_generator import create_grievance_report_pdf
+from core.pdf_render import render_service
 from .schemas import GrievanceCreate, GrievanceResponse
 from .services import GrievanceService
 from typing import List
@@ -164,7 +165,7 @@ async def export_grievance_pdf(
         "assigned_to": {"first_name": "HR", "last_name": "Manager"}
     }
     
-    pdf_buffer = create_grievance_report_pdf(grievance)
+    pdf_buffer = await render_service.render(create_grievance_report_pdf, grievance)
     
     return StreamingResponse(
         pdf_buffer,
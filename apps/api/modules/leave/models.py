@@ -3,12 +3,13 @@ Leave & Attendance Module - Models
 Leave requests, balances, policies, attendance tracking
 """
 
-from sqlalchemy import Column, String, Date, Numeric, Text, ForeignKey, Boolean
+from sqlalchemy import Column, String, Date, DateTime, Numeric, Text, ForeignKey, Boolean, UniqueConstraint, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
 
 from core.database import Base
-from core.models import BaseModel, TenantMixin, AuditMixin
+from core.models import BaseModel, TenantMixin, AuditMixin, UUIDMixin
 
 
 class LeavePolicy(BaseModel, TenantMixin, Base):
@@ -25,8 +26,24 @@ class LeavePolicy(BaseModel, TenantMixin, Base):
 
 
 class LeaveBalance(BaseModel, TenantMixin, Base):
-    """Employee leave balances"""
+    """
+    Employee leave balances
+    
+    A snapshot of the leave ledger: every change is posted as a
+    LeaveLedgerEntry and applied here in the same transaction, so reading a
+    balance never has to sum the ledger.
+    """
     __tablename__ = "leave_balances"
+    __table_args__ = (
+        # One live balance per employee, type and year; the accrual engine upserts on it
+        Index(
+            'uq_leave_balances_employee_type_year',
+            'employee_id', 'leave_type', 'year',
+            unique=True,
+            postgresql_where=text('is_deleted = false'),
+            sqlite_where=text('is_deleted = 0')
+        ),
+    )
     
     employee_id = Column(UUID(as_uuid=True), ForeignKey('employees.id'), nullable=False)
     leave_type = Column(String(50), nullable=False)
@@ -38,6 +55,48 @@ class LeaveBalance(BaseModel, TenantMixin, Base):
     available_days = Column(Numeric(5, 2), nullable=False)
 
 
+class LeaveLedgerEntryType:
+    """Kinds of leave ledger entries"""
+    OPENING = "opening"        # balance that existed before the ledger
+    ACCRUAL = "accrual"
+    CARRYOVER = "carryover"
+    ADJUSTMENT = "adjustment"
+    HOLD = "hold"              # request submitted: days move to pending
+    APPROVE = "approve"        # request approved: pending days become used
+    RELEASE = "release"        # request rejected: pending days are returned
+
+
+class LeaveLedgerEntry(UUIDMixin, Base):
+    """
+    Append-only record of every leave balance change
+    
+    Entries are never updated or deleted. reference identifies the business
+    event (e.g. "leave_request:<id>:hold"), and is unique per balance, so
+    posting the same event twice is a no-op.
+    """
+    __tablename__ = "leave_ledger"
+    __table_args__ = (
+        UniqueConstraint('employee_id', 'leave_type', 'year', 'reference', name='uq_leave_ledger_reference'),
+    )
+    
+    employee_id = Column(UUID(as_uuid=True), ForeignKey('employees.id'), nullable=False, index=True)
+    leave_type = Column(String(50), nullable=False)
+    year = Column(String(10), nullable=False)
+    entry_type = Column(String(20), nullable=False)
+    
+    total_delta = Column(Numeric(5, 2), default=0, nullable=False)
+    used_delta = Column(Numeric(5, 2), default=0, nullable=False)
+    pending_delta = Column(Numeric(5, 2), default=0, nullable=False)
+    
+    leave_request_id = Column(UUID(as_uuid=True), ForeignKey('leave_requests.id'), nullable=True)
+    reference = Column(String(100), nullable=True, index=True)
+    created_by = Column(UUID(as_uuid=True), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<LeaveLedgerEntry {self.entry_type} {self.leave_type}/{self.year}>"
+
+
 class LeaveRequest(BaseModel, TenantMixin, AuditMixin, Base):
     """Employee leave requests"""
     __tablename__ = "leave_requests"
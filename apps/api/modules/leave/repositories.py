@@ -3,14 +3,18 @@ Leave & Attendance Module - Repository Layer
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func, extract
+from sqlalchemy import select, insert, update, and_, or_, func, extract, exists, text
 from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 from datetime import date, datetime
 from decimal import Decimal
 import uuid
 
-from modules.leave.models import LeavePolicy, LeaveBalance, LeaveRequest, AttendanceRecord
+from modules.leave.models import (
+    LeavePolicy, LeaveBalance, LeaveRequest, AttendanceRecord,
+    LeaveLedgerEntry, LeaveLedgerEntryType
+)
+from modules.employees.models import Employee, EmploymentStatus
 from modules.leave.schemas import (
     LeavePolicyCreate, LeaveBalanceCreate, LeaveRequestCreate,
     LeaveRequestUpdate, AttendanceRecordCreate
@@ -58,9 +62,19 @@ class LeaveBalanceRepository:
         self.db = db
     
     async def create(self, balance_data: LeaveBalanceCreate) -> LeaveBalance:
-        """Create a new leave balance"""
+        """Create a new leave balance, recording its opening ledger entry"""
         balance = LeaveBalance(**balance_data.model_dump())
         self.db.add(balance)
+        self.db.add(LeaveLedgerEntry(
+            employee_id=balance.employee_id,
+            leave_type=balance.leave_type,
+            year=balance.year,
+            entry_type=LeaveLedgerEntryType.OPENING,
+            total_delta=balance.total_days,
+            used_delta=balance.used_days,
+            pending_delta=balance.pending_days,
+            reference=LeaveLedgerEntryType.OPENING
+        ))
         await self.db.commit()
         await self.db.refresh(balance)
         return balance
@@ -99,27 +113,369 @@ class LeaveBalanceRepository:
         )
         return result.scalar_one_or_none()
     
-    async def update_balance(
+def _dialect_insert(dialect_name: str):
+    """insert() with ON CONFLICT support for the dialect, or None"""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert
+
+
+def _ledger_insert(dialect_name: str, values):
+    """INSERT that silently skips entries whose reference is already posted"""
+    dialect_insert = _dialect_insert(dialect_name)
+    if dialect_insert is None:
+        return insert(LeaveLedgerEntry).values(values)
+    return dialect_insert(LeaveLedgerEntry).values(values).on_conflict_do_nothing()
+
+
+class LeaveLedgerRepository:
+    """
+    Repository for the leave ledger and its balance snapshots
+    
+    post() appends an entry and applies it to the LeaveBalance snapshot with a
+    single UPDATE ... RETURNING. The update is relative (days = days + delta),
+    so concurrent postings serialize on the row lock instead of overwriting
+    each other, and an optional available-days guard makes holds race-free.
+    Neither commits; the caller commits with the rest of its change.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def post(
         self,
-        balance_id: uuid.UUID,
-        used_days: Optional[Decimal] = None,
-        pending_days: Optional[Decimal] = None
-    ) -> Optional[LeaveBalance]:
-        """Update leave balance"""
-        balance = await self.db.get(LeaveBalance, balance_id)
-        if not balance:
-            return None
+        employee_id: uuid.UUID,
+        leave_type: str,
+        year: str,
+        entry_type: str,
+        total_delta: Decimal = Decimal("0"),
+        used_delta: Decimal = Decimal("0"),
+        pending_delta: Decimal = Decimal("0"),
+        leave_request_id: Optional[uuid.UUID] = None,
+        reference: Optional[str] = None,
+        created_by: Optional[uuid.UUID] = None,
+        min_available: Optional[Decimal] = None
+    ) -> Optional[Dict]:
+        """
+        Append a ledger entry and apply it to the balance snapshot
         
-        if used_days is not None:
-            balance.used_days = used_days
-        if pending_days is not None:
-            balance.pending_days = pending_days
+        Returns the updated snapshot, or the current one if reference was
+        already posted. Returns None (and the caller must roll back) when no
+        snapshot exists or it has fewer than min_available days available.
+        """
+        values = {
+            "id": uuid.uuid4(),
+            "employee_id": employee_id,
+            "leave_type": leave_type,
+            "year": year,
+            "entry_type": entry_type,
+            "total_delta": total_delta,
+            "used_delta": used_delta,
+            "pending_delta": pending_delta,
+            "leave_request_id": leave_request_id,
+            "reference": reference,
+            "created_by": created_by,
+            "created_at": datetime.utcnow()
+        }
+        inserted = await self.db.execute(_ledger_insert(self.db.get_bind().dialect.name, [values]))
         
-        balance.available_days = balance.total_days - balance.used_days - balance.pending_days
+        snapshot_columns = (
+            LeaveBalance.id,
+            LeaveBalance.total_days,
+            LeaveBalance.used_days,
+            LeaveBalance.pending_days,
+            LeaveBalance.available_days
+        )
+        balance_key = and_(
+            LeaveBalance.employee_id == employee_id,
+            LeaveBalance.leave_type == leave_type,
+            LeaveBalance.year == year,
+            LeaveBalance.is_deleted == False
+        )
         
-        await self.db.commit()
-        await self.db.refresh(balance)
-        return balance
+        if inserted.rowcount == 0:
+            result = await self.db.execute(select(*snapshot_columns).where(balance_key))
+            row = result.mappings().first()
+            return dict(row) if row else None
+        
+        conditions = [balance_key]
+        if min_available is not None:
+            conditions.append(LeaveBalance.available_days >= min_available)
+        
+        result = await self.db.execute(
+            update(LeaveBalance)
+            .where(and_(*conditions))
+            .values(
+                total_days=LeaveBalance.total_days + total_delta,
+                used_days=LeaveBalance.used_days + used_delta,
+                pending_days=LeaveBalance.pending_days + pending_delta,
+                available_days=LeaveBalance.available_days + (total_delta - used_delta - pending_delta),
+                updated_at=datetime.utcnow()
+            )
+            .returning(*snapshot_columns)
+            .execution_options(synchronize_session="fetch")
+        )
+        row = result.mappings().first()
+        return dict(row) if row else None
+    
+    async def has_entry(self, reference: str) -> bool:
+        """Whether an entry with this reference has been posted"""
+        result = await self.db.execute(
+            select(LeaveLedgerEntry.id).where(LeaveLedgerEntry.reference == reference).limit(1)
+        )
+        return result.first() is not None
+    
+    async def get_entries(
+        self,
+        employee_id: uuid.UUID,
+        leave_type: str,
+        year: str
+    ) -> List[LeaveLedgerEntry]:
+        """Ledger entries of one balance, oldest first"""
+        result = await self.db.execute(
+            select(LeaveLedgerEntry)
+            .where(
+                and_(
+                    LeaveLedgerEntry.employee_id == employee_id,
+                    LeaveLedgerEntry.leave_type == leave_type,
+                    LeaveLedgerEntry.year == year
+                )
+            )
+            .order_by(LeaveLedgerEntry.created_at)
+        )
+        return list(result.scalars().all())
+    
+    async def recompute_snapshots(self, employee_id: Optional[uuid.UUID] = None) -> Dict[str, int]:
+        """
+        Rebuild balance snapshots from the ledger
+        
+        Only balances with ledger entries are touched. Returns how many
+        snapshots were checked and how many had drifted and were corrected.
+        """
+        query = select(
+            LeaveLedgerEntry.employee_id,
+            LeaveLedgerEntry.leave_type,
+            LeaveLedgerEntry.year,
+            func.sum(LeaveLedgerEntry.total_delta).label("total_days"),
+            func.sum(LeaveLedgerEntry.used_delta).label("used_days"),
+            func.sum(LeaveLedgerEntry.pending_delta).label("pending_days")
+        ).group_by(LeaveLedgerEntry.employee_id, LeaveLedgerEntry.leave_type, LeaveLedgerEntry.year)
+        if employee_id is not None:
+            query = query.where(LeaveLedgerEntry.employee_id == employee_id)
+        sums = query.subquery()
+        
+        matches_ledger = and_(
+            LeaveBalance.employee_id == sums.c.employee_id,
+            LeaveBalance.leave_type == sums.c.leave_type,
+            LeaveBalance.year == sums.c.year,
+            LeaveBalance.is_deleted == False
+        )
+        drifted = or_(
+            LeaveBalance.total_days != sums.c.total_days,
+            LeaveBalance.used_days != sums.c.used_days,
+            LeaveBalance.pending_days != sums.c.pending_days,
+            LeaveBalance.available_days != sums.c.total_days - sums.c.used_days - sums.c.pending_days
+        )
+        
+        checked = (await self.db.execute(
+            select(func.count()).select_from(LeaveBalance).join(sums, matches_ledger)
+        )).scalar() or 0
+        
+        result = await self.db.execute(
+            update(LeaveBalance)
+            .where(and_(matches_ledger, drifted))
+            .values(
+                total_days=sums.c.total_days,
+                used_days=sums.c.used_days,
+                pending_days=sums.c.pending_days,
+                available_days=sums.c.total_days - sums.c.used_days - sums.c.pending_days,
+                updated_at=datetime.utcnow()
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return {"checked": checked, "corrected": result.rowcount}
+
+
+class LeaveAccrualRepository:
+    """
+    Set-based accrual and carryover postings
+    
+    Work is done one chunk of employees at a time: one keyset-paginated
+    SELECT, one multi-row ledger INSERT and one multi-row balance upsert.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_policies(self) -> List[LeavePolicy]:
+        result = await self.db.execute(
+            select(LeavePolicy)
+            .where(LeavePolicy.is_deleted == False)
+            .order_by(LeavePolicy.leave_type, LeavePolicy.country_code)
+        )
+        return list(result.scalars().all())
+    
+    @staticmethod
+    def _policy_scope(policy: LeavePolicy, overridden_countries: Sequence[str]):
+        """Employees a policy applies to: its country, or (global policy) every country without its own"""
+        if policy.country_code:
+            return Employee.country_code == policy.country_code
+        if overridden_countries:
+            return or_(Employee.country_code.is_(None), Employee.country_code.notin_(overridden_countries))
+        return True
+    
+    async def get_accrual_candidates(
+        self,
+        policy: LeavePolicy,
+        overridden_countries: Sequence[str],
+        year: str,
+        period_start: date,
+        period_end: date,
+        after_id: Optional[uuid.UUID],
+        limit: int
+    ) -> List:
+        """
+        Next chunk of (id, hire_date, termination_date, country_code) employed
+        during the period
+        
+        Balances seeded with an opening entry already hold the year's
+        allowance and are skipped until the next year.
+        """
+        seeded = exists().where(
+            and_(
+                LeaveLedgerEntry.employee_id == Employee.id,
+                LeaveLedgerEntry.leave_type == policy.leave_type,
+                LeaveLedgerEntry.year == year,
+                LeaveLedgerEntry.entry_type == LeaveLedgerEntryType.OPENING
+            )
+        )
+        conditions = [
+            Employee.is_deleted == False,
+            Employee.status.in_([EmploymentStatus.ACTIVE, EmploymentStatus.ON_LEAVE]),
+            Employee.hire_date <= period_end,
+            or_(Employee.termination_date.is_(None), Employee.termination_date >= period_start),
+            self._policy_scope(policy, overridden_countries),
+            ~seeded
+        ]
+        if after_id is not None:
+            conditions.append(Employee.id > after_id)
+        
+        result = await self.db.execute(
+            select(Employee.id, Employee.hire_date, Employee.termination_date, Employee.country_code)
+            .where(and_(*conditions))
+            .order_by(Employee.id)
+            .limit(limit)
+        )
+        return result.all()
+    
+    async def get_carryover_candidates(
+        self,
+        policy: LeavePolicy,
+        overridden_countries: Sequence[str],
+        from_year: str,
+        after_id: Optional[uuid.UUID],
+        limit: int
+    ) -> List:
+        """Next chunk of (employee_id, country_code, available_days) with days left in from_year"""
+        conditions = [
+            LeaveBalance.leave_type == policy.leave_type,
+            LeaveBalance.year == from_year,
+            LeaveBalance.is_deleted == False,
+            LeaveBalance.available_days > 0,
+            Employee.is_deleted == False,
+            self._policy_scope(policy, overridden_countries)
+        ]
+        if after_id is not None:
+            conditions.append(LeaveBalance.employee_id > after_id)
+        
+        result = await self.db.execute(
+            select(LeaveBalance.employee_id, Employee.country_code, LeaveBalance.available_days)
+            .join(Employee, Employee.id == LeaveBalance.employee_id)
+            .where(and_(*conditions))
+            .order_by(LeaveBalance.employee_id)
+            .limit(limit)
+        )
+        return result.all()
+    
+    async def post_credits(
+        self,
+        leave_type: str,
+        year: str,
+        entry_type: str,
+        reference: str,
+        credits: Sequence[Tuple[uuid.UUID, Optional[str], Decimal]]
+    ) -> int:
+        """
+        Credit (employee_id, country_code, days) rows to one leave type and year
+        
+        The ledger insert skips employees already credited for reference and
+        returns the rest; only those are upserted into the balance snapshots,
+        so re-running a period changes nothing. Returns the number posted.
+        """
+        if not credits:
+            return 0
+        
+        dialect_name = self.db.get_bind().dialect.name
+        now = datetime.utcnow()
+        ledger_rows = [
+            {
+                "id": uuid.uuid4(),
+                "employee_id": employee_id,
+                "leave_type": leave_type,
+                "year": year,
+                "entry_type": entry_type,
+                "total_delta": days,
+                "used_delta": Decimal("0"),
+                "pending_delta": Decimal("0"),
+                "reference": reference,
+                "created_at": now
+            }
+            for employee_id, _, days in credits
+        ]
+        result = await self.db.execute(
+            _ledger_insert(dialect_name, ledger_rows).returning(
+                LeaveLedgerEntry.employee_id, LeaveLedgerEntry.total_delta
+            )
+        )
+        posted = result.all()
+        if not posted:
+            return 0
+        
+        countries = {employee_id: country_code for employee_id, country_code, _ in credits}
+        balance_rows = [
+            {
+                "id": uuid.uuid4(),
+                "employee_id": employee_id,
+                "leave_type": leave_type,
+                "year": year,
+                "total_days": days,
+                "used_days": Decimal("0"),
+                "pending_days": Decimal("0"),
+                "available_days": days,
+                "country_code": countries[employee_id],
+                "is_deleted": False,
+                "created_at": now,
+                "updated_at": now
+            }
+            for employee_id, days in posted
+        ]
+        upsert = _dialect_insert(dialect_name)(LeaveBalance).values(balance_rows)
+        await self.db.execute(
+            upsert.on_conflict_do_update(
+                index_elements=[LeaveBalance.employee_id, LeaveBalance.leave_type, LeaveBalance.year],
+                index_where=text("is_deleted = false" if dialect_name == "postgresql" else "is_deleted = 0"),
+                set_={
+                    "total_days": LeaveBalance.total_days + upsert.excluded.total_days,
+                    "available_days": LeaveBalance.available_days + upsert.excluded.available_days,
+                    "updated_at": upsert.excluded.updated_at
+                }
+            )
+        )
+        return len(posted)
 
 
 class LeaveRequestRepository:
@@ -128,8 +484,14 @@ class LeaveRequestRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
     
-    async def create(self, request_data: LeaveRequestCreate, total_days: Decimal, country_code: str = None) -> LeaveRequest:
-        """Create a new leave request"""
+    async def create(
+        self,
+        request_data: LeaveRequestCreate,
+        total_days: Decimal,
+        country_code: str = None,
+        commit: bool = True
+    ) -> LeaveRequest:
+        """Create a new leave request (commit=False only flushes, to join the caller's transaction)"""
         request_dict = request_data.model_dump()
         leave_request = LeaveRequest(
             **request_dict,
@@ -138,6 +500,9 @@ class LeaveRequestRepository:
             country_code=country_code or 'US'  # Default to 'US' if not provided
         )
         self.db.add(leave_request)
+        if not commit:
+            await self.db.flush()
+            return leave_request
         await self.db.commit()
         await self.db.refresh(leave_request)
         return leave_request
@@ -149,6 +514,13 @@ class LeaveRequestRepository:
         )
         return result.scalar_one_or_none()
     
+    async def get_for_update(self, request_id: uuid.UUID) -> Optional[LeaveRequest]:
+        """Load a leave request and lock its row until the transaction ends"""
+        result = await self.db.execute(
+            select(LeaveRequest).where(LeaveRequest.id == request_id).with_for_update()
+        )
+        return result.scalar_one_or_none()
+    
     async def get_by_employee(self, employee_id: uuid.UUID) -> List[LeaveRequest]:
         """Get all leave requests for an employee"""
         result = await self.db.execute(
@@ -192,9 +564,10 @@ class LeaveRequestRepository:
     async def approve(
         self,
         request_id: uuid.UUID,
-        approver_id: uuid.UUID
+        approver_id: uuid.UUID,
+        commit: bool = True
     ) -> Optional[LeaveRequest]:
-        """Approve a leave request"""
+        """Approve a leave request (commit=False only flushes, to join the caller's transaction)"""
         leave_request = await self.get_by_id(request_id)
         if not leave_request:
             return None
@@ -203,6 +576,9 @@ class LeaveRequestRepository:
         leave_request.approver_id = approver_id
         leave_request.approved_date = date.today()
         
+        if not commit:
+            await self.db.flush()
+            return leave_request
         await self.db.commit()
         await self.db.refresh(leave_request)
         return leave_request
@@ -211,9 +587,10 @@ class LeaveRequestRepository:
         self,
         request_id: uuid.UUID,
         approver_id: uuid.UUID,
-        reason: str
+        reason: str,
+        commit: bool = True
     ) -> Optional[LeaveRequest]:
-        """Reject a leave request"""
+        """Reject a leave request (commit=False only flushes, to join the caller's transaction)"""
         leave_request = await self.get_by_id(request_id)
         if not leave_request:
             return None
@@ -223,6 +600,9 @@ class LeaveRequestRepository:
         leave_request.approved_date = date.today()
         leave_request.rejection_reason = reason
         
+        if not commit:
+            await self.db.flush()
+            return leave_request
         await self.db.commit()
         await self.db.refresh(leave_request)
         return leave_request
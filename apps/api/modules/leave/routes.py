@@ -8,10 +8,10 @@ from typing import Optional
 import uuid
 
 from core.database import get_db
-from core.dependencies import get_current_active_user
+from core.dependencies import get_current_active_user, require_hr_admin
 from core.pdf_generator import create_leave_request_pdf
+from core.pdf_render import render_service
 from modules.leave.models import LeaveRequest, LeavePolicy
-from modules.employees.models import Employee
 from modules.leave.schemas import (
     LeavePolicyCreate, LeavePolicyResponse,
     LeaveRequestCreate, AttendanceRecordCreate
@@ -137,7 +137,7 @@ async def export_leave_request_pdf(
         } if leave_req.approver else None
     }
     
-    pdf_buffer = create_leave_request_pdf(leave_request)
+    pdf_buffer = await render_service.render(create_leave_request_pdf, leave_request)
     
     return StreamingResponse(
         pdf_buffer,
@@ -370,6 +370,19 @@ async def delete_leave_policy(
     return {"message": "Leave policy deleted successfully"}
 
 
+@router.post("/balances/recompute")
+async def recompute_leave_balances(
+    employee_id: Optional[uuid.UUID] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(require_hr_admin)
+):
+    """Rebuild leave balances from the leave ledger (all employees, or one)"""
+    from modules.leave.services import LeaveService
+    
+    leave_service = LeaveService(db)
+    return await leave_service.recompute_balances(employee_id)
+
+
 @router.post("/balances/initialize")
 async def initialize_leave_balances(
     admin_key: Optional[str] = None,
@@ -380,10 +393,11 @@ async def initialize_leave_balances(
     Initialize leave balances for all active employees based on leave policies
     This should be run after creating or updating leave policies
     Can also be called with admin_key for initial setup
+    
+    Runs the accrual engine for every period of the current year so far;
+    periods already accrued are skipped, so it is safe to call repeatedly.
     """
-    from modules.leave.models import LeaveBalance
-    from sqlalchemy import and_
-    from decimal import Decimal
+    from modules.leave.services import LeaveAccrualService
     from datetime import datetime
     from core.config import settings
     
@@ -396,83 +410,20 @@ async def initialize_leave_balances(
         if 'admin' not in user_roles and 'hr_manager' not in user_roles:
             raise HTTPException(status_code=403, detail="Only HR admins can initialize leave balances")
     
+    policies_result = await db.execute(
+        select(LeavePolicy.id).where(LeavePolicy.is_deleted == False).limit(1)
+    )
+    if policies_result.first() is None:
+        raise HTTPException(status_code=400, detail="No leave policies found. Create policies first!")
+    
     try:
-        current_year = str(datetime.now().year)
-        
-        # Get all active employees
-        employees_result = await db.execute(
-            select(Employee).where(
-                and_(
-                    Employee.is_deleted == False,
-                    Employee.status == 'active'
-                )
-            )
-        )
-        employees = employees_result.scalars().all()
-        
-        # Get all leave policies
-        policies_result = await db.execute(
-            select(LeavePolicy).where(LeavePolicy.is_deleted == False)
-        )
-        policies = policies_result.scalars().all()
-        
-        if not policies:
-            raise HTTPException(status_code=400, detail="No leave policies found. Create policies first!")
-        
-        created_count = 0
-        updated_count = 0
-        skipped_count = 0
-        
-        # For each employee and policy combination
-        for emp in employees:
-            for policy in policies:
-                # Check if balance already exists
-                existing_balance_result = await db.execute(
-                    select(LeaveBalance).where(
-                        and_(
-                            LeaveBalance.employee_id == emp.id,
-                            LeaveBalance.leave_type == policy.leave_type,
-                            LeaveBalance.year == current_year,
-                            LeaveBalance.is_deleted == False
-                        )
-                    )
-                )
-                existing_balance = existing_balance_result.scalar_one_or_none()
-                
-                if existing_balance:
-                    # Update if days changed
-                    if existing_balance.total_days != policy.days_per_year:
-                        existing_balance.total_days = policy.days_per_year
-                        existing_balance.available_days = policy.days_per_year - existing_balance.used_days - existing_balance.pending_days
-                        updated_count += 1
-                    else:
-                        skipped_count += 1
-                else:
-                    # Create new balance
-                    balance = LeaveBalance(
-                        employee_id=emp.id,
-                        leave_type=policy.leave_type,
-                        year=current_year,
-                        total_days=policy.days_per_year,
-                        used_days=Decimal("0"),
-                        pending_days=Decimal("0"),
-                        available_days=policy.days_per_year,
-                        country_code=emp.country_code
-                    )
-                    db.add(balance)
-                    created_count += 1
-        
-        await db.commit()
+        stats = await LeaveAccrualService(db).run(catch_up=True)
         
         return {
             "success": True,
             "message": f"Leave balances initialized successfully",
-            "created": created_count,
-            "updated": updated_count,
-            "skipped": skipped_count,
-            "total_employees": len(employees),
-            "total_policies": len(policies),
-            "year": current_year
+            **stats,
+            "year": str(datetime.now().year)
         }
     
     except Exception as e:
@@ -4,15 +4,18 @@ Leave & Attendance Module - Service Layer with Approval Workflow Integration
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List, Optional
-from datetime import date, datetime
-from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Tuple
+from datetime import date, datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from collections import defaultdict
+import logging
 import uuid
 
 from modules.leave.repositories import (
-    LeavePolicyRepository, LeaveBalanceRepository,
-    LeaveRequestRepository, AttendanceRepository
+    LeavePolicyRepository, LeaveBalanceRepository, LeaveLedgerRepository,
+    LeaveAccrualRepository, LeaveRequestRepository, AttendanceRepository
 )
+from modules.leave.models import LeavePolicy, LeaveLedgerEntryType
 from modules.leave.schemas import (
     LeavePolicyCreate, LeavePolicyResponse,
     LeaveBalanceCreate, LeaveBalanceResponse,
@@ -25,6 +28,14 @@ from modules.approvals.models import ApprovalType
 from modules.employees.models import Employee
 from core.exceptions import NotFoundException, BadRequestException
 from core.email import email_service
+from core.cache import invalidate_tags, employee_tag, approvals_tag, APPROVALS_ORG_TAG
+from core.config import settings
+from core.work_calendar import get_work_calendar
+
+logger = logging.getLogger(__name__)
+
+# Accrual periods per year for LeavePolicy.accrual_rate (no rate = yearly grant)
+ACCRUAL_PERIODS_PER_YEAR = {"monthly": 12, "quarterly": 4, "yearly": 1}
 
 
 class LeaveService:
@@ -34,6 +45,7 @@ class LeaveService:
         self.db = db
         self.policy_repo = LeavePolicyRepository(db)
         self.balance_repo = LeaveBalanceRepository(db)
+        self.ledger_repo = LeaveLedgerRepository(db)
         self.request_repo = LeaveRequestRepository(db)
         self.attendance_repo = AttendanceRepository(db)
         self.approval_service = ApprovalService(db)
@@ -62,6 +74,18 @@ class LeaveService:
         balances = await self.balance_repo.get_by_employee_and_year(employee_id, year)
         return [LeaveBalanceResponse.model_validate(b) for b in balances]
     
+    async def recompute_balances(self, employee_id: Optional[uuid.UUID] = None) -> dict:
+        """Rebuild balance snapshots from the leave ledger, correcting any drift"""
+        stats = await self.ledger_repo.recompute_snapshots(employee_id)
+        await self.db.commit()
+        if employee_id:
+            await invalidate_tags(employee_tag(employee_id))
+        return stats
+    
+    @staticmethod
+    def _ledger_reference(request_id: uuid.UUID, entry_type: str) -> str:
+        return f"leave_request:{request_id}:{entry_type}"
+    
     # Leave Request methods
     async def submit_leave_request(
         self,
@@ -85,8 +109,15 @@ class LeaveService:
         if not employee.manager_id:
             raise BadRequestException("Employee has no supervisor assigned. Cannot route for approval.")
         
-        # Calculate total days
-        total_days = Decimal((request_data.end_date - request_data.start_date).days + 1)
+        if request_data.end_date < request_data.start_date:
+            raise BadRequestException("End date must be on or after the start date")
+        
+        # Count working days only: weekends and public holidays of the
+        # employee's country do not use up leave
+        work_calendar = await get_work_calendar(self.db, employee.country_code)
+        total_days = Decimal(work_calendar.working_days(request_data.start_date, request_data.end_date))
+        if total_days == 0:
+            raise BadRequestException("The requested period contains no working days")
         
         # Check leave balance
         year = str(request_data.start_date.year)
@@ -101,14 +132,8 @@ class LeaveService:
                 f"Insufficient leave balance. Available: {balance.available_days}, Requested: {total_days}"
             )
         
-        # Create leave request with country_code from employee
         country_code = employee.country_code or 'US'  # Default to 'US' if not set
-        leave_request = await self.request_repo.create(request_data, total_days, country_code=country_code)
-        leave_request.approver_id = employee.manager_id
-        await self.db.commit()
-        await self.db.refresh(leave_request)
         
-        # Create first approval (Line Manager)
         # Second approval (HR Manager) will be created automatically when Line Manager approves
         from core.role_helpers import get_hr_manager
         
@@ -117,6 +142,32 @@ class LeaveService:
         if not hr_manager:
             raise BadRequestException("HR Manager not found. Cannot create approval chain.")
         
+        # Create the leave request, its hold, the first approval and the
+        # supervisor's notification in one transaction; the guarded hold is
+        # what actually stops concurrent requests overdrawing
+        leave_request = await self.request_repo.create(
+            request_data, total_days, country_code=country_code, commit=False
+        )
+        leave_request.approver_id = employee.manager_id
+        
+        if balance:
+            held = await self.ledger_repo.post(
+                request_data.employee_id,
+                request_data.leave_type,
+                year,
+                LeaveLedgerEntryType.HOLD,
+                pending_delta=total_days,
+                leave_request_id=leave_request.id,
+                reference=self._ledger_reference(leave_request.id, LeaveLedgerEntryType.HOLD),
+                created_by=current_employee_id,
+                min_available=total_days
+            )
+            if held is None:
+                await self.db.rollback()
+                raise BadRequestException(
+                    f"Insufficient leave balance. Requested: {total_days}"
+                )
+        
         # Create first approval (Line Manager) only
         approval_data = ApprovalRequestCreate(
             request_type=ApprovalType.LEAVE,
@@ -131,7 +182,8 @@ class LeaveService:
             country_code=country_code,
             approval_level=1,
             is_final_approval=False,
-            next_approver_id=hr_manager.id  # Store next approver ID for sequential creation
+            next_approver_id=hr_manager.id,  # Store next approver ID for sequential creation
+            commit=False
         )
         
         # Send email notification to Line Manager (first approver)
@@ -140,9 +192,9 @@ class LeaveService:
         )
         supervisor = supervisor_result.scalar_one_or_none()
         
-        if supervisor and supervisor.email:
+        if supervisor and supervisor.work_email:
             await email_service.send_approval_request_notification(
-                to_email=supervisor.email,
+                to_email=supervisor.work_email,
                 employee_name=f"{employee.first_name} {employee.last_name}",
                 request_type="leave",
                 request_details={
@@ -151,13 +203,20 @@ class LeaveService:
                     "End Date": request_data.end_date.strftime("%Y-%m-%d"),
                     "Days": str(total_days),
                     "Reason": request_data.reason or "N/A"
-                }
+                },
+                db=self.db,
+                dedupe_key=f"approval:{line_manager_approval.id}:requested"
             )
         
-        # Update leave balance (add to pending)
-        if balance:
-            new_pending = balance.pending_days + total_days
-            await self.balance_repo.update_balance(balance.id, pending_days=new_pending)
+        await self.db.commit()
+        await self.db.refresh(leave_request)
+        
+        await invalidate_tags(
+            employee_tag(request_data.employee_id),
+            approvals_tag(line_manager_approval.approver_id),
+            approvals_tag(hr_manager.id),
+            APPROVALS_ORG_TAG
+        )
         
         return LeaveRequestResponse.model_validate(leave_request)
     
@@ -193,45 +252,36 @@ class LeaveService:
             if approval.request_id != request_id:
                 raise BadRequestException("Approval request does not match leave request")
             
+            leave_request = await self.request_repo.get_by_id(request_id)
+            if not leave_request:
+                raise NotFoundException("Leave request not found")
+            if leave_request.status != "pending":
+                raise BadRequestException(f"Leave request is already {leave_request.status}")
+            
             # Approve the approval request (this handles notifications)
             await self.approval_service.approve_request(approval_id, approver_id, comments)
             
             # Only process leave request if this is the final approval
             if approval.is_final_approval:
-                leave_request = await self.request_repo.approve(request_id, approver_id)
-                if not leave_request:
-                    raise NotFoundException("Leave request not found")
-                
-                # Update leave balance (move from pending to used)
-                year = str(leave_request.start_date.year)
-                balance = await self.balance_repo.get_by_employee_type_year(
-                    leave_request.employee_id,
-                    leave_request.leave_type,
-                    year
-                )
-                
-                if balance:
-                    new_pending = balance.pending_days - leave_request.total_days
-                    new_used = balance.used_days + leave_request.total_days
-                    await self.balance_repo.update_balance(
-                        balance.id,
-                        used_days=new_used,
-                        pending_days=new_pending
-                    )
-                
-                return LeaveRequestResponse.model_validate(leave_request)
+                return await self._approve(request_id, approver_id)
             else:
                 # Not final approval, just return the leave request without processing
-                leave_request = await self.request_repo.get_by_id(request_id)
-                if not leave_request:
-                    raise NotFoundException("Leave request not found")
+                await self.db.refresh(leave_request)
                 return LeaveRequestResponse.model_validate(leave_request)
         else:
             # Legacy path - direct approval (for backward compatibility)
-            leave_request = await self.request_repo.approve(request_id, approver_id)
-            if not leave_request:
-                raise NotFoundException("Leave request not found")
-            return LeaveRequestResponse.model_validate(leave_request)
+            return await self._approve(request_id, approver_id)
+    
+    async def _approve(self, request_id: uuid.UUID, approver_id: uuid.UUID) -> LeaveRequestResponse:
+        """Mark a pending request approved and move its held days to used, in one commit"""
+        await self._lock_pending(request_id)
+        leave_request = await self.request_repo.approve(request_id, approver_id, commit=False)
+        await self._settle_hold(leave_request, LeaveLedgerEntryType.APPROVE, approver_id)
+        await self.db.commit()
+        await self.db.refresh(leave_request)
+        
+        await invalidate_tags(employee_tag(leave_request.employee_id))
+        return LeaveRequestResponse.model_validate(leave_request)
     
     async def reject_leave_request(
         self,
@@ -240,9 +290,8 @@ class LeaveService:
         reason: str
     ) -> LeaveRequestResponse:
         """Reject a leave request (called after approval workflow rejects)"""
-        leave_request = await self.request_repo.reject(request_id, approver_id, reason)
-        if not leave_request:
-            raise NotFoundException("Leave request not found")
+        await self._lock_pending(request_id)
+        leave_request = await self.request_repo.reject(request_id, approver_id, reason, commit=False)
         
         # Send email notification to employee
         employee_result = await self.db.execute(
@@ -250,28 +299,62 @@ class LeaveService:
         )
         employee = employee_result.scalar_one_or_none()
         
-        if employee and employee.email:
+        if employee and employee.work_email:
             await email_service.send_approval_status_notification(
-                to_email=employee.email,
+                to_email=employee.work_email,
                 request_type="leave",
                 status="rejected",
-                comments=reason
+                comments=reason,
+                db=self.db,
+                dedupe_key=f"leave:{leave_request.id}:rejected"
             )
         
-        # Update leave balance (remove from pending)
-        year = str(leave_request.start_date.year)
-        balance = await self.balance_repo.get_by_employee_type_year(
-            leave_request.employee_id,
-            leave_request.leave_type,
-            year
-        )
+        # Return the held days
+        await self._settle_hold(leave_request, LeaveLedgerEntryType.RELEASE, approver_id)
         
-        if balance:
-            new_pending = balance.pending_days - leave_request.total_days
-            await self.balance_repo.update_balance(balance.id, pending_days=new_pending)
+        await self.db.commit()
+        await self.db.refresh(leave_request)
+        
+        await invalidate_tags(employee_tag(leave_request.employee_id))
         
         return LeaveRequestResponse.model_validate(leave_request)
     
+    async def _lock_pending(self, request_id: uuid.UUID) -> None:
+        """Lock a leave request row, refusing requests that were already decided"""
+        leave_request = await self.request_repo.get_for_update(request_id)
+        if not leave_request:
+            raise NotFoundException("Leave request not found")
+        status = leave_request.status
+        if status != "pending":
+            await self.db.rollback()
+            raise BadRequestException(f"Leave request is already {status}")
+    
+    async def _settle_hold(self, leave_request, entry_type: str, approver_id: uuid.UUID) -> None:
+        """
+        Post the approve or release entry for a request's hold (the caller commits)
+        
+        Requests submitted without a balance have no hold and are skipped.
+        Approval and release share one ledger reference, so a request's hold
+        is settled at most once whichever way it is decided.
+        """
+        if not await self.ledger_repo.has_entry(
+            self._ledger_reference(leave_request.id, LeaveLedgerEntryType.HOLD)
+        ):
+            return
+        
+        days = leave_request.total_days
+        await self.ledger_repo.post(
+            leave_request.employee_id,
+            leave_request.leave_type,
+            str(leave_request.start_date.year),
+            entry_type,
+            used_delta=days if entry_type == LeaveLedgerEntryType.APPROVE else Decimal("0"),
+            pending_delta=-days,
+            leave_request_id=leave_request.id,
+            reference=self._ledger_reference(leave_request.id, "settle"),
+            created_by=approver_id
+        )
+    
     # Attendance methods
     async def record_attendance(
         self,
@@ -288,6 +371,7 @@ class LeaveService:
             raise BadRequestException("Attendance already recorded for this date")
         
         record = await self.attendance_repo.create(attendance_data)
+        await invalidate_tags(employee_tag(attendance_data.employee_id))
         return AttendanceRecordResponse.model_validate(record)
     
     async def get_monthly_attendance(
@@ -299,3 +383,165 @@ class LeaveService:
         """Get attendance records for a month"""
         records = await self.attendance_repo.get_by_employee_and_month(employee_id, year, month)
         return [AttendanceRecordResponse.model_validate(r) for r in records]
+
+
+class LeaveAccrualService:
+    """
+    Bulk leave accrual and year-end carryover
+    
+    Each policy grants days_per_year spread over its accrual periods. Period
+    amounts are the difference of rounded cumulative totals, so twelve
+    monthly accruals add up to exactly days_per_year. The periods an employee
+    is hired and terminated in are pro-rated by the days they were employed.
+    Every credit is a ledger entry referenced by its period ("accrual:2025-04"),
+    so running a period again posts nothing new.
+    
+    Carryover moves unused days of a year into the next one, capped at the
+    policy's max_carryover; policies without max_carryover carry nothing.
+    """
+    
+    def __init__(
+        self,
+        db: AsyncSession,
+        chunk_size: int = settings.LEAVE_ACCRUAL_CHUNK_SIZE,
+        progress: Optional[Callable[[Dict], None]] = None
+    ):
+        self.db = db
+        self.repo = LeaveAccrualRepository(db)
+        self.chunk_size = chunk_size
+        self.progress = progress
+    
+    @staticmethod
+    def periods_per_year(policy: LeavePolicy) -> int:
+        return ACCRUAL_PERIODS_PER_YEAR.get((policy.accrual_rate or "yearly").lower(), 1)
+    
+    @staticmethod
+    def accrual_period(on: date, periods: int) -> Tuple[int, date, date, str]:
+        """(index from 1, start, end, key) of the accrual period containing on"""
+        months = 12 // periods
+        index = (on.month - 1) // months + 1
+        start = date(on.year, (index - 1) * months + 1, 1)
+        end = date(on.year + 1, 1, 1) if index == periods else date(on.year, index * months + 1, 1)
+        end -= timedelta(days=1)
+        
+        if periods == 12:
+            key = f"{on.year}-{index:02d}"
+        elif periods == 4:
+            key = f"{on.year}-Q{index}"
+        else:
+            key = str(on.year)
+        return index, start, end, key
+    
+    @staticmethod
+    def period_amount(days_per_year: Decimal, index: int, periods: int) -> Decimal:
+        cent = Decimal("0.01")
+        cumulative = (days_per_year * index / periods).quantize(cent, ROUND_HALF_UP)
+        previous = (days_per_year * (index - 1) / periods).quantize(cent, ROUND_HALF_UP)
+        return cumulative - previous
+    
+    async def run(self, on: Optional[date] = None, catch_up: bool = False) -> Dict:
+        """
+        Accrue the period containing on for every policy
+        
+        catch_up also accrues the earlier periods of the year (for new
+        policies or first-time setup). In January, or with catch_up, last
+        year's carryover is posted first.
+        """
+        on = on or date.today()
+        policies = await self.repo.get_policies()
+        overridden = defaultdict(list)
+        for policy in policies:
+            if policy.country_code:
+                overridden[policy.leave_type].append(policy.country_code)
+        
+        stats = {"carried_over": 0, "accrued": 0, "periods": 0}
+        if on.month == 1 or catch_up:
+            for policy in policies:
+                stats["carried_over"] += await self.carry_over(policy, overridden[policy.leave_type], on.year - 1)
+        
+        for policy in policies:
+            periods = self.periods_per_year(policy)
+            current, _, _, _ = self.accrual_period(on, periods)
+            for index in range(1 if catch_up else current, current + 1):
+                month = (index - 1) * (12 // periods) + 1
+                stats["accrued"] += await self.accrue(
+                    policy, overridden[policy.leave_type], date(on.year, month, 1)
+                )
+                stats["periods"] += 1
+        
+        logger.info(f"Leave accrual run for {on}: {stats}")
+        return stats
+    
+    async def accrue(self, policy: LeavePolicy, overridden_countries: List[str], on: date) -> int:
+        """Post one policy's accrual for the period containing on; returns employees credited"""
+        periods = self.periods_per_year(policy)
+        index, start, end, key = self.accrual_period(on, periods)
+        amount = self.period_amount(Decimal(policy.days_per_year), index, periods)
+        period_days = Decimal((end - start).days + 1)
+        year = str(on.year)
+        
+        posted, processed, after_id = 0, 0, None
+        while True:
+            employees = await self.repo.get_accrual_candidates(
+                policy, overridden_countries, year, start, end, after_id, self.chunk_size
+            )
+            if not employees:
+                break
+            
+            credits = []
+            for employee_id, hire_date, termination_date, country_code in employees:
+                days = amount
+                employed_from = max(start, hire_date)
+                employed_to = min(end, termination_date) if termination_date else end
+                if employed_from > start or employed_to < end:
+                    days = (amount * Decimal((employed_to - employed_from).days + 1) / period_days).quantize(
+                        Decimal("0.01"), ROUND_HALF_UP
+                    )
+                if days > 0:
+                    credits.append((employee_id, country_code, days))
+            
+            posted += await self.repo.post_credits(
+                policy.leave_type, year, LeaveLedgerEntryType.ACCRUAL, f"accrual:{key}", credits
+            )
+            await self.db.commit()
+            
+            processed += len(employees)
+            after_id = employees[-1][0]
+            self._report({"stage": "accrual", "leave_type": policy.leave_type, "period": key,
+                          "processed": processed, "posted": posted})
+        return posted
+    
+    async def carry_over(self, policy: LeavePolicy, overridden_countries: List[str], from_year: int) -> int:
+        """Carry unused days of from_year into the next year; returns employees credited"""
+        if not policy.max_carryover or policy.max_carryover <= 0:
+            return 0
+        
+        cap = Decimal(policy.max_carryover)
+        posted, processed, after_id = 0, 0, None
+        while True:
+            balances = await self.repo.get_carryover_candidates(
+                policy, overridden_countries, str(from_year), after_id, self.chunk_size
+            )
+            if not balances:
+                break
+            
+            credits = [
+                (employee_id, country_code, min(Decimal(available), cap))
+                for employee_id, country_code, available in balances
+            ]
+            posted += await self.repo.post_credits(
+                policy.leave_type, str(from_year + 1), LeaveLedgerEntryType.CARRYOVER,
+                f"carryover:{from_year}", credits
+            )
+            await self.db.commit()
+            
+            processed += len(balances)
+            after_id = balances[-1][0]
+            self._report({"stage": "carryover", "leave_type": policy.leave_type, "period": str(from_year),
+                          "processed": processed, "posted": posted})
+        return posted
+    
+    def _report(self, progress: Dict) -> None:
+        logger.debug(f"Leave accrual progress: {progress}")
+        if self.progress:
+            self.progress(progress)
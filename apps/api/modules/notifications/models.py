@@ -3,13 +3,13 @@ In-app Notification System - Models
 Notifications, announcements, messaging
 """
 
-from sqlalchemy import Column, String, Text, ForeignKey, Boolean, DateTime
+from sqlalchemy import Column, String, Text, ForeignKey, Boolean, DateTime, Integer
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 
 from core.database import Base
-from core.models import BaseModel, TenantMixin
+from core.models import BaseModel, TenantMixin, UUIDMixin, TimestampMixin
 
 
 class Notification(BaseModel, TenantMixin, Base):
@@ -78,3 +78,33 @@ class Announcement(BaseModel, TenantMixin, Base):
     def __repr__(self):
         return f"<Announcement {self.title}>"
 
+
+
+class EmailOutbox(UUIDMixin, TimestampMixin, Base):
+    """
+    Outgoing email queued in the same transaction as the change that caused it
+
+    Rows stay 'pending' until the outbox dispatcher delivers them. A claimed
+    row has next_attempt_at pushed forward by the claim lease, so a worker that
+    dies mid-batch only delays delivery instead of losing the message.
+    """
+    __tablename__ = "email_outbox"
+    
+    to_email = Column(String(255), nullable=False)
+    subject = Column(String(500), nullable=False)
+    html_body = Column(Text, nullable=False)
+    text_body = Column(Text, nullable=True)
+    
+    # Callers pass a stable key (e.g. "approval:<id>:requested") so retried
+    # requests do not queue the same notification twice
+    dedupe_key = Column(String(255), nullable=True, unique=True)
+    
+    # Delivery state
+    status = Column(String(20), default="pending", nullable=False)  # pending, sent, failed
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_error = Column(Text, nullable=True)
+    sent_at = Column(DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f"<EmailOutbox {self.to_email} - {self.status}>"
@@ -11,13 +11,83 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.pdfgen import canvas
 from datetime import datetime
 from decimal import Decimal
-from typing import List
+from types import SimpleNamespace
+from typing import AsyncIterator, List
+import asyncio
+import base64
 import io
+import logging
 import zipfile
 import os
 from pathlib import Path
 
 from modules.payroll.models import Payroll, PayrollEntry
+from core.cache import cache
+from core.config import settings
+from core.pdf_render import render_service
+
+logger = logging.getLogger(__name__)
+
+# Payroll columns the payslip and summary templates read
+PAYROLL_FIELDS = (
+    "id", "year", "month", "payment_date", "updated_at",
+    "total_basic_salary", "total_allowances", "total_gross_salary",
+    "total_deductions", "total_net_salary",
+)
+ENTRY_FIELDS = (
+    "id", "updated_at", "employee_number", "first_name", "last_name",
+    "position", "department", "basic_salary", "allowances", "gross_salary",
+    "deductions", "net_salary", "currency",
+)
+
+def _snapshot(obj, fields) -> SimpleNamespace:
+    """Copy ORM attributes into a picklable object detached from the session"""
+    return SimpleNamespace(**{field: getattr(obj, field) for field in fields})
+
+
+def render_payslip(payroll: dict, entry: dict) -> bytes:
+    """Render service entry point for a single payslip"""
+    return pdf_generator.generate_payslip(SimpleNamespace(**payroll), SimpleNamespace(**entry))
+
+
+def render_payroll_summary(payroll: dict, entries: List[dict]) -> bytes:
+    """Render service entry point for the payroll summary"""
+    return pdf_generator.generate_payroll_summary(
+        SimpleNamespace(**payroll),
+        [SimpleNamespace(**entry) for entry in entries]
+    )
+
+
+def payslip_filename(payroll, entry) -> str:
+    """Name of an entry's payslip inside the payroll ZIP"""
+    filename = f"{entry.employee_number}_{entry.first_name}_{entry.last_name}_payslip_{payroll.year}_{payroll.month:02d}.pdf"
+    return filename.replace(" ", "_")
+
+
+def payslip_cache_key(payroll, entry) -> str:
+    """Rendered payslips change only when the payroll or the entry is updated"""
+    payroll_version = payroll.updated_at.timestamp() if payroll.updated_at else 0
+    entry_version = entry.updated_at.timestamp() if entry.updated_at else 0
+    return f"payslip:{payroll.id}:{entry.id}:{payroll_version}:{entry_version}"
+
+
+class _ZipChunkBuffer(io.RawIOBase):
+    """Unseekable sink for ZipFile; bytes are drained after every member"""
+    
+    def __init__(self):
+        self._chunks = []
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
 
 
 class PayrollPDFGenerator:
@@ -142,12 +212,8 @@ class PayrollPDFGenerator:
                 # Generate payslip PDF
                 pdf_bytes = self.generate_payslip(payroll, entry)
                 
-                # Create filename
-                filename = f"{entry.employee_number}_{entry.first_name}_{entry.last_name}_payslip_{payroll.year}_{payroll.month:02d}.pdf"
-                filename = filename.replace(" ", "_")
-                
                 # Add to ZIP
-                zip_file.writestr(filename, pdf_bytes)
+                zip_file.writestr(payslip_filename(payroll, entry), pdf_bytes)
             
             # Add summary file
             summary_pdf = self.generate_payroll_summary(payroll, entries)
@@ -156,6 +222,76 @@ class PayrollPDFGenerator:
         zip_buffer.seek(0)
         return zip_buffer.getvalue()
     
+    def stream_payroll_zip(self, payroll: Payroll, entries: List[PayrollEntry]) -> AsyncIterator[bytes]:
+        """
+        Stream a ZIP of all payslips while they are rendered
+        
+        Payslips are rendered by the shared render service, at most two per worker
+        in flight, and each is written to the archive as soon as it finishes.
+        Rendered PDFs are cached by payroll id, entry id and updated_at.
+        Rows are snapshotted here so the stream does not touch the session.
+        """
+        payroll_data = _snapshot(payroll, PAYROLL_FIELDS)
+        entries_data = [_snapshot(entry, ENTRY_FIELDS) for entry in entries]
+        return self._zip_stream(payroll_data, entries_data)
+    
+    async def _zip_stream(self, payroll: SimpleNamespace, entries: List[SimpleNamespace]) -> AsyncIterator[bytes]:
+        sink = _ZipChunkBuffer()
+        window = max(1, render_service.workers * 2)
+        pending_entries = iter(entries)
+        in_flight = set()
+        
+        try:
+            with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+                while True:
+                    for entry in pending_entries:
+                        in_flight.add(asyncio.ensure_future(self._payslip_member(payroll, entry)))
+                        if len(in_flight) >= window:
+                            break
+                    if not in_flight:
+                        break
+                
+                    done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        filename, pdf_bytes = task.result()
+                        zip_file.writestr(filename, pdf_bytes)
+                    yield sink.drain()
+            
+                summary_pdf = await render_service.render_bytes(
+                    render_payroll_summary, vars(payroll), [vars(entry) for entry in entries]
+                )
+                zip_file.writestr(f"PAYROLL_SUMMARY_{payroll.year}_{payroll.month:02d}.pdf", summary_pdf)
+        
+            yield sink.drain()
+        finally:
+            # A client that disconnects closes the stream; stop queued renders
+            for task in in_flight:
+                task.cancel()
+    
+    async def render_payslip_pdf(self, payroll: Payroll, entry: PayrollEntry) -> bytes:
+        """Render one payslip off the event loop, reusing the payslip cache"""
+        _, pdf_bytes = await self._payslip_member(
+            _snapshot(payroll, PAYROLL_FIELDS),
+            _snapshot(entry, ENTRY_FIELDS)
+        )
+        return pdf_bytes
+    
+    async def _payslip_member(self, payroll: SimpleNamespace, entry: SimpleNamespace):
+        """Return (filename, pdf bytes) for one entry, from cache or the render service"""
+        key = payslip_cache_key(payroll, entry)
+        cached = await cache.get(key, local=False)
+        if cached:
+            return payslip_filename(payroll, entry), base64.b64decode(cached)
+        
+        pdf_bytes = await render_service.render_bytes(render_payslip, vars(payroll), vars(entry))
+        await cache.set(
+            key,
+            base64.b64encode(pdf_bytes).decode("ascii"),
+            settings.PAYSLIP_CACHE_TTL_SECONDS,
+            local=False
+        )
+        return payslip_filename(payroll, entry), pdf_bytes
+    
     def generate_payroll_summary(self, payroll: Payroll, entries: List[PayrollEntry]) -> bytes:
         """Generate a summary PDF for the entire payroll batch"""
         
@@ -27,15 +27,19 @@ router = APIRouter(prefix="/payroll", tags=["payroll"])
 
 @router.get("/employees", response_model=list[EmployeePayrollSummary])
 async def get_employees_for_payroll(
+    year: Optional[int] = Query(None, ge=2000, le=2100),
+    month: Optional[int] = Query(None, ge=1, le=12),
     session: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Get all active employees with contract salary for payroll processing.
+    With year and month, salaries of employees hired or leaving during that
+    month are pro-rated by working days.
     Only accessible to HR Manager and HR Admin.
     """
     employees = await PayrollService.get_active_employees_for_payroll(
-        session, current_user["id"]
+        session, current_user["id"], year=year, month=month
     )
     return employees
 
@@ -248,17 +252,18 @@ async def download_payroll_pdfs(
     Download payroll as ZIP file containing individual PDF payslips.
     Only accessible to Finance Manager and CEO after approval.
     """
+    from fastapi.responses import StreamingResponse
     from modules.payroll.pdf_generator import pdf_generator
     
     payroll = await PayrollService.get_payroll(session, payroll_id)
     
-    # Generate ZIP file with all payslips
-    zip_bytes = pdf_generator.generate_payroll_zip(payroll, payroll.entries)
+    # Stream the ZIP while payslips render in the process pool
+    zip_stream = pdf_generator.stream_payroll_zip(payroll, payroll.entries)
     
     filename = f"payroll_{payroll.year}_{payroll.month:02d}_payslips.zip"
     
-    return Response(
-        content=zip_bytes,
+    return StreamingResponse(
+        zip_stream,
         media_type="application/zip",
         headers={
             "Content-Disposition": f"attachment; filename={filename}"
@@ -313,7 +318,7 @@ async def download_my_payslip(
         raise HTTPException(status_code=404, detail="No payslip found for this period")
     
     # Generate individual payslip PDF
-    pdf_bytes = pdf_generator.generate_payslip(payroll, entry)
+    pdf_bytes = await pdf_generator.render_payslip_pdf(payroll, entry)
     
     filename = f"{employee.employee_number}_payslip_{payroll.year}_{payroll.month:02d}.pdf"
     
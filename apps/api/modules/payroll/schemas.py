@@ -131,3 +131,5 @@ class EmployeePayrollSummary(BaseModel):
     basic_salary: Decimal
     has_active_contract: bool
     contract_monthly_salary: Optional[Decimal] = None
+    working_days: Optional[int] = None  # Working days in the payroll month (when a month is given)
+    days_worked: Optional[int] = None  # Working days the employee was employed in that month
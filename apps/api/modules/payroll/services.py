@@ -9,6 +9,7 @@ from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from datetime import datetime, date
 from decimal import Decimal
+from calendar import monthrange
 import uuid
 
 from modules.payroll.models import Payroll, PayrollEntry, PayrollApproval, PayrollStatus
@@ -16,66 +17,121 @@ from modules.payroll.schemas import (
     PayrollCreate, PayrollUpdate, PayrollEntryCreate,
     EmployeePayrollSummary
 )
-from modules.employees.models import Employee, EmploymentStatus
+from modules.employees.models import Employee, EmploymentStatus, Department, Position
 from modules.employee_files.models import EmploymentContract, ContractStatus
 from core.exceptions import NotFoundException, BadRequestException
+from core.cache import invalidate_tags, tenant_tag, approvals_tag, employee_tag, APPROVALS_ORG_TAG
+from core.work_calendar import get_work_calendars
 
 
 class PayrollService:
     """Service for payroll management"""
     
+    @staticmethod
+    async def _invalidate_payroll_caches(payroll: Payroll) -> None:
+        """Drop cached payroll views for the payroll's tenant"""
+        if payroll.country_code:
+            await invalidate_tags(tenant_tag(payroll.country_code))
+    
     @staticmethod
     async def get_active_employees_for_payroll(
         session: AsyncSession,
-        user_id: str
+        user_id: str,
+        year: Optional[int] = None,
+        month: Optional[int] = None
     ) -> List[EmployeePayrollSummary]:
-        """Get all active employees with their contract salary for payroll processing"""
+        """
+        Get all active employees with their contract salary for payroll processing
         
-        # Query active employees with their active contracts
-        query = (
-            select(Employee)
-            .outerjoin(EmploymentContract, and_(
-                EmploymentContract.employee_id == Employee.id,
+        When year and month are given, basic_salary is pro-rated by the working
+        days (per the employee's country calendar) between hire/termination
+        date and the month boundaries.
+        """
+        if (year is None) != (month is None):
+            raise BadRequestException("Provide both year and month to pro-rate salaries")
+        
+        # Rank each employee's active contracts so the latest one is rn = 1;
+        # this replaces a per-employee contract lookup with one query
+        ranked_contracts = (
+            select(
+                EmploymentContract.employee_id.label("employee_id"),
+                EmploymentContract.monthly_salary.label("monthly_salary"),
+                func.row_number().over(
+                    partition_by=EmploymentContract.employee_id,
+                    order_by=(EmploymentContract.start_date.desc(), EmploymentContract.created_at.desc())
+                ).label("rn")
+            )
+            .where(
                 EmploymentContract.status == ContractStatus.ACTIVE,
                 EmploymentContract.is_deleted == False
+            )
+            .subquery()
+        )
+        
+        query = (
+            select(
+                Employee.id,
+                Employee.employee_number,
+                Employee.first_name,
+                Employee.last_name,
+                Position.title,
+                Department.name,
+                ranked_contracts.c.monthly_salary,
+                ranked_contracts.c.employee_id,
+                Employee.hire_date,
+                Employee.termination_date,
+                Employee.country_code
+            )
+            .outerjoin(Position, Position.id == Employee.position_id)
+            .outerjoin(Department, Department.id == Employee.department_id)
+            .outerjoin(ranked_contracts, and_(
+                ranked_contracts.c.employee_id == Employee.id,
+                ranked_contracts.c.rn == 1
             ))
             .where(
                 Employee.status == EmploymentStatus.ACTIVE,
                 Employee.is_deleted == False
             )
-            .options(selectinload(Employee.position))
-            .options(selectinload(Employee.department))
+            .order_by(Employee.last_name, Employee.first_name)
         )
         
         result = await session.execute(query)
-        employees = result.scalars().unique().all()
+        rows = result.all()
+        
+        calendars = {}
+        if year is not None:
+            period_start = date(year, month, 1)
+            period_end = date(year, month, monthrange(year, month)[1])
+            calendars = await get_work_calendars(session, (row.country_code for row in rows))
         
         summaries = []
-        for employee in employees:
-            # Get active contract for this employee
-            contract_query = (
-                select(EmploymentContract)
-                .where(
-                    EmploymentContract.employee_id == employee.id,
-                    EmploymentContract.status == ContractStatus.ACTIVE,
-                    EmploymentContract.is_deleted == False
+        for (employee_id, employee_number, first_name, last_name,
+             position_title, department_name, monthly_salary, contract_employee_id,
+             hire_date, termination_date, country_code) in rows:
+            has_contract = contract_employee_id is not None
+            basic_salary = monthly_salary if has_contract else Decimal('0')
+            working_days = days_worked = None
+            if year is not None:
+                work_calendar = calendars[country_code]
+                working_days = work_calendar.working_days_in_month(year, month)
+                days_worked = work_calendar.overlap_working_days(
+                    period_start, period_end,
+                    hire_date or period_start, termination_date or period_end
                 )
-                .order_by(EmploymentContract.start_date.desc())
-                .limit(1)
-            )
-            contract_result = await session.execute(contract_query)
-            contract = contract_result.scalar_one_or_none()
-            
+                if has_contract and working_days and days_worked < working_days:
+                    basic_salary = (monthly_salary * days_worked / working_days).quantize(Decimal('0.01'))
             summaries.append(EmployeePayrollSummary(
-                employee_id=str(employee.id),
-                employee_number=employee.employee_number or "",
-                first_name=employee.first_name,
-                last_name=employee.last_name,
-                position=employee.position.title if employee.position else None,
-                department=employee.department.name if employee.department else None,
-                basic_salary=contract.monthly_salary if contract else Decimal('0'),
-                has_active_contract=contract is not None,
-                contract_monthly_salary=contract.monthly_salary if contract else None
+                employee_id=str(employee_id),
+                employee_number=employee_number or "",
+                first_name=first_name,
+                last_name=last_name,
+                position=position_title,
+                department=department_name,
+                basic_salary=basic_salary,
+                has_active_contract=has_contract,
+                contract_monthly_salary=monthly_salary if has_contract else None,
+                working_days=working_days,
+                days_worked=days_worked
             ))
         
         return summaries
@@ -179,6 +235,7 @@ class PayrollService:
             session.add(entry)
         
         await session.commit()
+        await PayrollService._invalidate_payroll_caches(payroll)
         
         # Reload with relationships
         query = (
@@ -326,6 +383,7 @@ class PayrollService:
         
         payroll.updated_at = datetime.utcnow()
         await session.commit()
+        await PayrollService._invalidate_payroll_caches(payroll)
         await session.refresh(payroll)
         
         return payroll
@@ -375,10 +433,10 @@ class PayrollService:
         if not ceo:
             raise BadRequestException("CEO (Admin) not found. Cannot create approval chain.")
         
-        # Update status
+        # Update status; the approval chain and the Finance Manager's
+        # notification are committed with it
         payroll.status = PayrollStatus.PENDING_FINANCE
         payroll.updated_at = datetime.utcnow()
-        await session.commit()
         
         # Create approval chain: Finance Manager → CEO
         approval_service = ApprovalService(session)
@@ -396,7 +454,8 @@ class PayrollService:
             finance_manager.id,
             country_code=country_code,
             approval_level=1,
-            is_final_approval=False
+            is_final_approval=False,
+            commit=False
         )
         
         # Second approval: CEO
@@ -406,23 +465,35 @@ class PayrollService:
             country_code=country_code,
             approval_level=2,
             previous_approval_id=finance_approval.id,
-            is_final_approval=True
+            is_final_approval=True,
+            commit=False
         )
         
         # Send notification to Finance Manager
         from core.email import email_service
-        if finance_manager.email:
+        if finance_manager.work_email:
             await email_service.send_approval_request_notification(
-                to_email=finance_manager.email,
+                to_email=finance_manager.work_email,
                 employee_name=f"{hr_employee.first_name} {hr_employee.last_name}",
                 request_type="payroll",
                 request_details={
                     "Period": f"{payroll.year}-{payroll.month:02d}",
                     "Total Net Salary": str(payroll.total_net_salary),
                     "Total Employees": str(len(payroll.entries))
-                }
+                },
+                db=session,
+                dedupe_key=f"approval:{finance_approval.id}:requested"
             )
         
+        await session.commit()
+        await PayrollService._invalidate_payroll_caches(payroll)
+        await invalidate_tags(
+            approvals_tag(finance_approval.approver_id),
+            approvals_tag(ceo_approval.approver_id),
+            employee_tag(hr_employee.id),
+            APPROVALS_ORG_TAG
+        )
+        
         await session.refresh(payroll)
         return payroll
     
@@ -482,17 +553,20 @@ class PayrollService:
                 select(Employee).where(Employee.user_id == payroll.created_by_id)
             )
             hr_employee = hr_result.scalar_one_or_none()
-            if hr_employee and hr_employee.email:
+            if hr_employee and hr_employee.work_email:
                 await email_service.send_approval_status_notification(
-                    to_email=hr_employee.email,
+                    to_email=hr_employee.work_email,
                     request_type="payroll",
                     status="rejected",
-                    comments=comments
+                    comments=comments,
+                    db=session,
+                    dedupe_key=f"approval:{approval_id}:rejected"
                 )
         
         payroll.updated_at = datetime.utcnow()
         
         await session.commit()
+        await PayrollService._invalidate_payroll_caches(payroll)
         await session.refresh(payroll)
         
         return payroll
@@ -559,12 +633,14 @@ class PayrollService:
             hr_manager = await get_hr_manager(session, payroll.country_code)
             
             for manager in [finance_manager, hr_manager]:
-                if manager and manager.email:
+                if manager and manager.work_email:
                     await email_service.send_approval_status_notification(
-                        to_email=manager.email,
+                        to_email=manager.work_email,
                         request_type="payroll",
                         status="approved",
-                        comments=f"Payroll approved by CEO. Ready for processing."
+                        comments=f"Payroll approved by CEO. Ready for processing.",
+                        db=session,
+                        dedupe_key=f"approval:{approval_id}:approved:{manager.id}"
                     )
         else:
             await approval_service.reject_request(approval_id, ceo_employee.id, comments)
@@ -576,17 +652,20 @@ class PayrollService:
                 select(Employee).where(Employee.user_id == payroll.created_by_id)
             )
             hr_employee = hr_result.scalar_one_or_none()
-            if hr_employee and hr_employee.email:
+            if hr_employee and hr_employee.work_email:
                 await email_service.send_approval_status_notification(
-                    to_email=hr_employee.email,
+                    to_email=hr_employee.work_email,
                     request_type="payroll",
                     status="rejected",
-                    comments=comments
+                    comments=comments,
+                    db=session,
+                    dedupe_key=f"approval:{approval_id}:rejected"
                 )
         
         payroll.updated_at = datetime.utcnow()
         
         await session.commit()
+        await PayrollService._invalidate_payroll_caches(payroll)
         await session.refresh(payroll)
         
         return payroll
@@ -609,6 +688,7 @@ class PayrollService:
         payroll.updated_at = datetime.utcnow()
         
         await session.commit()
+        await PayrollService._invalidate_payroll_caches(payroll)
         await session.refresh(payroll)
         
         return payroll
@@ -631,6 +711,7 @@ class PayrollService:
         payroll.updated_at = datetime.utcnow()
         
         await session.commit()
+        await PayrollService._invalidate_payroll_caches(payroll)
     
     @staticmethod
     async def get_payroll_stats(
@@ -60,6 +60,10 @@ class PerformanceReviewCycle(BaseModel, TenantMixin, AuditMixin, Base):
     final_areas_for_improvement = Column(Text, nullable=True)
     final_development_plan = Column(Text, nullable=True)
     
+    # Slot/submission counts and rating sums per evaluator type (JSON),
+    # refreshed in the same transaction as each submitted evaluation
+    rating_summary = Column(Text, nullable=True)
+    
     # Employee acknowledgment
     employee_comments = Column(Text, nullable=True)
     acknowledged_date = Column(Date, nullable=True)
@@ -1,6 +1,219 @@
 """Performance Module - Repositories"""
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, and_, or_, exists, func, case
+from sqlalchemy.sql import Select
+from typing import Any, Dict, List, Optional
+from datetime import date
+import uuid
+
+from modules.performance.models import PerformanceReviewCycle, PerformanceEvaluation
+from modules.employees.models import Department, Employee, EmploymentStatus
+
 
 class PerformanceRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
+
+    async def get_cycle_for_update(self, review_cycle_id: uuid.UUID) -> Optional[PerformanceReviewCycle]:
+        """Load a review cycle and lock its row until the transaction ends"""
+        result = await self.db.execute(
+            select(PerformanceReviewCycle)
+            .where(PerformanceReviewCycle.id == review_cycle_id)
+            .with_for_update()
+        )
+        return result.scalar_one_or_none()
+
+    async def get_cycle_with_employee_name(self, review_cycle_id: uuid.UUID):
+        """(cycle, employee first name, employee last name) or None"""
+        result = await self.db.execute(
+            select(PerformanceReviewCycle, Employee.first_name, Employee.last_name)
+            .outerjoin(Employee, Employee.id == PerformanceReviewCycle.employee_id)
+            .where(PerformanceReviewCycle.id == review_cycle_id)
+        )
+        return result.first()
+
+    async def get_rating_aggregates(self, review_cycle_id: uuid.UUID) -> List[Any]:
+        """Slot, submission and rating totals per evaluator type of one cycle"""
+        submitted = PerformanceEvaluation.status == "submitted"
+        rated = and_(submitted, PerformanceEvaluation.rating.isnot(None))
+        result = await self.db.execute(
+            select(
+                PerformanceEvaluation.evaluator_type,
+                func.count().label("total"),
+                func.count(case((submitted, 1))).label("submitted"),
+                func.count(case((rated, 1))).label("rated"),
+                func.coalesce(func.sum(case((rated, PerformanceEvaluation.rating))), 0).label("rating_sum")
+            )
+            .where(
+                PerformanceEvaluation.review_cycle_id == review_cycle_id,
+                PerformanceEvaluation.is_deleted == False
+            )
+            .group_by(PerformanceEvaluation.evaluator_type)
+        )
+        return result.all()
+
+    @staticmethod
+    def _period_cycles(
+        query: Select,
+        period_start: date,
+        period_end: date,
+        department_id: Optional[uuid.UUID],
+        review_type: Optional[str]
+    ) -> Select:
+        """Restrict a query over cycles to those reviewing a span within the period"""
+        query = query.where(
+            PerformanceReviewCycle.review_period_start >= period_start,
+            PerformanceReviewCycle.review_period_end <= period_end,
+            PerformanceReviewCycle.is_deleted == False
+        )
+        if department_id is not None:
+            query = query.where(Employee.department_id == department_id)
+        if review_type is not None:
+            query = query.where(PerformanceReviewCycle.review_type == review_type)
+        return query
+
+    async def get_final_rating_distribution(
+        self,
+        period_start: date,
+        period_end: date,
+        department_id: Optional[uuid.UUID] = None,
+        review_type: Optional[str] = None
+    ) -> List[Any]:
+        """Cycle counts per (department, final rating)"""
+        query = (
+            select(
+                Employee.department_id,
+                Department.name.label("department_name"),
+                PerformanceReviewCycle.final_rating,
+                func.count().label("cycles")
+            )
+            .select_from(PerformanceReviewCycle)
+            .join(Employee, Employee.id == PerformanceReviewCycle.employee_id)
+            .outerjoin(Department, Department.id == Employee.department_id)
+            .group_by(Employee.department_id, Department.name, PerformanceReviewCycle.final_rating)
+        )
+        query = self._period_cycles(query, period_start, period_end, department_id, review_type)
+        result = await self.db.execute(query)
+        return result.all()
+
+    async def get_evaluation_rating_distribution(
+        self,
+        period_start: date,
+        period_end: date,
+        department_id: Optional[uuid.UUID] = None,
+        review_type: Optional[str] = None
+    ) -> List[Any]:
+        """Submitted evaluation counts per (department, evaluator type, rating)"""
+        query = (
+            select(
+                Employee.department_id,
+                Department.name.label("department_name"),
+                PerformanceEvaluation.evaluator_type,
+                PerformanceEvaluation.rating,
+                func.count().label("evaluations")
+            )
+            .select_from(PerformanceEvaluation)
+            .join(PerformanceReviewCycle, PerformanceReviewCycle.id == PerformanceEvaluation.review_cycle_id)
+            .join(Employee, Employee.id == PerformanceReviewCycle.employee_id)
+            .outerjoin(Department, Department.id == Employee.department_id)
+            .where(
+                PerformanceEvaluation.status == "submitted",
+                PerformanceEvaluation.rating.isnot(None),
+                PerformanceEvaluation.is_deleted == False
+            )
+            .group_by(
+                Employee.department_id, Department.name,
+                PerformanceEvaluation.evaluator_type, PerformanceEvaluation.rating
+            )
+        )
+        query = self._period_cycles(query, period_start, period_end, department_id, review_type)
+        result = await self.db.execute(query)
+        return result.all()
+
+
+class ReviewCampaignRepository:
+    """Set-based queries and bulk inserts behind 360-review campaigns"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def target_query(
+        review_period_start: date,
+        review_period_end: date,
+        review_type: str,
+        department_id: Optional[uuid.UUID] = None,
+        country_code: Optional[str] = None
+    ) -> Select:
+        """
+        Active employees in scope who were hired by the end of the period and
+        do not already have a cycle for the same period and review type
+        """
+        already_reviewed = exists().where(
+            PerformanceReviewCycle.employee_id == Employee.id,
+            PerformanceReviewCycle.review_period_start == review_period_start,
+            PerformanceReviewCycle.review_period_end == review_period_end,
+            PerformanceReviewCycle.review_type == review_type,
+            PerformanceReviewCycle.is_deleted == False
+        )
+        query = select(
+            Employee.id,
+            Employee.manager_id,
+            Employee.country_code,
+            Employee.first_name,
+            Employee.last_name,
+            Employee.work_email
+        ).where(
+            Employee.status == EmploymentStatus.ACTIVE,
+            Employee.is_deleted == False,
+            or_(Employee.hire_date.is_(None), Employee.hire_date <= review_period_end),
+            ~already_reviewed
+        )
+        if department_id is not None:
+            query = query.where(Employee.department_id == department_id)
+        if country_code is not None:
+            query = query.where(Employee.country_code == country_code)
+        return query
+
+    async def get_targets(self, target_query: Select) -> List[Any]:
+        result = await self.db.execute(target_query.order_by(Employee.id))
+        return result.all()
+
+    async def get_evaluator_pool(self, target_query: Select, review_period_end: date, include_peers: bool) -> List[Any]:
+        """
+        Active employees who may evaluate a target, in one query: the targets'
+        managers, their direct reports and, with include_peers, everyone who
+        shares a manager with a target. People hired after the period are left out.
+        """
+        targets = target_query.subquery()
+        manager_ids = select(targets.c.manager_id).where(targets.c.manager_id.isnot(None))
+        related = [
+            Employee.id.in_(manager_ids),
+            Employee.manager_id.in_(select(targets.c.id))
+        ]
+        if include_peers:
+            related.append(Employee.manager_id.in_(manager_ids))
+
+        result = await self.db.execute(
+            select(
+                Employee.id,
+                Employee.manager_id,
+                Employee.first_name,
+                Employee.work_email
+            ).where(
+                Employee.status == EmploymentStatus.ACTIVE,
+                Employee.is_deleted == False,
+                or_(Employee.hire_date.is_(None), Employee.hire_date <= review_period_end),
+                or_(*related)
+            ).order_by(Employee.id)
+        )
+        return result.all()
+
+    async def insert_cycles(self, rows: List[Dict[str, Any]]):
+        """Insert review cycles in one executemany (ids are assigned by the caller)"""
+        if rows:
+            await self.db.execute(insert(PerformanceReviewCycle), rows)
+
+    async def insert_evaluations(self, rows: List[Dict[str, Any]]):
+        if rows:
+            await self.db.execute(insert(PerformanceEvaluation), rows)
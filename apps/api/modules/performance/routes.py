@@ -2,25 +2,27 @@
 Performance Management Module - API Routes
 360-degree performance review system
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import StreamingResponse
 from typing import List, Optional
 import uuid
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.dependencies import get_db, get_current_user, get_current_active_user, require_admin
+from core.dependencies import get_db, get_current_user, get_current_active_user, require_admin, require_hr_admin, require_hr_read
 from core.exceptions import NotFoundException, BadRequestException
 from core.pdf_generator import create_performance_appraisal_pdf
+from core.pdf_render import render_service
 from modules.auth.models import User
-from modules.performance.services import PerformanceService
-from datetime import datetime
+from modules.performance.services import PerformanceService, ReviewCampaignService
+from datetime import date, datetime
 from modules.performance.schemas import (
     PerformanceReviewCycleCreate,
     PerformanceReviewCycleResponse,
     PerformanceEvaluationSubmit,
     PerformanceEvaluationResponse,
-    Review360Summary
+    Review360Summary,
+    ReviewCampaignCreate
 )
 
 router = APIRouter()
@@ -47,6 +49,65 @@ async def initiate_360_review(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
+@router.post("/reviews/360/campaigns", response_model=None, status_code=status.HTTP_201_CREATED)
+async def launch_review_campaign(
+    campaign: ReviewCampaignCreate,
+    background: bool = Query(False, description="Run on a Celery worker and return a task ID to poll"),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(require_hr_admin)
+):
+    """
+    Launch 360-degree reviews for a department, a country or the whole organization
+    Employees who already have a review for the same period and type are skipped
+    Requires HR admin permissions
+    """
+    employee_id = current_user.get("employee_id")
+    if background:
+        from core.tasks import launch_review_campaign as launch_task
+        task = launch_task.delay(campaign.model_dump(mode="json"), employee_id)
+        return {"task_id": task.id, "status": "queued"}
+    
+    service = ReviewCampaignService(db)
+    return await service.launch(campaign, initiator_id=uuid.UUID(employee_id) if employee_id else None)
+
+
+@router.get("/reviews/360/campaigns/tasks/{task_id}")
+async def get_review_campaign_task(
+    task_id: str,
+    current_user: dict = Depends(require_hr_admin)
+):
+    """Progress or result of a background review campaign launch"""
+    from celery.result import AsyncResult
+    from core.celery_app import celery_app
+    
+    task = AsyncResult(task_id, app=celery_app)
+    response = {"task_id": task_id, "state": task.state}
+    if task.state == "PROGRESS":
+        response["progress"] = task.info
+    elif task.successful():
+        response["result"] = task.result
+    elif task.failed():
+        response["error"] = str(task.result)
+    return response
+
+
+@router.get("/reviews/360/calibration")
+async def get_review_calibration(
+    period_start: date,
+    period_end: date,
+    department_id: Optional[uuid.UUID] = None,
+    review_type: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(require_hr_read)
+):
+    """
+    Final-rating and evaluation-rating distributions per department for the
+    360-degree review cycles within a period
+    """
+    service = PerformanceService(db)
+    return await service.get_calibration(period_start, period_end, department_id, review_type)
+
+
 @router.get("/reviews/360/{review_cycle_id}", response_model=Review360Summary)
 async def get_360_review_summary(
     review_cycle_id: uuid.UUID,
@@ -385,7 +446,7 @@ async def export_360_review_pdf(
         "development_goals": "Focus on strategic planning and mentoring junior staff."
     }
     
-    pdf_buffer = create_performance_appraisal_pdf(appraisal)
+    pdf_buffer = await render_service.render(create_performance_appraisal_pdf, appraisal)
     
     return StreamingResponse(
         pdf_buffer,
@@ -3,8 +3,8 @@ Performance Management Module - Pydantic Schemas
 360-degree performance reviews
 """
 
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, List, Literal, Dict, Any
 from datetime import date, datetime
 import uuid
 
@@ -50,6 +50,42 @@ class PerformanceReviewCycleResponse(PerformanceReviewCycleBase):
         from_attributes = True
 
 
+# 360-degree Review Campaign Schemas
+class ReviewCampaignCreate(BaseModel):
+    """Launch 360-degree reviews for every active employee in a scope"""
+    scope: Literal["department", "country", "organization"]
+    department_id: Optional[uuid.UUID] = None
+    country_code: Optional[str] = Field(None, min_length=2, max_length=2)
+    review_period_start: date
+    review_period_end: date
+    review_type: str = "annual"  # annual, quarterly, probation
+    include_subordinates: bool = True
+    include_peers: bool = False
+    peers_per_employee: int = Field(3, ge=1, le=10)
+    notify: bool = True
+    
+    @model_validator(mode='after')
+    def check_scope(self):
+        if self.scope == "department" and not self.department_id:
+            raise ValueError("department_id is required for a department campaign")
+        if self.scope == "country" and not self.country_code:
+            raise ValueError("country_code is required for a country campaign")
+        if self.review_period_end < self.review_period_start:
+            raise ValueError("review_period_end must be on or after review_period_start")
+        return self
+
+
+class ReviewCampaignResult(BaseModel):
+    scope: str
+    review_period_start: date
+    review_period_end: date
+    review_type: str
+    cycles_created: int
+    evaluations_created: int
+    evaluators: int
+    notifications_queued: int
+
+
 # Performance Evaluation Schemas
 class PerformanceEvaluationBase(BaseModel):
     rating: Optional[int] = Field(None, ge=1, le=5)
@@ -107,6 +143,7 @@ class Review360Summary(BaseModel):
     peer_average_rating: Optional[float] = None
     subordinate_average_rating: Optional[float] = None
     self_rating: Optional[int] = None
+    rating_breakdown: Dict[str, Any] = {}  # evaluator type -> total, submitted, rated, rating_sum, average
     
     # Final results
     final_rating: Optional[int] = None
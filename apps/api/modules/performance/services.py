@@ -1,9 +1,12 @@
 """Performance Module - Services with 360-degree Reviews"""
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
-from typing import Optional, List
+from sqlalchemy import select, and_
+from typing import Callable, Dict, Optional, List
 from datetime import date
-from statistics import mean
+from collections import defaultdict
+from html import escape
+import json
+import logging
 import uuid
 
 from modules.performance.models import (
@@ -17,17 +20,29 @@ from modules.performance.schemas import (
     PerformanceReviewCycleResponse,
     PerformanceEvaluationSubmit,
     PerformanceEvaluationResponse,
-    Review360Summary
+    Review360Summary,
+    ReviewCampaignCreate,
+    ReviewCampaignResult
 )
+from modules.performance.repositories import PerformanceRepository, ReviewCampaignRepository
 from modules.employees.models import Employee
 from modules.approvals.services import ApprovalService
 from modules.approvals.schemas import ApprovalRequestCreate
 from modules.approvals.models import ApprovalType
 from core.exceptions import NotFoundException, BadRequestException
+from core.email_outbox import enqueue_email, enqueue_emails
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Rating scale of evaluations and final ratings
+RATING_SCALE = range(1, 6)
+
 
 class PerformanceService:
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.repo = PerformanceRepository(db)
         self.approval_service = ApprovalService(db)
     
     async def initiate_360_review(
@@ -124,7 +139,15 @@ class PerformanceService:
     ) -> PerformanceEvaluationResponse:
         """
         Submit an evaluation for a 360-degree review
+        
+        The cycle's rating summary is refreshed in the same transaction; the
+        cycle row is locked first so concurrent submissions to one cycle
+        cannot overwrite each other's summary.
         """
+        review_cycle = await self.repo.get_cycle_for_update(review_cycle_id)
+        if not review_cycle:
+            raise NotFoundException("Review cycle not found")
+        
         # Find the evaluation slot
         result = await self.db.execute(
             select(PerformanceEvaluation).where(
@@ -148,36 +171,75 @@ class PerformanceService:
         
         evaluation.status = "submitted"
         evaluation.submitted_date = date.today()
+        await self.db.flush()
         
-        await self.db.commit()
-        await self.db.refresh(evaluation)
+        summary = await self._refresh_rating_summary(review_cycle)
         
         # Check if all evaluations are submitted
-        await self._check_review_completion(review_cycle_id)
+        await self._check_review_completion(review_cycle, summary)
+        
+        await self.db.commit()
+        await self.db.refresh(evaluation)
         
         return PerformanceEvaluationResponse.model_validate(evaluation)
     
+    @staticmethod
+    def build_rating_summary(rows) -> dict:
+        """
+        Turn per-evaluator-type aggregate rows into the summary stored on the cycle
+        
+        rating_sum is kept next to each average so summaries can be combined
+        exactly (e.g. across cycles) without reloading evaluations.
+        """
+        by_type = {}
+        totals = {"total": 0, "submitted": 0, "rated": 0, "rating_sum": 0}
+        for row in rows:
+            evaluator_type = getattr(row.evaluator_type, "value", row.evaluator_type)
+            rating_sum = int(row.rating_sum or 0)
+            by_type[evaluator_type] = {
+                "total": row.total,
+                "submitted": row.submitted,
+                "rated": row.rated,
+                "rating_sum": rating_sum,
+                "average": round(rating_sum / row.rated, 2) if row.rated else None
+            }
+            totals["total"] += row.total
+            totals["submitted"] += row.submitted
+            totals["rated"] += row.rated
+            totals["rating_sum"] += rating_sum
+        return {
+            **totals,
+            "pending": totals["total"] - totals["submitted"],
+            "average": round(totals["rating_sum"] / totals["rated"], 2) if totals["rated"] else None,
+            "by_type": by_type
+        }
+    
+    async def _refresh_rating_summary(self, review_cycle: PerformanceReviewCycle) -> dict:
+        """Recompute a cycle's rating summary with one GROUP BY evaluator_type query and store it"""
+        summary = self.build_rating_summary(await self.repo.get_rating_aggregates(review_cycle.id))
+        review_cycle.rating_summary = json.dumps(summary)
+        return summary
+    
     async def get_360_review_summary(
         self,
         review_cycle_id: uuid.UUID
     ) -> Review360Summary:
         """
         Get comprehensive 360-degree review summary with all evaluations
-        """
-        # Get review cycle
-        result = await self.db.execute(
-            select(PerformanceReviewCycle).where(PerformanceReviewCycle.id == review_cycle_id)
-        )
-        review_cycle = result.scalar_one_or_none()
         
-        if not review_cycle:
+        Counts and averages come from the rating summary stored on the cycle;
+        cycles created before summaries existed get theirs computed once here.
+        """
+        row = await self.repo.get_cycle_with_employee_name(review_cycle_id)
+        if not row:
             raise NotFoundException("Review cycle not found")
+        review_cycle, first_name, last_name = row
         
-        # Get employee
-        result = await self.db.execute(
-            select(Employee).where(Employee.id == review_cycle.employee_id)
-        )
-        employee = result.scalar_one_or_none()
+        if review_cycle.rating_summary:
+            summary = json.loads(review_cycle.rating_summary)
+        else:
+            summary = await self._refresh_rating_summary(review_cycle)
+            await self.db.commit()
         
         # Get all evaluations
         result = await self.db.execute(
@@ -185,7 +247,6 @@ class PerformanceService:
                 PerformanceEvaluation.review_cycle_id == review_cycle_id
             )
         )
-        evaluations = result.scalars().all()
         
         # Organize evaluations by type
         supervisor_eval = None
@@ -193,7 +254,7 @@ class PerformanceService:
         subordinate_evals = []
         self_eval = None
         
-        for eval in evaluations:
+        for eval in result.scalars().all():
             eval_response = PerformanceEvaluationResponse.model_validate(eval)
             if eval.evaluator_type == ReviewerType.SUPERVISOR:
                 supervisor_eval = eval_response
@@ -204,49 +265,103 @@ class PerformanceService:
             elif eval.evaluator_type == ReviewerType.SELF:
                 self_eval = eval_response
         
-        # Calculate statistics
-        total_evals = len(evaluations)
-        completed_evals = sum(1 for e in evaluations if e.status == "submitted")
-        pending_evals = total_evals - completed_evals
-        
-        # Calculate average ratings
-        submitted_evals = [e for e in evaluations if e.status == "submitted" and e.rating is not None]
-        average_rating = mean([e.rating for e in submitted_evals]) if submitted_evals else None
-        
-        supervisor_rating = supervisor_eval.rating if supervisor_eval and supervisor_eval.rating else None
-        
-        peer_ratings = [e.rating for e in peer_evals if e.rating is not None]
-        peer_avg = mean(peer_ratings) if peer_ratings else None
-        
-        sub_ratings = [e.rating for e in subordinate_evals if e.rating is not None]
-        sub_avg = mean(sub_ratings) if sub_ratings else None
-        
-        self_rating = self_eval.rating if self_eval and self_eval.rating else None
+        by_type = summary["by_type"]
         
         return Review360Summary(
             review_cycle_id=review_cycle.id,
             employee_id=review_cycle.employee_id,
-            employee_name=f"{employee.first_name} {employee.last_name}" if employee else "Unknown",
+            employee_name=f"{first_name} {last_name}" if first_name else "Unknown",
             review_period=f"{review_cycle.review_period_start} to {review_cycle.review_period_end}",
             status=review_cycle.status,
-            total_evaluations=total_evals,
-            completed_evaluations=completed_evals,
-            pending_evaluations=pending_evals,
+            total_evaluations=summary["total"],
+            completed_evaluations=summary["submitted"],
+            pending_evaluations=summary["pending"],
             supervisor_evaluation=supervisor_eval,
             peer_evaluations=peer_evals,
             subordinate_evaluations=subordinate_evals,
             self_evaluation=self_eval,
-            average_rating=average_rating,
-            supervisor_rating=supervisor_rating,
-            peer_average_rating=peer_avg,
-            subordinate_average_rating=sub_avg,
-            self_rating=self_rating,
+            average_rating=summary["average"],
+            supervisor_rating=supervisor_eval.rating if supervisor_eval and supervisor_eval.rating else None,
+            peer_average_rating=by_type.get(ReviewerType.PEER.value, {}).get("average"),
+            subordinate_average_rating=by_type.get(ReviewerType.SUBORDINATE.value, {}).get("average"),
+            self_rating=self_eval.rating if self_eval and self_eval.rating else None,
+            rating_breakdown=by_type,
             final_rating=review_cycle.final_rating,
             final_strengths=review_cycle.final_strengths,
             final_areas_for_improvement=review_cycle.final_areas_for_improvement,
             final_development_plan=review_cycle.final_development_plan
         )
     
+    async def get_calibration(
+        self,
+        period_start: date,
+        period_end: date,
+        department_id: Optional[uuid.UUID] = None,
+        review_type: Optional[str] = None
+    ) -> dict:
+        """
+        Rating distributions per department for the cycles within a period
+        
+        Built from two grouped queries (final ratings per cycle, submitted
+        ratings per evaluator type); no individual evaluations are loaded.
+        """
+        if period_end < period_start:
+            raise BadRequestException("period_end must be on or after period_start")
+        
+        departments: Dict[Optional[uuid.UUID], dict] = {}
+        
+        def department(department_id, name):
+            if department_id not in departments:
+                departments[department_id] = {
+                    "department_id": str(department_id) if department_id else None,
+                    "department_name": name or "Unassigned",
+                    "cycles": 0,
+                    "final_rating_distribution": {str(r): 0 for r in RATING_SCALE},
+                    "unrated_cycles": 0,
+                    "evaluations": 0,
+                    "average_rating": None,
+                    "by_evaluator_type": {}
+                }
+            return departments[department_id]
+        
+        filters = dict(department_id=department_id, review_type=review_type)
+        for row in await self.repo.get_final_rating_distribution(period_start, period_end, **filters):
+            entry = department(row.department_id, row.department_name)
+            entry["cycles"] += row.cycles
+            if row.final_rating is None:
+                entry["unrated_cycles"] += row.cycles
+            else:
+                key = str(row.final_rating)
+                entry["final_rating_distribution"][key] = entry["final_rating_distribution"].get(key, 0) + row.cycles
+        
+        rating_sums: Dict[Optional[uuid.UUID], int] = defaultdict(int)
+        for row in await self.repo.get_evaluation_rating_distribution(period_start, period_end, **filters):
+            entry = department(row.department_id, row.department_name)
+            evaluator_type = getattr(row.evaluator_type, "value", row.evaluator_type)
+            by_type = entry["by_evaluator_type"].setdefault(evaluator_type, {
+                "count": 0, "average": None, "rating_sum": 0,
+                "distribution": {str(r): 0 for r in RATING_SCALE}
+            })
+            by_type["count"] += row.evaluations
+            by_type["rating_sum"] += row.rating * row.evaluations
+            key = str(row.rating)
+            by_type["distribution"][key] = by_type["distribution"].get(key, 0) + row.evaluations
+            entry["evaluations"] += row.evaluations
+            rating_sums[row.department_id] += row.rating * row.evaluations
+        
+        for department_id, entry in departments.items():
+            if entry["evaluations"]:
+                entry["average_rating"] = round(rating_sums[department_id] / entry["evaluations"], 2)
+            for by_type in entry["by_evaluator_type"].values():
+                by_type["average"] = round(by_type.pop("rating_sum") / by_type["count"], 2)
+        
+        return {
+            "period_start": period_start.isoformat(),
+            "period_end": period_end.isoformat(),
+            "review_type": review_type,
+            "departments": sorted(departments.values(), key=lambda d: d["department_name"])
+        }
+    
     async def finalize_360_review(
         self,
         review_cycle_id: uuid.UUID,
@@ -282,10 +397,10 @@ class PerformanceService:
         )
         employee = employee_result.scalar_one_or_none()
         
-        if employee and employee.email:
+        if employee and employee.work_email:
             from core.email import email_service
             await email_service.send_email(
-                to_email=employee.email,
+                to_email=employee.work_email,
                 subject="Performance Appraisal Completed",
                 html_body=f"""
                 <p>Dear {employee.first_name},</p>
@@ -368,64 +483,188 @@ class PerformanceService:
             for eval, cycle, employee in results
         ]
     
-    async def _check_review_completion(self, review_cycle_id: uuid.UUID):
+    async def _check_review_completion(self, review_cycle: PerformanceReviewCycle, summary: dict):
         """
-        Check if all evaluations are submitted and auto-complete if needed
+        Once every evaluation is in, set the aggregated rating and let the employee know
+        (the caller commits)
         """
-        result = await self.db.execute(
-            select(func.count(PerformanceEvaluation.id)).where(
-                and_(
-                    PerformanceEvaluation.review_cycle_id == review_cycle_id,
-                    PerformanceEvaluation.status == "pending"
-                )
-            )
+        if summary["pending"] or not summary["rated"]:
+            return
+        
+        review_cycle.final_rating = round(summary["rating_sum"] / summary["rated"])
+        # Keep status as in_progress until HR finalizes
+        
+        # Notify the employee that all evaluations are complete
+        employee_result = await self.db.execute(
+            select(Employee.first_name, Employee.work_email).where(Employee.id == review_cycle.employee_id)
         )
-        pending_count = result.scalar()
-        
-        if pending_count == 0:
-            # All evaluations submitted, calculate aggregated rating
-            result = await self.db.execute(
-                select(PerformanceEvaluation).where(
-                    and_(
-                        PerformanceEvaluation.review_cycle_id == review_cycle_id,
-                        PerformanceEvaluation.rating.isnot(None)
-                    )
-                )
+        employee = employee_result.first()
+        
+        if employee and employee.work_email:
+            await enqueue_email(
+                to_email=employee.work_email,
+                subject="Performance Appraisal Completed",
+                html_body=f"""
+                <p>Dear {employee.first_name},</p>
+                <p>Your performance appraisal for the period {review_cycle.review_period_start} to {review_cycle.review_period_end} has been completed.</p>
+                <p>You can view and download your appraisal from your dashboard.</p>
+                <p>The appraisal has been added to your personnel file.</p>
+                """,
+                db=self.db,
+                dedupe_key=f"review_cycle:{review_cycle.id}:evaluations_complete"
             )
-            evaluations = result.scalars().all()
+
+class ReviewCampaignService:
+    """
+    Launch 360-degree reviews for a department, a country or the whole org
+    
+    Targets and their evaluators are resolved in two queries, then every
+    review cycle, evaluation slot and evaluator email goes in as bulk inserts
+    in one transaction, so a failed launch leaves nothing half-created.
+    Employees who already have a cycle for the same period and review type
+    are skipped, which makes relaunching a campaign (e.g. after new hires) safe.
+    """
+    
+    def __init__(
+        self,
+        db: AsyncSession,
+        batch_size: int = settings.REVIEW_CAMPAIGN_BATCH_SIZE,
+        progress: Optional[Callable[[dict], None]] = None
+    ):
+        self.db = db
+        self.batch_size = batch_size
+        self.progress = progress
+        self.repo = ReviewCampaignRepository(db)
+    
+    @staticmethod
+    def pick_peers(position: int, siblings: List[uuid.UUID], count: int) -> List[uuid.UUID]:
+        """
+        The count colleagues after position in the (sorted) sibling list,
+        wrapping around, so every employee reviews and is reviewed by about
+        the same number of peers
+        """
+        return [siblings[(position + k) % len(siblings)] for k in range(1, min(count, len(siblings) - 1) + 1)]
+    
+    def _report(self, stage: str, done: int, total: int):
+        if self.progress:
+            self.progress({"stage": stage, "done": done, "total": total})
+    
+    async def _insert_in_batches(self, stage: str, insert, rows: List[dict]):
+        for start in range(0, len(rows), self.batch_size):
+            await insert(rows[start:start + self.batch_size])
+            self._report(stage, min(start + self.batch_size, len(rows)), len(rows))
+    
+    async def launch(
+        self,
+        campaign: ReviewCampaignCreate,
+        initiator_id: Optional[uuid.UUID] = None
+    ) -> ReviewCampaignResult:
+        """Create the review cycles and evaluation slots of a campaign and notify the evaluators"""
+        target_query = self.repo.target_query(
+            campaign.review_period_start,
+            campaign.review_period_end,
+            campaign.review_type,
+            department_id=campaign.department_id if campaign.scope == "department" else None,
+            country_code=campaign.country_code if campaign.scope == "country" else None
+        )
+        targets = await self.repo.get_targets(target_query)
+        self._report("resolved", len(targets), len(targets))
+        
+        result = ReviewCampaignResult(
+            scope=campaign.scope,
+            review_period_start=campaign.review_period_start,
+            review_period_end=campaign.review_period_end,
+            review_type=campaign.review_type,
+            cycles_created=0,
+            evaluations_created=0,
+            evaluators=0,
+            notifications_queued=0
+        )
+        if not targets:
+            return result
+        
+        pool = await self.repo.get_evaluator_pool(
+            target_query, campaign.review_period_end, campaign.include_peers
+        )
+        contacts = {row.id: row for row in targets}
+        contacts.update((row.id, row) for row in pool)
+        
+        # Pool rows are ordered by id, so each manager's list is sorted
+        reports: Dict[uuid.UUID, List[uuid.UUID]] = defaultdict(list)
+        positions: Dict[uuid.UUID, int] = {}
+        for row in pool:
+            if row.manager_id:
+                positions[row.id] = len(reports[row.manager_id])
+                reports[row.manager_id].append(row.id)
+        
+        cycles, evaluations = [], []
+        assignments: Dict[uuid.UUID, int] = defaultdict(int)
+        for target in targets:
+            cycle_id = uuid.uuid4()
+            cycles.append({
+                "id": cycle_id,
+                "employee_id": target.id,
+                "review_period_start": campaign.review_period_start,
+                "review_period_end": campaign.review_period_end,
+                "review_type": campaign.review_type,
+                "status": "in_progress",
+                "country_code": target.country_code,
+                "created_by": initiator_id
+            })
             
-            if evaluations:
-                avg_rating = round(mean([e.rating for e in evaluations]))
-                
-                # Update review cycle
-                result = await self.db.execute(
-                    select(PerformanceReviewCycle).where(
-                        PerformanceReviewCycle.id == review_cycle_id
-                    )
+            slots = [(target.id, ReviewerType.SELF)]
+            if target.manager_id in contacts:
+                slots.append((target.manager_id, ReviewerType.SUPERVISOR))
+            if campaign.include_subordinates:
+                slots.extend((report_id, ReviewerType.SUBORDINATE) for report_id in reports.get(target.id, ()))
+            if campaign.include_peers and target.manager_id and target.id in positions:
+                siblings = reports[target.manager_id]
+                slots.extend(
+                    (peer_id, ReviewerType.PEER)
+                    for peer_id in self.pick_peers(positions[target.id], siblings, campaign.peers_per_employee)
                 )
-                review_cycle = result.scalar_one_or_none()
-                
-                if review_cycle:
-                    review_cycle.final_rating = avg_rating
-                    # Keep status as in_progress until HR finalizes
-                    
-                    # Send notification to employee that all evaluations are complete
-                    employee_result = await self.db.execute(
-                        select(Employee).where(Employee.id == review_cycle.employee_id)
-                    )
-                    employee = employee_result.scalar_one_or_none()
-                    
-                    if employee and employee.email:
-                        from core.email import email_service
-                        await email_service.send_email(
-                            to_email=employee.email,
-                            subject="Performance Appraisal Completed",
-                            html_body=f"""
-                            <p>Dear {employee.first_name},</p>
-                            <p>Your performance appraisal for the period {review_cycle.review_period_start} to {review_cycle.review_period_end} has been completed.</p>
-                            <p>You can view and download your appraisal from your dashboard.</p>
-                            <p>The appraisal has been added to your personnel file.</p>
-                            """
-                        )
-                    
-                    await self.db.commit()
+            
+            for evaluator_id, evaluator_type in slots:
+                evaluations.append({
+                    "review_cycle_id": cycle_id,
+                    "evaluator_id": evaluator_id,
+                    "evaluator_type": evaluator_type,
+                    "status": "pending",
+                    "country_code": target.country_code,
+                    "created_by": initiator_id
+                })
+                assignments[evaluator_id] += 1
+        
+        await self._insert_in_batches("cycles", self.repo.insert_cycles, cycles)
+        await self._insert_in_batches("evaluations", self.repo.insert_evaluations, evaluations)
+        
+        notifications_queued = 0
+        if campaign.notify:
+            period = f"{campaign.review_period_start} to {campaign.review_period_end}"
+            messages = [
+                {
+                    "to_email": contacts[evaluator_id].work_email,
+                    "subject": "Performance Review Evaluations Assigned",
+                    "html_body": f"""
+                    <p>Dear {escape(contacts[evaluator_id].first_name or '')},</p>
+                    <p>You have been asked to complete {count} evaluation{'s' if count != 1 else ''} for the {campaign.review_type} performance review covering {period}.</p>
+                    <p>You can find them under pending evaluations on your dashboard.</p>
+                    """
+                }
+                for evaluator_id, count in assignments.items()
+                if contacts[evaluator_id].work_email
+            ]
+            notifications_queued = await enqueue_emails(messages, self.db, batch_size=self.batch_size)
+            self._report("notifications", notifications_queued, notifications_queued)
+        
+        await self.db.commit()
+        logger.info(
+            f"Launched {campaign.scope} review campaign {campaign.review_period_start}..{campaign.review_period_end}: "
+            f"{len(cycles)} cycles, {len(evaluations)} evaluations"
+        )
+        
+        result.cycles_created = len(cycles)
+        result.evaluations_created = len(evaluations)
+        result.evaluators = len(assignments)
+        result.notifications_queued = notifications_queued
+        return result
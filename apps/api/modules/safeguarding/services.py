@@ -247,8 +247,12 @@ View case: {email_service.config.APP_URL}/safeguarding/cases/{case.id}
 Confidentiality Notice: Handle this case with strict confidentiality in accordance with safeguarding policies.
                     """
                     
-                    email_service._send_email(user.email, subject, html_body, text_body)
-                    logger.info(f"Notification sent to {user.email} for case {case.case_number}")
+                    await email_service._send_email(
+                        user.email, subject, html_body, text_body,
+                        db=session,
+                        dedupe_key=f"safeguarding:{case.id}:reported:{user.id}"
+                    )
+                    logger.info(f"Notification queued for {user.email} for case {case.case_number}")
         
         except Exception as e:
             logger.error(f"Error sending notifications for case {case.case_number}: {str(e)}")
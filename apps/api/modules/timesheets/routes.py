@@ -1,70 +1,119 @@
 """Timesheets Module - Routes"""
 import uuid
-from fastapi import APIRouter, Depends, HTTPException, status
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, or_
 from sqlalchemy.orm import selectinload
+from core.config import settings
 from core.database import get_db
 from core.dependencies import get_current_active_user, require_admin
+from core.exceptions import BadRequestException
+from core.pagination import encode_cursor, decode_cursor
 from core.pdf_generator import create_timesheet_pdf
+from core.pdf_render import render_service
+from core.work_calendar import get_work_calendar
 from modules.timesheets.models import Timesheet
 from modules.employees.models import Employee
 
 router = APIRouter()
 
 @router.get("/")
-async def list_timesheets(db: AsyncSession = Depends(get_db), current_user = Depends(get_current_active_user)):
-    """List employee timesheets"""
-    from modules.timesheets.models import TimesheetEntry
-    from modules.employees.models import Employee
-    from sqlalchemy import and_
+async def list_timesheets(
+    employee_id: Optional[uuid.UUID] = Query(None, description="Only this employee's timesheets (admins)"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    period_from: Optional[date] = Query(None, description="Timesheets whose period ends on or after this date"),
+    period_to: Optional[date] = Query(None, description="Timesheets whose period starts on or before this date"),
+    summary: bool = Query(False, description="Return total_hours only, without entries"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=settings.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """
+    List employee timesheets, newest first
+    
+    Keyset-paginated on (created_at, id): pass next_cursor back as cursor
+    to fetch the following page.
+    """
+    from modules.timesheets.models import TimesheetEntry, Project
     
     # Get current user's employee_id
     employee_result = await db.execute(
-        select(Employee).where(Employee.user_id == current_user['id'], Employee.is_deleted == False)
+        select(Employee.id).where(Employee.user_id == current_user['id'], Employee.is_deleted == False)
     )
-    employee = employee_result.scalar_one_or_none()
+    own_employee_id = employee_result.scalar_one_or_none()
     
-    # Build query - filter by employee_id if user is not admin/superuser
     query = select(Timesheet).options(
         selectinload(Timesheet.employee),
-        selectinload(Timesheet.approver),
-        selectinload(Timesheet.entries).selectinload(TimesheetEntry.project)
+        selectinload(Timesheet.approver)
     ).where(Timesheet.is_deleted == False)
     
     # If user has an employee record, filter by their employee_id
     # If admin/superuser, show all timesheets
-    if employee and not current_user.get('is_superuser', False):
-        # Check if user has admin role
-        from modules.auth.models import User
-        user_result = await db.execute(
-            select(User).options(selectinload(User.roles)).where(User.id == current_user['id'])
-        )
-        user = user_result.scalar_one_or_none()
-        has_admin_role = user and any(role.name in ['admin', 'super_admin', 'hr_admin'] for role in user.roles)
-        
-        if not has_admin_role:
-            query = query.where(Timesheet.employee_id == employee.id)
-    
-    query = query.order_by(Timesheet.created_at.desc())
+    has_admin_role = current_user.get('is_superuser', False) or any(
+        role in ['admin', 'super_admin', 'hr_admin'] for role in current_user.get('roles', [])
+    )
+    if own_employee_id and not has_admin_role:
+        query = query.where(Timesheet.employee_id == own_employee_id)
+    elif employee_id:
+        query = query.where(Timesheet.employee_id == employee_id)
+    
+    if status_filter:
+        query = query.where(Timesheet.status == status_filter)
+    if period_from:
+        query = query.where(Timesheet.period_end >= period_from)
+    if period_to:
+        query = query.where(Timesheet.period_start <= period_to)
+    
+    after = decode_cursor(cursor, 2)
+    if after:
+        try:
+            after_created_at, after_id = datetime.fromisoformat(after[0]), uuid.UUID(after[1])
+        except ValueError:
+            raise BadRequestException("Invalid pagination cursor")
+        query = query.where(or_(
+            Timesheet.created_at < after_created_at,
+            and_(Timesheet.created_at == after_created_at, Timesheet.id < after_id)
+        ))
+    
+    query = query.order_by(Timesheet.created_at.desc(), Timesheet.id.desc()).limit(limit + 1)
     result = await db.execute(query)
     timesheets = result.scalars().all()
     
-    timesheet_list = []
-    for t in timesheets:
-        # Fetch entries for this timesheet (exclude soft-deleted)
+    has_more = len(timesheets) > limit
+    timesheets = timesheets[:limit]
+    
+    # One query for the entries of every timesheet on the page
+    entries_by_timesheet = defaultdict(list)
+    if not summary and timesheets:
         entries_result = await db.execute(
-            select(TimesheetEntry)
+            select(TimesheetEntry, Project.name)
+            .outerjoin(Project, Project.id == TimesheetEntry.project_id)
             .where(
-                TimesheetEntry.timesheet_id == t.id,
+                TimesheetEntry.timesheet_id.in_([t.id for t in timesheets]),
                 TimesheetEntry.is_deleted == False
             )
-            .order_by(TimesheetEntry.date)
+            .order_by(TimesheetEntry.timesheet_id, TimesheetEntry.date)
         )
-        entries = entries_result.scalars().all()
-        
-        timesheet_list.append({
+        for e, project_name in entries_result.all():
+            entries_by_timesheet[e.timesheet_id].append({
+                "id": str(e.id),
+                "date": str(e.date),
+                "project_id": str(e.project_id) if e.project_id else None,
+                "project_name": project_name or (str(e.project_id)[:8] if e.project_id else "N/A"),
+                "hours": float(e.hours),
+                "activity_description": e.activity_description,
+                "description": e.activity_description,
+                "notes": e.notes
+            })
+    
+    timesheet_list = []
+    for t in timesheets:
+        item = {
             "id": str(t.id),
             "employee": f"{t.employee.first_name} {t.employee.last_name}" if t.employee else "Unknown",
             "period_start": str(t.period_start) if t.period_start else None,
@@ -75,20 +124,14 @@ async def list_timesheets(db: AsyncSession = Depends(get_db), current_user = Dep
             "status": t.status,
             "submitted_date": str(t.submitted_date) if t.submitted_date else None,
             "approved_date": str(t.approved_date) if t.approved_date else None,
-            "approver_name": f"{t.approver.first_name} {t.approver.last_name}" if t.approver else None,
-            "entries": [{
-                "id": str(e.id),
-                "date": str(e.date),
-                "project_id": str(e.project_id) if e.project_id else None,
-                "project_name": e.project.name if e.project else (str(e.project_id)[:8] if e.project_id else "N/A"),
-                "hours": float(e.hours),
-                "activity_description": e.activity_description,
-                "description": e.activity_description,
-                "notes": e.notes
-            } for e in entries]
-        })
+            "approver_name": f"{t.approver.first_name} {t.approver.last_name}" if t.approver else None
+        }
+        if not summary:
+            item["entries"] = entries_by_timesheet[t.id]
+        timesheet_list.append(item)
     
-    return {"timesheets": timesheet_list}
+    next_cursor = encode_cursor(timesheets[-1].created_at.isoformat(), timesheets[-1].id) if has_more else None
+    return {"timesheets": timesheet_list, "next_cursor": next_cursor}
 
 @router.post("/")
 async def create_timesheet(
@@ -518,6 +561,8 @@ async def export_timesheet_pdf(
     if not timesheet_record:
         raise HTTPException(status_code=404, detail="Timesheet not found")
     
+    work_calendar = await get_work_calendar(db, timesheet_record.employee.country_code)
+    
     # Build the timesheet dict from actual database data
     timesheet = {
         "id": str(timesheet_record.id),
@@ -545,10 +590,15 @@ async def export_timesheet_pdf(
                 "activity_description": entry.activity_description or ""
             }
             for entry in timesheet_record.entries
+        ],
+        "non_working_days": [
+            str(day) for day in work_calendar.non_working_days(
+                timesheet_record.period_start, timesheet_record.period_end
+            )
         ]
     }
     
-    pdf_buffer = create_timesheet_pdf(timesheet)
+    pdf_buffer = await render_service.render(create_timesheet_pdf, timesheet)
     
     return StreamingResponse(
         pdf_buffer,
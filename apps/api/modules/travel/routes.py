@@ -10,6 +10,7 @@ from datetime import datetime
 from core.database import get_db
 from core.dependencies import get_current_active_user, require_admin
 from core.pdf_generator import create_travel_request_pdf
+from core.pdf_render import render_service
 from modules.travel.models import TravelRequest
 
 router = APIRouter()
@@ -265,7 +266,7 @@ async def export_travel_request_pdf(
         } if travel_req.approver else None
     }
     
-    pdf_buffer = create_travel_request_pdf(travel_request)
+    pdf_buffer = await render_service.render(create_travel_request_pdf, travel_request)
     
     return StreamingResponse(
         pdf_buffer,
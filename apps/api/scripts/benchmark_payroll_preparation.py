@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Payroll Preparation Benchmark
+Times PayrollService.get_active_employees_for_payroll against growing
+headcounts and reports the number of SQL statements issued per call
+"""
+
+import asyncio
+import sys
+import time
+import uuid
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from core.database import Base
+import main  # noqa: F401 - registers every model on Base.metadata
+from modules.employees.models import Employee, EmploymentType
+from modules.employee_files.models import EmploymentContract, ContractStatus
+from modules.payroll.services import PayrollService
+
+SIZES = [50, 500, 5000]
+RUNS = 5
+
+
+async def seed(session: AsyncSession, count: int):
+    """Insert active employees with one expired and one active contract each"""
+    creator_id = uuid.uuid4()
+    for i in range(count):
+        employee_id = uuid.uuid4()
+        session.add(Employee(
+            id=employee_id,
+            employee_number=f"EMP{i:05d}",
+            first_name="Bench",
+            last_name=f"Employee{i:05d}",
+            work_email=f"bench{i}@example.com",
+            employment_type=EmploymentType.FULL_TIME,
+            hire_date=date(2023, 1, 1)
+        ))
+        for year, status in [(2023, ContractStatus.EXPIRED), (2024, ContractStatus.ACTIVE)]:
+            session.add(EmploymentContract(
+                employee_id=employee_id,
+                contract_number=f"C{i:05d}-{year}",
+                position_title="Officer",
+                start_date=date(year, 1, 1),
+                end_date=date(year, 12, 31),
+                monthly_salary=Decimal("1000"),
+                status=status,
+                created_by=creator_id
+            ))
+    await session.commit()
+
+
+async def benchmark_size(count: int):
+    """Return (median seconds, statements per call) for one headcount"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        await seed(session, count)
+        
+        statements = []
+        event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args))
+        
+        timings = []
+        for _ in range(RUNS):
+            started = time.perf_counter()
+            await PayrollService.get_active_employees_for_payroll(session, user_id=None)
+            timings.append(time.perf_counter() - started)
+    
+    await engine.dispose()
+    timings.sort()
+    return timings[len(timings) // 2], len(statements) // RUNS
+
+
+async def main():
+    print(f"{'employees':>10} {'median ms':>10} {'ms/employee':>12} {'queries':>8}")
+    for count in SIZES:
+        median, queries = await benchmark_size(count)
+        print(f"{count:>10} {median * 1000:>10.1f} {median * 1000 / count:>12.3f} {queries:>8}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -10,6 +10,7 @@ from sqlalchemy import select
 from core.database import AsyncSessionLocal
 from modules.auth.models import User
 from modules.employees.models import Employee
+from modules.employees.hierarchy import OrgHierarchy
 from core.security import hash_password
 
 # Default password for all employees
@@ -183,6 +184,10 @@ async def seed_employees():
                 session.add(employee)
                 print(f"Added employee: {emp_data['Employee ID']} - {emp_data['First Name']} {emp_data['Last Name']}")
             
+            # Bulk inserts bypass the hierarchy index; recompute it once at the end
+            await session.flush()
+            await OrgHierarchy(session).rebuild()
+            
             await session.commit()
             print(f"\nSuccessfully seeded {len(employees_data)} employees!")
             
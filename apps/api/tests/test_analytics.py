@@ -0,0 +1,120 @@
+"""
+Tests for analytics rollups
+"""
+
+from datetime import date
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+
+from modules.analytics.services import AnalyticsRollupService, AnalyticsService
+from modules.employees.models import Employee, EmploymentStatus, EmploymentType
+from modules.leave.models import LeaveBalance
+
+
+def _employee(number, hire_date, termination_date=None, status=EmploymentStatus.ACTIVE, gender=None):
+    return Employee(
+        id=uuid4(), employee_number=number, first_name="Roll", last_name=number,
+        work_email=f"{number.lower()}@example.com", employment_type=EmploymentType.FULL_TIME,
+        hire_date=hire_date, termination_date=termination_date, status=status, country_code="AF",
+        gender=gender
+    )
+
+
+@pytest.mark.asyncio
+async def test_rollups_back_reports_and_refresh_incrementally(db_session, monkeypatch):
+    """Test that reports read the rollups and a refresh only revisits changed periods"""
+    db_session.add_all([
+        _employee("ANL001", date(2024, 1, 10)),
+        _employee("ANL002", date(2023, 6, 1), date(2025, 3, 15), EmploymentStatus.TERMINATED),
+        _employee("ANL003", date(2025, 2, 1))
+    ])
+    employee = _employee("ANL004", date(2024, 5, 1))
+    db_session.add(employee)
+    balance = LeaveBalance(
+        employee_id=employee.id, leave_type="annual", year="2025",
+        total_days=Decimal("20"), used_days=Decimal("5"), pending_days=Decimal("0"), available_days=Decimal("15")
+    )
+    db_session.add(balance)
+    await db_session.commit()
+
+    # Reports never build rollups inside the request; they queue a refresh
+    requested = []
+    monkeypatch.setattr("modules.analytics.services.request_refresh", lambda: requested.append(True))
+    analytics = AnalyticsService(db_session)
+    empty = await analytics.get_turnover_rate(2025)
+    assert (empty["employees_at_start"], empty["refreshed_at"]) == (0, None)
+    assert requested
+
+    rollups = AnalyticsRollupService(db_session)
+    first = await rollups.refresh(today=date(2025, 4, 10))
+    assert first == {"headcount_groups": 2, "months_refreshed": 23, "leave_years_refreshed": 1}
+
+    turnover = await analytics.get_turnover_rate(2025)
+    assert turnover["employees_at_start"] == 3
+    assert turnover["terminations"] == 1
+    assert turnover["turnover_rate"] == 33.33
+    assert turnover["refreshed_at"] is not None
+
+    headcount = await analytics.get_headcount_report(group_by="country")
+    assert headcount["headcount"] == [{"group": "AF", "count": 3}]
+
+    dashboard = await analytics.get_dashboard_metrics()
+    assert dashboard["total_employees"] == 4
+    assert dashboard["active_employees"] == 3
+
+    # Nothing changed: only the current month is revisited
+    second = await rollups.refresh(today=date(2025, 4, 10))
+    assert second["months_refreshed"] == 1
+    assert second["leave_years_refreshed"] == 0
+
+    balance.used_days = Decimal("10")
+    balance.available_days = Decimal("10")
+    await db_session.commit()
+    third = await rollups.refresh(today=date(2025, 4, 10))
+    assert third["leave_years_refreshed"] == 1
+
+    utilization = await analytics.get_leave_utilization(2025)
+    assert utilization["total_used_days"] == 10
+    assert utilization["overall_utilization_percentage"] == 50.0
+
+
+@pytest.mark.asyncio
+async def test_workforce_series_buckets_and_splits(db_session):
+    """Test that the series carries headcount across quiet periods and splits by group"""
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    from modules.analytics.routes import _series_as_csv
+    from core.exceptions import BadRequestException
+
+    db_session.add_all([
+        _employee("SER001", date(2024, 11, 10), gender="female"),
+        _employee("SER002", date(2025, 1, 15), gender="male"),
+        _employee("SER003", date(2024, 6, 1), date(2025, 2, 20), EmploymentStatus.TERMINATED, gender="female")
+    ])
+    await db_session.commit()
+
+    analytics = AnalyticsService(db_session, session_factory=async_sessionmaker(db_session.bind))
+    monthly = [row async for row in analytics.workforce_series("month", date(2025, 1, 10), date(2025, 3, 31))]
+    assert [(r["period_start"], r["opening_headcount"], r["hires"], r["exits"], r["closing_headcount"]) for r in monthly] == [
+        ("2025-01-01", 2, 1, 0, 3),
+        ("2025-02-01", 3, 0, 1, 2),
+        ("2025-03-01", 2, 0, 0, 2)
+    ]
+    assert monthly[1]["turnover_rate"] == 40.0
+    assert monthly[2]["period_end"] == "2025-03-31"
+
+    quarterly = analytics.workforce_series("quarter", date(2025, 1, 1), date(2025, 3, 31), split_by="gender")
+    rows = [row async for row in quarterly]
+    assert [(r["group"], r["opening_headcount"], r["closing_headcount"]) for r in rows] == [
+        ("female", 2, 1),
+        ("male", 0, 1)
+    ]
+
+    weekly = analytics.workforce_series("week", date(2025, 1, 15), date(2025, 1, 21))
+    csv_text = "".join([chunk async for chunk in _series_as_csv(weekly)])
+    assert csv_text.splitlines()[1].startswith("2025-01-13,2025-01-19,all,2,1,0,3,")
+
+    with pytest.raises(BadRequestException):
+        analytics.workforce_series("day")
+
@@ -33,3 +33,112 @@ async def test_approval_pending_endpoint_exists(client: AsyncClient):
     # Should require auth
     assert response.status_code in [401, 200]
 
+
+
+@pytest.mark.asyncio
+async def test_pending_approvals_gated_and_paginated_in_sql(db_session):
+    """Test that only actionable approvals are returned, newest first, page by page"""
+    from datetime import date, datetime, timedelta
+    from modules.approvals.models import ApprovalRequest, ApprovalStatus, ApprovalType
+    from modules.approvals.services import ApprovalService
+    from modules.employees.models import Employee, EmploymentType
+    
+    employee, approver, first_approver = [
+        Employee(
+            id=uuid4(), employee_number=f"APR{i:03d}", first_name="Test", last_name=f"Person{i}",
+            work_email=f"approvals{i}@example.com", employment_type=EmploymentType.FULL_TIME,
+            hire_date=date(2024, 1, 1), country_code="AF"
+        )
+        for i in range(3)
+    ]
+    db_session.add_all([employee, approver, first_approver])
+    
+    base = datetime(2026, 1, 1)
+    
+    def approval(level, status, approver_id, previous=None, minutes=0):
+        return ApprovalRequest(
+            id=uuid4(), request_type=ApprovalType.LEAVE, request_id=uuid4(), employee_id=employee.id,
+            approver_id=approver_id, approval_level=level, status=status,
+            previous_approval_id=previous.id if previous else None,
+            submitted_at=base + timedelta(minutes=minutes), country_code="AF"
+        )
+    
+    approved_first = approval(1, ApprovalStatus.APPROVED, first_approver.id)
+    pending_first = approval(1, ApprovalStatus.PENDING, first_approver.id)
+    actionable = [approval(1, ApprovalStatus.PENDING, approver.id, minutes=i) for i in range(3)]
+    actionable.append(approval(2, ApprovalStatus.PENDING, approver.id, approved_first, minutes=10))
+    blocked = approval(2, ApprovalStatus.PENDING, approver.id, pending_first, minutes=20)
+    db_session.add_all([approved_first, pending_first, *actionable, blocked])
+    await db_session.commit()
+    
+    service = ApprovalService(db_session)
+    assert await service.count_pending_approvals(approver.id) == 4
+    
+    first_page = await service.get_pending_approvals(approver.id, limit=2)
+    last = first_page[-1]
+    second_page = await service.get_pending_approvals(approver.id, limit=2, after=(last["submitted_at"], last["id"]))
+    
+    expected = sorted(actionable, key=lambda a: a.submitted_at, reverse=True)
+    assert [a["id"] for a in first_page + second_page] == [a.id for a in expected]
+    assert first_page[0]["employee_name"] == "Test Person0"
+
+
+@pytest.mark.asyncio
+async def test_approval_stats_grouped_cached_and_backlog(db_session):
+    """Test grouped stats, their invalidation on approval changes, and the org backlog"""
+    from datetime import date, datetime, timedelta
+    from sqlalchemy import event
+    from core.cache import invalidate_tags, approvals_tag, APPROVALS_ORG_TAG
+    from modules.approvals.models import ApprovalRequest, ApprovalStatus, ApprovalType
+    from modules.approvals.schemas import ApprovalRequestCreate
+    from modules.approvals.services import ApprovalService
+    from modules.employees.models import Employee, EmploymentType
+    
+    employee, approver = [
+        Employee(
+            id=uuid4(), employee_number=f"STAT{i:03d}", first_name="Stat", last_name=f"Person{i}",
+            work_email=f"stats{i}@example.com", employment_type=EmploymentType.FULL_TIME,
+            hire_date=date(2024, 1, 1), country_code="AF"
+        )
+        for i in range(2)
+    ]
+    db_session.add_all([employee, approver])
+    now = datetime.utcnow()
+    for request_type, age_days in [
+        (ApprovalType.LEAVE, 0), (ApprovalType.LEAVE, 5), (ApprovalType.LEAVE, 6), (ApprovalType.TRAVEL, 10)
+    ]:
+        db_session.add(ApprovalRequest(
+            id=uuid4(), request_type=request_type, request_id=uuid4(), employee_id=employee.id,
+            approver_id=approver.id, status=ApprovalStatus.PENDING, country_code="AF",
+            submitted_at=now - timedelta(days=age_days, hours=1)
+        ))
+    await db_session.commit()
+    await invalidate_tags(approvals_tag(approver.id), APPROVALS_ORG_TAG)
+    
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db_session.bind.sync_engine, "before_cursor_execute", listener)
+    try:
+        service = ApprovalService(db_session)
+        stats = await service.get_approval_stats(approver.id)
+        assert (stats.total_pending, stats.leave_pending, stats.travel_pending) == (4, 3, 1)
+        assert len(statements) == 1
+        
+        await service.get_approval_stats(approver.id)
+        assert len(statements) == 1
+    finally:
+        event.remove(db_session.bind.sync_engine, "before_cursor_execute", listener)
+    
+    await service.create_approval_request(
+        ApprovalRequestCreate(request_type=ApprovalType.TIMESHEET, request_id=uuid4(), employee_id=employee.id),
+        approver.id,
+        country_code="AF"
+    )
+    stats = await service.get_approval_stats(approver.id)
+    assert (stats.total_pending, stats.timesheet_pending) == (5, 1)
+    
+    backlog = await service.get_approval_backlog("AF")
+    cells = {(row["request_type"], row["age_bucket"]): row["pending"] for row in backlog["rows"]}
+    assert backlog["total_pending"] == 5
+    assert cells == {("leave", "0-1d"): 1, ("leave", "3-7d"): 2, ("travel", "7d+"): 1, ("timesheet", "0-1d"): 1}
+    assert backlog["rows"][0]["approver_name"] == "Stat Person1"
@@ -53,3 +53,83 @@ async def test_rate_limiting(client: AsyncClient):
     # This is a basic test - in production, rate limiting should kick in earlier
     assert all(status in [400, 401, 422, 429] for status in responses)
 
+
+
+@pytest.mark.asyncio
+async def test_principal_cache_invalidation():
+    """Test that cached principals are dropped on user and role changes"""
+    from core.principal_cache import PrincipalCache
+    
+    principal_cache = PrincipalCache(ttl=60, local_ttl=60)
+    principal = {"id": "user-1", "roles": ["employee"], "permissions": ["hr:read"]}
+    
+    await principal_cache.set("user-1", principal)
+    assert await principal_cache.get("user-1") == principal
+    
+    await principal_cache.invalidate_user("user-1")
+    assert await principal_cache.get("user-1") is None
+    
+    await principal_cache.set("user-1", principal)
+    await principal_cache.invalidate_all()
+    assert await principal_cache.get("user-1") is None
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_bounds_queue_and_hashes_in_parallel():
+    """Test off-loop hashing, the queue limit and parallel bulk hashing"""
+    from core.exceptions import PasswordHashingUnavailableException
+    from core.password_hashing import PasswordHasher
+    from core.security import password_needs_rehash, verify_password
+    
+    hasher = PasswordHasher(workers=2, max_queue=2, rounds=4)
+    try:
+        hashed = await hasher.hash("Secret*123")
+        assert hashed.startswith("$2b$04$")
+        assert await hasher.verify("Secret*123", hashed)
+        assert not await hasher.verify("wrong", hashed)
+        
+        hashes = await hasher.hash_many([f"Password{i}!" for i in range(6)])
+        assert all(verify_password(f"Password{i}!", h) for i, h in enumerate(hashes))
+        assert hasher.peak_in_flight <= 2
+        
+        hasher.in_flight = hasher.max_queue
+        with pytest.raises(PasswordHashingUnavailableException):
+            await hasher.verify("Secret*123", hashed)
+        hasher.in_flight = 0
+        
+        stats = hasher.get_stats()
+        assert (stats["hashed"], stats["verified"], stats["rejected"]) == (7, 2, 1)
+        assert password_needs_rehash(hashed, 5) and not password_needs_rehash(hashed, 4)
+    finally:
+        hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_login_upgrades_hash_to_current_work_factor(db_session, monkeypatch):
+    """Test that a login with a hash at an old cost stores one at the current cost"""
+    from uuid import uuid4
+    from core.password_hashing import PasswordHasher
+    from core.security import hash_password, verify_password
+    from modules.auth.models import User
+    from modules.auth.schemas import LoginRequest
+    from modules.auth.services import AuthService
+    
+    user = User(
+        id=uuid4(), email="rehash@example.com", hashed_password=hash_password("Secret*123", rounds=4),
+        first_name="Re", last_name="Hash", is_active=True, is_verified=True, is_superuser=True
+    )
+    db_session.add(user)
+    await db_session.commit()
+    
+    hasher = PasswordHasher(workers=1, max_queue=4, rounds=5)
+    monkeypatch.setattr("modules.auth.services.password_hasher", hasher)
+    try:
+        access_token, _ = await AuthService(db_session).login(LoginRequest(email=user.email, password="Secret*123"))
+    finally:
+        hasher.shutdown()
+    
+    await db_session.refresh(user)
+    assert access_token
+    assert user.hashed_password.startswith("$2b$05$")
+    assert verify_password("Secret*123", user.hashed_password)
+    assert hasher.get_stats()["rehashed"] == 1
@@ -0,0 +1,76 @@
+"""
+Tests for the cache layer
+"""
+
+import asyncio
+import pytest
+
+from core.cache import RedisCache
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_coalesces_concurrent_loads():
+    """Test that concurrent misses for one key share a single loader call"""
+    cache = RedisCache()
+    calls = 0
+    
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"value": 42}
+    
+    results = await asyncio.gather(*[
+        cache.get_or_set("test:single-flight", loader, ttl=60)
+        for _ in range(10)
+    ])
+    
+    assert calls == 1
+    assert all(result == {"value": 42} for result in results)
+    assert cache.stats.coalesced == 9
+
+
+@pytest.mark.asyncio
+async def test_local_tier_serves_without_redis():
+    """Test that the in-process tier works when Redis is unavailable"""
+    cache = RedisCache()
+    
+    await cache.set_many({"test:a": 1, "test:b": 2}, ttl=60)
+    assert await cache.get_many(["test:a", "test:b", "test:c"]) == {"test:a": 1, "test:b": 2}
+    
+    await cache.delete("test:a")
+    assert await cache.get("test:a") is None
+    assert cache.get_stats()["local_hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_invalidate_tags_drops_only_tagged_entries():
+    """Test that tag invalidation removes tagged keys and leaves the rest"""
+    cache = RedisCache()
+    
+    await cache.set("test:employee", {"id": 1}, ttl=60, tags=["employee:1", "department:9"])
+    await cache.set("test:department", {"id": 9}, ttl=60, tags=["department:9"])
+    await cache.set("test:other", {"id": 2}, ttl=60, tags=["employee:2"])
+    
+    await cache.invalidate_tags("department:9")
+    
+    assert await cache.get("test:employee") is None
+    assert await cache.get("test:department") is None
+    assert await cache.get("test:other") == {"id": 2}
+
+
+@pytest.mark.asyncio
+async def test_local_tier_returns_json_copies_like_redis():
+    """Test that L1 hits are typed like Redis hits and cannot be mutated by callers"""
+    from uuid import uuid4
+    cache = RedisCache()
+    employee_id = uuid4()
+    
+    async def loader():
+        return {"id": employee_id, "tags": ["a"]}
+    
+    loaded = await cache.get_or_set("test:typed", loader, ttl=60)
+    assert loaded == {"id": str(employee_id), "tags": ["a"]}
+    
+    loaded["tags"].append("b")
+    assert await cache.get("test:typed") == {"id": str(employee_id), "tags": ["a"]}
@@ -27,3 +27,130 @@ async def test_user_role_endpoint_exists(client: AsyncClient):
     # Should require auth
     assert response.status_code in [401, 200]
 
+
+
+@pytest.mark.asyncio
+async def test_employee_dashboard_fans_out_with_per_component_fallback(db_session, monkeypatch):
+    """Test that components run on their own sessions and a failing one is served stale"""
+    from datetime import date
+    from decimal import Decimal
+    from uuid import uuid4
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    from core.cache import cache, build_dashboard_key
+    from modules.dashboard.services import DashboardService
+    from modules.employees.models import Employee, EmploymentType
+    from modules.grievance.models import Grievance
+    from modules.leave.models import LeaveBalance
+    
+    user_id = uuid4()
+    employee = Employee(
+        id=uuid4(), user_id=user_id, employee_number="DASH001", first_name="Dash", last_name="Board",
+        work_email="dash@example.com", employment_type=EmploymentType.FULL_TIME,
+        hire_date=date(2024, 1, 1), country_code="AF"
+    )
+    db_session.add(employee)
+    db_session.add(LeaveBalance(
+        employee_id=employee.id, leave_type="annual", year=str(date.today().year),
+        total_days=Decimal("20"), used_days=Decimal("5"), pending_days=Decimal("0"), available_days=Decimal("15")
+    ))
+    db_session.add_all([
+        Grievance(employee_id=employee.id, case_number=f"G-{i}", grievance_type="other",
+                  description="test", filed_date=date.today(), status=status)
+        for i, status in enumerate(["open", "resolved", "closed"])
+    ])
+    await db_session.commit()
+    
+    service = DashboardService(db_session, session_factory=async_sessionmaker(db_session.bind))
+    first = await service.get_employee_dashboard(user_id)
+    assert first["staleComponents"] == []
+    assert first["leaveBalance"]["annual"] == 15
+    assert first["grievances"] == {"total": 3, "resolved": 2, "pending": 1}
+    
+    async def broken(db, employee_id):
+        raise RuntimeError("database went away")
+    
+    await cache.delete(build_dashboard_key(str(user_id), "employee"))
+    monkeypatch.setattr(DashboardService, "_get_employee_grievances", staticmethod(broken))
+    second = await service.get_employee_dashboard(user_id)
+    assert second["staleComponents"] == ["grievances"]
+    assert second["grievances"] == first["grievances"]
+    assert await cache.get(build_dashboard_key(str(user_id), "employee")) is None
+
+
+@pytest.mark.asyncio
+async def test_supervisor_dashboard_aggregates_whole_team(db_session, monkeypatch):
+    """Test that direct and indirect reports get real balances, attendance and leave status"""
+    import asyncio
+    from datetime import date, timedelta
+    from decimal import Decimal
+    from uuid import uuid4
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    from core.cache import cache, build_dashboard_key
+    from modules.dashboard.services import DashboardService
+    from modules.employees.hierarchy import OrgHierarchy
+    from modules.employees.models import Employee, EmploymentType
+    from modules.leave.models import AttendanceRecord, LeaveBalance, LeaveRequest
+    
+    def make_employee(number, first_name, manager_id=None, user_id=None):
+        return Employee(
+            id=uuid4(), user_id=user_id, employee_number=number, first_name=first_name, last_name="Team",
+            work_email=f"{number.lower()}@example.com", employment_type=EmploymentType.FULL_TIME,
+            hire_date=date(2024, 1, 1), country_code="AF", manager_id=manager_id
+        )
+    
+    today = date.today()
+    user_id = uuid4()
+    supervisor = make_employee("SUP001", "Sam", user_id=user_id)
+    direct = make_employee("SUP002", "Dana", manager_id=supervisor.id)
+    indirect = make_employee("SUP003", "Ira", manager_id=direct.id)
+    db_session.add_all([supervisor, direct, indirect])
+    db_session.add(LeaveBalance(
+        employee_id=direct.id, leave_type="annual", year=str(today.year),
+        total_days=Decimal("20"), used_days=Decimal("8"), pending_days=Decimal("0"), available_days=Decimal("12")
+    ))
+    db_session.add_all([
+        AttendanceRecord(employee_id=direct.id, date=today - timedelta(days=i), status=status)
+        for i, status in enumerate(["present", "late", "half-day", "absent"])
+    ])
+    db_session.add(LeaveRequest(
+        employee_id=indirect.id, leave_type="annual", start_date=today - timedelta(days=1),
+        end_date=today + timedelta(days=1), total_days=Decimal("3"), status="approved"
+    ))
+    await db_session.flush()
+    await OrgHierarchy(db_session).rebuild()
+    await db_session.commit()
+    
+    # The test engine shares one connection; run components one at a time on it
+    monkeypatch.setattr("core.fanout._query_slots", asyncio.Semaphore(1))
+    service = DashboardService(db_session, session_factory=async_sessionmaker(db_session.bind))
+    dashboard = await service.get_supervisor_dashboard(user_id)
+    
+    assert dashboard["staleComponents"] == []
+    members = {m["name"]: m for m in dashboard["teamMembers"]}
+    assert list(members) == ["Dana Team", "Ira Team"]
+    assert members["Dana Team"]["depth"] == 1
+    assert members["Dana Team"]["leave_balance"] == 12
+    assert members["Dana Team"]["attendance_rate"] == 62.5
+    assert members["Dana Team"]["status"] == "active"
+    assert members["Ira Team"]["depth"] == 2
+    assert members["Ira Team"]["attendance_rate"] is None
+    assert members["Ira Team"]["status"] == "on_leave"
+    assert dashboard["teamStats"] == {
+        "totalMembers": 2, "directReports": 1, "activeMembers": 1, "onLeave": 1, "avgAttendance": 62.5
+    }
+    assert await cache.get(build_dashboard_key(str(supervisor.id), "supervisor")) == dashboard
+
+
+@pytest.mark.asyncio
+async def test_fan_out_deadline_covers_waiting_for_a_slot(monkeypatch):
+    """Test that a component stuck waiting for a query slot times out"""
+    import asyncio
+    from core.fanout import fan_out
+    
+    def no_session():
+        raise AssertionError("no session should be opened without a slot")
+    
+    monkeypatch.setattr("core.fanout._query_slots", asyncio.Semaphore(0))
+    results, errors = await fan_out({"stuck": lambda db: None}, timeout=0.05, session_factory=no_session)
+    assert results == {}
+    assert isinstance(errors["stuck"], asyncio.TimeoutError)
@@ -0,0 +1,83 @@
+"""
+Tests for the transactional email outbox
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from core.email import email_service
+from core.email_outbox import EmailOutboxDispatcher, enqueue_email
+from modules.notifications.models import EmailOutbox
+
+
+async def _outbox(db_session):
+    result = await db_session.execute(select(EmailOutbox).order_by(EmailOutbox.to_email))
+    return result.scalars().all()
+
+
+@pytest.mark.asyncio
+async def test_enqueue_joins_caller_transaction(db_session):
+    """Test that queued mail is deduplicated and discarded on rollback"""
+    await enqueue_email("a@example.com", "Hello", "<p>Hi</p>", db=db_session, dedupe_key="k1")
+    await enqueue_email("a@example.com", "Hello", "<p>Hi</p>", db=db_session, dedupe_key="k1")
+    await enqueue_email("b@example.com", "Hello", "<p>Hi</p>", db=db_session, dedupe_key="k2")
+    await db_session.rollback()
+    assert await _outbox(db_session) == []
+
+    await enqueue_email("a@example.com", "Hello", "<p>Hi</p>", db=db_session, dedupe_key="k1")
+    await enqueue_email("a@example.com", "Hello", "<p>Hi</p>", db=db_session, dedupe_key="k1")
+    await db_session.commit()
+
+    rows = await _outbox(db_session)
+    assert len(rows) == 1
+    assert rows[0].status == "pending"
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_sends_batches_and_backs_off(db_session, monkeypatch):
+    """Test that one batch is delivered together and failures are rescheduled"""
+    for address in ["a@example.com", "b@example.com", "c@example.com"]:
+        await enqueue_email(address, "Hello", "<p>Hi</p>", db=db_session)
+    await db_session.commit()
+
+    batches = []
+
+    def deliver_batch(messages):
+        batches.append([m["to_email"] for m in messages])
+        return [None if m["to_email"] != "b@example.com" else "mailbox unavailable" for m in messages]
+
+    monkeypatch.setattr(email_service, "deliver_batch", deliver_batch)
+    dispatcher = EmailOutboxDispatcher(
+        session_factory=async_sessionmaker(db_session.bind, expire_on_commit=False),
+        batch_size=10,
+        max_attempts=2,
+        backoff_seconds=60
+    )
+
+    assert await dispatcher.dispatch_pending() == 3
+    assert sorted(batches[0]) == ["a@example.com", "b@example.com", "c@example.com"]
+
+    db_session.expire_all()
+    rows = {row.to_email: row for row in await _outbox(db_session)}
+    assert rows["a@example.com"].status == "sent"
+    assert rows["a@example.com"].sent_at is not None
+    assert rows["b@example.com"].status == "pending"
+    assert rows["b@example.com"].attempts == 1
+    assert rows["b@example.com"].last_error == "mailbox unavailable"
+    assert rows["b@example.com"].next_attempt_at > datetime.utcnow()
+
+    # Nothing is due until the backoff expires
+    assert await dispatcher.dispatch_pending() == 0
+
+    rows["b@example.com"].next_attempt_at = datetime.utcnow()
+    await db_session.commit()
+    assert await dispatcher.dispatch_pending() == 1
+
+    db_session.expire_all()
+    rows = {row.to_email: row for row in await _outbox(db_session)}
+    assert rows["b@example.com"].status == "failed"
+    assert dispatcher.get_stats()["sent"] == 2
+    assert dispatcher.get_stats()["failed"] == 1
@@ -35,3 +35,176 @@ async def test_create_employee_requires_auth(client: AsyncClient):
     response = await client.post("/api/v1/employees/", json=employee_data)
     assert response.status_code == 401
 
+
+
+@pytest.mark.asyncio
+async def test_directory_keyset_pages_with_projection_and_filters(db_session):
+    """Test directory paging, field projection, filtering and exact count"""
+    from datetime import date
+    from modules.employees.models import Employee, Department, EmploymentType, EmploymentStatus
+    from modules.employees.services import EmployeeService
+    
+    department = Department(id=uuid4(), name="Programs", code="PRG")
+    db_session.add(department)
+    for i in range(7):
+        db_session.add(Employee(
+            id=uuid4(), employee_number=f"DIR{i:03d}", first_name="Test", last_name=f"Person{i}",
+            work_email=f"directory{i}@example.com", employment_type=EmploymentType.FULL_TIME,
+            hire_date=date(2024, 1, 1), country_code="AF",
+            status=EmploymentStatus.TERMINATED if i == 6 else EmploymentStatus.ACTIVE,
+            department_id=department.id
+        ))
+    await db_session.commit()
+    
+    service = EmployeeService(db_session)
+    pages, cursor = [], None
+    while True:
+        page = await service.get_directory(
+            fields="employee_number,last_name,department_name", sort="-last_name",
+            status="active", country_code="af", cursor=cursor, limit=4, count="exact"
+        )
+        pages.append(page)
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    
+    names = [item["last_name"] for page in pages for item in page["items"]]
+    assert names == [f"Person{i}" for i in range(5, -1, -1)]
+    assert set(pages[0]["items"][0]) == {"employee_number", "last_name", "department_name"}
+    assert pages[0]["items"][0]["department_name"] == "Programs"
+    assert pages[0]["total"] == 6 and pages[0]["total_is_estimate"] is False
+
+
+@pytest.mark.asyncio
+async def test_search_fallback_ranks_fuzzy_and_prefix_matches(db_session):
+    """Test the in-process search index: typos, prefixes and tenant scope"""
+    from datetime import date
+    from modules.employees.models import Employee, EmploymentType
+    from modules.employees.search import EmployeeSearchService, employee_search_index
+    
+    people = [("Mariam", "Ahmadi", "AF"), ("Maryam", "Karimi", "AF"), ("Marcus", "Stone", "US")]
+    for i, (first_name, last_name, country) in enumerate(people):
+        db_session.add(Employee(
+            id=uuid4(), employee_number=f"SRCH{i:03d}", first_name=first_name, last_name=last_name,
+            work_email=f"{first_name.lower()}@example.com", employment_type=EmploymentType.FULL_TIME,
+            hire_date=date(2024, 1, 1), country_code=country
+        ))
+    await db_session.commit()
+    employee_search_index.invalidate()
+    
+    hr_user = {"permissions": ["hr:read"], "country_code": "AF", "is_superuser": False}
+    service = EmployeeSearchService(db_session)
+    
+    typo = await service.search("ahmady", hr_user)
+    assert typo[0]["last_name"] == "Ahmadi"
+    
+    prefix = await service.search("mar", hr_user, autocomplete=True)
+    assert {r["last_name"] for r in prefix} == {"Ahmadi", "Karimi"}
+    
+    exact = await service.search("srch001", hr_user)
+    assert exact[0]["employee_number"] == "SRCH001"
+    
+    # Employee writes drop the index instead of waiting for its TTL
+    from uuid import UUID
+    from modules.employees.schemas import EmployeeUpdate
+    from modules.employees.services import EmployeeService
+    
+    employee_service = EmployeeService(db_session)
+    await employee_service.update_employee(UUID(str(exact[0]["id"])), EmployeeUpdate(last_name="Rahimi"))
+    assert (await service.search("rahimi", hr_user))[0]["employee_number"] == "SRCH001"
+    await employee_service.delete_employee(UUID(str(typo[0]["id"])))
+    assert {r["last_name"] for r in await service.search("mar", hr_user, autocomplete=True)} == {"Rahimi"}
+
+
+@pytest.mark.asyncio
+async def test_hierarchy_index_follows_manager_moves(db_session):
+    """Test reports, chain of command and span of control across a subtree move"""
+    from datetime import date
+    from sqlalchemy import select
+    from core.exceptions import BadRequestException
+    from modules.employees.hierarchy import OrgHierarchy
+    from modules.employees.models import Employee, EmployeeHierarchy, EmploymentType
+    
+    hierarchy = OrgHierarchy(db_session)
+    people = {}
+    
+    async def hire(name, manager=None):
+        employee = Employee(
+            id=uuid4(), employee_number=f"ORG-{name}", first_name=name, last_name="Org",
+            work_email=f"org-{name.lower()}@example.com", employment_type=EmploymentType.FULL_TIME,
+            hire_date=date(2024, 1, 1), manager_id=people[manager].id if manager else None
+        )
+        db_session.add(employee)
+        await db_session.flush()
+        await hierarchy.add_employee(employee.id, employee.manager_id)
+        people[name] = employee
+    
+    # Chief -> Ana -> Ben -> Cy, and Chief -> Dee
+    await hire("Chief")
+    await hire("Ana", "Chief")
+    await hire("Ben", "Ana")
+    await hire("Cy", "Ben")
+    await hire("Dee", "Chief")
+    await db_session.commit()
+    
+    reports = await hierarchy.get_reports(people["Chief"].id)
+    assert [(r.first_name, r.depth) for r in reports] == [("Ana", 1), ("Dee", 1), ("Ben", 2), ("Cy", 3)]
+    assert [r.first_name for r in await hierarchy.get_reports(people["Chief"].id, max_depth=1)] == ["Ana", "Dee"]
+    
+    # Ana's whole branch moves under Dee
+    await hierarchy.set_manager(people["Ana"], people["Dee"].id)
+    await db_session.commit()
+    
+    chain = await hierarchy.get_chain_of_command(people["Cy"].id)
+    assert [(r.first_name, r.depth) for r in chain] == [("Ben", 1), ("Ana", 2), ("Dee", 3), ("Chief", 4)]
+    assert await hierarchy.get_span_of_control(people["Dee"].id) == {
+        "employee_id": people["Dee"].id, "level": 1, "direct_reports": 1, "total_reports": 3, "levels_below": 3
+    }
+    assert (await hierarchy.get_span_of_control(people["Chief"].id))["direct_reports"] == 1
+    
+    with pytest.raises(BadRequestException):
+        await hierarchy.set_manager(people["Dee"], people["Cy"].id)
+    
+    # The incrementally maintained rows match a rebuild from manager_id
+    async def closure():
+        result = await db_session.execute(
+            select(EmployeeHierarchy.ancestor_id, EmployeeHierarchy.descendant_id, EmployeeHierarchy.depth)
+        )
+        return set(result.all())
+    
+    maintained = await closure()
+    assert await hierarchy.rebuild() == len(maintained) == 15
+    assert await closure() == maintained
+
+
+@pytest.mark.asyncio
+async def test_synced_employees_join_the_hierarchy_index(db_session):
+    """Test that employees created by the admin user sync can be placed in the reporting hierarchy"""
+    from datetime import date
+    from sqlalchemy import select
+    from modules.admin.routes import sync_users_to_employees
+    from modules.auth.models import User
+    from modules.employees.hierarchy import OrgHierarchy
+    from modules.employees.models import Employee, EmploymentType
+    
+    manager = Employee(
+        id=uuid4(), employee_number="SYNC-MGR", first_name="Sync", last_name="Manager",
+        work_email="sync-manager@example.com", employment_type=EmploymentType.FULL_TIME,
+        hire_date=date(2024, 1, 1)
+    )
+    db_session.add(manager)
+    db_session.add(User(id=uuid4(), email="synced@example.com", hashed_password="x", first_name="Syn", last_name="Ced"))
+    await db_session.flush()
+    hierarchy = OrgHierarchy(db_session)
+    await hierarchy.add_employee(manager.id)
+    manager_id = manager.id
+    await db_session.commit()
+    
+    result = await sync_users_to_employees(current_user={}, db=db_session)
+    assert result["created"] == 1
+    
+    synced = await db_session.scalar(select(Employee).where(Employee.work_email == "synced@example.com"))
+    await hierarchy.set_manager(synced, manager_id)
+    await db_session.commit()
+    
+    assert [r.first_name for r in await hierarchy.get_reports(manager_id)] == ["Syn"]
@@ -42,3 +42,332 @@ async def test_leave_balance_endpoint_exists(client: AsyncClient):
     # Should require auth
     assert response.status_code in [401, 200]
 
+
+
+@pytest.mark.asyncio
+async def test_leave_ledger_guards_holds_and_recomputes_snapshots(db_session):
+    """Test that ledger postings are guarded, idempotent and rebuild the snapshot"""
+    from decimal import Decimal
+    from uuid import uuid4
+    from modules.employees.models import Employee, EmploymentType
+    from modules.leave.models import LeaveBalance, LeaveLedgerEntryType
+    from modules.leave.repositories import LeaveBalanceRepository, LeaveLedgerRepository
+    from modules.leave.schemas import LeaveBalanceCreate
+    from modules.leave.services import LeaveService
+    
+    employee = Employee(
+        id=uuid4(), employee_number="LED001", first_name="Led", last_name="Ger",
+        work_email="ledger@example.com", employment_type=EmploymentType.FULL_TIME,
+        hire_date=date(2024, 1, 1), country_code="AF"
+    )
+    db_session.add(employee)
+    await db_session.commit()
+    balance = await LeaveBalanceRepository(db_session).create(LeaveBalanceCreate(
+        employee_id=employee.id, leave_type="annual", year="2025",
+        total_days=Decimal("10"), available_days=Decimal("10")
+    ))
+    
+    ledger = LeaveLedgerRepository(db_session)
+    key = (employee.id, "annual", "2025")
+    held = await ledger.post(
+        *key, LeaveLedgerEntryType.HOLD, pending_delta=Decimal("6"),
+        reference="leave_request:a:hold", min_available=Decimal("6")
+    )
+    assert held["pending_days"] == 6
+    assert held["available_days"] == 4
+    await db_session.commit()
+    
+    # A second request cannot overdraw what the first one holds
+    assert await ledger.post(
+        *key, LeaveLedgerEntryType.HOLD, pending_delta=Decimal("5"),
+        reference="leave_request:b:hold", min_available=Decimal("5")
+    ) is None
+    await db_session.rollback()
+    
+    # Posting the same event twice applies it once
+    for _ in range(2):
+        approved = await ledger.post(
+            *key, LeaveLedgerEntryType.APPROVE, used_delta=Decimal("6"), pending_delta=Decimal("-6"),
+            reference="leave_request:a:approve"
+        )
+    await db_session.commit()
+    assert (approved["used_days"], approved["pending_days"], approved["available_days"]) == (6, 0, 4)
+    assert len(await ledger.get_entries(*key)) == 3
+    
+    await db_session.refresh(balance)
+    balance.available_days = Decimal("9")
+    await db_session.commit()
+    assert await LeaveService(db_session).recompute_balances() == {"checked": 1, "corrected": 1}
+    await db_session.refresh(balance)
+    assert balance.available_days == 4
+
+
+@pytest.mark.asyncio
+async def test_leave_request_hold_is_settled_once(db_session):
+    """Test that a decided request cannot be decided again and its hold is settled once"""
+    from decimal import Decimal
+    from uuid import uuid4
+    from core.exceptions import BadRequestException
+    from modules.employees.models import Employee, EmploymentType
+    from modules.leave.models import LeaveBalance, LeaveLedgerEntryType, LeaveRequest
+    from modules.leave.repositories import LeaveLedgerRepository
+    from modules.leave.services import LeaveService
+    
+    employee = Employee(
+        id=uuid4(), employee_number="SET001", first_name="Set", last_name="Tle",
+        work_email="settle@example.com", employment_type=EmploymentType.FULL_TIME,
+        hire_date=date(2024, 1, 1), country_code="AF"
+    )
+    db_session.add(employee)
+    db_session.add(LeaveBalance(
+        employee_id=employee.id, leave_type="annual", year="2025", total_days=Decimal("10"),
+        used_days=Decimal("0"), pending_days=Decimal("0"), available_days=Decimal("10")
+    ))
+    leave_request = LeaveRequest(
+        id=uuid4(), employee_id=employee.id, leave_type="annual", start_date=date(2025, 5, 5),
+        end_date=date(2025, 5, 7), total_days=Decimal("3"), status="pending", country_code="AF"
+    )
+    db_session.add(leave_request)
+    employee_id, request_id = employee.id, leave_request.id
+    await db_session.commit()
+    await LeaveLedgerRepository(db_session).post(
+        employee_id, "annual", "2025", LeaveLedgerEntryType.HOLD, pending_delta=Decimal("3"),
+        reference=f"leave_request:{request_id}:hold"
+    )
+    await db_session.commit()
+    
+    service = LeaveService(db_session)
+    approved = await service.approve_leave_request(request_id, employee_id)
+    assert approved.status == "approved"
+    with pytest.raises(BadRequestException):
+        await service.reject_leave_request(request_id, employee_id, "Too late")
+    
+    entries = await service.ledger_repo.get_entries(employee_id, "annual", "2025")
+    assert [entry.entry_type for entry in entries] == [LeaveLedgerEntryType.HOLD, LeaveLedgerEntryType.APPROVE]
+    balance = (await service.get_employee_balances(employee_id, "2025"))[0]
+    assert (balance.used_days, balance.pending_days, balance.available_days) == (3, 0, 7)
+
+
+@pytest.mark.asyncio
+async def test_rejecting_pending_leave_request_releases_hold(db_session, monkeypatch):
+    """Test that rejecting a pending request releases its hold and queues the employee email"""
+    from decimal import Decimal
+    from uuid import uuid4
+    from sqlalchemy import select
+    from modules.employees.models import Employee, EmploymentType
+    from modules.leave.models import LeaveBalance, LeaveLedgerEntryType, LeaveRequest
+    from modules.leave.repositories import LeaveLedgerRepository
+    from modules.leave.services import LeaveService
+    from core.email import email_service
+    from modules.notifications.models import EmailOutbox
+    
+    monkeypatch.setattr(email_service.config, "SEND_EMAILS", True)
+    employee = Employee(
+        id=uuid4(), employee_number="REJ001", first_name="Re", last_name="Ject",
+        work_email="reject@example.com", employment_type=EmploymentType.FULL_TIME,
+        hire_date=date(2024, 1, 1), country_code="AF"
+    )
+    db_session.add(employee)
+    db_session.add(LeaveBalance(
+        employee_id=employee.id, leave_type="annual", year="2025", total_days=Decimal("10"),
+        used_days=Decimal("0"), pending_days=Decimal("0"), available_days=Decimal("10")
+    ))
+    leave_request = LeaveRequest(
+        id=uuid4(), employee_id=employee.id, leave_type="annual", start_date=date(2025, 5, 5),
+        end_date=date(2025, 5, 7), total_days=Decimal("3"), status="pending", country_code="AF"
+    )
+    db_session.add(leave_request)
+    employee_id, request_id = employee.id, leave_request.id
+    await db_session.commit()
+    await LeaveLedgerRepository(db_session).post(
+        employee_id, "annual", "2025", LeaveLedgerEntryType.HOLD, pending_delta=Decimal("3"),
+        reference=f"leave_request:{request_id}:hold"
+    )
+    await db_session.commit()
+    
+    service = LeaveService(db_session)
+    rejected = await service.reject_leave_request(request_id, employee_id, "Busy period")
+    assert rejected.status == "rejected"
+    
+    entries = await service.ledger_repo.get_entries(employee_id, "annual", "2025")
+    assert [entry.entry_type for entry in entries] == [LeaveLedgerEntryType.HOLD, LeaveLedgerEntryType.RELEASE]
+    balance = (await service.get_employee_balances(employee_id, "2025"))[0]
+    assert (balance.used_days, balance.pending_days, balance.available_days) == (0, 0, 10)
+    
+    result = await db_session.execute(
+        select(EmailOutbox.to_email).where(EmailOutbox.dedupe_key == f"leave:{request_id}:rejected")
+    )
+    assert result.scalars().all() == ["reject@example.com"]
+
+
+@pytest.mark.asyncio
+async def test_leave_workflow_queues_notifications(db_session, monkeypatch):
+    """Test that submitting and approving a leave request queue outbox emails for each step"""
+    from decimal import Decimal
+    from uuid import uuid4
+    from sqlalchemy import select
+    from core.email import email_service
+    from modules.approvals.models import ApprovalRequest
+    from modules.auth.models import Role, User
+    from modules.employees.models import Employee, EmploymentType
+    from modules.leave.models import LeaveBalance
+    from modules.leave.schemas import LeaveRequestCreate
+    from modules.leave.services import LeaveService
+    from modules.notifications.models import EmailOutbox
+    
+    monkeypatch.setattr(email_service.config, "SEND_EMAILS", True)
+    hr_user = User(
+        id=uuid4(), email="hr.user@example.com", hashed_password="x", first_name="Hr", last_name="User",
+        roles=[Role(id=uuid4(), name="hr_manager", display_name="HR Manager")]
+    )
+    hr, manager, employee = [
+        Employee(
+            id=uuid4(), employee_number=f"NTF{i:03d}", first_name="Notify", last_name=f"Person{i}",
+            work_email=f"notify{i}@example.com", employment_type=EmploymentType.FULL_TIME,
+            hire_date=date(2024, 1, 1), country_code="AF"
+        )
+        for i in range(3)
+    ]
+    hr.user_id = hr_user.id
+    employee.manager_id = manager.id
+    db_session.add_all([hr_user, hr, manager, employee])
+    db_session.add(LeaveBalance(
+        employee_id=employee.id, leave_type="annual", year="2025", total_days=Decimal("10"),
+        used_days=Decimal("0"), pending_days=Decimal("0"), available_days=Decimal("10")
+    ))
+    ids = (hr.id, manager.id, employee.id)
+    await db_session.commit()
+    hr_id, manager_id, employee_id = ids
+    
+    async def outbox_recipients():
+        result = await db_session.execute(select(EmailOutbox.to_email).order_by(EmailOutbox.created_at))
+        return result.scalars().all()
+    
+    async def pending_approval(approver_id):
+        result = await db_session.execute(
+            select(ApprovalRequest.id).where(ApprovalRequest.approver_id == approver_id)
+        )
+        return result.scalar_one()
+    
+    service = LeaveService(db_session)
+    submitted = await service.submit_leave_request(
+        LeaveRequestCreate(leave_type="annual", start_date=date(2025, 5, 5), end_date=date(2025, 5, 7)),
+        employee_id
+    )
+    assert await outbox_recipients() == ["notify1@example.com"]
+    
+    await service.approve_leave_request(submitted.id, manager_id, approval_id=await pending_approval(manager_id))
+    assert await outbox_recipients() == ["notify1@example.com", "notify0@example.com"]
+    
+    approved = await service.approve_leave_request(submitted.id, hr_id, approval_id=await pending_approval(hr_id))
+    assert approved.status == "approved"
+    assert await outbox_recipients() == ["notify1@example.com", "notify0@example.com", "notify2@example.com"]
+
+
+@pytest.mark.asyncio
+async def test_leave_submission_commits_with_its_notification(db_session, monkeypatch):
+    """Test that a submission whose notification cannot be queued leaves no request, hold or approval"""
+    from decimal import Decimal
+    from uuid import uuid4
+    from sqlalchemy import func, select
+    from core.email import email_service
+    from modules.approvals.models import ApprovalRequest
+    from modules.auth.models import Role, User
+    from modules.employees.models import Employee, EmploymentType
+    from modules.leave.models import LeaveBalance, LeaveRequest
+    from modules.leave.schemas import LeaveRequestCreate
+    from modules.leave.services import LeaveService
+    
+    async def failing_notification(**kwargs):
+        raise RuntimeError("outbox unavailable")
+    
+    monkeypatch.setattr(email_service, "send_approval_request_notification", failing_notification)
+    hr_user = User(
+        id=uuid4(), email="hr.atomic@example.com", hashed_password="x", first_name="Hr", last_name="Atomic",
+        roles=[Role(id=uuid4(), name="hr_manager", display_name="HR Manager")]
+    )
+    hr, manager, employee = [
+        Employee(
+            id=uuid4(), employee_number=f"ATM{i:03d}", first_name="Atomic", last_name=f"Person{i}",
+            work_email=f"atomic{i}@example.com", employment_type=EmploymentType.FULL_TIME,
+            hire_date=date(2024, 1, 1), country_code="AF"
+        )
+        for i in range(3)
+    ]
+    hr.user_id = hr_user.id
+    employee.manager_id = manager.id
+    db_session.add_all([hr_user, hr, manager, employee])
+    db_session.add(LeaveBalance(
+        employee_id=employee.id, leave_type="annual", year="2025", total_days=Decimal("10"),
+        used_days=Decimal("0"), pending_days=Decimal("0"), available_days=Decimal("10")
+    ))
+    employee_id = employee.id
+    await db_session.commit()
+    
+    service = LeaveService(db_session)
+    with pytest.raises(RuntimeError):
+        await service.submit_leave_request(
+            LeaveRequestCreate(leave_type="annual", start_date=date(2025, 5, 5), end_date=date(2025, 5, 7)),
+            employee_id
+        )
+    await db_session.rollback()
+    
+    assert await db_session.scalar(select(func.count()).select_from(LeaveRequest)) == 0
+    assert await db_session.scalar(select(func.count()).select_from(ApprovalRequest)) == 0
+    balance = (await service.get_employee_balances(employee_id, "2025"))[0]
+    assert balance.pending_days == 0
+
+
+@pytest.mark.asyncio
+async def test_leave_accrual_prorates_carries_over_and_is_idempotent(db_session):
+    """Test that accruals follow policies per country, pro-rate new hires and post once per period"""
+    from decimal import Decimal
+    from uuid import uuid4
+    from sqlalchemy import select
+    from modules.employees.models import Employee, EmploymentType
+    from modules.leave.models import LeaveBalance, LeavePolicy
+    from modules.leave.services import LeaveAccrualService
+    
+    def make_employee(number, hire_date, country_code, termination_date=None):
+        return Employee(
+            id=uuid4(), employee_number=number, first_name="Acc", last_name=number,
+            work_email=f"{number.lower()}@example.com", employment_type=EmploymentType.FULL_TIME,
+            hire_date=hire_date, termination_date=termination_date, country_code=country_code
+        )
+    
+    veteran = make_employee("ACC001", date(2024, 1, 1), "AF")
+    new_hire = make_employee("ACC002", date(2025, 3, 16), "AF")
+    kenyan = make_employee("ACC003", date(2020, 5, 1), "KE")
+    leaver = make_employee("ACC004", date(2020, 5, 1), "AF", termination_date=date(2025, 3, 10))
+    db_session.add_all([veteran, new_hire, kenyan, leaver])
+    db_session.add_all([
+        LeavePolicy(name="Annual", leave_type="annual", days_per_year=Decimal("12"),
+                    accrual_rate="monthly", max_carryover=Decimal("5")),
+        LeavePolicy(name="Annual (KE)", leave_type="annual", days_per_year=Decimal("24"),
+                    accrual_rate="yearly", country_code="KE")
+    ])
+    db_session.add(LeaveBalance(
+        employee_id=veteran.id, leave_type="annual", year="2024", total_days=Decimal("12"),
+        used_days=Decimal("4"), pending_days=Decimal("0"), available_days=Decimal("8")
+    ))
+    await db_session.commit()
+    
+    progress = []
+    service = LeaveAccrualService(db_session, chunk_size=1, progress=progress.append)
+    stats = await service.run(on=date(2025, 3, 20), catch_up=True)
+    assert stats == {"carried_over": 1, "accrued": 8, "periods": 4}  # 3 + 1 + 3 months and 1 yearly grant
+    assert progress[-1]["processed"] == 1
+    
+    result = await db_session.execute(
+        select(LeaveBalance.employee_id, LeaveBalance.total_days, LeaveBalance.available_days)
+        .where(LeaveBalance.year == "2025")
+    )
+    balances = {row.employee_id: (row.total_days, row.available_days) for row in result.all()}
+    assert balances[veteran.id] == (Decimal("8"), Decimal("8"))  # 5 carried over + 3 months
+    assert balances[new_hire.id] == (Decimal("0.52"), Decimal("0.52"))  # 16 of March's 31 days
+    assert balances[kenyan.id] == (Decimal("24"), Decimal("24"))
+    assert balances[leaver.id] == (Decimal("2.32"), Decimal("2.32"))  # 2 months + 10 of March's 31 days
+    
+    assert await service.run(on=date(2025, 3, 20), catch_up=True) == {"carried_over": 0, "accrued": 0, "periods": 4}
+    assert LeaveAccrualService.period_amount(Decimal("20"), 12, 12) == Decimal("1.67")
+    assert sum(LeaveAccrualService.period_amount(Decimal("20"), i, 12) for i in range(1, 13)) == Decimal("20")
@@ -0,0 +1,97 @@
+"""
+Tests for org chart layout and export
+"""
+
+from datetime import date
+from uuid import uuid4
+
+import pytest
+
+from core.org_chart import layout_org_chart, paginate_layout, render_org_chart_svg
+from core.pdf_generator import create_organization_chart_pdf
+
+
+def _node(node_id, manager_id=None):
+    return {"id": node_id, "manager_id": manager_id, "name": node_id.title(), "position": None, "department": None}
+
+
+def test_layout_centres_managers_and_paginates():
+    """Test tidy positions, the depth cut and page windows"""
+    layout = layout_org_chart([
+        _node("ceo"),
+        _node("ops", "ceo"), _node("fin", "ceo"),
+        _node("a", "ops"), _node("b", "ops"), _node("c", "ops"),
+        _node("d", "fin"),
+        _node("loner", "missing")
+    ])
+    positions = {node["id"]: (node["x"], node["y"]) for node in layout["nodes"]}
+    assert positions == {
+        "ceo": (2, 0), "ops": (1, 1), "fin": (3, 1),
+        "a": (0, 2), "b": (1, 2), "c": (2, 2), "d": (3, 2),
+        "loner": (4, 0)
+    }
+    assert [node["id"] for node in layout["nodes"]][:3] == ["ceo", "ops", "a"]
+    assert (layout["width"], layout["height"]) == (5, 3)
+    
+    shallow = layout_org_chart([_node("ceo"), _node("ops", "ceo"), _node("a", "ops"), _node("b", "ops")], max_depth=1)
+    ops = next(node for node in shallow["nodes"] if node["id"] == "ops")
+    assert (ops["reports"], ops["hidden_reports"], shallow["height"]) == (2, 2, 2)
+    
+    pages = paginate_layout(layout, columns=2, rows=2)
+    assert [(page["x0"], page["y0"], sorted(n["id"] for n in page["nodes"])) for page in pages] == [
+        (0, 0, ["ops"]), (2, 0, ["ceo", "fin"]), (4, 0, ["loner"]), (0, 2, ["a", "b"]), (2, 2, ["c", "d"])
+    ]
+    
+    svg = render_org_chart_svg(layout)
+    assert svg.startswith("<svg") and svg.count("<rect") == 8 and svg.count("<path") == 6
+    assert create_organization_chart_pdf(layout, "Everyone").getvalue().startswith(b"%PDF")
+
+
+@pytest.mark.asyncio
+async def test_chart_scopes_and_version_keyed_cache(db_session):
+    """Test subtree and department scopes, and that writes change the cached layout's key"""
+    from modules.employees.hierarchy import OrgHierarchy
+    from modules.employees.models import Department, Employee, EmploymentType, EmploymentStatus
+    from modules.employees.org_chart import OrgChartService
+    
+    programs = Department(id=uuid4(), name="Programs", code="CHART-PRG")
+    field = Department(id=uuid4(), name="Field", code="CHART-FLD", parent_id=programs.id)
+    db_session.add_all([programs, field])
+    hierarchy = OrgHierarchy(db_session)
+    people = {}
+    for name, manager, department in [
+        ("Head", None, None), ("Pia", "Head", programs), ("Fay", "Pia", field), ("Gus", "Head", None)
+    ]:
+        employee = Employee(
+            id=uuid4(), employee_number=f"CHART-{name}", first_name=name, last_name="Chart",
+            work_email=f"chart-{name.lower()}@example.com", employment_type=EmploymentType.FULL_TIME,
+            hire_date=date(2024, 1, 1), status=EmploymentStatus.ACTIVE,
+            manager_id=people[manager].id if manager else None,
+            department_id=department.id if department else None
+        )
+        db_session.add(employee)
+        await db_session.flush()
+        await hierarchy.add_employee(employee.id, employee.manager_id)
+        people[name] = employee
+    await db_session.commit()
+    
+    service = OrgChartService(db_session)
+    subtree = await service.get_layout(root_employee_id=people["Pia"].id)
+    assert [(n["name"], n["x"], n["y"], n["manager_id"]) for n in subtree["nodes"]] == [
+        ("Pia Chart", 0, 0, None), ("Fay Chart", 0, 1, str(people["Pia"].id))
+    ]
+    assert subtree["title"] == "Pia Chart"
+    
+    department = await service.get_layout(department_id=programs.id)
+    assert {n["name"] for n in department["nodes"]} == {"Pia Chart", "Fay Chart"}
+    assert department["title"] == "Programs"
+    
+    everyone = await service.get_layout(max_depth=1)
+    assert [n["name"] for n in everyone["nodes"]] == ["Head Chart", "Gus Chart", "Pia Chart"]
+    assert await service.get_layout(max_depth=1) == everyone
+    
+    await hierarchy.set_manager(people["Fay"], people["Head"].id)
+    await db_session.commit()
+    moved = await service.get_layout(root_employee_id=people["Pia"].id)
+    assert moved["version"] != subtree["version"]
+    assert [n["name"] for n in moved["nodes"]] == ["Pia Chart"]
@@ -31,3 +31,161 @@ async def test_payroll_stats_endpoint_exists(client: AsyncClient):
     # Should require auth
     assert response.status_code in [401, 200]
 
+
+
+async def _seed_employees_with_contracts(session, count):
+    """Insert active employees, each with an expired and a current active contract"""
+    import uuid
+    from datetime import date
+    from decimal import Decimal
+    from modules.employees.models import Employee, EmploymentType
+    from modules.employee_files.models import EmploymentContract, ContractStatus
+    
+    creator_id = uuid.uuid4()
+    for i in range(count):
+        employee = Employee(
+            id=uuid.uuid4(),
+            employee_number=f"EMP{i:05d}",
+            first_name="Test",
+            last_name=f"Employee{i:05d}",
+            work_email=f"employee{i}@example.com",
+            employment_type=EmploymentType.FULL_TIME,
+            hire_date=date(2023, 1, 1)
+        )
+        session.add(employee)
+        for year, status, salary in [
+            (2023, ContractStatus.EXPIRED, Decimal("900")),
+            (2024, ContractStatus.ACTIVE, Decimal("1000")),
+        ]:
+            session.add(EmploymentContract(
+                employee_id=employee.id,
+                contract_number=f"C{i:05d}-{year}",
+                position_title="Officer",
+                start_date=date(year, 1, 1),
+                end_date=date(year, 12, 31),
+                monthly_salary=salary,
+                status=status,
+                created_by=creator_id
+            ))
+    await session.commit()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("employee_count", [50, 500])
+async def test_active_employees_for_payroll_query_count_is_flat(db_session, employee_count):
+    """Test that payroll preparation issues a constant number of queries"""
+    from sqlalchemy import event
+    from modules.payroll.services import PayrollService
+    
+    await _seed_employees_with_contracts(db_session, employee_count)
+    
+    statements = []
+    engine = db_session.bind.sync_engine
+    
+    def count_statement(*args):
+        statements.append(args)
+    
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        summaries = await PayrollService.get_active_employees_for_payroll(db_session, user_id=None)
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+    
+    assert len(summaries) == employee_count
+    assert all(summary.has_active_contract for summary in summaries)
+    assert all(summary.basic_salary == 1000 for summary in summaries)
+    assert len(statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_payroll_zip_contains_every_payslip():
+    """Test that the streamed ZIP is valid and holds each payslip plus the summary"""
+    import io
+    import uuid
+    import zipfile
+    from datetime import date, datetime
+    from decimal import Decimal
+    from types import SimpleNamespace
+    from modules.payroll.pdf_generator import pdf_generator
+    
+    amount = Decimal("1000")
+    payroll = SimpleNamespace(
+        id=uuid.uuid4(), year=2026, month=3, payment_date=date(2026, 3, 31),
+        updated_at=datetime(2026, 3, 1), total_basic_salary=amount, total_allowances=amount,
+        total_gross_salary=amount, total_deductions=amount, total_net_salary=amount
+    )
+    entries = [
+        SimpleNamespace(
+            id=uuid.uuid4(), updated_at=datetime(2026, 3, 1), employee_number=f"EMP{i:03d}",
+            first_name="Test", last_name=f"Employee{i}", position=None, department=None,
+            basic_salary=amount, allowances=amount, gross_salary=amount,
+            deductions=amount, net_salary=amount, currency="USD"
+        )
+        for i in range(5)
+    ]
+    
+    chunks = [chunk async for chunk in pdf_generator.stream_payroll_zip(payroll, entries)]
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    
+    assert len(chunks) > 1
+    assert archive.testzip() is None
+    assert len(archive.namelist()) == 6
+    assert "PAYROLL_SUMMARY_2026_03.pdf" in archive.namelist()
+
+
+@pytest.mark.asyncio
+async def test_stream_payroll_zip_cancels_renders_when_closed(monkeypatch):
+    """Test that closing the ZIP stream early cancels payslip renders still in flight"""
+    import asyncio
+    from types import SimpleNamespace
+    from modules.payroll.pdf_generator import pdf_generator
+    
+    cancelled = []
+    
+    async def fake_member(payroll, entry):
+        if entry.index == 0:
+            return "first.pdf", b"%PDF"
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.append(entry.index)
+            raise
+    
+    monkeypatch.setattr(pdf_generator, "_payslip_member", fake_member)
+    entries = [SimpleNamespace(index=i) for i in range(3)]
+    stream = pdf_generator._zip_stream(SimpleNamespace(year=2026, month=3), entries)
+    
+    await stream.__anext__()
+    await stream.aclose()
+    await asyncio.sleep(0)
+    
+    assert sorted(cancelled) == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_payroll_prorates_mid_month_hires_by_working_days(db_session):
+    """Test that salaries of employees hired during the payroll month are pro-rated"""
+    from datetime import date
+    from decimal import Decimal
+    from core.work_calendar import invalidate_work_calendar
+    from modules.employees.models import Employee
+    from modules.payroll.services import PayrollService
+    
+    invalidate_work_calendar()
+    await _seed_employees_with_contracts(db_session, 2)
+    new_hire = (await db_session.execute(
+        Employee.__table__.select().where(Employee.employee_number == "EMP00001")
+    )).first()
+    await db_session.execute(
+        Employee.__table__.update().where(Employee.id == new_hire.id).values(hire_date=date(2025, 3, 17))
+    )
+    await db_session.commit()
+    
+    summaries = await PayrollService.get_active_employees_for_payroll(db_session, user_id=None, year=2025, month=3)
+    by_number = {summary.employee_number: summary for summary in summaries}
+    
+    # March 2025 has 21 weekdays; the hire worked the last 11 of them
+    assert (by_number["EMP00000"].basic_salary, by_number["EMP00000"].working_days) == (Decimal("1000"), 21)
+    assert by_number["EMP00001"].days_worked == 11
+    assert by_number["EMP00001"].basic_salary == Decimal("523.81")
+    assert by_number["EMP00001"].contract_monthly_salary == Decimal("1000")
@@ -0,0 +1,125 @@
+"""
+Tests for the PDF render service
+"""
+
+import asyncio
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+
+from core.exceptions import RenderUnavailableException
+from core.pdf_generator import generate_resignation_letter_pdf
+from core.pdf_render import (
+    PDFRenderService, renderer_path, resolve_renderer, encode_render_args, decode_render_args
+)
+
+RESIGNATION = {
+    "resignation_date": "2026-01-15",
+    "intended_last_working_day": "2026-02-15",
+    "notice_period_days": 30,
+    "reason": "Relocation"
+}
+EMPLOYEE = {"full_name": "Test User", "work_email": "test@example.com"}
+
+
+def _slow_render(seconds):
+    time.sleep(seconds)
+    return b"%PDF-slow"
+
+
+@pytest.mark.asyncio
+async def test_process_backend_renders_pdf():
+    """Test that documents render in the worker pool"""
+    service = PDFRenderService(backend="process", workers=1)
+    try:
+        pdf_buffer = await service.render(generate_resignation_letter_pdf, RESIGNATION, EMPLOYEE)
+    finally:
+        service.shutdown()
+    
+    assert pdf_buffer.getvalue().startswith(b"%PDF")
+    assert service.get_stats()["rendered"] == 1
+    assert service.get_stats()["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_timed_out_render_keeps_its_slot_until_the_worker_finishes():
+    """Test that a render abandoned by its caller still counts against the queue bound"""
+    service = PDFRenderService(backend="process", workers=1, max_queue=1)
+    try:
+        await service.render_bytes(_slow_render, 0)  # start the worker
+        with pytest.raises(RenderUnavailableException):
+            await service.render_bytes(_slow_render, 1.0, timeout=0.2)
+        assert service.get_stats()["queue_depth"] == 1
+        with pytest.raises(RenderUnavailableException):
+            await service.render_bytes(_slow_render, 0)
+        assert service.get_stats()["rejected"] == 1
+        
+        for _ in range(50):
+            if service.queue_depth == 0:
+                break
+            await asyncio.sleep(0.1)
+        assert service.get_stats()["queue_depth"] == 0
+    finally:
+        service.shutdown()
+
+
+def test_render_args_survive_the_celery_json_round_trip():
+    """Test that UUID, Decimal and date arguments keep their types through JSON"""
+    import json
+    args = [{"id": uuid4(), "net_salary": Decimal("1234.50"), "pay_date": date(2025, 3, 31),
+             "generated_at": datetime(2025, 3, 31, 9, 30), "items": (1, "two", None)}]
+    assert decode_render_args(json.loads(json.dumps(encode_render_args(args)))) == [
+        {**args[0], "items": [1, "two", None]}
+    ]
+    with pytest.raises(TypeError):
+        encode_render_args([object()])
+
+
+@pytest.mark.asyncio
+async def test_full_queue_is_rejected():
+    """Test that renders beyond the queue bound fail fast"""
+    service = PDFRenderService(backend="inline", max_queue=0)
+    
+    with pytest.raises(RenderUnavailableException):
+        await service.render(generate_resignation_letter_pdf, RESIGNATION, EMPLOYEE)
+    assert service.get_stats()["rejected"] == 1
+
+
+def test_resolve_renderer_only_allows_render_modules():
+    """Test that Celery render tasks cannot name arbitrary callables"""
+    assert resolve_renderer(renderer_path(generate_resignation_letter_pdf)) is generate_resignation_letter_pdf
+    with pytest.raises(ValueError):
+        resolve_renderer("os:system")
+
+
+@pytest.mark.asyncio
+async def test_user_manual_is_rendered_once_per_content_hash(tmp_path, monkeypatch):
+    """Test that the manual is served from disk until its sources change"""
+    from core import user_manual
+    
+    renders = []
+    
+    async def fake_render_bytes(renderer, *args, **kwargs):
+        renders.append(renderer)
+        return b"%PDF-1.4 manual"
+    
+    monkeypatch.setattr(user_manual.render_service, "render_bytes", fake_render_bytes)
+    manual_cache = user_manual.UserManualCache(directory=str(tmp_path))
+    
+    first_path, first_etag = await manual_cache.get()
+    second_path, second_etag = await manual_cache.get()
+    
+    assert len(renders) == 1
+    assert (first_path, first_etag) == (second_path, second_etag)
+    assert open(first_path, "rb").read() == b"%PDF-1.4 manual"
+    
+    # A changed source produces a new hash, a new file and removes the old one
+    monkeypatch.setattr(manual_cache, "content_hash", lambda: "f" * 64)
+    third_path, third_etag = await manual_cache.get()
+    
+    assert len(renders) == 2
+    assert third_etag != first_etag
+    assert [p.name for p in tmp_path.iterdir()] == [third_path.rsplit("/", 1)[-1]]
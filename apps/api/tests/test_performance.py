@@ -34,3 +34,138 @@ async def test_performance_goals_endpoint_exists(client: AsyncClient):
     # Should require auth
     assert response.status_code in [401, 200]
 
+
+
+@pytest.mark.asyncio
+async def test_review_campaign_creates_cycles_for_a_department_in_bulk(db_session):
+    """Test that a department campaign creates every cycle and slot once and batches notifications"""
+    from datetime import date
+    from sqlalchemy import func, select
+    from modules.employees.models import Department, Employee, EmploymentStatus, EmploymentType
+    from modules.notifications.models import EmailOutbox
+    from modules.performance.models import PerformanceEvaluation, PerformanceReviewCycle, ReviewerType
+    from modules.performance.schemas import ReviewCampaignCreate
+    from modules.performance.services import ReviewCampaignService
+    
+    ops, finance = Department(id=uuid4(), name="Operations", code="OPS"), Department(id=uuid4(), name="Finance", code="FIN")
+    db_session.add_all([ops, finance])
+    
+    def person(number, manager=None, department=ops, hire_date=date(2024, 1, 1), status=EmploymentStatus.ACTIVE):
+        employee = Employee(
+            id=uuid4(), employee_number=number, first_name="Camp", last_name=number,
+            work_email=f"{number.lower()}@example.com", employment_type=EmploymentType.FULL_TIME,
+            hire_date=hire_date, status=status, department_id=department.id,
+            manager_id=manager.id if manager else None, country_code="AF"
+        )
+        db_session.add(employee)
+        return employee
+    
+    head = person("CMP001")
+    head.first_name = "Camp <b>"
+    a, b, c = person("CMP002", head), person("CMP003", head), person("CMP004", head)
+    b_report = person("CMP005", b)
+    person("CMP006", head, department=finance)  # reviews head as a subordinate, not a target
+    person("CMP007", head, hire_date=date(2026, 2, 1))  # hired after the period
+    person("CMP008", head, status=EmploymentStatus.TERMINATED)
+    await db_session.commit()
+    
+    campaign = ReviewCampaignCreate(
+        scope="department", department_id=ops.id,
+        review_period_start=date(2025, 1, 1), review_period_end=date(2025, 12, 31),
+        include_peers=True, peers_per_employee=1
+    )
+    progress = []
+    service = ReviewCampaignService(db_session, batch_size=2, progress=progress.append)
+    result = await service.launch(campaign)
+    
+    # head: self + 4 reports; a, c: self + supervisor + peer; b: + its report; b_report: self + supervisor
+    assert (result.cycles_created, result.evaluations_created) == (5, 17)
+    assert (result.evaluators, result.notifications_queued) == (6, 6)
+    assert {"stage": "cycles", "done": 5, "total": 5} in progress
+    
+    slots = await db_session.execute(
+        select(PerformanceEvaluation.evaluator_type, func.count())
+        .join(PerformanceReviewCycle, PerformanceReviewCycle.id == PerformanceEvaluation.review_cycle_id)
+        .group_by(PerformanceEvaluation.evaluator_type)
+    )
+    assert dict(slots.all()) == {
+        ReviewerType.SELF: 5, ReviewerType.SUPERVISOR: 4, ReviewerType.SUBORDINATE: 5, ReviewerType.PEER: 3
+    }
+    assert await db_session.scalar(select(func.count()).select_from(EmailOutbox)) == 6
+    head_email = await db_session.scalar(select(EmailOutbox.html_body).where(EmailOutbox.to_email == "cmp001@example.com"))
+    assert "Dear Camp &lt;b&gt;," in head_email
+    
+    # Relaunching only picks up employees without a cycle for the period
+    again = await ReviewCampaignService(db_session).launch(campaign)
+    assert again.cycles_created == 0
+    assert await db_session.scalar(select(func.count()).select_from(PerformanceReviewCycle)) == 5
+    
+    with pytest.raises(ValueError):
+        ReviewCampaignCreate(scope="country", review_period_start=date(2025, 1, 1), review_period_end=date(2025, 12, 31))
+
+
+@pytest.mark.asyncio
+async def test_rating_summary_tracks_submissions_and_feeds_calibration(db_session):
+    """Test that submissions keep the cycle's rating summary current and calibration groups ratings"""
+    import json
+    from datetime import date
+    from modules.employees.models import Department, Employee, EmploymentType
+    from modules.performance.models import PerformanceEvaluation, PerformanceReviewCycle, ReviewerType
+    from modules.performance.schemas import PerformanceEvaluationSubmit
+    from modules.performance.services import PerformanceService
+    
+    department = Department(id=uuid4(), name="Programs", code="PRG")
+    db_session.add(department)
+    people = [
+        Employee(
+            id=uuid4(), employee_number=f"RTG00{i}", first_name="Rate", last_name=str(i),
+            work_email=f"rtg{i}@example.com", employment_type=EmploymentType.FULL_TIME,
+            hire_date=date(2024, 1, 1), department_id=department.id
+        )
+        for i in range(4)
+    ]
+    employee, supervisor, peer_a, peer_b = people
+    db_session.add_all(people)
+    cycle = PerformanceReviewCycle(
+        id=uuid4(), employee_id=employee.id, review_type="annual", status="in_progress",
+        review_period_start=date(2025, 1, 1), review_period_end=date(2025, 12, 31)
+    )
+    db_session.add(cycle)
+    db_session.add_all([
+        PerformanceEvaluation(review_cycle_id=cycle.id, evaluator_id=evaluator_id, evaluator_type=evaluator_type, status="pending")
+        for evaluator_id, evaluator_type in [
+            (employee.id, ReviewerType.SELF), (supervisor.id, ReviewerType.SUPERVISOR),
+            (peer_a.id, ReviewerType.PEER), (peer_b.id, ReviewerType.PEER)
+        ]
+    ])
+    await db_session.commit()
+    
+    service = PerformanceService(db_session)
+    summary = await service.get_360_review_summary(cycle.id)
+    assert (summary.total_evaluations, summary.pending_evaluations, summary.average_rating) == (4, 4, None)
+    
+    for evaluator, rating in [(supervisor, 4), (peer_a, 3), (peer_b, 5)]:
+        await service.submit_evaluation(cycle.id, evaluator.id, PerformanceEvaluationSubmit(rating=rating))
+    
+    summary = await service.get_360_review_summary(cycle.id)
+    assert (summary.completed_evaluations, summary.pending_evaluations) == (3, 1)
+    assert summary.average_rating == 4.0
+    assert summary.peer_average_rating == 4.0
+    assert summary.supervisor_rating == 4
+    assert summary.rating_breakdown["peer"]["rated"] == 2
+    assert summary.final_rating is None
+    
+    await service.submit_evaluation(cycle.id, employee.id, PerformanceEvaluationSubmit(rating=5))
+    await db_session.refresh(cycle)
+    assert json.loads(cycle.rating_summary)["pending"] == 0
+    assert cycle.final_rating == 4  # round(17 / 4)
+    
+    calibration = await service.get_calibration(date(2025, 1, 1), date(2025, 12, 31))
+    [programs] = calibration["departments"]
+    assert programs["department_name"] == "Programs"
+    assert programs["cycles"] == 1
+    assert programs["final_rating_distribution"]["4"] == 1
+    assert programs["evaluations"] == 4
+    assert programs["average_rating"] == 4.25
+    assert programs["by_evaluator_type"]["peer"]["distribution"] == {"1": 0, "2": 0, "3": 1, "4": 0, "5": 1}
+    assert (await service.get_calibration(date(2026, 1, 1), date(2026, 12, 31)))["departments"] == []
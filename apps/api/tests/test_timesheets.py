@@ -33,3 +33,58 @@ async def test_projects_endpoint_exists(client: AsyncClient):
     # Should require auth
     assert response.status_code in [401, 200]
 
+
+
+@pytest.mark.asyncio
+async def test_list_timesheets_keyset_pages_and_batched_entries(db_session):
+    """Test cursor paging, soft-deleted entry exclusion and summary mode"""
+    import uuid
+    from datetime import datetime, timedelta
+    from decimal import Decimal
+    from modules.employees.models import Employee, EmploymentType
+    from modules.timesheets.models import Project, Timesheet, TimesheetEntry
+    from modules.timesheets.routes import list_timesheets
+    
+    employee = Employee(
+        id=uuid.uuid4(), employee_number="EMP001", first_name="Test", last_name="User",
+        work_email="timesheets@example.com", employment_type=EmploymentType.FULL_TIME,
+        hire_date=date(2024, 1, 1)
+    )
+    project = Project(id=uuid.uuid4(), name="Relief", project_code="REL")
+    db_session.add_all([employee, project])
+    created = datetime(2026, 1, 1)
+    for week in range(5):
+        timesheet = Timesheet(
+            id=uuid.uuid4(), employee_id=employee.id, status="submitted",
+            period_start=date(2026, 1, 5) + timedelta(weeks=week),
+            period_end=date(2026, 1, 9) + timedelta(weeks=week),
+            total_hours=Decimal("16"), created_at=created + timedelta(days=week)
+        )
+        db_session.add(timesheet)
+        for day, is_deleted in [(0, False), (1, False), (2, True)]:
+            db_session.add(TimesheetEntry(
+                id=uuid.uuid4(), timesheet_id=timesheet.id, project_id=project.id,
+                date=timesheet.period_start + timedelta(days=day), hours=Decimal("8"),
+                is_deleted=is_deleted
+            ))
+    await db_session.commit()
+    
+    admin = {"id": uuid.uuid4(), "roles": ["admin"], "is_superuser": False}
+    filters = dict(employee_id=None, status_filter=None, period_from=None, period_to=None, limit=2)
+    
+    pages, cursor = [], None
+    while True:
+        page = await list_timesheets(**filters, summary=False, cursor=cursor, db=db_session, current_user=admin)
+        pages.append(page["timesheets"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    
+    listed = [t for page in pages for t in page]
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [t["period_start"] for t in listed] == sorted((t["period_start"] for t in listed), reverse=True)
+    assert all(len(t["entries"]) == 2 for t in listed)
+    
+    summary = await list_timesheets(**filters, summary=True, cursor=None, db=db_session, current_user=admin)
+    assert "entries" not in summary["timesheets"][0]
+    assert summary["timesheets"][0]["total_hours"] == 16.0
@@ -0,0 +1,78 @@
+"""
+Tests for the working-day calendar
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from core.work_calendar import (
+    WorkCalendar, get_work_calendar, invalidate_work_calendar,
+    parse_public_holidays, parse_weekend_days
+)
+
+
+def test_bitset_counts_match_day_by_day_walk():
+    """Test that bitset counting agrees with checking every day across years"""
+    holidays, recurring = parse_public_holidays('["2024-03-11", {"date": "2025-03-21"}, "01-01", "02-29"]')
+    cal = WorkCalendar("AF", weekend_days=parse_weekend_days("4"), holidays=holidays, recurring_holidays=recurring)
+    
+    start = date(2023, 12, 20)
+    days = [start + timedelta(days=i) for i in range(800)]
+    expected = [d.weekday() != 4 and d not in holidays and (d.month, d.day) not in recurring for d in days]
+    assert [cal.is_working_day(d) for d in days] == expected
+    
+    for first, last in [(0, 799), (10, 11), (12, 400), (300, 300), (450, 700)]:
+        assert cal.working_days(days[first], days[last]) == sum(expected[first:last + 1])
+    assert cal.working_days(date(2025, 1, 10), date(2025, 1, 1)) == 0
+    assert cal.non_working_days(date(2025, 3, 19), date(2025, 3, 23)) == [date(2025, 3, 21)]
+    
+    # 02-29 only exists in leap years
+    assert not cal.is_working_day(date(2024, 2, 29))
+    assert cal.working_days_in_month(2025, 2) == 24
+
+
+def test_weekend_and_holiday_parsing():
+    """Test weekend defaults and strict holiday validation"""
+    assert parse_weekend_days(None) == {5, 6}
+    assert parse_weekend_days(None, working_days_per_week=6) == {6}
+    assert parse_weekend_days("4, 5") == {4, 5}
+    with pytest.raises(ValueError):
+        parse_weekend_days("7")
+    
+    fixed, recurring = parse_public_holidays("2025-08-19\n03-21; 12-25")
+    assert fixed == {date(2025, 8, 19)}
+    assert recurring == {(3, 21), (12, 25)}
+    with pytest.raises(ValueError):
+        parse_public_holidays("Nowruz", strict=True)
+    assert parse_public_holidays("Nowruz") == (frozenset(), frozenset())
+
+
+@pytest.mark.asyncio
+async def test_calendars_load_from_country_config_and_are_cached(db_session):
+    """Test that calendars come from CountryConfig and reload after invalidation"""
+    from modules.admin.models import CountryConfig
+    
+    invalidate_work_calendar()
+    config = CountryConfig(
+        country_code="AF", country_name="Afghanistan", default_currency="AFN", timezone="Asia/Kabul",
+        working_hours_per_week=40, working_days_per_week=6, weekend_days="4",
+        public_holidays='["03-21"]'
+    )
+    db_session.add(config)
+    await db_session.commit()
+    
+    cal = await get_work_calendar(db_session, "AF")
+    assert cal.weekend_days == {4}
+    assert not cal.is_working_day(date(2025, 3, 21))
+    assert await get_work_calendar(db_session, "AF") is cal
+    
+    unknown = await get_work_calendar(db_session, "ZZ")
+    assert unknown.working_days(date(2025, 3, 17), date(2025, 3, 23)) == 5
+    
+    config.weekend_days = "4,5"
+    await db_session.commit()
+    assert await get_work_calendar(db_session, "AF") is cal
+    invalidate_work_calendar("AF")
+    assert (await get_work_calendar(db_session, "AF")).weekend_days == {4, 5}
+    invalidate_work_calendar()
@@ -21,6 +21,8 @@ export default function TimesheetsPage() {
   const [showTimesheetForm, setShowTimesheetForm] = useState(false)
   const [timesheets, setTimesheets] = useState<Timesheet[]>([])
   const [loading, setLoading] = useState(true)
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [selectedTimesheet, setSelectedTimesheet] = useState<Timesheet | null>(null)
   const [showDetailDialog, setShowDetailDialog] = useState(false)
   const { user } = useAuthStore()
@@ -30,10 +32,12 @@ export default function TimesheetsPage() {
     loadTimesheets()
   }, [])
 
+  // (Re)load the first page; later pages are appended by loadMoreTimesheets
   const loadTimesheets = async () => {
     try {
-      const data = await timesheetService.getTimesheets()
-      setTimesheets(data)
+      const page = await timesheetService.getTimesheetPage()
+      setTimesheets(page.timesheets)
+      setNextCursor(page.next_cursor)
     } catch (error) {
       console.error('Failed to load timesheets:', error)
     } finally {
@@ -41,6 +45,20 @@ export default function TimesheetsPage() {
     }
   }
 
+  const loadMoreTimesheets = async () => {
+    if (!nextCursor) return
+    setLoadingMore(true)
+    try {
+      const page = await timesheetService.getTimesheetPage(nextCursor)
+      setTimesheets(prev => [...prev, ...page.timesheets])
+      setNextCursor(page.next_cursor)
+    } catch (error) {
+      console.error('Failed to load more timesheets:', error)
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   const handleAddTimesheet = () => {
     setShowTimesheetForm(true)
   }
@@ -281,6 +299,13 @@ export default function TimesheetsPage() {
                   ))}
                 </tbody>
               </table>
+              {nextCursor && (
+                <div className="border-t p-3 text-center">
+                  <Button variant="outline" size="sm" onClick={loadMoreTimesheets} disabled={loadingMore}>
+                    {loadingMore ? 'Loading...' : 'Load more'}
+                  </Button>
+                </div>
+              )}
             </div>
           )}
         </CardContent>
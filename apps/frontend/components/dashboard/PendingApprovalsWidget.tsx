@@ -82,7 +82,7 @@ export function PendingApprovalsWidget({ employeeId }: PendingApprovalsWidgetPro
       }
       
       // Fetch pending approvals list
-      const approvalsResponse = await fetch(`${API_BASE_URL}/approvals/pending`, {
+      const approvalsResponse = await fetch(`${API_BASE_URL}/approvals/pending?limit=5`, {
         headers: {
           'Authorization': `Bearer ${token}`,
           'Content-Type': 'application/json',
@@ -46,7 +46,7 @@ interface TeamMember {
   id: string
   name: string
   position: string
-  attendance_rate: number
+  attendance_rate: number | null
   leave_balance: number
   status: string
 }
@@ -397,13 +397,17 @@ export function SupervisorDashboard() {
                       <td className="py-3 px-4 font-medium">{member.name}</td>
                       <td className="py-3 px-4 text-gray-600">{member.position}</td>
                       <td className="py-3 px-4 text-center">
-                        <Badge variant="outline" className={
-                          member.attendance_rate >= 95 ? 'bg-green-50 text-green-700' :
-                          member.attendance_rate >= 85 ? 'bg-yellow-50 text-yellow-700' :
-                          'bg-red-50 text-red-700'
-                        }>
-                          {member.attendance_rate}%
-                        </Badge>
+                        {member.attendance_rate === null ? (
+                          <span className="text-gray-400">—</span>
+                        ) : (
+                          <Badge variant="outline" className={
+                            member.attendance_rate >= 95 ? 'bg-green-50 text-green-700' :
+                            member.attendance_rate >= 85 ? 'bg-yellow-50 text-yellow-700' :
+                            'bg-red-50 text-red-700'
+                          }>
+                            {member.attendance_rate}%
+                          </Badge>
+                        )}
                       </td>
                       <td className="py-3 px-4 text-center">{member.leave_balance} days</td>
                       <td className="py-3 px-4 text-center">
@@ -29,6 +29,7 @@ interface CountryConfig {
   timezone: string
   working_hours_per_week: number
   working_days_per_week: number
+  weekend_days: string | null
   public_holidays: string | null
   is_active: boolean
 }
@@ -179,6 +180,7 @@ export function CountryConfigDialog({ open, onOpenChange }: CountryConfigDialogP
   const [timezone, setTimezone] = useState('')
   const [workingHours, setWorkingHours] = useState('40')
   const [workingDays, setWorkingDays] = useState('5')
+  const [weekendDays, setWeekendDays] = useState('')
   const [publicHolidays, setPublicHolidays] = useState('')
 
   useEffect(() => {
@@ -257,6 +259,7 @@ export function CountryConfigDialog({ open, onOpenChange }: CountryConfigDialogP
         timezone: timezone,
         working_hours_per_week: parseFloat(workingHours),
         working_days_per_week: parseInt(workingDays),
+        weekend_days: weekendDays || null,
         public_holidays: publicHolidays || null,
         is_active: true,
       }
@@ -322,6 +325,7 @@ const baseUrl = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000/api/v1
     setTimezone(config.timezone)
     setWorkingHours(config.working_hours_per_week.toString())
     setWorkingDays(config.working_days_per_week.toString())
+    setWeekendDays(config.weekend_days || '')
     setPublicHolidays(config.public_holidays || '')
     setEditingId(config.id)
     setShowAddConfig(true)
@@ -375,6 +379,7 @@ const baseUrl = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000/api/v1
     setTimezone('')
     setWorkingHours('40')
     setWorkingDays('5')
+    setWeekendDays('')
     setPublicHolidays('')
   }
 
@@ -485,13 +490,23 @@ const baseUrl = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000/api/v1
                   />
                 </div>
 
+                <div className="space-y-2">
+                  <Label htmlFor="weekend-days">Weekend Days (Optional)</Label>
+                  <Input
+                    id="weekend-days"
+                    value={weekendDays}
+                    onChange={(e) => setWeekendDays(e.target.value)}
+                    placeholder="5,6 (Mon = 0 ... Sun = 6)"
+                  />
+                </div>
+
                 <div className="space-y-2">
                   <Label htmlFor="public-holidays">Public Holidays (Optional)</Label>
                   <Input
                     id="public-holidays"
                     value={publicHolidays}
                     onChange={(e) => setPublicHolidays(e.target.value)}
-                    placeholder="New Year, Eid..."
+                    placeholder="2025-03-31, 08-19 (MM-DD repeats every year)"
                   />
                 </div>
               </div>
@@ -22,10 +22,21 @@ export interface Timesheet {
   entries: TimesheetEntry[]
 }
 
+export interface TimesheetPage {
+  timesheets: Timesheet[]
+  next_cursor: string | null
+}
+
+// Rows fetched per page; the list loads further pages on demand
+const TIMESHEET_PAGE_SIZE = 25
+
 class TimesheetService {
-  async getTimesheets(): Promise<Timesheet[]> {
-    const response = await apiClient.get<{timesheets: Timesheet[]}>('/timesheets/')
-    return response.data.timesheets
+  // One page of timesheets, newest first; pass the previous page's next_cursor to continue
+  async getTimesheetPage(cursor?: string | null, limit: number = TIMESHEET_PAGE_SIZE): Promise<TimesheetPage> {
+    const response = await apiClient.get<TimesheetPage>('/timesheets/', {
+      params: { limit, ...(cursor ? { cursor } : {}) },
+    })
+    return response.data
   }
 
   async createTimesheet(data: {